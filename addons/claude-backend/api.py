@@ -19,15 +19,16 @@ from dotenv import load_dotenv
 import requests
 from werkzeug.exceptions import HTTPException
 
-import tools
-import intent
+from lazy_import import LazyModule, module_available, preload, startup_timer
+import metrics_exporter
+import tracing
 from providers import stream_chat as provider_stream_chat
 import pricing
-import chat_ui
 from core.translations import LANGUAGE_TEXT, get_lang_text, tr, set_current_language
 from core.image_helpers import parse_image_data, format_message_with_image_anthropic, format_message_with_image_openai, format_message_with_image_google
 from core.model_utils import normalize_model_name, get_model_provider, validate_model_provider_compatibility, get_active_model
 from core.error_utils import humanize_provider_error, _extract_http_error_code, _extract_remote_message
+from core.keyword_matcher import KeywordMatcher, all_lang_keywords
 from services.model_service import (
     NVIDIA_MODEL_BLOCKLIST, NVIDIA_MODEL_TESTED_OK, MODEL_BLOCKLIST_FILE,
     NVIDIA_MODEL_UNCERTAIN, PROVIDER_MODEL_TESTED_OK, PROVIDER_MODEL_UNCERTAIN,
@@ -49,43 +50,49 @@ from services.prompt_service import (
     _load_custom_system_prompt_from_disk, _persist_custom_system_prompt_to_disk
 )
 
-# Optional feature modules
-try:
-    import memory
-    MEMORY_AVAILABLE = True
-except ImportError:
-    MEMORY_AVAILABLE = False
-
-try:
-    import file_upload
-    FILE_UPLOAD_AVAILABLE = True
-except ImportError:
-    FILE_UPLOAD_AVAILABLE = False
-    
-try:
-    import rag
-    RAG_AVAILABLE = True
-except ImportError:
-    RAG_AVAILABLE = False
-
-try:
-    import mcp
-    MCP_AVAILABLE = True
-except ImportError:
-    MCP_AVAILABLE = False
-
-try:
-    import skills
-    SKILLS_AVAILABLE = True
-except ImportError:
-    SKILLS_AVAILABLE = False
-
-try:
-    import fallback
-    FALLBACK_AVAILABLE = True
-except ImportError:
-    FALLBACK_AVAILABLE = False
-
+# Large subsystems are imported on first use (or by the background warm-up
+# right after the port is bound) so the server starts quickly.
+tools = LazyModule("tools")
+intent = LazyModule("intent")
+chat_ui = LazyModule("chat_ui")
+
+# Optional feature modules — availability is probed with find_spec, the
+# module itself is imported on first use.
+memory = LazyModule("memory")
+MEMORY_AVAILABLE = module_available("memory")
+file_upload = LazyModule("file_upload")
+FILE_UPLOAD_AVAILABLE = module_available("file_upload")
+rag = LazyModule("rag")
+RAG_AVAILABLE = module_available("rag")
+mcp = LazyModule("mcp")
+MCP_AVAILABLE = module_available("mcp")
+skills = LazyModule("skills")
+SKILLS_AVAILABLE = module_available("skills")
+fallback = LazyModule("fallback")
+FALLBACK_AVAILABLE = module_available("fallback")
+model_fallback = LazyModule("model_fallback")
+MODEL_FALLBACK_AVAILABLE = module_available("model_fallback")
+semantic_cache = LazyModule("semantic_cache")
+SEMANTIC_CACHE_AVAILABLE = module_available("semantic_cache")
+tool_optimizer = LazyModule("tool_optimizer")
+TOOL_OPTIMIZER_AVAILABLE = module_available("tool_optimizer")
+quality_metrics = LazyModule("quality_metrics")
+QUALITY_METRICS_AVAILABLE = module_available("quality_metrics")
+messaging = LazyModule("messaging")
+telegram_bot = LazyModule("telegram_bot")
+whatsapp_bot = LazyModule("whatsapp_bot")
+discord_bot = LazyModule("discord_bot")
+MESSAGING_AVAILABLE = all(module_available(m) for m in ("messaging", "telegram_bot", "whatsapp_bot", "discord_bot"))
+image_support = LazyModule("image_support")
+IMAGE_SUPPORT_AVAILABLE = module_available("image_support")
+scheduled_tasks = LazyModule("scheduled_tasks")
+SCHEDULED_TASKS_AVAILABLE = module_available("scheduled_tasks")
+voice_transcription = LazyModule("voice_transcription")
+VOICE_TRANSCRIPTION_AVAILABLE = module_available("voice_transcription")
+scheduler_agent = LazyModule("scheduler_agent")
+SCHEDULER_AGENT_AVAILABLE = module_available("scheduler_agent")
+
+# Needed while this module loads (model list, agent sync): imported eagerly.
 try:
     import model_catalog
     MODEL_CATALOG_AVAILABLE = True
@@ -98,63 +105,6 @@ try:
 except ImportError:
     AGENT_CONFIG_AVAILABLE = False
 
-try:
-    import model_fallback
-    MODEL_FALLBACK_AVAILABLE = True
-except ImportError:
-    MODEL_FALLBACK_AVAILABLE = False
-
-try:
-    import semantic_cache
-    SEMANTIC_CACHE_AVAILABLE = True
-except ImportError:
-    SEMANTIC_CACHE_AVAILABLE = False
-
-try:
-    import tool_optimizer
-    TOOL_OPTIMIZER_AVAILABLE = True
-except ImportError:
-    TOOL_OPTIMIZER_AVAILABLE = False
-
-try:
-    import quality_metrics
-    QUALITY_METRICS_AVAILABLE = True
-except ImportError:
-    QUALITY_METRICS_AVAILABLE = False
-
-try:
-    import messaging
-    import telegram_bot
-    import whatsapp_bot
-    import discord_bot
-    MESSAGING_AVAILABLE = True
-except ImportError:
-    MESSAGING_AVAILABLE = False
-
-try:
-    import image_support
-    IMAGE_SUPPORT_AVAILABLE = True
-except ImportError:
-    IMAGE_SUPPORT_AVAILABLE = False
-
-try:
-    import scheduled_tasks
-    SCHEDULED_TASKS_AVAILABLE = True
-except ImportError:
-    SCHEDULED_TASKS_AVAILABLE = False
-
-try:
-    import voice_transcription
-    VOICE_TRANSCRIPTION_AVAILABLE = True
-except ImportError:
-    VOICE_TRANSCRIPTION_AVAILABLE = False
-
-try:
-    import scheduler_agent
-    SCHEDULER_AGENT_AVAILABLE = True
-except ImportError:
-    SCHEDULER_AGENT_AVAILABLE = False
-
 load_dotenv()
 
 app = Flask(__name__)
@@ -242,6 +192,8 @@ ENABLE_VOICE_INPUT = os.getenv("ENABLE_VOICE_INPUT", "True").lower() == "true"
 TTS_VOICE = os.getenv("TTS_VOICE", "female").lower().strip()
 ENABLE_RAG = os.getenv("ENABLE_RAG", "False").lower() == "true"
 ENABLE_CHAT_BUBBLE = os.getenv("ENABLE_CHAT_BUBBLE", "False").lower() == "true"
+# Answer simple single-device commands/questions locally (services/command_engine.py)
+ENABLE_FAST_PATH = os.getenv("ENABLE_FAST_PATH", "True").lower() == "true"
 ENABLE_AMIRA_CARD_BUTTON = True
 ENABLE_AMIRA_AUTOMATION_BUTTON = True
 COST_CURRENCY = os.getenv("COST_CURRENCY", "USD").upper()
@@ -796,7 +748,8 @@ PROVIDER_DEFAULTS = {
 # and the on-disk model cache.  To edit the static model list → edit model_catalog.py.
 # ---------------------------------------------------------------------------
 if MODEL_CATALOG_AVAILABLE:
-    PROVIDER_MODELS = model_catalog.get_catalog().get_provider_models()
+    with startup_timer.stage("model catalog"):
+        PROVIDER_MODELS = model_catalog.get_catalog().get_provider_models()
 else:
     # Bare-minimum fallback if model_catalog is missing
     PROVIDER_MODELS = {"anthropic": ["claude-sonnet-4-6"], "openai": ["gpt-4o"]}
@@ -895,12 +848,19 @@ def _refresh_model_cache_at_startup() -> Dict[str, Any]:
             "ollama_api_key": OLLAMA_API_KEY,
             "custom_api_base": CUSTOM_API_BASE,
         }
-        results = _refresh_all_model_providers(provider_keys, extra)
+        def _on_update(provider: str, models: List[str]) -> None:
+            # Called per provider as soon as its list arrives (also after the deadline).
+            if not models:
+                return
+            PROVIDER_MODELS[provider] = list(models)
+            if MODEL_CATALOG_AVAILABLE:
+                model_catalog.get_catalog().merge_dynamic(provider, models)
+            apply_persistent_model_blocklist()
+
+        results = _refresh_all_model_providers(provider_keys, extra, on_update=_on_update)
         _updated = results.get("updated", {}) if isinstance(results, dict) else {}
+        _pending = results.get("pending", []) if isinstance(results, dict) else []
         if _updated:
-            for _p, _ml in _updated.items():
-                if _ml:
-                    PROVIDER_MODELS[_p] = list(_ml)
             logger.info(f"Model cache startup refresh: updated {len(_updated)} providers")
 
         # Always re-apply persisted dynamic cache (latest write wins).
@@ -923,75 +883,79 @@ def _refresh_model_cache_at_startup() -> Dict[str, Any]:
             "updated_count": len(_updated),
             "dynamic_count": len(_dyn),
             "updated": sorted(list(_updated.keys())),
+            "pending": list(_pending),
             "blocklist_removed": int(block_res.get("removed_total", 0)),
         }
     except Exception as _e:
         logger.warning(f"Model cache startup refresh failed: {_e}")
         return {"success": False, "error": str(_e), "updated_count": 0, "dynamic_count": 0, "updated": []}
 
-try:
-    from providers import _PROVIDER_CLASSES, get_provider_class as _get_provider_class
-    _dynamic_ok = []
-    _dynamic_fail = []
-    for _pid in list(_PROVIDER_CLASSES):
-        try:
-            _cls = _get_provider_class(_pid)
-            # Ollama needs the user-configured base_url to reach the server.
-            # Skip entirely if no URL is configured — avoids a useless connection attempt.
-            if _pid == "ollama":
-                if not OLLAMA_BASE_URL:
-                    continue
-                import logging as _log2
-                _log2.getLogger(__name__).info(f"Ollama: probing {OLLAMA_BASE_URL} ...")
-                _inst = _cls(base_url=OLLAMA_BASE_URL)
-            else:
-                _inst = _cls()
-            _live = _inst.get_available_models()
-            if _live:  # only replace if the provider returned something
-                PROVIDER_MODELS[_pid] = _live
-                # Seed fixed baseline for runtime-discovered API providers that start empty
-                # in model_catalog._PROVIDER_MODELS. This keeps Fixed/Dynamic grouping useful.
-                if not FIXED_PROVIDER_MODELS.get(_pid):
-                    FIXED_PROVIDER_MODELS[_pid] = list(_live)
-                _dynamic_ok.append(f"{_pid}({len(_live)})")
-            elif _pid == "ollama":
-                import logging as _log2
-                _log2.getLogger(__name__).warning(
-                    f"Ollama: no models found at {OLLAMA_BASE_URL} — server unreachable or no models installed"
-                )
-        except Exception as _e:
-            _dynamic_fail.append(f"{_pid}:{_e.__class__.__name__}:{_e}")
-    import logging as _log
-    _dlog = _log.getLogger(__name__)
-    if _dynamic_ok:
-        _dlog.info(f"Dynamic model discovery: {', '.join(_dynamic_ok)}")
-    if _dynamic_fail:
-        _dlog.warning(f"Dynamic model discovery failed: {', '.join(_dynamic_fail)}")
-except Exception:
-    pass
-
-# Load persisted dynamic model cache from disk and overlay runtime list.
-try:
-    from providers.model_fetcher import (
-        load_dynamic_cache as _load_dynamic_model_cache,
-        update_fixed_cache as _update_fixed_model_cache,
-    )
-    _update_fixed_model_cache(FIXED_PROVIDER_MODELS)
-    _model_cache = _load_dynamic_model_cache()
-    for _p, _ml in _model_cache.items():
-        if _ml:
-            # Skip Ollama cache — always use live /api/tags results
-            if _p == "ollama" and PROVIDER_MODELS.get("ollama"):
-                continue
-            PROVIDER_MODELS[_p] = _ml
-    if _model_cache:
+def _discover_provider_models() -> None:
+    """Ask every provider for its live model list (network; runs in the background)."""
+    try:
+        from providers import _PROVIDER_CLASSES, get_provider_class as _get_provider_class
+        _dynamic_ok = []
+        _dynamic_fail = []
+        for _pid in list(_PROVIDER_CLASSES):
+            try:
+                _cls = _get_provider_class(_pid)
+                # Ollama needs the user-configured base_url to reach the server.
+                # Skip entirely if no URL is configured — avoids a useless connection attempt.
+                if _pid == "ollama":
+                    if not OLLAMA_BASE_URL:
+                        continue
+                    import logging as _log2
+                    _log2.getLogger(__name__).info(f"Ollama: probing {OLLAMA_BASE_URL} ...")
+                    _inst = _cls(base_url=OLLAMA_BASE_URL)
+                else:
+                    _inst = _cls()
+                _live = _inst.get_available_models()
+                if _live:  # only replace if the provider returned something
+                    PROVIDER_MODELS[_pid] = _live
+                    # Seed fixed baseline for runtime-discovered API providers that start empty
+                    # in model_catalog._PROVIDER_MODELS. This keeps Fixed/Dynamic grouping useful.
+                    if not FIXED_PROVIDER_MODELS.get(_pid):
+                        FIXED_PROVIDER_MODELS[_pid] = list(_live)
+                    _dynamic_ok.append(f"{_pid}({len(_live)})")
+                elif _pid == "ollama":
+                    import logging as _log2
+                    _log2.getLogger(__name__).warning(
+                        f"Ollama: no models found at {OLLAMA_BASE_URL} — server unreachable or no models installed"
+                    )
+            except Exception as _e:
+                _dynamic_fail.append(f"{_pid}:{_e.__class__.__name__}:{_e}")
         import logging as _log
-        _log.getLogger(__name__).info(f"Loaded dynamic model cache for {len(_model_cache)} providers")
-except Exception:
-    pass  # cache optional — dynamic lists remain
+        _dlog = _log.getLogger(__name__)
+        if _dynamic_ok:
+            _dlog.info(f"Dynamic model discovery: {', '.join(_dynamic_ok)}")
+        if _dynamic_fail:
+            _dlog.warning(f"Dynamic model discovery failed: {', '.join(_dynamic_fail)}")
+    except Exception:
+        pass
 
-# Always refresh dynamic model cache at addon startup.
-_refresh_model_cache_at_startup()
+
+# Load persisted dynamic model cache from disk and overlay runtime list.
+# Live discovery and the network refresh run after the port is bound, see
+# start_background_startup().
+with startup_timer.stage("model cache (disk)"):
+    try:
+        from providers.model_fetcher import (
+            load_dynamic_cache as _load_dynamic_model_cache,
+            update_fixed_cache as _update_fixed_model_cache,
+        )
+        _update_fixed_model_cache(FIXED_PROVIDER_MODELS)
+        _model_cache = _load_dynamic_model_cache()
+        for _p, _ml in _model_cache.items():
+            if _ml:
+                # Skip Ollama cache — always use live /api/tags results
+                if _p == "ollama" and PROVIDER_MODELS.get("ollama"):
+                    continue
+                PROVIDER_MODELS[_p] = _ml
+        if _model_cache:
+            import logging as _log
+            _log.getLogger(__name__).info(f"Loaded dynamic model cache for {len(_model_cache)} providers")
+    except Exception:
+        pass  # cache optional — dynamic lists remain
 
 
 # Mapping user-friendly names (with prefixes) to technical model names
@@ -1922,14 +1886,16 @@ def _apply_channel_agent(channel: str):
 
 ai_client = None
 # Prefer persisted selection (set by /api/set_model) over add-on configuration
-load_runtime_selection()
-initialize_ai_client()
+with startup_timer.stage("ai client"):
+    load_runtime_selection()
+    initialize_ai_client()
 
 # Sync AGENT_SYSTEM_PROMPT_OVERRIDE and other agent globals from the persisted
 # active agent so the first chat request already has the correct system prompt.
 if AGENT_CONFIG_AVAILABLE:
     try:
-        _sync_active_agent_globals(apply_model=True, persist_selection=True, reinitialize_client=True)
+        with startup_timer.stage("agent sync"):
+            _sync_active_agent_globals(apply_model=True, persist_selection=True, reinitialize_client=True)
         logger.info("Startup: agent globals synced from persisted active agent")
     except Exception as _e:
         logger.warning(f"Startup agent globals sync failed: {_e}")
@@ -1991,7 +1957,8 @@ def scan_config_structure(root_dir="/config", max_depth=2):
 
 # Scan at startup
 try:
-    CONFIG_STRUCTURE_TEXT = scan_config_structure()
+    with startup_timer.stage("config scan"):
+        CONFIG_STRUCTURE_TEXT = scan_config_structure()
     logger.info("Config structure scanned for prompt.")
 except Exception as e:
     CONFIG_STRUCTURE_TEXT = "(Could not scan config: " + str(e) + ")"
@@ -2043,7 +2010,8 @@ def parse_configuration_includes():
         return includes
 
 # Parse at startup
-CONFIG_INCLUDES = parse_configuration_includes()
+with startup_timer.stage("config includes"):
+    CONFIG_INCLUDES = parse_configuration_includes()
 if CONFIG_INCLUDES:
     logger.info(f"Configuration includes loaded: {len(CONFIG_INCLUDES)} files mapped")
     for key, path in CONFIG_INCLUDES.items():
@@ -2172,8 +2140,13 @@ def load_conversations():
         return
 
 
-def save_conversations():
-    """Save conversations to persistent storage (without image data to save space)."""
+def save_conversations(session_id: Optional[str] = None):
+    """Save conversations to persistent storage (without image data to save space).
+
+    *session_id* names the session that changed, so the sidebar index is
+    updated in place; without it the index is fully reconciled on next listing.
+    """
+    _touch_conversation_index(session_id)
     tmp_path = f"{CONVERSATIONS_FILE}.tmp"
     try:
         os.makedirs(os.path.dirname(CONVERSATIONS_FILE), exist_ok=True)
@@ -2253,11 +2226,24 @@ def save_conversations():
             pass
 
 
-# Load saved conversations on startup
-load_conversations()
+def _touch_conversation_index(session_id: Optional[str] = None) -> None:
+    try:
+        from services.conversation_index import get_conversation_index
+        if session_id is None:
+            get_conversation_index().invalidate()
+        else:
+            get_conversation_index().touch(session_id, conversations.get(session_id))
+    except Exception as e:
+        logger.debug(f"Conversation index update failed: {e}")
+
+
+# Load saved conversations on startup (synchronously: routes bind the dict)
+with startup_timer.stage("conversations"):
+    load_conversations()
 
 # Load persisted model blocklists on startup
-load_model_blocklists()
+with startup_timer.stage("model blocklists"):
+    load_model_blocklists()
 
 # ---- Snapshot system for safe config editing ----
 
@@ -2289,47 +2275,18 @@ def save_device_config(config: dict) -> None:
         logger.warning(f"Could not save device config: {e}")
 
 def create_snapshot(filename: str) -> dict:
-    """Create a snapshot of a file before modifying it. Returns snapshot info."""
-    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    """Create a snapshot of a file before modifying it. Returns snapshot info.
+
+    Stored content-addressed (see services/snapshot_service.py); retention is
+    MAX_SNAPSHOTS_PER_FILE per original file.
+    """
     src_path = os.path.join(HA_CONFIG_DIR, filename)
     if not os.path.isfile(src_path):
         return {"snapshot_id": None, "message": f"File '{filename}' does not exist (new file)"}
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_name = filename.replace("/", "__").replace("\\", "__")
-    snapshot_id = f"{timestamp}_{safe_name}"
-    snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_id)
-
-    import shutil
-    shutil.copy2(src_path, snapshot_path)
-
-    # Save metadata
-    meta_path = snapshot_path + ".meta"
-    meta = {"original_file": filename, "timestamp": timestamp, "snapshot_id": snapshot_id,
-            "size": os.path.getsize(src_path)}
-    with open(meta_path, "w") as f:
-        json.dump(meta, f)
-
-    # Per-file limit: keep max MAX_SNAPSHOTS_PER_FILE snapshots per original file
-    all_snapshots = sorted([f for f in os.listdir(SNAPSHOTS_DIR) if not f.endswith(".meta")])
-    # Group by original file (suffix after timestamp_)
-    file_snapshots = {}
-    for s in all_snapshots:
-        parts = s.split("_", 2)  # YYYYMMDD_HHMMSS_filename
-        file_key = parts[2] if len(parts) > 2 else s
-        file_snapshots.setdefault(file_key, []).append(s)
-    for file_key, snaps in file_snapshots.items():
-        while len(snaps) > MAX_SNAPSHOTS_PER_FILE:
-            oldest = snaps.pop(0)
-            try:
-                os.remove(os.path.join(SNAPSHOTS_DIR, oldest))
-                os.remove(os.path.join(SNAPSHOTS_DIR, oldest + ".meta"))
-                logger.debug(f"Snapshot auto-deleted (per-file limit): {oldest}")
-            except:
-                pass
-
-    logger.info(f"Snapshot created: {snapshot_id}")
-    return {"snapshot_id": snapshot_id, "original_file": filename, "timestamp": timestamp}
+    from services.snapshot_service import get_snapshot_store
+    meta = get_snapshot_store().create_from_file(filename, src_path, MAX_SNAPSHOTS_PER_FILE)
+    return {"snapshot_id": meta["snapshot_id"], "original_file": filename, "timestamp": meta["timestamp"]}
 
 
 # ---- Home Assistant API helpers ----
@@ -2337,6 +2294,12 @@ def create_snapshot(filename: str) -> dict:
 
 def call_ha_websocket(msg_type: str, **kwargs) -> dict:
     """Send a WebSocket command to Home Assistant and return the result."""
+    with tracing.span(f"ha_ws:{msg_type}"), \
+            metrics_exporter.HA_REQUEST_SECONDS.time(transport="ws", resource=msg_type):
+        return _call_ha_websocket(msg_type, **kwargs)
+
+
+def _call_ha_websocket(msg_type: str, **kwargs) -> dict:
     import websocket as ws_lib
     token = get_ha_token()
     ws_url = HA_URL.replace("http://", "ws://").replace("https://", "wss://") + "/websocket"
@@ -2367,6 +2330,14 @@ def call_ha_websocket(msg_type: str, **kwargs) -> dict:
 
 def call_ha_api(method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
     """Call Home Assistant API."""
+    # Span name / metric label keep only the first path segment so aggregates group by resource
+    resource = endpoint.split('/', 1)[0].split('?', 1)[0]
+    with tracing.span(f"ha:{method.upper()} {resource}", endpoint=endpoint), \
+            metrics_exporter.HA_REQUEST_SECONDS.time(transport="rest", resource=resource):
+        return _call_ha_api(method, endpoint, data)
+
+
+def _call_ha_api(method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
     url = f"{HA_URL}/api/{endpoint}"
     headers = get_ha_headers()
     token = get_ha_token()
@@ -2399,6 +2370,14 @@ def call_ha_api(method: str, endpoint: str, data: Optional[Dict[str, Any]] = Non
 def get_all_states() -> List[Dict]:
     """Get all entity states from HA."""
     result = call_ha_api("GET", "states")
+    if isinstance(result, list) and result:
+        try:
+            from services.entity_validator import get_entity_index
+            from services.registry_service import get_registry_graph
+            get_entity_index().update_from_states(result)
+            get_registry_graph().observe_states(result)
+        except Exception as e:
+            logger.debug(f"Entity index update skipped: {e}")
     return result if isinstance(result, list) else []
 
 
@@ -2862,74 +2841,35 @@ def _validate_entity_ids_in_response(text: str) -> str:
     """Validate entity IDs mentioned in AI responses against real HA states.
 
     If the AI hallucinated entity IDs (e.g. invented sensor.epcube_pvpower when
-    the real ID is sensor.ep_cube_pv_power), append a warning with the correct
-    entity IDs found via keyword matching.
+    the real ID is sensor.ep_cube_pv_power), append a warning with the closest
+    real entity IDs from the entity index.
 
-    Only runs when the response contains multiple entity_id references.
+    Only runs when the response contains multiple entity_id references.  Uses
+    the in-process entity index (services/entity_validator.py): no HA call.
     """
-    import re
-
-    HA_DOMAINS = (
-        "sensor", "binary_sensor", "light", "switch", "climate", "cover",
-        "fan", "media_player", "automation", "script", "scene", "group",
-        "person", "input_boolean", "input_number", "input_text", "input_select",
-        "input_datetime", "button", "number", "select", "text", "lock",
-        "alarm_control_panel", "camera", "vacuum", "water_heater", "humidifier",
-        "weather", "device_tracker", "timer", "counter", "update", "siren",
-        "remote",
-        # NOTE: notify, tts, persistent_notification are SERVICES, not entities
+    from services.entity_validator import (
+        EXAMPLE_ENTITIES, HELPER_DOMAINS, find_entity_ids, get_entity_index,
     )
-    # HA service verbs — patterns like switch.turn_off are service calls, not entity IDs
-    _SERVICE_VERBS = {
-        "turn_on", "turn_off", "toggle", "reload", "trigger", "press",
-        "open_cover", "close_cover", "stop_cover", "lock", "unlock",
-        "set_temperature", "set_humidity", "set_hvac_mode", "set_fan_mode",
-        "set_value", "set_speed", "set_datetime", "set_position",
-        "set_tilt_position", "set_preset_mode", "set_swing_mode",
-        "select_option", "select_first", "select_last", "select_next",
-        "select_previous", "increment", "decrement",
-        "play_media", "media_play", "media_pause", "media_stop",
-        "media_next_track", "media_previous_track",
-        "volume_up", "volume_down", "volume_mute", "volume_set",
-        "start", "stop", "pause", "resume", "open", "close",
-        "enable", "disable", "activate", "deactivate",
-        "send_message", "notify", "install", "skip",
-    }
-    domain_pattern = "|".join(re.escape(d) for d in HA_DOMAINS)
-    entity_re = re.compile(rf'\b({domain_pattern})\.[a-z0-9][a-z0-9_]*\b')
-
-    found_full = set()
-    for m in entity_re.finditer(text):
-        candidate = m.group(0)
-        suffix = candidate.split(".", 1)[1]
-        if suffix not in _SERVICE_VERBS:
-            found_full.add(candidate)
+
+    found_full = find_entity_ids(text)
     if not found_full or len(found_full) < 2:
         return text
 
     # Skip generic examples
-    EXAMPLE_ENTITIES = {"light.living_room", "switch.living_room", "sensor.temperature",
-                        "binary_sensor.motion", "light.soggiorno", "light.camera",
-                        "light.xxx", "switch.xxx", "sensor.xxx", "scene.movie_night"}
     if found_full.issubset(EXAMPLE_ENTITIES):
         return text
 
     try:
-        all_states = get_all_states()
-        real_eids = {s.get("entity_id", "") for s in all_states}
-
-        invalid = found_full - real_eids
+        index = get_entity_index()
+        index.ensure_fresh()
+        invalid = index.unknown(found_full)
         if not invalid:
             return text
 
-        helper_domains = {
-            "input_boolean", "input_number", "input_select",
-            "input_text", "input_datetime", "counter",
-        }
         invalid_domains = {eid.split(".", 1)[0] for eid in invalid if "." in eid}
         # Helper IDs are often discussed in prose before creation (or mapped fallbacks).
         # Avoid noisy warnings in these cases.
-        if invalid_domains and invalid_domains.issubset(helper_domains):
+        if invalid_domains and invalid_domains.issubset(HELPER_DOMAINS):
             logger.info(f"Entity validation: skipping helper-only invalid IDs: {invalid}")
             return text
 
@@ -2937,31 +2877,12 @@ def _validate_entity_ids_in_response(text: str) -> str:
         if len(invalid) < 2 and len(invalid) / max(len(found_full), 1) < 0.5:
             return text
 
-        # Find correct entities via keyword matching from invalid IDs
+        # Closest real entities for each invalid ID (trigram similarity)
         suggestions = []
-        _keywords = set()
-        for eid in invalid:
-            parts = eid.split(".")
-            if len(parts) == 2:
-                for p in parts[1].split("_"):
-                    if len(p) >= 4:
-                        _keywords.add(p)
-
-        if _keywords:
-            seen = set()
-            for keyword in list(_keywords)[:3]:
-                for s in all_states:
-                    s_eid = s.get("entity_id", "")
-                    fname = s.get("attributes", {}).get("friendly_name", "")
-                    if keyword in s_eid.lower() or keyword in fname.lower():
-                        if s_eid not in seen:
-                            seen.add(s_eid)
-                            state_val = s.get("state", "")
-                            unit = s.get("attributes", {}).get("unit_of_measurement", "")
-                            suggestions.append(
-                                f"- `{s_eid}` ({fname}) = {state_val}{' ' + unit if unit else ''}"
-                            )
-
+        for eid in sorted(invalid):
+            for s_eid, _score in index.suggest(eid, limit=2):
+                fname = index.friendly_name(s_eid)
+                suggestions.append(f"- `{eid}` → `{s_eid}`{f' ({fname})' if fname else ''}")
         suggestions = suggestions[:15]
 
         lang = LANGUAGE
@@ -2978,6 +2899,8 @@ def _validate_entity_ids_in_response(text: str) -> str:
         else:
             warning = f"\n\n⚠️ **Warning: some entity IDs may not exist.**\n"
             warning += f"Not found: {inv_list}\n"
+        if suggestions:
+            warning += "\n".join(suggestions) + "\n"
 
         logger.warning(f"Entity validation: {len(invalid)} invalid IDs in response: {invalid}")
         return text + warning
@@ -3188,6 +3111,45 @@ def _compact_messages_inflight(messages: list, start_idx: int = 0) -> None:
         )
 
 
+def _simulated_call_dispatchable(allowed_tools=None):
+    """Predicate for IncrementalToolCallParser: calls the tool loop can run mid-reply.
+
+    Chunked create_html_dashboard calls are left to finish normally.
+    """
+    def _check(tc):
+        return tc.get("name") != "create_html_dashboard" and (
+            not allowed_tools or tc.get("name") in allowed_tools
+        )
+    return _check
+
+
+def _stop_at_simulated_tool_call(provider_gen, sim_parser):
+    """Re-yield a no-tool provider stream, ending it once it needs a tool result.
+
+    The caller feeds every text chunk into *sim_parser* before asking for the
+    next event.  Tool calls keep being collected while the model emits them
+    back to back; as soon as it writes prose or a fabricated [TOOL RESULT]
+    after a dispatchable call (``sim_parser.needs_result``), generation is
+    abandoned and a synthetic 'done' is emitted, so the tool loop runs every
+    call collected so far instead of waiting for hallucinated results.
+    """
+    for event in provider_gen:
+        yield event
+        if sim_parser.needs_result:
+            logger.info(
+                f"ToolSimulator: {len(sim_parser.calls)} tool call(s) ready, reply continues "
+                "without results — dispatching without waiting for the rest"
+            )
+            _close = getattr(provider_gen, "close", None)
+            if _close:
+                try:
+                    _close()
+                except Exception:
+                    pass
+            yield {"type": "done", "finish_reason": "tool_calls"}
+            return
+
+
 def _collect_from_stream(user_message: str, session_id: str) -> str:
     """Blocking wrapper: collects all text from stream_chat_with_ai.
     Used by Telegram/WhatsApp for manager.py providers (groq, mistral, claude_web, etc.)."""
@@ -3414,7 +3376,7 @@ def chat_with_ai(user_message: str, session_id: str = "default") -> str:
 
         conversations[session_id] = messages
         conversations[session_id].append({"role": "assistant", "content": final_text})
-        save_conversations()
+        save_conversations(session_id)
         # Clean unnecessary comments from response before returning
         final_text = _clean_unnecessary_comments(final_text)
         final_text = _validate_entity_ids_in_response(final_text)
@@ -3624,43 +3586,55 @@ def _normalize_user_message_for_routing(user_message: str) -> str:
         return str(user_message or "").strip().lower()
 
 
-def _all_lang_keywords(key: str) -> set[str]:
-    """Collect keyword entries across all configured languages."""
-    out: set[str] = set()
+def _all_lang_keywords(key: str) -> frozenset:
+    """Collect keyword entries across all configured languages (cached)."""
     try:
-        for _lang_data in (KEYWORDS or {}).values():
-            vals = _lang_data.get(key, []) if isinstance(_lang_data, dict) else []
-            if isinstance(vals, list):
-                for v in vals:
-                    if isinstance(v, str) and v.strip():
-                        out.add(v.strip().lower())
+        return all_lang_keywords(KEYWORDS, key)
     except Exception:
-        pass
-    return out
+        return frozenset()
 
 
-def _looks_like_new_automation_request(user_message: str) -> bool:
-    msg = _normalize_user_message_for_routing(user_message)
-    automation_markers = (
-        "automaz", "automation", "automatiz", "automatisation", "automatización", "automatisation"
-    )
-    if not any(m in msg for m in automation_markers):
-        return False
-    create_signals = {
+_AUTOMATION_ROUTING_FAMILIES = {
+    "automation": (
+        "automaz", "automation", "automatiz", "automatisation", "automatización", "automatisation",
+    ),
+    "create": (
         "nuova automazione", "nuove automazioni", "new automation", "new automations",
         "crea automazione", "creare automazione", "create automation", "add automation",
         "aggiungi automazione", "un'altra automazione", "un altra automazione", "altra automazione",
         "nueva automatización", "nuevas automatizaciones", "crear automatización", "añadir automatización",
         "nouvelle automatisation", "nouvelles automatisations", "créer automatisation", "ajouter automatisation",
-    }
-    modify_signals = set(_all_lang_keywords("modify")) | {
+    ),
+    "modify_automation": (
         "modifica automazione", "modify automation", "update automation",
         "aggiorna automazione", "cambia automazione",
         "modificar automatización", "actualizar automatización",
         "modifier automatisation", "mettre à jour automatisation",
-    }
-    has_create = any(s in msg for s in create_signals)
-    has_modify = any(s in msg for s in modify_signals)
+    ),
+    "modify": (
+        "modifica", "modify", "update", "aggiorna", "cambia", "edit",
+        "modificar", "actualizar", "modifier", "changer", "mettre à jour",
+    ),
+}
+_automation_matcher: Dict[str, Any] = {"keywords": None, "matcher": None}
+
+
+def _automation_routing_signals(msg: str) -> set:
+    """Match the automation create/modify families (plus keywords.json 'modify') in one pass."""
+    if _automation_matcher["matcher"] is None or _automation_matcher["keywords"] is not KEYWORDS:
+        families = dict(_AUTOMATION_ROUTING_FAMILIES)
+        families["lang_modify"] = _all_lang_keywords("modify")
+        _automation_matcher.update(keywords=KEYWORDS, matcher=KeywordMatcher(families))
+    return _automation_matcher["matcher"].matches(msg)
+
+
+def _looks_like_new_automation_request(user_message: str) -> bool:
+    msg = _normalize_user_message_for_routing(user_message)
+    signals = _automation_routing_signals(msg)
+    if "automation" not in signals:
+        return False
+    has_create = "create" in signals
+    has_modify = "modify_automation" in signals or "lang_modify" in signals
     return bool(has_create and not has_modify)
 
 
@@ -3678,12 +3652,10 @@ def _has_explicit_automation_target(user_message: str) -> bool:
         return True
     # Quoted automation name + modify intent is explicit enough
     quoted_name = re.search(r'["“][^"”]{3,}["”]', raw)
-    modify_terms = sorted(_all_lang_keywords("modify") | {
-        "modifica", "modify", "update", "aggiorna", "cambia", "edit",
-        "modificar", "actualizar", "modifier", "changer", "mettre à jour",
-    }, key=len, reverse=True)
-    has_modify_intent = any(t and t in msg for t in modify_terms)
-    return bool(quoted_name and has_modify_intent)
+    if not quoted_name:
+        return False
+    signals = _automation_routing_signals(msg)
+    return "modify" in signals or "lang_modify" in signals
 
 
 def _extract_pending_context_from_assistant(text: str) -> Optional[str]:
@@ -3717,17 +3689,127 @@ def _is_short_followup_reply(user_message: str) -> bool:
     return any(m in txt for m in followup_markers)
 
 
+_DEFAULT_CONFIRMS = frozenset({"yes", "ok", "okay", "si", "sì", "oui", "vale"})
+
+
 def _is_confirmation_reply(user_message: str) -> bool:
     txt = _normalize_user_message_for_routing(user_message)
     if not txt:
         return False
-    confirms = _all_lang_keywords("confirm") | {"yes", "ok", "okay", "si", "sì", "oui", "vale"}
-    return txt in confirms
+    return txt in _all_lang_keywords("confirm") or txt in _DEFAULT_CONFIRMS
+
+
+def _local_reply_events(session_id: str, user_text: str, reply: str, model: str, provider: str, intent_name: str):
+    """Record a turn answered without a provider round and yield its stream events."""
+    conversations[session_id].append({"role": "user", "content": user_text})
+    conversations[session_id].append({
+        "role": "assistant",
+        "content": reply,
+        "model": model,
+        "provider": provider,
+    })
+    if len(conversations[session_id]) > 50:
+        trimmed = conversations[session_id][-40:]
+        while trimmed and trimmed[0].get("role") == "tool":
+            trimmed = trimmed[1:]
+        conversations[session_id] = trimmed
+    session_last_intent[session_id] = intent_name
+    session_pending_context.pop(session_id, None)
+    logger.chat(f"📤 [{model}]: {reply[:500]}")
+    yield {"type": "token", "content": reply}
+    yield {"type": "done", "finish_reason": "stop"}
+    with tracing.span("save_conversations"):
+        save_conversations(session_id)
+
+
+def _entity_states_for(entity_ids) -> Dict[str, str]:
+    """Current state strings for *entity_ids*; ids that no longer exist are omitted."""
+    wanted = set(entity_ids)
+    return {
+        s["entity_id"]: str(s.get("state"))
+        for s in get_all_states()
+        if s.get("entity_id") in wanted
+    }
+
+
+def _response_cache_scope(intent_name: str, language: str, context: str, history: List[Dict]) -> str:
+    """Response-cache scope: intent, reply language, active agent, page/context blocks and previous turn.
+
+    The previous exchange is part of the scope because a follow-up ("and the
+    bedroom?") means something different after each question.
+    """
+    agent_id = ""
+    if AGENT_CONFIG_AVAILABLE:
+        try:
+            active = agent_config.get_agent_manager().get_active_agent()
+            agent_id = active.id if active else ""
+        except Exception:
+            pass
+    import hashlib
+    ctx = hashlib.md5(context.encode("utf-8", "ignore")).hexdigest()[:12] if context.strip() else ""
+    prev = ""
+    if history:
+        last = json.dumps([[m.get("role"), m.get("content")] for m in history[-2:]], default=str)
+        prev = hashlib.md5(last.encode("utf-8", "ignore")).hexdigest()[:12]
+    return "|".join((intent_name, language, agent_id, ctx, prev))
+
+
+def _read_only_turn_entities(turn_messages: List[Dict], is_read_only_call) -> Optional[set]:
+    """Entity ids mentioned by this turn's tool results, or None if the turn is not cacheable.
+
+    Cacheable means at least one tool ran and every tool call was read-only.
+    """
+    from services.entity_validator import find_entity_ids
+    called = False
+    entity_ids: set = set()
+    for m in turn_messages:
+        if m.get("role") == "assistant" and m.get("tool_calls"):
+            for tc in m["tool_calls"]:
+                fn = tc.get("function") or {}
+                call = {"name": fn.get("name") or tc.get("name", ""),
+                        "arguments": fn.get("arguments") or tc.get("arguments", "{}")}
+                if not is_read_only_call(call):
+                    return None
+                called = True
+        elif m.get("role") == "tool":
+            content = m.get("content")
+            entity_ids |= find_entity_ids(content if isinstance(content, str) else json.dumps(content, default=str))
+    return entity_ids if called else None
 
 
 def stream_chat_with_ai(user_message: str, session_id: str = "default", image_data: str = None, read_only: bool = False, voice_mode: bool = False, req_language: str = None):
     """Stream chat events for all providers with optional image support. Yields SSE event dicts.
-    Uses LOCAL intent detection + smart context to minimize tokens sent to AI API."""
+    Uses LOCAL intent detection + smart context to minimize tokens sent to AI API.
+
+    Each request is recorded as a trace (see tracing.py / /api/debug/traces).
+    The trace is re-bound to the current thread around every resume, so spans
+    opened deeper in the pipeline land in the right request even when the
+    consumer hops threads between events.
+    """
+    with metrics_exporter.track_active_stream():
+        trace = tracing.start_trace("chat", session=session_id, provider=AI_PROVIDER, model=get_active_model())
+        inner = _stream_chat_with_ai_impl(user_message, session_id, image_data, read_only, voice_mode, req_language)
+        if trace is None:
+            yield from inner
+            return
+        tracing.bind(None)
+        try:
+            while True:
+                previous = tracing.bind(trace)
+                try:
+                    event = next(inner)
+                except StopIteration:
+                    return
+                finally:
+                    tracing.bind(previous)
+                yield event
+        finally:
+            inner.close()
+            tracing.finish_trace(trace)
+
+
+def _stream_chat_with_ai_impl(user_message: str, session_id: str, image_data: str, read_only: bool, voice_mode: bool, req_language: str):
+    """Body of stream_chat_with_ai (runs with the request trace bound)."""
     global current_session_id
     
     # Strip context blocks from user_message for saving in conversation history
@@ -3797,9 +3879,24 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
 
     # Step 1: LOCAL intent detection (preliminary — for bubble contexts and chat)
     # Simplified LLM-first approach: most intents are "auto" (all tools, LLM decides)
-    intent_info = intent.detect_intent(user_message, "", previous_intent=prev_intent)
+    with tracing.span("detect_intent"):
+        intent_info = intent.detect_intent(user_message, "", previous_intent=prev_intent)
     intent_name = intent_info["intent"]
 
+    # Fast path: deterministic single-device commands and state questions are
+    # resolved locally (no provider round); anything uncertain falls through.
+    if ENABLE_FAST_PATH:
+        from services.command_engine import get_command_engine
+        _engine = get_command_engine()
+        _engine.observe_followup(session_id, saved_user_message)
+        if intent_name == "auto" and not image_data and "[CURRENT_DASHBOARD_HTML]" not in user_message:
+            with tracing.span("fast_path"):
+                _fast = _engine.handle(saved_user_message, session_id=session_id, read_only=read_only)
+            if _fast:
+                yield from _local_reply_events(session_id, saved_user_message, _fast["reply"],
+                                               "fast_path", "local", intent_name)
+                return
+
     # Per-request language override: if the caller (e.g. bubble) specifies a language
     # that differs from the global LANGUAGE, patch language-specific prompt snippets
     # so the LLM replies in the user's own language regardless of the server setting.
@@ -3830,6 +3927,30 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
             intent_info["prompt"] = _prompt
         logger.info(f"Per-request language override: {LANGUAGE} → {_eff_language}")
 
+    # Response cache: a repeated read-only question is answered from cache when
+    # the entity states its answer was built from are unchanged (numbers that
+    # moved are patched in place; anything else invalidates the entry).
+    _response_cache = semantic_cache.get_response_cache() if SEMANTIC_CACHE_AVAILABLE else None
+    _response_cache_key = None
+    if (
+        _response_cache is not None
+        and intent_name == "auto"
+        and not image_data
+        and "[CURRENT_DASHBOARD_HTML]" not in user_message
+        and not saved_user_message.startswith("/")
+        and len(saved_user_message.split()) >= 3
+    ):
+        _response_cache_key = _response_cache_scope(
+            intent_name, _eff_language or LANGUAGE, user_message.replace(saved_user_message, ""),
+            conversations.get(session_id, []),
+        )
+        with tracing.span("response_cache"):
+            _cached = _response_cache.lookup(saved_user_message, _response_cache_key, _entity_states_for)
+        if _cached:
+            yield from _local_reply_events(session_id, saved_user_message, _cached["answer"],
+                                           "response_cache", "cache", intent_name)
+            return
+
     # Step 2: Build smart context (skip for chat — not needed)
     # When the message contains [CURRENT_DASHBOARD_HTML] the HTML is extracted and will be injected
     # as a SEPARATE earlier turn in the conversation (user: HTML, assistant: "ok, letto"), so the
@@ -3862,15 +3983,17 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
             smart_context = ""
             logger.info("Lean mode: smart context preload skipped for auto intent")
         else:
-            smart_context = intent.build_smart_context(
-                user_message,
-                intent=intent_name,
-            )
+            with tracing.span("build_smart_context", intent=intent_name):
+                smart_context = intent.build_smart_context(
+                    user_message,
+                    intent=intent_name,
+                )
 
         # Step 2.5: Inject memory context if enabled
         memory_context = ""
         if ENABLE_MEMORY and MEMORY_AVAILABLE:
-            memory_context = memory.get_memory_context()
+            with tracing.span("memory_context"):
+                memory_context = memory.get_memory_context()
             if memory_context:
                 logger.info(f"Memory context (MEMORY.md) injected for session {session_id}")
                 smart_context = memory_context + "\n\n" + smart_context
@@ -3878,19 +4001,22 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
         # Step 3: Re-detect intent WITH full smart context — but skip for skill commands
         # to avoid overriding the chat intent we just set.
         if not _is_skill_msg:
-            intent_info = intent.detect_intent(user_message, smart_context, previous_intent=prev_intent)
+            with tracing.span("detect_intent", with_context=True):
+                intent_info = intent.detect_intent(user_message, smart_context, previous_intent=prev_intent)
             intent_name = intent_info["intent"]
     else:
         smart_context = ""
         # Inject memory even for chat intent (no tools, but memory is still relevant)
         if ENABLE_MEMORY and MEMORY_AVAILABLE:
-            memory_context = memory.get_memory_context()
+            with tracing.span("memory_context"):
+                memory_context = memory.get_memory_context()
             if memory_context:
                 logger.info(f"Memory context (MEMORY.md) injected for chat session {session_id}")
                 smart_context = memory_context
 
     # Store this intent for next message's confirmation continuity
     session_last_intent[session_id] = intent_name
+    tracing.annotate(intent=intent_name)
     _has_explicit_auto_target = _has_explicit_automation_target(user_message)
     _looks_new_auto_req = _looks_like_new_automation_request(user_message)
     _intent_tools = intent_info.get("tools")
@@ -3983,7 +4109,9 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                     user_message = _remaining
                 yield {"type": "status", "message": f"Skill: {_skill_name}"}
                 yield {"type": "skill_active", "name": _skill_name}
-                logger.info(f"Skill '{_skill_name}' injected into system prompt")
+                _skill_entry = skills.get_catalog().get(_skill_name)
+                logger.info(f"Skill '{_skill_name}' injected into system prompt"
+                            f" (~{_skill_entry.tokens if _skill_entry else '?'} tokens)")
             else:
                 session_active_skill.pop(session_id, None)
                 yield {"type": "status", "message": tr("skill_not_found").format(name=_skill_name)}
@@ -4160,7 +4288,8 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
         # Inject RAG semantic search results if available AND enabled
         if RAG_AVAILABLE and ENABLE_RAG:
             try:
-                rag_context = rag.get_rag_context(user_message)
+                with tracing.span("rag_context"):
+                    rag_context = rag.get_rag_context(user_message)
                 if rag_context:
                     context_sections.append(f"## RISULTATI RICERCA SEMANTICA:\n{rag_context}")
             except Exception as e:
@@ -4174,6 +4303,7 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
 
     try:
         last_usage = None  # Will capture usage from done event
+        _turn_usage = {"input_tokens": 0, "output_tokens": 0, "cost": 0.0}  # all rounds (response cache savings)
         _streamed_text_parts: list = []  # accumulate streamed tokens for saving
         _all_intermediate_text: list = []  # text from intermediate rounds (before tool calls), preserved across round resets
 
@@ -4495,6 +4625,7 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                         on_fallback=lambda fp, fm, tp, tm: logger.warning(
                             f"⚡ Fallback: {fp}/{fm} → {tp}/{tm}"
                         ),
+                        intent=intent_info.get("intent") if isinstance(intent_info, dict) else None,
                     )
                     if _fb_result.success:
                         provider_gen = _fb_result.result
@@ -4553,6 +4684,15 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                 or get_active_model().lower() in _NO_NATIVE_TOOL_MODELS
             )
             _text_buffer: list = []
+            # No-tool providers: parse <tool_call> blocks while tokens arrive so the
+            # display stream stays free of tool markup and calls dispatch on close.
+            _sim_parser = None
+            if _is_no_tool_provider and not _is_html_dash and not _skip_tool_extraction:
+                from providers.tool_simulator import IncrementalToolCallParser
+                _sim_parser = IncrementalToolCallParser(
+                    _simulated_call_dispatchable((intent_info or {}).get("tools"))
+                )
+                provider_gen = _stop_at_simulated_tool_call(provider_gen, _sim_parser)
             _mcp_guard_triggered_this_round = False
             _buffer_for_mcp_guard = (
                 _mcp_guard_enabled
@@ -4602,7 +4742,13 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                         # ── Tool Simulator: extract <tool_call> blocks from buffered text ──
                         if _is_no_tool_provider and full_buf and not _skip_tool_extraction:
                             from providers.tool_simulator import extract_tool_calls, clean_response_text
-                            _sim_calls = extract_tool_calls(full_buf)
+                            if _sim_parser is not None:
+                                _sim_tail, _ = _sim_parser.finish()
+                                if _sim_tail:
+                                    yield {"type": "token", "content": _sim_tail}
+                                _sim_calls = list(_sim_parser.calls)
+                            else:
+                                _sim_calls = extract_tool_calls(full_buf)
                             if not _sim_calls:
                                 # Gemini/Web models often escape tool XML as markdown text:
                                 # \<tool\_call\> ... create\_html\_dashboard ...
@@ -4689,7 +4835,7 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                                 )
                                 # For HTML dashboard flow, avoid echoing model prose/partial HTML.
                                 # We only show tool execution statuses and final save confirmation.
-                                if not _all_read_only and not _is_html_dash:
+                                if not _all_read_only and not _is_html_dash and _sim_parser is None:
                                     cleaned = clean_response_text(full_buf)
                                     if cleaned:
                                         yield {"type": "token", "content": cleaned}
@@ -4733,7 +4879,7 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                                     logger.info("HTML dashboard retry: model asked confirmation, forcing immediate tool execution")
                                     _text_buffer = []
                                     break
-                            elif _display:
+                            elif _display and _sim_parser is None:
                                 yield {"type": "token", "content": _display}
                             _text_buffer = []
                         elif _is_html_dash and _finish_reason_done == "malformed_function_call":
@@ -4893,6 +5039,9 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                                 pass  # non-critical — don't break the stream
                             event = {**event, "usage": usage}
                             last_usage = usage
+                            _turn_usage["input_tokens"] += input_tokens
+                            _turn_usage["output_tokens"] += output_tokens
+                            _turn_usage["cost"] += cost_bd["total_cost"]
                         else:
                             logger.debug(f"⚠️ Done event without usage: finish_reason={event.get('finish_reason')}")
                         if not _pending_tool_calls:
@@ -5003,7 +5152,12 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                     # {"type": "token", "content": "..."}.
                     chunk = event.get("text", "")
                     _streamed_text_parts.append(chunk)
-                    if _is_html_dash or _is_no_tool_provider:
+                    if _sim_parser is not None:
+                        _text_buffer.append(chunk)
+                        _sim_shown, _ = _sim_parser.feed(chunk)
+                        if _sim_shown:
+                            yield {"type": "token", "content": _sim_shown}
+                    elif _is_html_dash or _is_no_tool_provider:
                         _text_buffer.append(chunk)  # buffer: process after done
                     elif _buffer_for_mcp_guard:
                         _mcp_guard_stream_buffer.append(chunk)  # hold until done decision
@@ -5013,7 +5167,12 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                     # Some providers yield token events directly — accumulate those too
                     content = event.get("content", "")
                     _streamed_text_parts.append(content)
-                    if _is_html_dash or _is_no_tool_provider:
+                    if _sim_parser is not None:
+                        _text_buffer.append(content)
+                        _sim_shown, _ = _sim_parser.feed(content)
+                        if _sim_shown:
+                            yield {"type": "token", "content": _sim_shown}
+                    elif _is_html_dash or _is_no_tool_provider:
                         _text_buffer.append(content)  # buffer: process after done
                     elif _buffer_for_mcp_guard:
                         _mcp_guard_stream_buffer.append(content)  # hold until done decision
@@ -5543,7 +5702,25 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
             _html_dashboard_success_message = ""
             _stop_after_html_dashboard_error = False
             _html_dashboard_error_message = ""
-            for tc in _pending_tool_calls:
+            # A run of consecutive read-only MCP calls is fanned out concurrently
+            # when the loop reaches its first call; every other tool still runs
+            # one at a time in the order the model asked for.
+            _mcp_prefetched: dict = {}
+
+            def _mcp_batchable_args(tc):
+                _name = str(tc.get("name", ""))
+                if not tools.is_mcp_read_only(_name):
+                    return None
+                try:
+                    _a = tc.get("arguments", "{}") or "{}"
+                    _a = _a if isinstance(_a, dict) else json.loads(_a)
+                except Exception:
+                    return None
+                if not isinstance(_a, dict) or f"{_name}:{json.dumps(_a, sort_keys=True)}" in _tool_cache:
+                    return None
+                return _a
+
+            for _tc_pos, tc in enumerate(_pending_tool_calls):
                 fn_name = tc.get("name", "")
                 try:
                     _raw_args = tc.get("arguments", "{}") or "{}"
@@ -5609,14 +5786,27 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                 yield {"type": "status", "message": f"🔧 {_status_label}..."}
                 logger.info(f"Tool (round {_tool_round}): {fn_name} {list(tc_args.keys())}")
 
-                if fn_name in _read_only_tools and _sig in _tool_cache:
+                if (fn_name in _read_only_tools or tools.is_mcp_read_only(fn_name)) and _sig in _tool_cache:
                     logger.debug(f"Tool cache hit: {fn_name}")
                     result = _tool_cache[_sig]
                 elif fn_name.startswith("mcp_"):
                     # MCP tools are runtime-dynamic and are not part of the static
                     # ToolRegistry catalog: execute via direct MCP dispatcher.
-                    result = tools.execute_tool(fn_name, tc_args)
-                    if fn_name in _read_only_tools:
+                    if tc["id"] not in _mcp_prefetched and _mcp_batchable_args(tc) is not None:
+                        _mcp_run = []
+                        for _next_tc in _pending_tool_calls[_tc_pos:]:
+                            _next_args = _mcp_batchable_args(_next_tc)
+                            if _next_args is None:
+                                break
+                            _mcp_run.append((_next_tc, _next_args))
+                        if len(_mcp_run) > 1:
+                            yield {"type": "status", "message": f"🔧 MCP ×{len(_mcp_run)}..."}
+                            _mcp_results = tools.execute_mcp_tools_batch([(t["name"], a) for t, a in _mcp_run])
+                            _mcp_prefetched.update({t["id"]: r for (t, _a), r in zip(_mcp_run, _mcp_results)})
+                    result = _mcp_prefetched.pop(tc["id"], None)
+                    if result is None:
+                        result = tools.execute_tool(fn_name, tc_args)
+                    if tools.is_mcp_read_only(fn_name):
                         _tool_cache[_sig] = result
                 elif _tool_registry is not None:
                     # === OpenClaw-style execution with hooks ===
@@ -6052,6 +6242,15 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
                     assistant_msg["usage"] = last_usage
                 conversations[session_id].append(assistant_msg)
 
+                if _response_cache_key and intent_name == "auto" and not _write_tools_executed and not _pending_summary:
+                    try:
+                        _deps = _read_only_turn_entities(messages[conv_length_before:], _is_read_only_call)
+                        if _deps:
+                            _response_cache.store(saved_user_message, _response_cache_key, assembled,
+                                                  _entity_states_for(_deps), _turn_usage)
+                    except Exception as _rc_err:
+                        logger.debug(f"Response cache store skipped: {_rc_err}")
+
                 # ── Auto-save HTML dashboard ───────────────────────────────
                 # Providers without tool support (claude_web, groq, mistral, …)
                 # stream the HTML as plain text. If the intent was
@@ -6335,7 +6534,8 @@ def stream_chat_with_ai(user_message: str, session_id: str = "default", image_da
         if _deferred_done_event is not None:
             yield _deferred_done_event
             _deferred_done_event = None
-        save_conversations()
+        with tracing.span("save_conversations"):
+            save_conversations(session_id)
         
         # Save to persistent memory if enabled
         if ENABLE_MEMORY and MEMORY_AVAILABLE and conversations[session_id]:
@@ -6733,6 +6933,9 @@ def api_fallback_stats():
         return jsonify({"success": False, "error": "Model fallback not available"}), 501
     try:
         stats = model_fallback.get_fallback_stats()
+        chain = fallback.get_fallback_chain() if FALLBACK_AVAILABLE else None
+        if chain is not None:
+            stats["chain"] = chain.get_stats()
         return jsonify({"success": True, "fallback": stats}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -7125,8 +7328,42 @@ def initialize_mcp() -> None:
 
 
 # Register blueprints
+_background_startup_started = False
+
+
+def start_background_startup() -> None:
+    """Run the slow part of startup in a daemon thread (called once the port is about to be bound).
+
+    Live provider model discovery + model cache refresh (network; the refresh
+    then repeats periodically), then a warm-up import of the chat pipeline and the enabled optional subsystems
+    so the first request does not pay for them.
+    """
+    global _background_startup_started
+    if _background_startup_started:
+        return
+    _background_startup_started = True
+
+    def _run():
+        with startup_timer.stage("model discovery", background=True):
+            _discover_provider_models()
+        from services.model_refresh_service import get_model_refresh_service
+        refresher = get_model_refresh_service()
+        with startup_timer.stage("model cache refresh", background=True):
+            refresher.refresh_now()
+        refresher.start(delay=refresher.next_delay())
+        with startup_timer.stage("warm-up imports", background=True):
+            enabled = [(memory, MEMORY_AVAILABLE and ENABLE_MEMORY), (rag, RAG_AVAILABLE and ENABLE_RAG),
+                       (file_upload, FILE_UPLOAD_AVAILABLE and ENABLE_FILE_UPLOAD),
+                       (semantic_cache, SEMANTIC_CACHE_AVAILABLE), (model_fallback, MODEL_FALLBACK_AVAILABLE),
+                       (tool_optimizer, TOOL_OPTIMIZER_AVAILABLE), (quality_metrics, QUALITY_METRICS_AVAILABLE)]
+            preload(tools, intent, chat_ui, *[m for m, on in enabled if on])
+
+    threading.Thread(target=_run, name="background-startup", daemon=True).start()
+
+
 from routes import register_blueprints
-register_blueprints(app)
+with startup_timer.stage("blueprints"):
+    register_blueprints(app)
 
 if __name__ == "__main__":
     logger.info(f"Provider: {AI_PROVIDER} | Model: {get_active_model()}")
@@ -7393,6 +7630,7 @@ if __name__ == "__main__":
             logger.warning(f"⚠️ Dashboard migration error: {e}")
 
     migrate_html_dashboards()
+    start_background_startup()
 
     # Initialize messaging bots (Telegram + WhatsApp)
     start_messaging_bots()
@@ -0,0 +1,221 @@
+"""Shared asyncio runtime for the synchronous Flask code.
+
+Async SDKs (official MCP client, edge-tts, gemini_webapi, discord.py) used to
+bring their own loop: a dedicated thread per MCP server, a loop installed on
+whatever request thread happened to call TTS, a loop per Discord bot.  This
+module runs ONE event loop in a daemon thread for the whole process:
+
+    from async_runtime import get_runtime
+
+    result = get_runtime().run(some_coroutine(), timeout=30, name="tts.edge")
+
+- ``run()`` submits a coroutine and blocks the calling thread for its result;
+  on timeout (or if the caller is interrupted) the task is cancelled.
+- ``submit()`` returns a ``concurrent.futures.Future`` so several coroutines
+  can be in flight at once; ``spawn()`` is the same for long-lived tasks
+  (e.g. a bot gateway) that should not count as in-flight requests.
+- Objects bound to a loop (SDK clients, sessions) stay usable across calls
+  because every call goes through the same loop.
+- Per-name metrics (calls, errors, timeouts, cancellations, latency) are
+  exposed by ``stats()`` for the diagnostics endpoints.
+
+Never call ``run()`` from code that is itself running on the runtime loop:
+it would deadlock, so it raises RuntimeError instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Any, Coroutine, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+START_TIMEOUT = 5.0
+SLOW_TASK_SECONDS = 10.0
+
+
+class AsyncRuntime:
+    """One background event loop with submit-and-wait helpers and metrics."""
+
+    def __init__(self, name: str = "async-runtime"):
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._inflight = 0
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._started_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runtime loop, started on first use."""
+        with self._lock:
+            if self._loop is not None and self._thread and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.close()
+
+            self._thread = threading.Thread(target=_run, name=self._name, daemon=True)
+            self._thread.start()
+            ready.wait(START_TIMEOUT)
+            self._loop = loop
+            self._started_at = time.time()
+            logger.debug(f"AsyncRuntime: loop started ({self._name})")
+            return loop
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel pending tasks and stop the loop (used on shutdown and in tests)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or not loop.is_running():
+            return
+
+        async def _cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_all(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Submitting work
+    # ------------------------------------------------------------------
+
+    def submit(self, coro: Coroutine, name: str = "task", track: bool = True) -> concurrent.futures.Future:
+        """Schedule *coro* on the runtime loop; returns a thread-safe future."""
+        loop = self.loop
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        if not track:
+            return future
+        t0 = time.monotonic()
+        with self._lock:
+            self._inflight += 1
+            self._metric(name)["calls"] += 1
+
+        def _done(f: concurrent.futures.Future) -> None:
+            elapsed = time.monotonic() - t0
+            with self._lock:
+                self._inflight -= 1
+                m = self._metric(name)
+                m["completed"] += 1
+                m["total_s"] += elapsed
+                m["max_s"] = max(m["max_s"], elapsed)
+                if f.cancelled():
+                    m["cancelled"] += 1
+                elif f.exception() is not None:
+                    m["errors"] += 1
+            if elapsed > SLOW_TASK_SECONDS:
+                logger.debug(f"AsyncRuntime: slow task {name} ({elapsed:.1f}s)")
+
+        future.add_done_callback(_done)
+        return future
+
+    def spawn(self, coro: Coroutine, name: str = "background") -> concurrent.futures.Future:
+        """Start a long-lived task (not counted as in-flight work)."""
+        logger.debug(f"AsyncRuntime: spawning {name}")
+        return self.submit(coro, name=name, track=False)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None, name: str = "task") -> Any:
+        """Run *coro* on the runtime loop and wait for its result.
+
+        Raises ``TimeoutError`` (``concurrent.futures.TimeoutError``) after
+        *timeout* seconds; the coroutine is cancelled in that case.
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from the runtime loop thread")
+        future = self.submit(coro, name=name)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                self._metric(name)["timeouts"] += 1
+            future.cancel()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _metric(self, name: str) -> Dict[str, Any]:
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = {"calls": 0, "completed": 0, "errors": 0, "timeouts": 0,
+                                       "cancelled": 0, "total_s": 0.0, "max_s": 0.0}
+        return m
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = {}
+            for name, m in self._metrics.items():
+                done = m["completed"]
+                tasks[name] = {
+                    "calls": m["calls"],
+                    "errors": m["errors"],
+                    "timeouts": m["timeouts"],
+                    "cancelled": m["cancelled"],
+                    "avg_ms": round(m["total_s"] * 1000 / done, 1) if done else None,
+                    "max_ms": round(m["max_s"] * 1000, 1),
+                }
+            inflight = self._inflight
+        pending = None
+        loop = self._loop
+        if loop is not None and self.running:
+            try:
+                pending = len(asyncio.all_tasks(loop))
+            except RuntimeError:
+                pass
+        return {
+            "running": self.running,
+            "uptime_s": round(time.time() - self._started_at) if self._started_at and self.running else None,
+            "inflight": inflight,
+            "loop_tasks": pending,
+            "tasks": tasks,
+        }
+
+
+_runtime: Optional[AsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AsyncRuntime:
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AsyncRuntime()
+    return _runtime
@@ -0,0 +1,383 @@
+"""Fake Home Assistant for benchmarks: REST + WebSocket on one local port.
+
+Serves a deterministic, synthetic home of ``entities`` entities:
+
+- REST  ``/api/``, ``/api/config``, ``/api/states``, ``/api/states/<id>``,
+  ``/api/history/period/<start>``, ``/api/services/<domain>/<service>``
+- WS    ``/api/websocket`` (and ``/websocket``): auth handshake,
+  ``config/{entity,device,area}_registry/list``,
+  ``recorder/statistics_during_period``, ``subscribe_events``; any other
+  command answers ``success`` with an empty result.
+
+    ha = FakeHomeAssistant(entities=5000).start()
+    os.environ["HA_URL"] = ha.url
+    ...
+    ha.load(20000)      # same port, bigger home
+    ha.stop()
+
+Only the standard library is used, so the fake starts in milliseconds and
+adds no dependencies.  ``latency`` delays every REST/WS answer to mimic a
+slow Raspberry Pi.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+AREAS = [
+    ("kitchen", "Kitchen"), ("living_room", "Living Room"), ("bedroom", "Bedroom"),
+    ("bathroom", "Bathroom"), ("office", "Office"), ("garage", "Garage"),
+    ("garden", "Garden"), ("hallway", "Hallway"), ("cucina", "Cucina"),
+    ("soggiorno", "Soggiorno"), ("camera", "Camera da letto"), ("porch", "Porch"),
+]
+
+# domain -> relative weight in the synthetic home
+DOMAIN_WEIGHTS = {
+    "sensor": 40, "binary_sensor": 15, "light": 14, "switch": 10, "cover": 5,
+    "automation": 6, "script": 3, "climate": 2, "media_player": 2, "scene": 3,
+}
+
+SENSOR_KINDS = [
+    ("temperature", "°C", lambda r: round(r.uniform(16, 26), 1)),
+    ("humidity", "%", lambda r: round(r.uniform(30, 70))),
+    ("power", "W", lambda r: round(r.uniform(0, 2500), 1)),
+    ("energy", "kWh", lambda r: round(r.uniform(0, 9000), 2)),
+    ("battery", "%", lambda r: r.randint(5, 100)),
+]
+
+# Entities the benchmark scenarios refer to by name
+FIXED = [
+    ("light.kitchen", "on", {"friendly_name": "Kitchen Light", "brightness": 180}),
+    ("light.living_room", "on", {"friendly_name": "Living Room Light", "brightness": 255}),
+    ("light.porch", "off", {"friendly_name": "Porch Light"}),
+    ("sensor.bedroom_temperature", "21.4", {"friendly_name": "Bedroom Temperature",
+                                            "device_class": "temperature", "unit_of_measurement": "°C",
+                                            "state_class": "measurement"}),
+    ("cover.bathroom", "open", {"friendly_name": "Bathroom Shutter", "current_position": 100}),
+    ("climate.living_room", "heat", {"friendly_name": "Living Room Thermostat",
+                                      "current_temperature": 20.5, "temperature": 21}),
+]
+FIXED_AREAS = {"light.kitchen": "kitchen", "light.living_room": "living_room", "light.porch": "porch",
+               "sensor.bedroom_temperature": "bedroom", "cover.bathroom": "bathroom",
+               "climate.living_room": "living_room"}
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def make_home(entities: int = 500, seed: int = 42) -> Dict[str, Any]:
+    """Build states and registries for a synthetic home (same seed, same home)."""
+    rng = random.Random(seed)
+    now = time.time()
+    domains, weights = zip(*DOMAIN_WEIGHTS.items())
+    states: List[Dict[str, Any]] = []
+    entity_reg: List[Dict[str, Any]] = []
+    devices: List[Dict[str, Any]] = []
+
+    def add(entity_id: str, state: str, attrs: Dict[str, Any], area_id: str) -> None:
+        changed = _iso(now - rng.uniform(0, 86400))
+        states.append({"entity_id": entity_id, "state": state, "attributes": attrs,
+                       "last_changed": changed, "last_updated": changed,
+                       "context": {"id": f"ctx{len(states)}", "parent_id": None, "user_id": None}})
+        idx = len(states) - 1
+        device_id = f"dev{idx // 3}"
+        if idx % 3 == 0:
+            devices.append({"id": device_id, "name": attrs.get("friendly_name", entity_id),
+                            "area_id": area_id, "manufacturer": "Bench", "model": "Fake",
+                            "via_device_id": None})
+        entity_reg.append({"entity_id": entity_id, "device_id": device_id, "area_id": None,
+                           "platform": "bench", "name": None,
+                           "original_name": attrs.get("friendly_name"), "disabled_by": None,
+                           "hidden_by": None, "unique_id": f"uid-{entity_id}"})
+
+    for entity_id, state, attrs in FIXED[:entities]:
+        add(entity_id, state, dict(attrs), FIXED_AREAS[entity_id])
+
+    i = 0
+    while len(states) < entities:
+        i += 1
+        domain = rng.choices(domains, weights)[0]
+        area_id, area_name = AREAS[i % len(AREAS)]
+        attrs: Dict[str, Any] = {}
+        if domain == "sensor":
+            kind, unit, value = SENSOR_KINDS[i % len(SENSOR_KINDS)]
+            object_id, name, state = f"{area_id}_{kind}_{i}", f"{area_name} {kind.title()} {i}", str(value(rng))
+            attrs = {"device_class": kind, "unit_of_measurement": unit, "state_class": "measurement"}
+        elif domain == "binary_sensor":
+            kind = ("motion", "door", "window")[i % 3]
+            object_id, name, state = f"{area_id}_{kind}_{i}", f"{area_name} {kind.title()} {i}", rng.choice(["on", "off"])
+            attrs = {"device_class": kind}
+        elif domain == "climate":
+            object_id, name, state = f"{area_id}_{i}", f"{area_name} Thermostat {i}", "heat"
+            attrs = {"current_temperature": round(rng.uniform(17, 23), 1), "temperature": 21}
+        elif domain == "cover":
+            object_id, name, state = f"{area_id}_shutter_{i}", f"{area_name} Shutter {i}", rng.choice(["open", "closed"])
+        elif domain in ("automation", "script", "scene"):
+            object_id, name, state = f"{area_id}_{domain}_{i}", f"{area_name} {domain.title()} {i}", "on"
+        else:
+            object_id, name, state = f"{area_id}_{domain}_{i}", f"{area_name} {domain.replace('_', ' ').title()} {i}", rng.choice(["on", "off"])
+        attrs["friendly_name"] = name
+        add(f"{domain}.{object_id}", state, attrs, area_id)
+
+    areas = [{"area_id": a, "name": n, "aliases": [], "floor_id": None, "icon": None, "picture": None}
+             for a, n in AREAS]
+    return {"states": states, "entity_registry": entity_reg, "device_registry": devices,
+            "area_registry": areas}
+
+
+class FakeHomeAssistant:
+    """Threaded local HTTP/WS server answering like Home Assistant Core."""
+
+    def __init__(self, entities: int = 500, latency: float = 0.0, seed: int = 42,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.load(entities, seed)
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self._sockets: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, entities: int, seed: int = 42) -> None:
+        """Replace the served home (the server keeps its port)."""
+        self.home = make_home(entities, seed)
+        self.by_id = {s["entity_id"]: s for s in self.home["states"]}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeHomeAssistant":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ha", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.requests[key] += 1
+
+    def reset_counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts, self.requests = dict(self.requests), Counter()
+        return counts
+
+    # ---- REST ----
+
+    def rest(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        parts = [unquote(p) for p in path.split("/") if p][1:]   # strip "api"
+        head = parts[0] if parts else ""
+        self.count(f"rest:{method} {head or '/'}")
+        if not parts:
+            return 200, {"message": "API running."}
+        if head == "config" and len(parts) == 1:
+            return 200, {"location_name": "Bench Home", "time_zone": "UTC", "version": "2025.1.0",
+                         "unit_system": {"temperature": "°C"}, "components": ["recorder", "history"]}
+        if head == "states":
+            if len(parts) == 1:
+                return 200, self.home["states"]
+            state = self.by_id.get(parts[1])
+            return (200, state) if state else (404, {"message": "Entity not found."})
+        if head == "history" and len(parts) >= 3 and parts[1] == "period":
+            return 200, self._history(parts[2], query)
+        if head == "services" and method == "POST" and len(parts) == 3:
+            ids = (body or {}).get("entity_id") or []
+            ids = [ids] if isinstance(ids, str) else ids
+            return 200, [self.by_id[e] for e in ids if e in self.by_id]
+        return 404, {"message": "Not found"}
+
+    def _history(self, start: str, query: Dict[str, List[str]]) -> List[List[Dict[str, Any]]]:
+        ids = [e for e in (query.get("filter_entity_id", [""])[0]).split(",") if e in self.by_id]
+        try:
+            t0 = datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            t0 = time.time() - 86400
+        t1 = time.time()
+        out = []
+        for eid in ids:
+            rng = random.Random(eid)
+            base = self.by_id[eid]["state"]
+            points = []
+            for k in range(48):
+                ts = t0 + (t1 - t0) * k / 48
+                try:
+                    state = str(round(float(base) + rng.uniform(-2, 2), 1))
+                except ValueError:
+                    state = rng.choice(["on", "off"])
+                points.append({"state": state, "last_changed": _iso(ts)})
+            points[0] = {"entity_id": eid, **points[0], "attributes": self.by_id[eid]["attributes"]}
+            out.append(points)
+        return out
+
+    # ---- WebSocket ----
+
+    def ws_command(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        kind = msg.get("type", "")
+        self.count(f"ws:{kind}")
+        result: Any = None
+        if kind.endswith("_registry/list"):
+            result = self.home.get(kind.split("/")[1].replace("_registry", "") + "_registry", [])
+        elif kind == "recorder/statistics_during_period":
+            result = self._statistics(msg.get("statistic_ids") or [], msg.get("start_time"))
+        elif kind in ("get_states",):
+            result = self.home["states"]
+        elif kind == "lovelace/dashboards/list":
+            result = []
+        return {"id": msg.get("id"), "type": "result", "success": True, "result": result}
+
+    def _statistics(self, ids: List[str], start: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+        now = time.time()
+        try:
+            t0 = datetime.fromisoformat((start or "").replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            t0 = now - 86400
+        out = {}
+        for sid in ids:
+            rng = random.Random(sid)
+            rows = []
+            ts = t0
+            while ts < now:
+                mean = rng.uniform(15, 25)
+                rows.append({"start": int(ts * 1000), "end": int((ts + 3600) * 1000),
+                             "mean": round(mean, 2), "min": round(mean - 1, 2), "max": round(mean + 1, 2)})
+                ts += 3600
+            out[sid] = rows
+        return out
+
+
+def _ws_recv(rfile) -> Tuple[Optional[int], bytes]:
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, b""
+    opcode = head[0] & 0x0F
+    masked = head[1] & 0x80
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", rfile.read(8))[0]
+    mask = rfile.read(4) if masked else b""
+    payload = rfile.read(length)
+    if masked:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def _ws_send(wfile, payload: bytes, opcode: int = 0x1) -> None:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack(">BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, n)
+    wfile.write(header + payload)
+    wfile.flush()
+
+
+def _make_handler(ha: FakeHomeAssistant):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _reply(self, status: int, payload: Any) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _rest(self, method: str) -> None:
+            url = urlparse(self.path)
+            if self.headers.get("Upgrade", "").lower() == "websocket":
+                return self._websocket()
+            body = None
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    body = None
+            if ha.latency:
+                time.sleep(ha.latency)
+            if not url.path.startswith("/api"):
+                return self._reply(404, {"message": "Not found"})
+            self._reply(*ha.rest(method, url.path, parse_qs(url.query, keep_blank_values=True), body))
+
+        def do_GET(self) -> None:
+            self._rest("GET")
+
+        def do_POST(self) -> None:
+            self._rest("POST")
+
+        def do_DELETE(self) -> None:
+            self._rest("DELETE")
+
+        def _websocket(self) -> None:
+            key = self.headers.get("Sec-WebSocket-Key", "")
+            accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+            self.send_response(101)
+            self.send_header("Upgrade", "websocket")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Sec-WebSocket-Accept", accept)
+            self.end_headers()
+            self.close_connection = True
+            with ha._lock:
+                ha._sockets.append(self.connection)
+            send = lambda obj: _ws_send(self.wfile, json.dumps(obj).encode("utf-8"))
+            try:
+                send({"type": "auth_required", "ha_version": "2025.1.0"})
+                while True:
+                    opcode, payload = _ws_recv(self.rfile)
+                    if opcode is None or opcode == 0x8:
+                        return
+                    if opcode == 0x9:
+                        _ws_send(self.wfile, payload, 0xA)
+                        continue
+                    if opcode != 0x1:
+                        continue
+                    msg = json.loads(payload)
+                    if msg.get("type") == "auth":
+                        send({"type": "auth_ok", "ha_version": "2025.1.0"})
+                        continue
+                    if ha.latency:
+                        time.sleep(ha.latency)
+                    send(ha.ws_command(msg))
+            except (OSError, ValueError):
+                return
+            finally:
+                with ha._lock:
+                    if self.connection in ha._sockets:
+                        ha._sockets.remove(self.connection)
+
+    return Handler
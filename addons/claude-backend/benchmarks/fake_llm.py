@@ -0,0 +1,177 @@
+"""Scripted OpenAI-compatible streaming provider for benchmarks.
+
+Answers ``POST /v1/chat/completions`` with ``stream: true`` SSE chunks in
+the shape the ``custom`` provider parses (providers/enhanced.py
+``_openai_compat_stream``).  Replies are scripted by ``Rule``s matched
+against the last user message:
+
+- a rule with ``tool`` answers the first round with that tool call (if the
+  tool is among the ones offered), and the following round (after the tool
+  result) with ``reply``;
+- otherwise ``reply`` is streamed word by word.
+
+``ttft`` and ``token_delay`` simulate provider latency; the default is zero
+so the benchmark measures the add-on, not the fake.  Every request's prompt
+size is recorded, since prompt tokens are what the smart-context pipeline is
+meant to keep small.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_REPLY = "Done. Let me know if you need anything else."
+
+
+@dataclass
+class Rule:
+    match: str
+    reply: str = DEFAULT_REPLY
+    tool: Optional[str] = None
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+class FakeLLM:
+    """Threaded local server speaking the OpenAI chat-completions SSE protocol."""
+
+    def __init__(self, rules: Optional[List[Rule]] = None, model: str = "bench-model",
+                 ttft: float = 0.0, token_delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.rules = list(rules or [])
+        self.model = model
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLM":
+        threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            calls, self.calls = self.calls, []
+        return calls
+
+    def plan(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Decide the answer to one request: {"reply": str} or {"tool": name, "arguments": {...}}."""
+        messages = body.get("messages") or []
+        last_user = next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+        after_tool = bool(messages) and messages[-1].get("role") == "tool"
+        offered = {(t.get("function") or {}).get("name") for t in body.get("tools") or []}
+        low = last_user.lower()
+        rule = next((r for r in self.rules if r.match.lower() in low), None)
+        with self._lock:
+            self.calls.append({"messages": len(messages), "prompt_chars": len(json.dumps(messages)),
+                               "tools_offered": len(offered), "after_tool": after_tool})
+        if rule and rule.tool and not after_tool and rule.tool in offered:
+            return {"tool": rule.tool, "arguments": rule.arguments}
+        return {"reply": rule.reply if rule else DEFAULT_REPLY}
+
+    def chunks(self, body: Dict[str, Any]):
+        plan = self.plan(body)
+        prompt_tokens = len(json.dumps(body.get("messages") or [])) // 4
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model") or self.model}
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> Dict[str, Any]:
+            return {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        if self.ttft:
+            time.sleep(self.ttft)
+        if "tool" in plan:
+            yield chunk({"role": "assistant", "content": None, "tool_calls": [{
+                "index": 0, "id": "call_bench_0", "type": "function",
+                "function": {"name": plan["tool"], "arguments": json.dumps(plan["arguments"])}}]})
+            yield chunk({}, "tool_calls")
+            completion_tokens = 20
+        else:
+            words = plan["reply"].split(" ")
+            for i, word in enumerate(words):
+                if i and self.token_delay:
+                    time.sleep(self.token_delay)
+                yield chunk({"content": word if i == 0 else " " + word})
+            yield chunk({}, "stop")
+            completion_tokens = max(1, len(plan["reply"]) // 4)
+        yield {**base, "choices": [], "usage": {"prompt_tokens": prompt_tokens,
+                                                "completion_tokens": completion_tokens,
+                                                "total_tokens": prompt_tokens + completion_tokens}}
+
+
+def _make_handler(llm: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _json(self, status: int, payload: Any) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                return self._json(200, {"object": "list", "data": [{"id": llm.model, "object": "model"}]})
+            self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._json(400, {"error": {"message": "invalid JSON"}})
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            if not body.get("stream"):
+                plan = llm.plan(body)
+                message = {"role": "assistant", "content": plan.get("reply")}
+                if "tool" in plan:
+                    message["tool_calls"] = [{"id": "call_bench_0", "type": "function", "function": {
+                        "name": plan["tool"], "arguments": json.dumps(plan["arguments"])}}]
+                return self._json(200, {"id": "chatcmpl-bench", "object": "chat.completion",
+                                        "model": body.get("model") or llm.model,
+                                        "choices": [{"index": 0, "message": message,
+                                                     "finish_reason": "tool_calls" if "tool" in plan else "stop"}]})
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for event in llm.chunks(body):
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except OSError:
+                pass
+
+    return Handler
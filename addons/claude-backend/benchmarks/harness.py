@@ -0,0 +1,90 @@
+"""Timing, memory and comparison helpers for the benchmark runner."""
+
+from __future__ import annotations
+
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _pct(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def time_it(fn: Callable[[], Any], repeat: int = 10, warmup: int = 1,
+            before: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Wall time of ``fn()`` over *repeat* runs (``before()`` runs untimed before each)."""
+    for _ in range(warmup):
+        if before:
+            before()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "runs": repeat,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(_pct(samples, 0.5), 3),
+        "p95_ms": round(_pct(samples, 0.95), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def memory_of(fn: Callable[[], Any], before: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Peak and retained Python heap of one ``fn()`` call, plus allocated blocks.
+
+    Runs separately from ``time_it`` because tracemalloc slows allocation-heavy
+    code several times over.
+    """
+    if before:
+        before()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        snap0 = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+        snap1 = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    new_blocks = sum(max(0, s.count_diff) for s in snap1.compare_to(snap0, "lineno"))
+    return {
+        "peak_kb": round((peak - base) / 1024, 1),
+        "retained_kb": round((current - base) / 1024, 1),
+        "new_blocks": new_blocks,
+    }
+
+
+def _walk(node: Any, path: Tuple[str, ...] = ()):
+    if isinstance(node, dict):
+        if "p50_ms" in node:
+            yield path, node
+        for k, v in node.items():
+            yield from _walk(v, path + (str(k),))
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 10.0) -> Tuple[List[str], List[str]]:
+    """Diff the p50 of every timed entry; returns (report lines, regressions above *threshold* %)."""
+    old = {p: n for p, n in _walk(baseline.get("results", {}))}
+    lines, regressions = [], []
+    for path, node in _walk(current.get("results", {})):
+        prev = old.get(path)
+        if not prev or not prev.get("p50_ms"):
+            continue
+        delta = (node["p50_ms"] - prev["p50_ms"]) / prev["p50_ms"] * 100
+        line = f"{'/'.join(path):<60} {prev['p50_ms']:>10.2f} -> {node['p50_ms']:>10.2f} ms  {delta:+6.1f}%"
+        lines.append(line)
+        if delta > threshold:
+            regressions.append(line)
+    return lines, regressions
@@ -0,0 +1,273 @@
+"""Benchmark runner: chat pipeline end to end plus hot-function micro-benchmarks.
+
+Starts a fake Home Assistant (benchmarks/fake_ha.py) and a scripted
+OpenAI-compatible provider (benchmarks/fake_llm.py) on localhost, points
+the add-on at them through the usual environment variables (``custom``
+provider), then imports ``api`` and measures:
+
+- ``e2e``    ``stream_chat_with_ai`` for representative intents: wall time,
+             per-stage p50/p95 from tracing.py, HA requests and LLM rounds
+             per turn, prompt size, peak/retained memory and new allocations
+- ``micro``  search_entities, build_smart_context, detect_intent,
+             save_conversations and rag.semantic_search
+
+for each home size in ``--entities``.  All files the add-on would write under
+/config and /data go to a temporary directory.
+
+    cd addons/claude-backend
+    python -m benchmarks.run --entities 500,5000 --out bench.json
+    python -m benchmarks.run --entities 500,5000 --compare bench.json --fail-over 15
+
+``--compare`` prints the p50 change of every entry against an earlier run
+and exits with status 1 when one regressed by more than ``--fail-over`` %.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_ha import FakeHomeAssistant
+from benchmarks.fake_llm import FakeLLM, Rule
+from benchmarks.harness import compare, memory_of, time_it
+
+# name -> (user message, scripted provider behaviour)
+SCENARIOS: Dict[str, Tuple[str, Rule]] = {
+    "chat": ("hello, how are you today?",
+             Rule("hello", "Hi! I'm fine, thanks. How can I help with your home?")),
+    "device_command": ("turn off the kitchen light",
+                       Rule("kitchen light", "The kitchen light is now off.", "call_service",
+                            {"domain": "light", "service": "turn_off", "data": {"entity_id": "light.kitchen"}})),
+    "entity_query": ("which lights are on in the living room?",
+                     Rule("lights are on", "The living room light is on.", "get_entities",
+                          {"domain": "light", "query": "living room"})),
+    "search": ("find all the temperature sensors in the kitchen",
+               Rule("temperature sensors", "I found several kitchen temperature sensors.", "search_entities",
+                    {"query": "kitchen temperature"})),
+    "history": ("how did the bedroom temperature change today?",
+                Rule("bedroom temperature change", "It stayed between 20 and 22 °C.", "get_history",
+                     {"entity_id": "sensor.bedroom_temperature", "hours": 24})),
+    "statistics": ("give me the hourly statistics of the bedroom temperature",
+                   Rule("hourly statistics", "The mean was 21 °C.", "get_statistics",
+                        {"entity_id": "sensor.bedroom_temperature", "period": "hour"})),
+    "automation": ("create an automation that turns on the porch light at sunset",
+                   Rule("automation", "```yaml\nalias: Porch light at sunset\ntriggers:\n  - trigger: sun\n"
+                                      "    event: sunset\nactions:\n  - action: light.turn_on\n"
+                                      "    target:\n      entity_id: light.porch\n```")),
+}
+
+MICRO_MESSAGES = ["turn off the kitchen light", "what's the temperature in the bedroom?",
+                  "create an automation that turns on the porch light at sunset"]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _configure_env(ha: FakeHomeAssistant, llm: FakeLLM, tmp: str) -> None:
+    """Environment read by api.py at import time."""
+    os.environ.update({
+        "AI_PROVIDER": "custom",
+        "CUSTOM_API_KEY": "bench",
+        "CUSTOM_API_BASE": llm.base_url,
+        "CUSTOM_MODEL_NAME": llm.model,
+        "HA_URL": ha.url,
+        "SUPERVISOR_TOKEN": "bench",
+        "USAGE_STATS_FILE": os.path.join(tmp, "usage_stats.json"),
+        "ENABLE_TRACING": "true",
+        "MODEL_REFRESH_INTERVAL_HOURS": "0",
+    })
+
+
+def _prepare(api, tmp: str) -> None:
+    """Send the files the pipeline writes under /config to *tmp* and lift the provider RPM cap."""
+    from collections import deque
+    import rag
+    from providers.rate_limiter import get_rate_limit_coordinator
+    api.CONVERSATIONS_FILE = os.path.join(tmp, "conversations.json")
+    rag.STORAGE_DIR = os.path.join(tmp, "rag")
+    limiter = get_rate_limit_coordinator().get_limiter("custom")
+    limiter.max_rpm = 10 ** 6
+    limiter.request_times = deque(maxlen=1000)
+
+
+def _reset_caches() -> None:
+    """Drop caches that would turn repeated identical turns into cache hits."""
+    import semantic_cache
+    for cache in (semantic_cache._semantic_cache, semantic_cache._response_cache):
+        if cache is not None:
+            cache.clear()
+    try:
+        from services.registry_service import get_registry_graph
+        get_registry_graph().invalidate()
+    except Exception:
+        pass
+
+
+def run_e2e(api, ha: FakeHomeAssistant, llm: FakeLLM, repeat: int) -> Dict[str, Any]:
+    import tracing
+    results: Dict[str, Any] = {}
+    for name, (message, _rule) in SCENARIOS.items():
+        counter = iter(range(10 ** 9))
+        events: List[int] = []
+
+        def turn() -> None:
+            out = list(api.stream_chat_with_ai(message, session_id=f"bench-{name}-{next(counter)}"))
+            events.append(len(out))
+
+        _reset_caches()
+        turn()  # warm-up
+        tracing.clear()
+        ha.reset_counts()
+        llm.reset_calls()
+        timing = time_it(turn, repeat=repeat, warmup=0, before=_reset_caches)
+        stages = tracing.aggregates()
+        ha_counts = ha.reset_counts()
+        calls = llm.reset_calls()
+        results[name] = {
+            **timing,
+            "events_per_turn": round(sum(events[-repeat:]) / repeat, 1),
+            "ha_requests_per_turn": round(sum(ha_counts.values()) / repeat, 2),
+            "ha_requests": {k: round(v / repeat, 2) for k, v in sorted(ha_counts.items())},
+            "llm_rounds_per_turn": round(len(calls) / repeat, 2),
+            "prompt_chars_per_turn": round(sum(c["prompt_chars"] for c in calls) / repeat),
+            "stages": {k: v for k, v in stages.items() if k != "total"},
+            "memory": memory_of(turn, before=_reset_caches),
+        }
+        logging.getLogger("bench").info("e2e %-15s p50 %8.1f ms", name, timing["p50_ms"])
+    return results
+
+
+def _micro_cases(api, tmp: str) -> Dict[str, Tuple[Callable[[], Any], Callable[[], None]]]:
+    import intent
+    import rag
+    import tools
+
+    def noop() -> None:
+        pass
+
+    contexts = {m: intent.build_smart_context(m) for m in MICRO_MESSAGES}
+
+    def fill_conversations() -> None:
+        api.conversations.clear()
+        for s in range(40):
+            api.conversations[str(1_700_000_000 + s)] = [
+                {"role": "user" if i % 2 == 0 else "assistant",
+                 "content": f"message {i} about the kitchen light and bedroom temperature " * 4}
+                for i in range(60)
+            ]
+
+    if not os.path.exists(os.path.join(rag.STORAGE_DIR, "rag_index.json")):
+        words = ("heating boiler thermostat kitchen light sunset automation energy meter solar "
+                 "battery garage door alarm camera irrigation garden schedule vacation").split()
+        for d in range(150):
+            body = " ".join(words[(d * 7 + k) % len(words)] for k in range(400))
+            rag.index_document(f"doc{d}", f"Document {d}. {body}")
+
+    cases = {
+        "search_entities": (lambda: tools.execute_tool("search_entities", {"query": "kitchen temperature"}), noop),
+        "save_conversations": (api.save_conversations, fill_conversations),
+        "rag.semantic_search": (lambda: rag.semantic_search("kitchen thermostat schedule", limit=5), noop),
+    }
+    for i, m in enumerate(MICRO_MESSAGES):
+        cases[f"build_smart_context[{i}]"] = (lambda m=m: intent.build_smart_context(m), noop)
+        cases[f"detect_intent[{i}]"] = (lambda m=m: intent.detect_intent(m, contexts[m]), noop)
+    return cases
+
+
+def run_micro(api, tmp: str, repeat: int) -> Dict[str, Any]:
+    results = {}
+    for name, (fn, before) in _micro_cases(api, tmp).items():
+        results[name] = {**time_it(fn, repeat=repeat, warmup=1, before=before),
+                         "memory": memory_of(fn, before=before)}
+        logging.getLogger("bench").info("micro %-28s p50 %8.2f ms", name, results[name]["p50_ms"])
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Chat pipeline benchmarks against a fake HA and LLM")
+    parser.add_argument("--entities", default="500,5000,20000", help="comma-separated home sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per e2e scenario")
+    parser.add_argument("--micro-repeat", type=int, default=20, help="timed runs per micro-benchmark")
+    parser.add_argument("--only", choices=["e2e", "micro"], help="run one suite only")
+    parser.add_argument("--ha-latency", type=float, default=0.0, help="seconds added to every HA answer")
+    parser.add_argument("--llm-ttft", type=float, default=0.0, help="seconds before the first LLM chunk")
+    parser.add_argument("--llm-token-delay", type=float, default=0.0, help="seconds between LLM chunks")
+    parser.add_argument("--out", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to diff against")
+    parser.add_argument("--fail-over", type=float, default=10.0, help="regression threshold in %% for --compare")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger("bench").setLevel(logging.INFO)
+    sizes = [int(s) for s in args.entities.split(",") if s.strip()]
+
+    tmp = tempfile.mkdtemp(prefix="amira-bench-")
+    ha = FakeHomeAssistant(entities=sizes[0], latency=args.ha_latency).start()
+    llm = FakeLLM([rule for _, rule in SCENARIOS.values()], ttft=args.llm_ttft,
+                  token_delay=args.llm_token_delay).start()
+    _configure_env(ha, llm, tmp)
+    t0 = time.perf_counter()
+    import api
+    import_ms = round((time.perf_counter() - t0) * 1000, 1)
+    logging.getLogger().setLevel(logging.WARNING)
+    _prepare(api, tmp)
+
+    report: Dict[str, Any] = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_commit(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "args": vars(args), "import_api_ms": import_ms},
+        "results": {},
+    }
+    try:
+        for size in sizes:
+            logging.getLogger("bench").info("--- %d entities ---", size)
+            ha.load(size)
+            _reset_caches()
+            section: Dict[str, Any] = {}
+            if args.only in (None, "e2e"):
+                section["e2e"] = run_e2e(api, ha, llm, args.repeat)
+            if args.only in (None, "micro"):
+                section["micro"] = run_micro(api, tmp, args.micro_repeat)
+            report["results"][str(size)] = section
+    finally:
+        ha.stop()
+        llm.stop()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, report, args.fail_over)
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.fail_over}%:")
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
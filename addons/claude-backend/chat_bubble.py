@@ -2396,7 +2396,7 @@ def get_chat_bubble_js(
 
   async function switchToConversation(sessionId) {{
     try {{
-      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId), {{credentials:'same-origin'}});
+      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId) + '?limit=20', {{credentials:'same-origin'}});
       if (!resp.ok) throw new Error('HTTP ' + resp.status);
       const data = await resp.json();
       // Update session ID
@@ -2828,7 +2828,7 @@ def get_chat_bubble_js(
   async function _loadCardConversation(sessionId, msgsContainer) {{
     if (!msgsContainer) return;
     try {{
-      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId), {{credentials:'same-origin'}});
+      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId) + '?limit=30', {{credentials:'same-origin'}});
       if (!resp.ok) return;
       const data = await resp.json();
       if (data.messages && data.messages.length > 0) {{
@@ -3328,7 +3328,7 @@ def get_chat_bubble_js(
     if (!_autoMsgsEl || !sessionId) return;
     const target = _autoMsgsEl;
     try {{
-      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId), {{credentials:'same-origin'}});
+      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sessionId) + '?limit=30', {{credentials:'same-origin'}});
       if (!resp.ok) return;
       const data = await resp.json();
       const messages = (data && Array.isArray(data.messages)) ? data.messages : [];
@@ -5994,7 +5994,7 @@ def get_chat_bubble_js(
     // localStorage empty — try loading from server for current session
     try {{
       const sid = getSessionId();
-      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sid), {{credentials:'same-origin'}});
+      const resp = await fetch(API_BASE + '/api/conversations/' + encodeURIComponent(sid) + '?limit=20', {{credentials:'same-origin'}});
       if (resp.ok) {{
         const data = await resp.json();
         if (data.messages && data.messages.length > 0) {{
@@ -279,6 +279,7 @@ def get_chat_ui():
             "settings_enable_voice_input": "Voice Input",
             "settings_enable_rag": "RAG",
             "settings_enable_chat_bubble": "Chat Bubble",
+            "settings_enable_fast_path": "Local Fast Path",
             "settings_enable_amira_card_button": "Amira Card Button",
             "settings_enable_amira_automation_button": "Amira Automation Button",
             "settings_enable_mcp": "MCP Servers",
@@ -320,6 +321,7 @@ def get_chat_ui():
             "settings_desc_enable_voice_input": "Enable microphone button for voice messages (Groq Whisper, with OpenAI/Google fallback) \u2013 requires HTTPS",
             "settings_desc_enable_rag": "[EXPERIMENTAL] Enable RAG (Retrieval-Augmented Generation) for document search and context injection",
             "settings_desc_enable_chat_bubble": "Show a floating AI chat bubble on every HA page.",
+            "settings_desc_enable_fast_path": "Answer simple one-device commands and questions locally, without calling the AI provider.",
             "settings_desc_enable_amira_card_button": "Show the Amira button inside the Lovelace card editor dialog for AI-assisted card editing.",
             "settings_desc_enable_amira_automation_button": "Show the Amira button and flowchart helper in the Home Assistant automation editor.",
             "settings_desc_enable_mcp": "Enable MCP (Model Context Protocol) support. When disabled, Amira skips MCP server connections at startup.",
@@ -625,6 +627,7 @@ def get_chat_ui():
             "settings_enable_voice_input": "Input Vocale",
             "settings_enable_rag": "RAG",
             "settings_enable_chat_bubble": "Bolla Chat",
+            "settings_enable_fast_path": "Percorso Rapido Locale",
             "settings_enable_amira_card_button": "Pulsante Amira Card",
             "settings_enable_amira_automation_button": "Pulsante Amira Automazioni",
             "settings_enable_mcp": "Server MCP",
@@ -665,6 +668,7 @@ def get_chat_ui():
             "settings_desc_enable_voice_input": "Abilita il pulsante microfono per messaggi vocali (Groq Whisper, con fallback OpenAI/Google) \u2013 richiede HTTPS",
             "settings_desc_enable_rag": "[SPERIMENTALE] Abilita RAG (Retrieval-Augmented Generation) per ricerca documenti e iniezione contesto",
             "settings_desc_enable_chat_bubble": "Mostra una bolla chat AI flottante su ogni pagina di HA.",
+            "settings_desc_enable_fast_path": "Esegui localmente comandi e domande semplici su un solo dispositivo, senza chiamare il provider AI.",
             "settings_desc_enable_amira_card_button": "Mostra il pulsante Amira nel dialog dell'editor card Lovelace per la modifica assistita dall'AI.",
             "settings_desc_enable_amira_automation_button": "Mostra il pulsante Amira e l'aiuto flowchart nell'editor automazioni di Home Assistant.",
             "settings_desc_enable_mcp": "Abilita il supporto MCP (Model Context Protocol). Se disattivato, Amira non si connette agli MCP server all'avvio.",
@@ -971,6 +975,7 @@ def get_chat_ui():
             "settings_enable_voice_input": "Entrada de Voz",
             "settings_enable_rag": "RAG",
             "settings_enable_chat_bubble": "Burbuja Chat",
+            "settings_enable_fast_path": "Ruta R\u00e1pida Local",
             "settings_enable_amira_card_button": "Bot\u00f3n Amira Card",
             "settings_enable_mcp": "Servidores MCP",
             "settings_fallback_enabled": "Respaldo Automatico",
@@ -1010,6 +1015,7 @@ def get_chat_ui():
             "settings_desc_enable_voice_input": "Habilitar bot\u00f3n de micr\u00f3fono para mensajes de voz (Groq Whisper, con fallback OpenAI/Google) \u2013 requiere HTTPS",
             "settings_desc_enable_rag": "[EXPERIMENTAL] Habilitar RAG (Generaci\u00f3n Aumentada por Recuperaci\u00f3n) para b\u00fasqueda de documentos e inyecci\u00f3n de contexto",
             "settings_desc_enable_chat_bubble": "Mostrar una burbuja de chat AI flotante en cada p\u00e1gina de HA.",
+            "settings_desc_enable_fast_path": "Responder localmente a comandos y preguntas simples sobre un solo dispositivo, sin llamar al proveedor de IA.",
             "settings_desc_enable_amira_card_button": "Mostrar el bot\u00f3n Amira dentro del di\u00e1logo del editor de tarjetas Lovelace para edici\u00f3n asistida por AI.",
             "settings_desc_enable_mcp": "Habilitar soporte MCP (Model Context Protocol). Si est\u00e1 desactivado, Amira no se conecta a servidores MCP al inicio.",
             "mcp_config_path": "Archivo de Configuraci\u00f3n",
@@ -1315,6 +1321,7 @@ def get_chat_ui():
             "settings_enable_voice_input": "Entree Vocale",
             "settings_enable_rag": "RAG",
             "settings_enable_chat_bubble": "Bulle Chat",
+            "settings_enable_fast_path": "Chemin Rapide Local",
             "settings_enable_amira_card_button": "Bouton Amira Card",
             "settings_enable_mcp": "Serveurs MCP",
             "settings_fallback_enabled": "Repli Automatique",
@@ -1354,6 +1361,7 @@ def get_chat_ui():
             "settings_desc_enable_voice_input": "Activer le bouton microphone pour les messages vocaux (Groq Whisper, avec fallback OpenAI/Google) \u2013 n\u00e9cessite HTTPS",
             "settings_desc_enable_rag": "[EXP\u00c9RIMENTAL] Activer RAG (G\u00e9n\u00e9ration Augment\u00e9e par R\u00e9cup\u00e9ration) pour la recherche de documents et l'injection de contexte",
             "settings_desc_enable_chat_bubble": "Afficher une bulle de chat IA flottante sur chaque page HA.",
+            "settings_desc_enable_fast_path": "R\u00e9pondre localement aux commandes et questions simples sur un seul appareil, sans appeler le fournisseur d'IA.",
             "settings_desc_enable_amira_card_button": "Afficher le bouton Amira dans la bo\u00eete de dialogue de l'\u00e9diteur de cartes Lovelace pour l'\u00e9dition assist\u00e9e par IA.",
             "settings_desc_enable_mcp": "Activer le support MCP (Model Context Protocol). Si d\u00e9sactiv\u00e9, Amira ne se connecte pas aux serveurs MCP au d\u00e9marrage.",
             "settings_desc_fallback_enabled": "Si le fournisseur principal \u00e9choue, essayer automatiquement le suivant dans la liste de priorit\u00e9",
@@ -6523,6 +6531,7 @@ def get_chat_ui():
                 enable_chat_bubble: T.settings_enable_chat_bubble || 'Chat Bubble',
                 enable_amira_card_button: T.settings_enable_amira_card_button || 'Amira Card Button',
                 enable_amira_automation_button: T.settings_enable_amira_automation_button || 'Amira Automation Button',
+                enable_fast_path: T.settings_enable_fast_path || 'Local Fast Path',
                 enable_mcp: T.settings_enable_mcp || 'MCP Servers',
                 anthropic_extended_thinking: T.settings_anthropic_thinking || 'Anthropic Thinking',
                 anthropic_prompt_caching: T.settings_anthropic_caching || 'Prompt Caching',
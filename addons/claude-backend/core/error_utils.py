@@ -3,8 +3,10 @@
 import re
 from typing import Optional
 
-import tools
 from core.translations import get_lang_text
+from lazy_import import LazyModule
+
+tools = LazyModule("tools")
 
 
 def _extract_http_error_code(error_text: str) -> Optional[int]:
@@ -0,0 +1,133 @@
+"""Compiled multi-family keyword matcher used for intent routing.
+
+Intent detection used to run ``any(k in msg for k in KEYWORDS)`` for a dozen
+keyword lists per message (plus a regex per short keyword). KeywordMatcher
+compiles every family into ONE trie-shaped regex and reports all matching
+families in a single left-to-right pass over the message.
+
+How it stays exact (same answers as the substring scans):
+- ``(?=(trie))`` is tried at every position and captures the LONGEST keyword
+  starting there; every other keyword starting at that position is a prefix
+  of it, so their families are looked up from a precomputed prefix table.
+- Keywords flagged ``whole_word`` (short tokens like "js", "ok") only count
+  when not surrounded by ``[a-z0-9_]``; that is checked per hit at runtime.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Set, Tuple
+
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_")
+
+# (families matched unconditionally, families that need word boundaries)
+_PrefixEntry = Tuple[int, FrozenSet[str], FrozenSet[str]]
+
+
+def _trie_pattern(node: dict) -> str:
+    """Render a nested-dict trie as a regex; '' key marks end of a keyword."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch != ""]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # Greedy optional: prefer the longer keyword, fall back to this one
+        return "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    """Single-pass matcher over named keyword families.
+
+    Args:
+        families: ``{family: keywords}``. Keywords are matched as-is, so
+            callers pass lowercase keywords and lowercase text.
+        whole_word_max_len: per-family length limit under which a keyword
+            must match as a whole word (e.g. ``{"html": 3}`` for "js").
+    """
+
+    def __init__(self, families: Mapping[str, Iterable[str]],
+                 whole_word_max_len: Mapping[str, int] = None):
+        whole_word_max_len = whole_word_max_len or {}
+        plain: Dict[str, Set[str]] = {}
+        bounded: Dict[str, Set[str]] = {}
+        for family, keywords in families.items():
+            limit = whole_word_max_len.get(family, 0)
+            for kw in keywords:
+                if not isinstance(kw, str) or not kw:
+                    continue
+                target = bounded if len(kw) <= limit else plain
+                target.setdefault(kw, set()).add(family)
+
+        self.families: FrozenSet[str] = frozenset(families)
+        self._prefixes: Dict[str, List[_PrefixEntry]] = {}
+        all_keywords = set(plain) | set(bounded)
+        for kw in all_keywords:
+            entries = []
+            for i in range(1, len(kw) + 1):
+                p = kw[:i]
+                if p in plain or p in bounded:
+                    entries.append((i, frozenset(plain.get(p, ())), frozenset(bounded.get(p, ()))))
+            self._prefixes[kw] = entries
+
+        trie: dict = {}
+        for kw in all_keywords:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._regex = re.compile("(?=(" + _trie_pattern(trie) + "))") if trie else None
+
+    def matches(self, text: str) -> Set[str]:
+        """Return every family with at least one keyword occurring in *text*."""
+        found: Set[str] = set()
+        if self._regex is None or not text:
+            return found
+        prefixes = self._prefixes
+        n = len(text)
+        for m in self._regex.finditer(text):
+            kw = m.group(1)
+            if not kw:
+                continue
+            pos = m.start()
+            left_ok = pos == 0 or text[pos - 1] not in _WORD_CHARS
+            for length, fams, bounded_fams in prefixes[kw]:
+                if fams:
+                    found |= fams
+                if bounded_fams and left_ok:
+                    end = pos + length
+                    if end >= n or text[end] not in _WORD_CHARS:
+                        found |= bounded_fams
+            if len(found) == len(self.families):
+                break
+        return found
+
+    def has(self, family: str, text: str) -> bool:
+        """Convenience for a single family (still a full pass; prefer matches())."""
+        return family in self.matches(text)
+
+
+# ---------------------------------------------------------------------------
+# keywords.json helpers
+# ---------------------------------------------------------------------------
+
+_lang_keyword_cache: Dict[str, Tuple[object, FrozenSet[str]]] = {}
+
+
+def all_lang_keywords(keywords: Mapping[str, dict], key: str) -> FrozenSet[str]:
+    """Union of ``keywords[lang][key]`` across languages (stripped, lowercased).
+
+    Cached per (keywords object, key): keywords.json is loaded once at startup,
+    so the set is rebuilt only if the KEYWORDS dict itself is replaced.
+    """
+    cached = _lang_keyword_cache.get(key)
+    if cached is not None and cached[0] is keywords:
+        return cached[1]
+    out: Set[str] = set()
+    for lang_data in (keywords or {}).values():
+        vals = lang_data.get(key, []) if isinstance(lang_data, dict) else []
+        if isinstance(vals, list):
+            for v in vals:
+                if isinstance(v, str) and v.strip():
+                    out.add(v.strip().lower())
+    result = frozenset(out)
+    _lang_keyword_cache[key] = (keywords, result)
+    return result
@@ -1,15 +1,18 @@
 """Discord Bot Integration.
 
 Listens for Discord messages via discord.py gateway and relays them to Amira API.
+The gateway client runs on the shared async runtime loop (async_runtime.py).
 """
 
 import asyncio
+import concurrent.futures
 import logging
-from threading import Thread
 from typing import Any, Dict, Optional, Set
 
 import requests
 
+from async_runtime import get_runtime
+
 try:
     import discord  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
@@ -43,7 +46,7 @@ class DiscordBot:
         self.api_base = api_base_url.rstrip("/")
         self.allowed_channel_ids = set(allowed_channel_ids or set())
         self.allowed_user_ids = set(allowed_user_ids or set())
-        self.thread: Optional[Thread] = None
+        self.task: Optional[concurrent.futures.Future] = None
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.client = None
         self.running = False
@@ -121,7 +124,11 @@ class DiscordBot:
         }
 
         try:
-            resp = requests.post(f"{self.api_base}/api/discord/message", json=payload, timeout=90)
+            # The bot shares the process-wide loop: keep the blocking call off it
+            resp = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: requests.post(f"{self.api_base}/api/discord/message", json=payload, timeout=90),
+            )
             if resp.status_code != 200:
                 logger.warning("Discord API error: %s %s", resp.status_code, resp.text[:200])
                 await self._send_chunks(message.channel, "⚠️ API error, please try again.")
@@ -176,47 +183,43 @@ class DiscordBot:
             return
 
         self.running = True
+        runtime = get_runtime()
+        self.loop = runtime.loop
+        self.task = runtime.spawn(self._runner(), name="discord")
 
-        def _thread_main():
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            try:
-                self.loop.run_until_complete(self._runner())
-            except Exception as e:
-                logger.error("Discord bot stopped with error: %s", e)
-            finally:
-                self.running = False
-                if self.loop and not self.loop.is_closed():
-                    self.loop.stop()
-                    self.loop.close()
-
-        self.thread = Thread(target=_thread_main, daemon=True)
-        self.thread.start()
+        def _on_exit(fut):
+            self.running = False
+            if not fut.cancelled() and fut.exception() is not None:
+                logger.error("Discord bot stopped with error: %s", fut.exception())
+
+        self.task.add_done_callback(_on_exit)
         logger.info("Discord bot started")
 
     def stop(self):
         self.running = False
-        if self.loop and self.client:
+        if self.client:
             try:
-                fut = asyncio.run_coroutine_threadsafe(self.client.close(), self.loop)
-                fut.result(timeout=5)
+                get_runtime().run(self.client.close(), timeout=5, name="discord.close")
             except Exception:
                 pass
-        if self.thread:
-            self.thread.join(timeout=5)
+        if self.task:
+            try:
+                self.task.result(timeout=5)
+            except Exception:
+                self.task.cancel()
         logger.info("Discord bot stopped")
 
     def send_message(self, channel_id: int, text: str, timeout: float = 10.0) -> bool:
         """Thread-safe synchronous send wrapper used by backend tools."""
-        if not self.running or not self.loop or not self.client:
+        if not self.running or not self.client:
             logger.warning("Discord send requested but bot is not running")
             return False
         try:
-            fut = asyncio.run_coroutine_threadsafe(
+            return bool(get_runtime().run(
                 self._send_to_channel(int(channel_id), text),
-                self.loop,
-            )
-            return bool(fut.result(timeout=timeout))
+                timeout=timeout,
+                name="discord.send",
+            ))
         except Exception as e:
             logger.error("Discord send_message failed: %s", e)
             return False
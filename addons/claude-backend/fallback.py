@@ -15,6 +15,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from enum import Enum
 
+from metrics_core import RingBuffer, StreamingStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -89,13 +91,18 @@ class ProviderHealth:
         self.consecutive_failures = 0
         self.is_available = True
         self.unavailable_until: Optional[datetime] = None
+        self.latency = StreamingStats()               # seconds, successful calls
+        self.error_types: Dict[str, int] = {}
+        self.recent_errors = RingBuffer(20)
     
-    def record_success(self) -> None:
+    def record_success(self, elapsed: Optional[float] = None) -> None:
         """Record successful request."""
         self.total_requests += 1
         self.success_requests += 1
         self.consecutive_failures = 0
         self.is_available = True
+        if elapsed is not None:
+            self.latency.observe(elapsed)
     
     def record_failure(self, error: Exception, error_type: ErrorType) -> None:
         """Record failed request."""
@@ -105,6 +112,9 @@ class ProviderHealth:
         self.last_error = str(error)
         self.last_error_type = error_type
         self.last_error_time = datetime.now()
+        self.error_types[error_type.value] = self.error_types.get(error_type.value, 0) + 1
+        self.recent_errors.append({"time": self.last_error_time.isoformat(),
+                                   "type": error_type.value, "error": self.last_error[:200]})
         
         # Temporarily disable provider if too many failures
         if error_type == ErrorType.RATE_LIMIT and self.consecutive_failures > 3:
@@ -183,6 +193,9 @@ class ProviderHealth:
             "available": self.is_available,
             "last_error": self.last_error,
             "last_error_type": self.last_error_type.value if self.last_error_type else None,
+            "latency_s": self.latency.snapshot(),
+            "error_types": dict(self.error_types),
+            "recent_errors": self.recent_errors.last(5),
         }
 
 
@@ -280,7 +293,7 @@ class ProviderFallback:
                     elapsed = time.time() - start_time
                     
                     # Record success
-                    self.health[provider].record_success()
+                    self.health[provider].record_success(elapsed)
                     self.call_counts[provider] += 1
                     
                     logger.info(
@@ -7,6 +7,7 @@ import logging
 from typing import Dict, List, Optional
 
 import api
+from core.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -468,7 +469,221 @@ DESIGN FREEDOM — vary these across dashboards:
 Follow the configured response language instruction."""
 
 
-def _is_conversational(msg: str) -> bool:
+# ---------------------------------------------------------------------------
+# Keyword families for routing
+# All families (static below + per-language ones from keywords.json) are
+# compiled into one KeywordMatcher, so a message is scanned once and every
+# signal used by detect_intent / build_smart_context is a set lookup.
+# ---------------------------------------------------------------------------
+
+# --- HA blocker: these keywords strongly indicate a HA request ---
+_HA_BLOCKERS = (
+    # Italian action verbs
+    "accendi", "spegni", "apri", "chiudi", "alza", "abbassa", "attiva", "disattiva",
+    "imposta", "regola", "metti", "porta a", "portalo", "impostalo", "riavvia",
+    "crea un'automazione", "crea automation", "crea script", "crea una scena",
+    # English action verbs
+    "turn on", "turn off", "switch on", "switch off", "dim ", "brighten",
+    "lock ", "unlock", "arm ", "disarm", "restart",
+    # French/Spanish action verbs
+    "allume ", "éteins", "ouvre ", "ferme ", "enciende", "apaga", "abre ", "cierra",
+    # HA-specific domain nouns (would only appear in HA requests)
+    "tapparella", "persiana", "tenda da sole", "termostato", "climatizzatore",
+    "irrigazione", "allarme", "serratura", "cancello", "pulsante",
+    # Query state signals
+    "lo stato di", "lo stato del", "stato della", "quante luci",
+    "qual è la temperatura", "quant'è la", "quanto consuma",
+    "entity_id",
+)
+
+
+# --- Conversational signals: these clearly mean "just chatting" ---
+_CONV_SIGNALS = (
+    # Identity / capabilities
+    "chi sei", "cosa sei", "cosa sai fare", "cosa puoi fare", "cosa sai",
+    "come ti chiami", "qual è il tuo nome", "presentati", "chi ti ha creato",
+    "who are you", "what are you", "what can you do", "your name", "who made you",
+    "qui es-tu", "que puedes hacer", "comment tu t'appelles",
+    # Wellbeing
+    "come stai", "come va", "come ti senti", "tutto bene",
+    "how are you", "how r u", "how's it going", "what's up",
+    "ça va", "comment tu vas", "cómo estás",
+    # Fun / creative
+    "barzelletta", "burletta", "scherzo", "indovinello",
+    "dimmi una storia", "dimmi una barzelletta", "raccontami una storia",
+    "raccontami qualcosa", "dimmi qualcosa di interessante",
+    "tell me a joke", "tell me a story",
+    "blague", "raconte-moi",
+    # Philosophical / opinion
+    "cosa pensi", "cosa ne pensi", "hai un'opinione", "secondo te",
+    "what do you think", "your opinion", "que penses-tu", "qué piensas",
+    # Praise / gratitude (standalone, not part of HA command)
+    "sei bravo", "sei ottimo", "sei fantastico", "sei utilissimo", "mi hai aiutato",
+    "you're great", "you're amazing", "you're helpful",
+    # Just being friendly
+    "parliamo di", "dimmi di", "parlami di qualcosa",
+)
+
+
+_EXPLICIT_HTML_KEYWORDS = (
+    "/local/dashboards",
+    ".html",
+    "dashboard html",
+    "html dashboard",
+    "pagina html",
+    "crea una dashboard html",
+    "create html dashboard",
+)
+_CARD_EDIT_KEYWORDS = (
+    "questa card",
+    "questa scheda",
+    "abbellisci",
+    "migliora questa card",
+    "migliora la card",
+    "sistema questa card",
+    "fix this card",
+    "improve this card",
+    "beautify this card",
+)
+_DEBUG_SELECTION_KEYWORDS = (
+    "analizza", "vedi", "mostra", "dettaglio", "investig", "il primo", "il secondo",
+    "numero", "entry", "errore", "analyze", "show", "detail", "investigate",
+    "analyse", "montre", "détail", "analiza", "muestra", "detalle",
+)
+_FOLLOW_UP_KEYWORDS = (
+    "modifica", "modificala", "modificalo", "cambia", "aggiungi",
+    "inserisci", "togli", "rimuovi", "usa le stess", "stesse entit",
+    "stessi sensor", "gli stessi", "le stesse", "modify it", "change it",
+    "add", "remove", "use the same", "same entities", "same sensors",
+    "modifie", "change", "ajoute", "utilise les même",
+    "modifica", "cambia", "añade", "usa los mismos",
+)
+# Short tokens (<= 3 chars, e.g. "js") must match as whole words
+_HTML_KEYWORDS = (
+    "html", "vue", "javascript", "js", "react", "svelte",
+    "interattiv", "realtime", "responsive", "custom css",
+    "custom design", "pannello web", "pagina web", "pagina live",
+    "pannello live", "plancia", "bento",
+)
+_STATS_WORD_KEYWORDS = ("statistich", "statistic", "estadístic", "statistique")
+_MANAGE_EXTRA_KEYWORDS = (
+    "non esist", "orfan", "orphan", "obsolet", "puliz", "clean", "purge",
+    "correggi", "fix", "converti", "convert", "valuta", "unità", "unit",
+)
+
+# --- build_smart_context triggers ---
+_AUTOMATION_KEYWORDS = (
+    "automazione", "automation", "automazion", "automatización", "automatizacion",
+    "automatisation", "trigger", "condizione", "condition", "condición", "condition",
+)
+_CREATE_AUTOMATION_KEYWORDS = (
+    "nuova automazione", "nuove automazioni", "new automation", "new automations",
+    "crea automazione", "creare automazione", "create automation", "add automation",
+    "aggiungi automazione", "altra automazione", "un'altra automazione", "un altra automazione",
+    "nueva automatización", "nuevas automatizaciones", "crear automatización", "añadir automatización",
+    "nouvelle automatisation", "nouvelles automatisations", "créer automatisation", "ajouter automatisation",
+)
+_MODIFY_AUTOMATION_KEYWORDS = (
+    "modifica automazione", "modifica questa automazione", "modify automation",
+    "update automation", "aggiorna automazione", "cambia automazione", "questa automazione",
+    "modificar automatización", "actualizar automatización", "esta automatización",
+    "modifier automatisation", "mettre à jour automatisation", "cette automatisation",
+)
+_SCRIPT_KEYWORDS = ("script", "scena", "scenari", "routine", "sequenza")
+_DASHBOARD_CONTEXT_KEYWORDS = ("dashboard", "lovelace", "scheda", "card", "pannello")
+
+_ENTITY_KEYWORDS = frozenset({
+    # light — IT/EN/ES/FR
+    "luce", "luci", "light", "lights", "lampe", "lampes", "lumiere", "luz", "luces",
+    # sensor — IT/EN/ES/FR
+    "temperatura", "temperature", "sensore", "sensor", "capteur", "sensor",
+    "humedad", "humidite", "humidity",
+    # climate — IT/EN/ES/FR
+    "clima", "climate", "termostato", "thermostat", "riscaldamento", "heating",
+    "calefaccion", "chauffage", "climatisation", "raffreddamento", "cooling",
+    # switch — IT/EN/ES/FR
+    "switch", "interruttore", "interrupteur", "interruptor",
+    # media player
+    "media_player",
+    # cover (blinds/shutters/gates) — IT/EN/ES/FR
+    "tapparella", "tapparelle", "persiana", "tenda",
+    "blind", "curtain", "shutter", "cover",
+    "volet", "rideau", "store",
+    "persiana", "estor", "toldo",
+    "cancello", "gate", "garage",
+    # lock — IT/EN/ES/FR
+    "serratura", "lock", "cerradura", "serrure",
+    # camera — IT/EN/ES/FR
+    "telecamera", "camera", "videocamera",
+    "camara", "surveillance",
+    # alarm — IT/EN/ES/FR
+    "allarme", "alarm", "sirena", "siren",
+    "alarma", "alarme",
+    # fan — IT/EN/ES/FR
+    "ventilatore", "fan", "ventilador", "ventilateur",
+    # vacuum — IT/EN/ES/FR
+    "aspirapolvere", "aspiratore", "vacuum", "robot",
+    "aspiradora", "aspirateur",
+    # irrigation/pump — IT/EN/ES/FR
+    "irrigazione", "irrigation", "pompa", "pump",
+    "riego", "pompe",
+})
+
+_STATIC_KEYWORD_FAMILIES = {
+    "ha_blocker": _HA_BLOCKERS,
+    "conversational": _CONV_SIGNALS,
+    "explicit_html": _EXPLICIT_HTML_KEYWORDS,
+    "card_edit": _CARD_EDIT_KEYWORDS,
+    "debug_selection": _DEBUG_SELECTION_KEYWORDS,
+    "follow_up": _FOLLOW_UP_KEYWORDS,
+    "html": _HTML_KEYWORDS,
+    "html_ref": ("/local/dashboards", ".html"),
+    "stats_word": _STATS_WORD_KEYWORDS,
+    "automation": _AUTOMATION_KEYWORDS,
+    "create_automation": _CREATE_AUTOMATION_KEYWORDS,
+    "modify_automation": _MODIFY_AUTOMATION_KEYWORDS,
+    "script": _SCRIPT_KEYWORDS,
+    "dashboard_context": _DASHBOARD_CONTEXT_KEYWORDS,
+    "entity": _ENTITY_KEYWORDS,
+}
+
+_matcher_state: Dict[str, object] = {"key": None, "matcher": None, "confirm": frozenset()}
+
+
+def _get_keyword_matcher() -> KeywordMatcher:
+    """Return the compiled matcher for the current language.
+
+    Built on first use and rebuilt only when api.LANGUAGE (or the loaded
+    keywords.json) changes.
+    """
+    key = (api.LANGUAGE, id(api.KEYWORDS))
+    matcher = _matcher_state["matcher"]
+    if matcher is not None and _matcher_state["key"] == key:
+        return matcher
+    lang_keywords = api.KEYWORDS.get(api.LANGUAGE, api.KEYWORDS.get("en", {}))
+    families = dict(_STATIC_KEYWORD_FAMILIES)
+    families["chat"] = [str(k or "").strip().lower() for k in lang_keywords.get("chat", [])]
+    families["dashboard"] = lang_keywords.get("dashboard", [])
+    families["statistics_manage"] = lang_keywords.get("statistics_manage", [])
+    families["manage"] = (list(lang_keywords.get("delete", [])) + list(lang_keywords.get("modify", []))
+                          + list(_MANAGE_EXTRA_KEYWORDS))
+    matcher = KeywordMatcher(families, whole_word_max_len={"chat": 3, "html": 3})
+    _matcher_state.update(
+        key=key,
+        matcher=matcher,
+        # Confirmation words are compared against the whole message, across all languages
+        confirm=frozenset(w for lang_data in api.KEYWORDS.values() for w in lang_data.get("confirm", [])),
+    )
+    logger.debug(f"Intent keyword matcher compiled for language={api.LANGUAGE}")
+    return matcher
+
+
+def _keyword_signals(msg: str) -> set:
+    """All keyword families present in *msg* (lowercase), in one pass."""
+    return _get_keyword_matcher().matches(msg)
+
+
+def _is_conversational(msg: str, signals: Optional[set] = None) -> bool:
     """Return True if the message is clearly casual conversation with no HA action needed.
 
     Logic:
@@ -476,58 +691,17 @@ def _is_conversational(msg: str) -> bool:
     2. If the message matches conversational signals → True (route to chat)
     3. Otherwise → False (let the existing keyword/LLM logic handle it)
     """
+    if signals is None:
+        signals = _keyword_signals(msg)
     # --- HA blocker: these keywords strongly indicate a HA request ---
-    HA_BLOCKERS = (
-        # Italian action verbs
-        "accendi", "spegni", "apri", "chiudi", "alza", "abbassa", "attiva", "disattiva",
-        "imposta", "regola", "metti", "porta a", "portalo", "impostalo", "riavvia",
-        "crea un'automazione", "crea automation", "crea script", "crea una scena",
-        # English action verbs
-        "turn on", "turn off", "switch on", "switch off", "dim ", "brighten",
-        "lock ", "unlock", "arm ", "disarm", "restart",
-        # French/Spanish action verbs
-        "allume ", "éteins", "ouvre ", "ferme ", "enciende", "apaga", "abre ", "cierra",
-        # HA-specific domain nouns (would only appear in HA requests)
-        "tapparella", "persiana", "tenda da sole", "termostato", "climatizzatore",
-        "irrigazione", "allarme", "serratura", "cancello", "pulsante",
-        # Query state signals
-        "lo stato di", "lo stato del", "stato della", "quante luci",
-        "qual è la temperatura", "quant'è la", "quanto consuma",
-        "entity_id",
-    )
-    if any(b in msg for b in HA_BLOCKERS):
+    if "ha_blocker" in signals:
         return False
     # HA entity_id pattern (sensor.xxx, light.xxx, etc.)
     if re.search(r"\b(sensor|light|switch|climate|cover|binary_sensor|input_boolean|input_number|input_select|automation|script|camera|alarm_control_panel|media_player|device_tracker)\.", msg):
         return False
 
     # --- Conversational signals: these clearly mean "just chatting" ---
-    CONV_SIGNALS = (
-        # Identity / capabilities
-        "chi sei", "cosa sei", "cosa sai fare", "cosa puoi fare", "cosa sai",
-        "come ti chiami", "qual è il tuo nome", "presentati", "chi ti ha creato",
-        "who are you", "what are you", "what can you do", "your name", "who made you",
-        "qui es-tu", "que puedes hacer", "comment tu t'appelles",
-        # Wellbeing
-        "come stai", "come va", "come ti senti", "tutto bene",
-        "how are you", "how r u", "how's it going", "what's up",
-        "ça va", "comment tu vas", "cómo estás",
-        # Fun / creative
-        "barzelletta", "burletta", "scherzo", "indovinello",
-        "dimmi una storia", "dimmi una barzelletta", "raccontami una storia",
-        "raccontami qualcosa", "dimmi qualcosa di interessante",
-        "tell me a joke", "tell me a story",
-        "blague", "raconte-moi",
-        # Philosophical / opinion
-        "cosa pensi", "cosa ne pensi", "hai un'opinione", "secondo te",
-        "what do you think", "your opinion", "que penses-tu", "qué piensas",
-        # Praise / gratitude (standalone, not part of HA command)
-        "sei bravo", "sei ottimo", "sei fantastico", "sei utilissimo", "mi hai aiutato",
-        "you're great", "you're amazing", "you're helpful",
-        # Just being friendly
-        "parliamo di", "dimmi di", "parlami di qualcosa",
-    )
-    return any(s in msg for s in CONV_SIGNALS)
+    return "conversational" in signals
 
 
 _BASE_CHAT_PROMPT = INTENT_PROMPTS["chat"]
@@ -598,6 +772,7 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
     _is_skill_cmd = bool(re.match(r"^/[a-z][a-z0-9_-]+", msg))
     has_yaml_fence = "```yaml" in msg or "```yml" in msg
     has_html_fence = "```html" in msg
+    signals = _keyword_signals(msg)
 
     # --- LOVELACE YAML CARD (high-priority guard) ---
     # If the user pasted a Lovelace YAML card and is asking to improve/beautify that card,
@@ -614,30 +789,8 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
         not _has_file_context
         and bool(re.search(r"(?mi)^\s*type\s*:\s*", user_message))
     )
-    explicit_html_request = any(
-        k in msg for k in [
-            "/local/dashboards",
-            ".html",
-            "dashboard html",
-            "html dashboard",
-            "pagina html",
-            "crea una dashboard html",
-            "create html dashboard",
-        ]
-    )
-    card_edit_signals = any(
-        k in msg for k in [
-            "questa card",
-            "questa scheda",
-            "abbellisci",
-            "migliora questa card",
-            "migliora la card",
-            "sistema questa card",
-            "fix this card",
-            "improve this card",
-            "beautify this card",
-        ]
-    )
+    explicit_html_request = "explicit_html" in signals
+    card_edit_signals = "card_edit" in signals
     if (has_yaml_fence or has_lovelace_yaml) and (card_edit_signals or not explicit_html_request):
         logger.info("Lovelace YAML detected (high-priority) — routing to card_editor intent")
         return {
@@ -662,9 +815,7 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
     # Short confirmation replies ("si", "sì", "yes", "ok") should carry forward the previous intent
     # so the model stays in the same focused mode (e.g. config_edit with confirmation prompt)
     # Build confirmation words from all languages in keywords.json
-    confirm_words = set()
-    for lang_data in api.KEYWORDS.values():
-        confirm_words.update(lang_data.get("confirm", []))
+    confirm_words = _matcher_state["confirm"]
     stripped = msg.strip().rstrip("!?.,;:")
     if previous_intent and previous_intent not in ("generic", "chat") and stripped in confirm_words:
         intent_key = previous_intent
@@ -685,23 +836,13 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
         if previous_intent == "system_debug":
             import re as _re_intent
             # Match messages that are just a number, or contain selection patterns
-            if _re_intent.match(r'^\\s*\\d+\\s*$', msg) or any(s in msg for s in [
-                "analizza", "vedi", "mostra", "dettaglio", "investig", "il primo", "il secondo",
-                "numero", "entry", "errore", "analyze", "show", "detail", "investigate",
-                "analyse", "montre", "détail", "analiza", "muestra", "detalle"
-            ]):
+            if _re_intent.match(r'^\\s*\\d+\\s*$', msg) or "debug_selection" in signals:
                 logger.info(f"Debug selection detected — carrying forward system_debug intent")
                 return {"intent": "system_debug", "tools": INTENT_TOOL_SETS["system_debug"],
                         "prompt": INTENT_PROMPTS.get("system_debug"), "specific_target": False}
 
         # Check if message looks like a follow-up (modify, use same, add, etc.)
-        follow_up_signals = ["modifica", "modificala", "modificalo", "cambia", "aggiungi",
-                             "inserisci", "togli", "rimuovi", "usa le stess", "stesse entit",
-                             "stessi sensor", "gli stessi", "le stesse", "modify it", "change it",
-                             "add", "remove", "use the same", "same entities", "same sensors",
-                             "modifie", "change", "ajoute", "utilise les même",
-                             "modifica", "cambia", "añade", "usa los mismos"]
-        if not _is_skill_cmd and any(s in msg for s in follow_up_signals):
+        if not _is_skill_cmd and "follow_up" in signals:
             logger.info(f"Follow-up detected — carrying forward intent: {previous_intent}")
             return {"intent": previous_intent, "tools": INTENT_TOOL_SETS[previous_intent],
                     "prompt": INTENT_PROMPTS.get(previous_intent), "specific_target": False}
@@ -713,33 +854,22 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
         return {"intent": "create_html_dashboard", "tools": INTENT_TOOL_SETS["create_html_dashboard"],
                 "prompt": INTENT_PROMPTS.get("create_html_dashboard"), "specific_target": True}
 
-    # Get keywords for current language, fallback to English if not available
-    lang_keywords = api.KEYWORDS.get(api.LANGUAGE, api.KEYWORDS.get("en", {}))
-
     # --- CHAT (greetings, chitchat) --- messages that don't need HA tools
-    chat_kw = lang_keywords.get("chat", [])
+    # Chat keywords come from keywords.json for the current language; very short
+    # ones (ok/hi/hey) only match as whole words (see _get_keyword_matcher).
     words = msg.strip().rstrip("!?.,").split()
 
-    def _contains_chat_kw(_msg: str, _kw: str) -> bool:
-        _kw = (_kw or "").strip().lower()
-        if not _kw:
-            return False
-        # For very short keywords (ok/hi/hey), require full word match
-        if len(_kw) <= 3:
-            return bool(re.search(rf"(?<![a-z0-9_]){re.escape(_kw)}(?![a-z0-9_])", _msg))
-        return _kw in _msg
-
     def _route_chat():
         return {"intent": "chat", "tools": INTENT_TOOL_SETS["chat"],
                 "prompt": INTENT_PROMPTS["chat"], "specific_target": False, "max_rounds": 1}
 
     if not _is_skill_cmd:
         # 1. Extended conversational heuristics (pattern-based, any length)
-        if _is_conversational(msg):
+        if _is_conversational(msg, signals):
             logger.info("Conversational message detected — routing to chat intent (no tools)")
             return _route_chat()
         # 2. Legacy: short greeting/keyword messages (≤ 8 words, chat keywords from keywords.json)
-        if len(words) <= 8 and any(_contains_chat_kw(msg, k) for k in chat_kw):
+        if len(words) <= 8 and "chat" in signals:
             logger.info("Chat keyword detected — routing to chat intent (no tools)")
             return _route_chat()
 
@@ -749,20 +879,9 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
     # --- HTML DASHBOARD CREATION/MODIFICATION (kept for specialized prompt) ---
     # The create_html_dashboard prompt is very specific (~100 lines of CSS/JS/Vue guidance)
     # so we keep keyword detection for it rather than relying on the LLM alone.
-    html_keywords = ["html", "vue", "javascript", "js", "react", "svelte",
-                     "interattiv", "realtime", "responsive", "custom css",
-                     "custom design", "pannello web", "pagina web", "pagina live",
-                     "pannello live", "plancia", "bento"]
-    dash_kw = lang_keywords.get("dashboard", [])
-    def _kw_in_msg(_msg: str, _kw: str) -> bool:
-        # Avoid false positives for short tokens like "js" inside other words.
-        if len(_kw) <= 3:
-            return bool(re.search(rf"(?<![a-z0-9_]){re.escape(_kw)}(?![a-z0-9_])", _msg))
-        return _kw in _msg
-
-    has_html_kw = any(_kw_in_msg(msg, k) for k in html_keywords)
-    has_dash = any(k in msg for k in dash_kw)
-    has_html_ref = any(k in msg for k in ["/local/dashboards", ".html"])
+    has_html_kw = "html" in signals
+    has_dash = "dashboard" in signals
+    has_html_ref = "html_ref" in signals
     if not has_html_ref and smart_context:
         has_html_ref = "/local/dashboards" in smart_context or ".html" in smart_context
     if not has_html_ref:
@@ -788,14 +907,9 @@ def detect_intent(user_message: str, smart_context: str, previous_intent: str |
                 "prompt": INTENT_PROMPTS.get("create_html_dashboard"), "specific_target": False}
 
     # --- STATISTICS MANAGEMENT (kept for specialized one-call-per-turn prompt) ---
-    statistics_manage_kw = lang_keywords.get("statistics_manage", [])
-    has_stats_word = any(k in msg for k in ["statistich", "statistic", "estadístic", "statistique"])
-    delete_kw = lang_keywords.get("delete", [])
-    modify_kw = lang_keywords.get("modify", [])
-    has_manage_signal = any(k in msg for k in delete_kw + modify_kw) or any(
-        k in msg for k in ["non esist", "orfan", "orphan", "obsolet", "puliz", "clean", "purge",
-                           "correggi", "fix", "converti", "convert", "valuta", "unità", "unit"])
-    if any(k in msg for k in statistics_manage_kw) or (has_stats_word and has_manage_signal):
+    has_stats_word = "stats_word" in signals
+    has_manage_signal = "manage" in signals
+    if "statistics_manage" in signals or (has_stats_word and has_manage_signal):
         return {"intent": "manage_statistics", "tools": INTENT_TOOL_SETS["manage_statistics"],
                 "prompt": INTENT_PROMPTS["manage_statistics"], "specific_target": False}
 
@@ -949,31 +1063,15 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
             _msg_stripped = _msg_stripped[_ctx_end + 1:]
     _msg_stripped = _msg_stripped.strip()
     msg_lower = _msg_stripped.lower()
+    signals = _keyword_signals(msg_lower)
 
     try:
         # --- AUTOMATION CONTEXT ---
-        auto_keywords = [
-            "automazione", "automation", "automazion", "automatización", "automatizacion",
-            "automatisation", "trigger", "condizione", "condition", "condición", "condition",
-        ]
-        create_auto_keywords = [
-            "nuova automazione", "nuove automazioni", "new automation", "new automations",
-            "crea automazione", "creare automazione", "create automation", "add automation",
-            "aggiungi automazione", "altra automazione", "un'altra automazione", "un altra automazione",
-            "nueva automatización", "nuevas automatizaciones", "crear automatización", "añadir automatización",
-            "nouvelle automatisation", "nouvelles automatisations", "créer automatisation", "ajouter automatisation",
-        ]
-        modify_auto_keywords = [
-            "modifica automazione", "modifica questa automazione", "modify automation",
-            "update automation", "aggiorna automazione", "cambia automazione", "questa automazione",
-            "modificar automatización", "actualizar automatización", "esta automatización",
-            "modifier automatisation", "mettre à jour automatisation", "cette automatisation",
-        ]
         force_automation_context = intent == "modify_automation"
-        wants_new_automation = any(k in msg_lower for k in create_auto_keywords)
-        wants_modify_automation = any(k in msg_lower for k in modify_auto_keywords)
+        wants_new_automation = "create_automation" in signals
+        wants_modify_automation = "modify_automation" in signals
         prefer_creation_context = wants_new_automation and not wants_modify_automation and not force_automation_context
-        if force_automation_context or any(k in msg_lower for k in auto_keywords):
+        if force_automation_context or "automation" in signals:
             import yaml
             # Get automation list
             states = api.get_all_states()
@@ -1113,8 +1211,7 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
                     )
 
         # --- SCRIPT CONTEXT ---
-        script_keywords = ["script", "scena", "scenari", "routine", "sequenza"]
-        if any(k in msg_lower for k in script_keywords):
+        if "script" in signals:
             import yaml
             states = api.get_all_states()
             script_entities = [{"entity_id": s.get("entity_id"),
@@ -1156,8 +1253,7 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
                     pass
 
         # --- DASHBOARD CONTEXT ---
-        dash_keywords = ["dashboard", "lovelace", "scheda", "card", "pannello"]
-        if any(k in msg_lower for k in dash_keywords):
+        if "dashboard_context" in signals:
             try:
                 dashboards = api.call_ha_websocket("lovelace/dashboards/list")
                 dash_list = dashboards.get("result", [])
@@ -1203,42 +1299,6 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
                 pass
 
         # --- ENTITY/DEVICE CONTEXT ---
-        entity_keywords = [
-            # light — IT/EN/ES/FR
-            "luce", "luci", "light", "lights", "lampe", "lampes", "lumiere", "luz", "luces",
-            # sensor — IT/EN/ES/FR
-            "temperatura", "temperature", "sensore", "sensor", "capteur", "sensor",
-            "humedad", "humidite", "humidity",
-            # climate — IT/EN/ES/FR
-            "clima", "climate", "termostato", "thermostat", "riscaldamento", "heating",
-            "calefaccion", "chauffage", "climatisation", "raffreddamento", "cooling",
-            # switch — IT/EN/ES/FR
-            "switch", "interruttore", "interrupteur", "interruptor",
-            # media player
-            "media_player",
-            # cover (blinds/shutters/gates) — IT/EN/ES/FR
-            "tapparella", "tapparelle", "persiana", "tenda",
-            "blind", "curtain", "shutter", "cover",
-            "volet", "rideau", "store",
-            "persiana", "estor", "toldo",
-            "cancello", "gate", "garage",
-            # lock — IT/EN/ES/FR
-            "serratura", "lock", "cerradura", "serrure",
-            # camera — IT/EN/ES/FR
-            "telecamera", "camera", "videocamera",
-            "camara", "surveillance",
-            # alarm — IT/EN/ES/FR
-            "allarme", "alarm", "sirena", "siren",
-            "alarma", "alarme",
-            # fan — IT/EN/ES/FR
-            "ventilatore", "fan", "ventilador", "ventilateur",
-            # vacuum — IT/EN/ES/FR
-            "aspirapolvere", "aspiratore", "vacuum", "robot",
-            "aspiradora", "aspirateur",
-            # irrigation/pump — IT/EN/ES/FR
-            "irrigazione", "irrigation", "pompa", "pump",
-            "riego", "pompe",
-        ]
         matched_domains = []
         domain_map = {
             # light
@@ -1444,23 +1504,23 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
             except Exception as _fe:
                 logger.warning(f"Smart context: file entity extraction failed: {_fe}")
 
-        if _msg_words and (intent == "create_html_dashboard" or any(k in msg_lower for k in entity_keywords)):
+        if _msg_words and (intent == "create_html_dashboard" or "entity" in signals):
             try:
+                from services.registry_service import get_registry_graph
                 all_states = api.get_all_states()
                 for keyword in _msg_words:
                     _device_classes = _device_class_aliases.get(keyword, [])
                     if _device_classes:
                         # ---- DEVICE CLASS MODE ----
                         # Keyword maps to a known device_class → filter ONLY by
-                        # the real HA attribute.  Zero false positives.
+                        # the real HA attribute (device_class index).  Zero false positives.
                         matched = [
                             {"entity_id": s.get("entity_id"),
                              "state": s.get("state"),
                              "friendly_name": s.get("attributes", {}).get("friendly_name", ""),
                              "unit": s.get("attributes", {}).get("unit_of_measurement", ""),
                              "device_class": s.get("attributes", {}).get("device_class", "")}
-                            for s in all_states
-                            if s.get("attributes", {}).get("device_class", "") in _device_classes
+                            for s in get_registry_graph().states_by_device_class(_device_classes)
                         ]
                         if matched:
                             _integration_matches.extend(matched)
@@ -1501,38 +1561,19 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
         # This prevents the AI from hallucinating entity IDs when no matches are found.
         # Previously this only ran for create_html_dashboard — now it runs for ALL intents
         # that trigger entity search (any intent with entity_keywords or _msg_words).
-        if _msg_words and (intent == "create_html_dashboard" or any(k in msg_lower for k in entity_keywords)):
+        if _msg_words and (intent == "create_html_dashboard" or "entity" in signals):
             try:
-                reg_result = api.call_ha_websocket("config/entity_registry/list")
-                registry = reg_result.get("result", []) if isinstance(reg_result, dict) else []
-                if registry:
-                    all_states_reg = api.get_all_states()
-                    state_map_reg = {s.get("entity_id"): s for s in all_states_reg}
-
-                    # Also resolve config_entry titles for broader matching
-                    # (e.g. user says "epcube" → config_entry title "EPCube" → match by entry_id)
-                    _matched_entry_ids: set = set()
-                    try:
-                        cfg_result = api.call_ha_websocket("config_entries/get_entries")
-                        cfg_entries = cfg_result.get("result", []) if isinstance(cfg_result, dict) else []
-                        for ce in cfg_entries:
-                            ce_domain = (ce.get("domain") or "").lower()
-                            ce_title = (ce.get("title") or "").lower()
-                            for keyword in _msg_words:
-                                if keyword in ce_domain or keyword in ce_title:
-                                    _matched_entry_ids.add(ce.get("entry_id", ""))
-                    except Exception:
-                        pass  # optional — platform match is enough
-
+                from services.registry_service import get_registry_graph
+                _graph = get_registry_graph()
+                if _graph.entities():
+                    # _graph.state() serves the snapshot fetched by the keyword search above
+                    # Platform name or config_entry domain/title match
+                    # (e.g. user says "epcube" → config_entry title "EPCube")
                     for keyword in _msg_words:
-                        reg_matches = [
-                            r for r in registry
-                            if keyword in (r.get("platform") or "").lower()
-                            or (_matched_entry_ids and r.get("config_entry_id") in _matched_entry_ids)
-                        ]
+                        reg_matches = _graph.integration_entities([keyword])
                         for r in reg_matches:
                             eid = r.get("entity_id", "")
-                            state = state_map_reg.get(eid, {})
+                            state = _graph.state(eid) or {}
                             _integration_matches.append({
                                 "entity_id": eid,
                                 "state": state.get("state", "unavailable"),
@@ -1588,7 +1629,7 @@ def build_smart_context(user_message: str, intent: str = None, max_chars: int =
             # Collect location words from the message (words not in entity_keywords or domain_map)
             _location_words = [
                 w for w in _msg_words
-                if w not in domain_map and w not in entity_keywords
+                if w not in domain_map and w not in _ENTITY_KEYWORDS
                 and w not in {"luce", "luci", "light", "lights"}
                 and len(w) >= 4
             ]
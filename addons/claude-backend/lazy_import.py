@@ -0,0 +1,165 @@
+"""Lazy module proxies and startup stage timing.
+
+Cold start used to import every subsystem (tools, UI, memory, RAG, MCP,
+messaging bots, ...) and probe every provider before the port was bound.
+This module provides the two pieces of the staged startup:
+
+    from lazy_import import LazyModule, module_available, startup_timer
+
+    memory = LazyModule("memory")            # imported on first attribute access
+    MEMORY_AVAILABLE = module_available("memory")   # find_spec, no import
+
+    with startup_timer.stage("conversations"):
+        load_conversations()
+
+- ``LazyModule`` forwards attribute access (get/set) to the real module,
+  importing it the first time; ``import x`` elsewhere still returns the real
+  module from ``sys.modules``.
+- ``module_available`` answers "is it installed?" via
+  ``importlib.util.find_spec`` without executing the module.  Optional
+  modules in this add-on guard their own third-party imports, so a found
+  spec is a reliable availability signal.
+- ``startup_timer`` records the duration of every startup stage, background
+  stage and on-demand import; ``report()`` backs ``/api/debug/startup``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reference point for "time since start": this module is imported first by server.py
+PROCESS_T0 = time.time()
+
+
+def module_available(name: str) -> bool:
+    """True if *name* can be imported (checked with find_spec, nothing is executed)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Dotted name whose parent package is missing, or a broken __spec__
+        return False
+
+
+class StartupTimer:
+    """Per-stage wall-clock timings for the startup report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: List[Dict[str, Any]] = []
+        self._ready_at: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str, background: bool = False) -> Iterator[None]:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - t0, kind="background" if background else "startup",
+                        error=error)
+
+    def record(self, name: str, seconds: float, kind: str = "startup", error: Optional[str] = None) -> None:
+        entry = {"stage": name, "kind": kind, "ms": round(seconds * 1000, 1),
+                 "at_s": round(time.time() - PROCESS_T0, 2)}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._stages.append(entry)
+        if seconds > 1.0:
+            logger.info(f"Startup: {name} took {seconds:.1f}s ({kind})")
+
+    def mark_ready(self) -> None:
+        """The HTTP port is about to be bound."""
+        with self._lock:
+            self._ready_at = time.time()
+
+    def summary(self) -> str:
+        """One log line: total time to ready plus the slowest startup stages."""
+        with self._lock:
+            stages = [s for s in self._stages if s["kind"] == "startup"]
+            ready = self._ready_at
+        top = sorted(stages, key=lambda s: -s["ms"])[:6]
+        parts = ", ".join(f"{s['stage']} {s['ms'] / 1000:.2f}s" for s in top)
+        total = f"{ready - PROCESS_T0:.1f}s" if ready else "n/a"
+        return f"ready in {total} ({parts})"
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = list(self._stages)
+            ready = self._ready_at
+        totals: Dict[str, float] = {}
+        for s in stages:
+            totals[s["kind"]] = round(totals.get(s["kind"], 0.0) + s["ms"], 1)
+        return {
+            "ready_s": round(ready - PROCESS_T0, 2) if ready else None,
+            "uptime_s": round(time.time() - PROCESS_T0, 1),
+            "totals_ms": totals,
+            "stages": stages,
+        }
+
+
+startup_timer = StartupTimer()
+_import_lock = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports *name* on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    t0 = time.perf_counter()
+                    try:
+                        module = importlib.import_module(self.__name__)
+                    finally:
+                        startup_timer.record(f"import {self.__name__}", time.perf_counter() - t0,
+                                             kind="on_demand")
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def lazy_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__") and attr.endswith("__") and attr not in ("__file__", "__path__", "__version__"):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.lazy_loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def preload(*modules: LazyModule) -> None:
+    """Import lazy modules now (used by the background warm-up stage)."""
+    for m in modules:
+        try:
+            m._load()
+        except Exception as e:
+            logger.warning(f"Preloading {m.__name__} failed: {e}")
@@ -6,16 +6,24 @@ Auto-discovers tools from MCP servers and registers them with the agent.
 Reference: https://modelcontextprotocol.io/
 """
 
+import hashlib
 import json
 import logging
+import re
 import subprocess
 import sys
 import threading
 import time
-import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Callable
 from pathlib import Path
 
+from mcp_transport import (
+    MCPTransport, SSETransport, StdioTransport, StreamableHTTPTransport,
+    TransportClosed, TransportError, TransportStats, TransportTimeout,
+)
+
 logger = logging.getLogger(__name__)
 
 # ── Official MCP SDK (pip install mcp) ────────────────────────────────────────
@@ -33,13 +41,12 @@ class _OfficialMCPStdioClient:
     """
     Wrapper sync-over-async per il pacchetto ufficiale `mcp` (pip install mcp).
 
-    Mantiene la connessione al processo STDIO aperta in un loop asyncio
-    dedicato (thread daemon), espone un'interfaccia completamente sincrona
+    Mantiene la connessione al processo STDIO aperta sul loop asyncio
+    condiviso (async_runtime), espone un'interfaccia completamente sincrona
     compatibile con il resto del codice Flask.
     """
 
     def __init__(self, command: str, args: list, env: Optional[dict] = None):
-        import asyncio
         import os as _os
         self._cmd = command
         self._args = args or []
@@ -47,27 +54,17 @@ class _OfficialMCPStdioClient:
         self._tools: List[Dict] = []
         self._session = None
         self._exit_stack = None
-        # Loop asyncio dedicato in thread daemon
-        self._loop = asyncio.new_event_loop()
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
-
-    def _run_loop(self) -> None:
-        import asyncio
-        asyncio.set_event_loop(self._loop)
-        self._loop.run_forever()
-
-    def _submit(self, coro, timeout: float = 30.0):
-        """Esegue una coroutine nel loop background, bloccando fino al risultato."""
-        import concurrent.futures
-        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
-        return fut.result(timeout=timeout)
+
+    def _submit(self, coro, timeout: float = 30.0, name: str = "mcp"):
+        """Esegue una coroutine nel loop condiviso, bloccando fino al risultato."""
+        from async_runtime import get_runtime
+        return get_runtime().run(coro, timeout=timeout, name=name)
 
     # ── Public sync interface ────────────────────────────────────────────────
 
     def connect(self) -> bool:
         """Connette al server MCP via stdio e scopre i tool."""
-        return self._submit(self._async_connect(), timeout=15.0)
+        return self._submit(self._async_connect(), timeout=15.0, name="mcp.connect")
 
     @property
     def discovered_tools(self) -> List[Dict]:
@@ -75,18 +72,16 @@ class _OfficialMCPStdioClient:
 
     def call_tool(self, name: str, arguments: Dict) -> str:
         """Chiama un tool, restituisce il risultato come stringa."""
-        return self._submit(self._async_call_tool(name, arguments), timeout=30.0)
+        return self._submit(self._async_call_tool(name, arguments), timeout=30.0, name="mcp.call_tool")
 
     def disconnect(self) -> None:
         if self._exit_stack:
             try:
-                self._submit(self._exit_stack.aclose(), timeout=5.0)
+                self._submit(self._exit_stack.aclose(), timeout=5.0, name="mcp.disconnect")
             except Exception:
                 pass
-        try:
-            self._loop.call_soon_threadsafe(self._loop.stop)
-        except Exception:
-            pass
+            self._exit_stack = None
+            self._session = None
 
     # ── Async internals ──────────────────────────────────────────────────────
 
@@ -242,6 +237,92 @@ class MCPSchemaValidator:
             return True, None  # Don't fail on validation errors, just warn
 
 
+class MCPResultCache:
+    """TTL + LRU cache of tool results for one server.
+
+    Opt-in per server via ``"cache": {"ttl": 60, "tools": ["search", "fetch"]}``
+    in the MCP config. Without an explicit ``tools`` list only tools whose name
+    looks read-only (get/list/search/fetch/read/query/find) are cached.
+    """
+
+    _READ_ONLY_NAME_RE = re.compile(r"^(get|list|search|fetch|read|query|find|lookup|describe)(_|$)|_(get|list|search|fetch|read)$")
+
+    def __init__(self, ttl: float = 60.0, tools: Optional[List[str]] = None, max_entries: int = 256):
+        self.ttl = float(ttl)
+        self.tools = set(tools) if tools else None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, cfg: Any) -> Optional["MCPResultCache"]:
+        """Build a cache from the server's ``cache`` config entry (None = disabled)."""
+        if not cfg:
+            return None
+        if cfg is True:
+            cfg = {}
+        if not isinstance(cfg, dict) or cfg.get("enabled", True) is False:
+            return None
+        return cls(
+            ttl=cfg.get("ttl", 60),
+            tools=cfg.get("tools"),
+            max_entries=int(cfg.get("max_entries", 256)),
+        )
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        if self.tools is not None:
+            return tool_name in self.tools
+        return self.looks_read_only(tool_name)
+
+    @classmethod
+    def looks_read_only(cls, tool_name: str) -> bool:
+        return bool(cls._READ_ONLY_NAME_RE.search(tool_name.lower()))
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict) -> str:
+        raw = json.dumps(arguments or {}, sort_keys=True, default=str, ensure_ascii=False)
+        return f"{tool_name}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, tool_name: str, arguments: Dict) -> Optional[str]:
+        key = self.make_key(tool_name, arguments)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, tool_name: str, arguments: Dict, result: str) -> None:
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
 class MCPServer:
     """Represents a single MCP server connection."""
     
@@ -261,14 +342,23 @@ class MCPServer:
         self.name = name
         self.transport_type = transport_type
         self.config = config
-        self.process = None
         self.session_id = None
         self.tools: Dict[str, Dict] = {}  # tool_name -> {description, inputSchema}
         self.resources: Dict[str, Dict] = {}  # resource_uri -> metadata
         self._connected = False
-        self._call_lock = threading.Lock()  # serialise concurrent tool calls per server
         self._official_client: Optional[_OfficialMCPStdioClient] = None  # official SDK
+        # Persistent JSON-RPC session (built-in stdio, Streamable HTTP or HTTP+SSE)
+        self._transport: Optional[MCPTransport] = None
+        self.latency = TransportStats()  # per-server latency, survives reconnects
+        self.result_cache: Optional[MCPResultCache] = MCPResultCache.from_config(config.get("cache"))
+        # Set by MCPManager: called with the server name when the tool list changes
+        self.on_tools_changed: Optional[Callable[[str], None]] = None
         
+    @property
+    def process(self):
+        """Current stdio subprocess (follows transport reconnects), or None."""
+        return getattr(self._transport, "process", None)
+
     def connect(self) -> bool:
         """Connect to MCP server.
         
@@ -323,115 +413,124 @@ class MCPServer:
                 self._official_client = None
 
         # ── Fallback: built-in subprocess transport ───────────────────────────
-        try:
-            full_cmd = [cmd] + args
-            logger.debug(f"MCP {self.name}: Starting stdio process: {full_cmd}")
+        full_cmd = [cmd] + args
+
+        def _spawn():
             import os as _os
-            self.process = subprocess.Popen(
+            logger.debug(f"MCP {self.name}: Starting stdio process: {full_cmd}")
+            return subprocess.Popen(
                 full_cmd,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
+                bufsize=1,
                 env={**dict(_os.environ), **env},
             )
-            self._connected = True
-            logger.info(
-                f"MCP {self.name}: Connected via built-in transport (PID: {self.process.pid})"
-            )
-            return self._discover_tools_stdio()
+
+        transport = StdioTransport(self.name, _spawn, stats=self.latency)
+        try:
+            transport.open()
         except Exception as e:
-            logger.error(f"MCP {self.name}: Stdio connection error: {e}")
+            err_out = transport.stderr_tail()
+            if err_out:
+                logger.warning(f"MCP {self.name}: process stderr: {err_out}")
+            logger.warning(f"MCP {self.name}: Initialize failed: {e}")
+            transport.close()
             return False
-    
-    def _connect_http(self) -> bool:
-        """Connect via HTTP (remote MCP server, JSON-RPC over HTTP)."""
-        try:
-            url = self.config.get("url")
-            headers = self.config.get("headers", {})
 
-            if not url:
-                logger.error(f"MCP {self.name}: Missing 'url' in HTTP config")
-                return False
+        logger.info(
+            f"MCP {self.name}: Connected via built-in transport (PID: {transport.process.pid})"
+        )
+        return self._attach_transport(transport)
 
-            self._connected = True
-            logger.info(f"MCP {self.name}: Connected via HTTP ({url})")
+    def _connect_http(self) -> bool:
+        """Connect via HTTP (remote MCP server, JSON-RPC over HTTP).
 
-            # Discover tools
-            return self._discover_tools_http()
-        except Exception as e:
-            logger.error(f"MCP {self.name}: HTTP connection error: {e}")
+        Tries in order:
+          1. Streamable HTTP (POST, MCP 2025-03-26)
+          2. HTTP+SSE (GET /sse → endpoint event → POST, MCP 2024-11-05)
+        """
+        url = self.config.get("url")
+        if not url:
+            logger.error(f"MCP {self.name}: Missing 'url' in HTTP config")
             return False
-    
-    def _discover_tools_stdio(self) -> bool:
-        """Discover available tools from stdio server."""
+
+        for transport_cls in (StreamableHTTPTransport, SSETransport):
+            transport = transport_cls(self.name, url, self._http_headers, stats=self.latency)
+            try:
+                transport.open()
+            except Exception as e:
+                logger.debug(f"MCP {self.name}: {transport.mode} transport failed: {e}")
+                transport.close()
+                continue
+            if self._attach_transport(transport):
+                logger.info(f"MCP {self.name}: Connected via HTTP ({url}, {transport.mode})")
+                return True
+
+        logger.warning(f"MCP {self.name}: All HTTP transport attempts failed")
+        return False
+
+    def _attach_transport(self, transport: MCPTransport) -> bool:
+        """Discover tools over an opened transport and keep it for later calls."""
         try:
-            # Send initialize request
-            init_msg = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {"protocolVersion": "2024-11-05"}
-            }
-            
-            response = self._send_request_stdio(init_msg)
-            if not response:
-                # Log stderr so we can see what the process printed
-                try:
-                    import select as _sel
-                    if self.process and _sel.select([self.process.stderr], [], [], 0.5)[0]:
-                        err_out = self.process.stderr.read(2000)
-                        if err_out:
-                            logger.warning(f"MCP {self.name}: process stderr: {err_out.strip()}")
-                except Exception:
-                    pass
-                logger.warning(f"MCP {self.name}: Initialize failed")
-                return False
+            response = transport.request("tools/list", timeout=10.0)
+        except TransportError as e:
+            logger.warning(f"MCP {self.name}: tools/list failed: {e}")
+            transport.close()
+            return False
+        if "result" not in response:
+            logger.warning(f"MCP {self.name}: tools/list failed, response={response}")
+            transport.close()
+            return False
 
-            # MCP protocol: send 'initialized' notification before any further requests
-            initialized_notif = {
-                "jsonrpc": "2.0",
-                "method": "notifications/initialized",
-                "params": {}
-            }
-            self._send_notification_stdio(initialized_notif)
-
-            # Send list_tools request
-            tools_msg = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/list",
-                "params": {}
-            }
+        self.tools = self._parse_tools(response["result"])
+        transport.on_notification = self._handle_notification
+        self._transport = transport
+        self.config["_transport_mode"] = transport.mode
+        self._connected = True
+        logger.info(f"MCP {self.name}: Discovered {len(self.tools)} tools via {transport.mode}")
+        return True
 
-            response = self._send_request_stdio(tools_msg)
-            if response and "result" in response:
-                tools_list = response["result"].get("tools", [])
-                for tool in tools_list:
-                    self.tools[tool["name"]] = {
-                        "description": tool.get("description", ""),
-                        "inputSchema": tool.get("inputSchema", {})
-                    }
+    @staticmethod
+    def _parse_tools(result: Dict) -> Dict[str, Dict]:
+        return {
+            tool["name"]: {
+                "description": tool.get("description", ""),
+                "inputSchema": tool.get("inputSchema", {}),
+            }
+            for tool in (result or {}).get("tools", [])
+        }
 
-                logger.info(f"MCP {self.name}: Discovered {len(self.tools)} tools")
-                return True
+    def _handle_notification(self, message: Dict) -> None:
+        """Server-initiated notifications (called from the transport reader thread)."""
+        if message.get("method") == "notifications/tools/list_changed":
+            # Re-list off the reader thread: the response arrives on that same thread
+            threading.Thread(target=self.refresh_tools, name=f"mcp-relist-{self.name}", daemon=True).start()
 
-            # Log stderr and full response to help diagnose failures
-            try:
-                import select as _sel
-                if self.process and _sel.select([self.process.stderr], [], [], 0.3)[0]:
-                    err_out = self.process.stderr.read(2000)
-                    if err_out:
-                        logger.warning(f"MCP {self.name}: process stderr: {err_out.strip()}")
-            except Exception:
-                pass
-            logger.warning(f"MCP {self.name}: tools/list failed, response={response}")
+    def refresh_tools(self) -> bool:
+        """Re-fetch tools/list and notify the manager if the catalog changed."""
+        if not self._transport:
             return False
-        except Exception as e:
-            logger.error(f"MCP {self.name}: Tool discovery failed: {e}")
+        try:
+            response = self._transport.request("tools/list", timeout=10.0)
+        except TransportError as e:
+            logger.warning(f"MCP {self.name}: tools/list refresh failed: {e}")
             return False
-    
-    def _http_headers(self, session_id: str = "") -> Dict:
+        if "result" not in response:
+            return False
+        tools = self._parse_tools(response["result"])
+        if tools == self.tools:
+            return True
+        self.tools = tools
+        if self.result_cache:
+            self.result_cache.clear()
+        logger.info(f"MCP {self.name}: tool list changed ({len(tools)} tools)")
+        if self.on_tools_changed:
+            self.on_tools_changed(self.name)
+        return True
+
+    def _http_headers(self) -> Dict:
         """Build HTTP headers for MCP requests, injecting OAuth token if available."""
         hdrs = {
             "Content-Type": "application/json",
@@ -446,207 +545,13 @@ class MCPServer:
                 hdrs.update(oauth_hdrs)
             except Exception:
                 pass
-        if session_id:
-            hdrs["Mcp-Session-Id"] = session_id
         return hdrs
 
-    @staticmethod
-    def _parse_sse_jsonrpc(text: str) -> Optional[Dict]:
-        """Extract the first JSON-RPC result from an SSE response body."""
-        for line in text.splitlines():
-            if line.startswith("data:"):
-                payload = line[5:].strip()
-                if payload and payload != "[DONE]":
-                    try:
-                        return json.loads(payload)
-                    except Exception:
-                        pass
-        return None
-
-    def _discover_tools_http(self) -> bool:
-        """Discover available tools via MCP HTTP transport.
-
-        Tries in order:
-          1. Streamable HTTP (POST, MCP 2025-03-26)
-          2. HTTP+SSE (GET /sse → endpoint event → POST, MCP 2024-11-05)
-        """
-        url = self.config.get("url").rstrip("/")
-
-        # ── 1. Try Streamable HTTP (POST to base URL) ────────────────────────
-        try:
-            init_payload = {
-                "jsonrpc": "2.0", "id": 1, "method": "initialize",
-                "params": {
-                    "protocolVersion": "2025-03-26",
-                    "capabilities": {},
-                    "clientInfo": {"name": "amira", "version": "1.0"},
-                },
-            }
-            init_resp = requests.post(url, json=init_payload, headers=self._http_headers(), timeout=8)
-            session_id = init_resp.headers.get("Mcp-Session-Id", "")
-            logger.info(f"MCP {self.name}: Streamable init → HTTP {init_resp.status_code}, session={session_id!r}")
-
-            if init_resp.status_code == 200:
-                requests.post(url, json={"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}},
-                              headers=self._http_headers(session_id), timeout=5)
-                tools_resp = requests.post(url, json={"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
-                                           headers=self._http_headers(session_id), timeout=10)
-                if tools_resp.status_code == 200:
-                    ct = tools_resp.headers.get("Content-Type", "")
-                    data = self._parse_sse_jsonrpc(tools_resp.text) if "text/event-stream" in ct else tools_resp.json()
-                    if data:
-                        for tool in data.get("result", {}).get("tools", []):
-                            self.tools[tool["name"]] = {"description": tool.get("description", ""), "inputSchema": tool.get("inputSchema", {})}
-                        if session_id:
-                            self.config["_session_id"] = session_id
-                        logger.info(f"MCP {self.name}: Discovered {len(self.tools)} tools via Streamable HTTP")
-                        return True
-        except Exception as e:
-            logger.debug(f"MCP {self.name}: Streamable HTTP failed: {e}")
-
-        # ── 2. Try HTTP+SSE transport ─────────────────────────────────────────
-        # Single reader thread handles the entire SSE stream:
-        #   - first data event → endpoint URL (sent to endpoint_q)
-        #   - subsequent data events → JSON-RPC responses (sent to response_q)
-        import threading as _threading
-        import queue as _q
-        from urllib.parse import urlparse as _urlparse
-        parsed = _urlparse(url)
-        base = f"{parsed.scheme}://{parsed.netloc}"
-
-        for sse_path in [url, url + "/sse", base + "/sse"]:
-            try:
-                sse_hdrs = {**self._http_headers(), "Accept": "text/event-stream"}
-                sse_conn = requests.get(sse_path, headers=sse_hdrs, timeout=10, stream=True)
-                if "text/event-stream" not in sse_conn.headers.get("Content-Type", ""):
-                    sse_conn.close()
-                    continue
-
-                endpoint_q: _q.Queue = _q.Queue()
-                response_q: _q.Queue = _q.Queue()
-
-                def _sse_reader(conn, eq, rq):
-                    endpoint_found = False
-                    try:
-                        for raw in conn.iter_lines(decode_unicode=True):
-                            line = (raw or "").strip()
-                            if not line.startswith("data:"):
-                                continue
-                            val = line[5:].strip()
-                            if not val or val == "[DONE]":
-                                continue
-                            if not endpoint_found:
-                                # First data event is always the endpoint URL
-                                eq.put(val)
-                                endpoint_found = True
-                            else:
-                                try:
-                                    rq.put(json.loads(val))
-                                except Exception:
-                                    pass
-                    except Exception:
-                        pass
-
-                reader = _threading.Thread(target=_sse_reader, args=(sse_conn, endpoint_q, response_q), daemon=True)
-                reader.start()
-
-                # Wait for endpoint URL from reader thread
-                try:
-                    endpoint_val = endpoint_q.get(timeout=8)
-                except _q.Empty:
-                    sse_conn.close()
-                    continue
-
-                if endpoint_val.startswith("http"):
-                    messages_url = endpoint_val
-                elif endpoint_val.startswith("/"):
-                    messages_url = base + endpoint_val
-                else:
-                    sse_conn.close()
-                    continue
-
-                logger.info(f"MCP {self.name}: SSE transport, messages endpoint: {messages_url}")
-                self.config["_messages_url"] = messages_url
-                self.config["_transport_mode"] = "sse"
-
-                def _post(payload, timeout=10):
-                    return requests.post(messages_url, json=payload, headers=self._http_headers(), timeout=timeout)
-
-                def _wait(req_id, timeout=10):
-                    import time as _t
-                    deadline = _t.time() + timeout
-                    while _t.time() < deadline:
-                        try:
-                            msg = response_q.get(timeout=0.3)
-                            if isinstance(msg, dict) and msg.get("id") == req_id:
-                                return msg
-                            response_q.put(msg)
-                        except _q.Empty:
-                            pass
-                    return None
-
-                _post({"jsonrpc": "2.0", "id": 1, "method": "initialize",
-                       "params": {"protocolVersion": "2024-11-05", "capabilities": {},
-                                  "clientInfo": {"name": "amira", "version": "1.0"}}})
-                _wait(1, timeout=6)
-                _post({"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}})
-                _post({"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}})
-                data = _wait(2, timeout=10)
-
-                if data:
-                    for tool in data.get("result", {}).get("tools", []):
-                        self.tools[tool["name"]] = {
-                            "description": tool.get("description", ""),
-                            "inputSchema": tool.get("inputSchema", {}),
-                        }
-                    logger.info(f"MCP {self.name}: Discovered {len(self.tools)} tools via HTTP+SSE")
-                    self.config["_sse_conn"] = sse_conn
-                    self.config["_sse_queue"] = response_q
-                    return True
-
-                logger.warning(f"MCP {self.name}: SSE tools/list timeout (no response in 10s)")
-                sse_conn.close()
-
-            except Exception as e:
-                logger.debug(f"MCP {self.name}: SSE attempt {sse_path} failed: {e}")
-
-        logger.warning(f"MCP {self.name}: All HTTP transport attempts failed")
-        return False
-    
-    def _send_notification_stdio(self, notification: Dict) -> None:
-        """Send a fire-and-forget notification via stdio (no response expected)."""
-        try:
-            if not self.process:
-                return
-            self.process.stdin.write(json.dumps(notification) + "\n")
-            self.process.stdin.flush()
-        except Exception as e:
-            logger.debug(f"MCP {self.name}: notification send failed: {e}")
-
-    def _send_request_stdio(self, request: Dict) -> Optional[Dict]:
-        """Send request via stdio and get response."""
-        try:
-            if not self.process:
-                return None
-
-            # Send request
-            self.process.stdin.write(json.dumps(request) + "\n")
-            self.process.stdin.flush()
-            
-            # Read response (with timeout)
-            import select
-            if select.select([self.process.stdout], [], [], 5)[0]:
-                response_line = self.process.stdout.readline()
-                return json.loads(response_line)
-            else:
-                logger.warning(f"MCP {self.name}: stdio read timeout")
-                return None
-        except Exception as e:
-            logger.error(f"MCP {self.name}: stdio request failed: {e}")
-            return None
-    
     def call_tool(self, tool_name: str, arguments: Dict) -> str:
         """Call a tool on the MCP server.
+
+        Safe to call from several threads at once: the transport routes each
+        response back to its caller by JSON-RPC id.
         
         Args:
             tool_name: Name of tool to call
@@ -655,147 +560,50 @@ class MCPServer:
         Returns:
             Tool result as JSON string
         """
-        with self._call_lock:  # serialise: stdio process is not thread-safe
-            return self._call_tool_locked(tool_name, arguments)
-
-    def _call_tool_locked(self, tool_name: str, arguments: Dict) -> str:
-        """Internal call_tool implementation (must be called with _call_lock held)."""
         try:
             if tool_name not in self.tools:
                 return json.dumps({"error": f"Tool '{tool_name}' not found on {self.name}"})
-            
-            if self.transport_type == self.TRANSPORT_STDIO:
+
+            if self._official_client:
                 # Usa il client ufficiale se disponibile (più robusto)
-                if self._official_client:
-                    return self._official_client.call_tool(tool_name, arguments)
-                # Fallback: built-in JSON-RPC su subprocess
-                tool_msg = {
-                    "jsonrpc": "2.0",
-                    "id": 3,
-                    "method": "tools/call",
-                    "params": {"name": tool_name, "arguments": arguments},
-                }
-                response = self._send_request_stdio(tool_msg)
-                if response and "result" in response:
-                    return json.dumps(response["result"])
-                else:
-                    return json.dumps({"error": "Tool call failed"})
-            
-            elif self.transport_type == self.TRANSPORT_HTTP:
-                if self.config.get("_transport_mode") == "sse":
-                    return self._call_tool_http_sse(tool_name, arguments)
-
-                # Streamable HTTP
-                url = self.config.get("url", "").rstrip("/")
-                session_id = self.config.get("_session_id", "")
-                payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
-                           "params": {"name": tool_name, "arguments": arguments}}
-                resp = requests.post(url, json=payload, headers=self._http_headers(session_id), timeout=30)
-                if resp.status_code == 200:
-                    ct = resp.headers.get("Content-Type", "")
-                    data = self._parse_sse_jsonrpc(resp.text) if "text/event-stream" in ct else resp.json()
-                    if data:
-                        if "result" in data:
-                            return json.dumps(data["result"])
-                        elif "error" in data:
-                            return json.dumps({"error": data["error"].get("message", "Unknown error")})
-                return json.dumps({"error": f"HTTP {resp.status_code}"})
-            
-            else:
-                return json.dumps({"error": f"Unknown transport: {self.transport_type}"})
+                started = self.latency.begin()
+                try:
+                    result = self._official_client.call_tool(tool_name, arguments)
+                except Exception as e:
+                    self.latency.end(started, ok=False, error=str(e))
+                    raise
+                self.latency.end(started, ok=True)
+                return result
+
+            if not self._transport:
+                return json.dumps({"error": f"MCP server '{self.name}' is not connected"})
+
+            data = self._transport.request(
+                "tools/call", {"name": tool_name, "arguments": arguments}, timeout=30.0
+            )
+            if "result" in data:
+                return json.dumps(data["result"])
+            error = data.get("error") or {}
+            return json.dumps({"error": error.get("message", "Unknown error") if isinstance(error, dict) else str(error)})
+        except (TransportClosed, ConnectionError):
+            raise  # MCPManager retries calls that never reached the server
+        except TransportTimeout as e:
+            logger.error(f"MCP {self.name}: Tool call timeout: {e}")
+            return json.dumps({"error": f"Tool call timeout: {e}"})
         except Exception as e:
             logger.error(f"MCP {self.name}: Tool call error: {e}")
             return json.dumps({"error": str(e)})
-    
-    def _call_tool_http_sse(self, tool_name: str, arguments: Dict) -> str:
-        """Call a tool via HTTP+SSE transport (fresh connection per call)."""
-        import threading as _threading
-        import queue as _q
-        import time as _t
-        from urllib.parse import urlparse as _up
-
-        base_url = self.config.get("url", "").rstrip("/")
-        parsed = _up(base_url)
-        base = f"{parsed.scheme}://{parsed.netloc}"
-
-        for sse_path in [base_url, base_url + "/sse", base + "/sse"]:
-            try:
-                sse_hdrs = {**self._http_headers(), "Accept": "text/event-stream"}
-                sse_conn = requests.get(sse_path, headers=sse_hdrs, timeout=10, stream=True)
-                if "text/event-stream" not in sse_conn.headers.get("Content-Type", ""):
-                    sse_conn.close()
-                    continue
-
-                endpoint_q: _q.Queue = _q.Queue()
-                response_q: _q.Queue = _q.Queue()
-
-                def _reader(conn, eq, rq):
-                    found = False
-                    try:
-                        for raw in conn.iter_lines(decode_unicode=True):
-                            line = (raw or "").strip()
-                            if not line.startswith("data:"):
-                                continue
-                            val = line[5:].strip()
-                            if not val or val == "[DONE]":
-                                continue
-                            if not found:
-                                eq.put(val)
-                                found = True
-                            else:
-                                try:
-                                    rq.put(json.loads(val))
-                                except Exception:
-                                    pass
-                    except Exception:
-                        pass
-
-                _threading.Thread(target=_reader, args=(sse_conn, endpoint_q, response_q), daemon=True).start()
 
-                try:
-                    ep_val = endpoint_q.get(timeout=8)
-                except _q.Empty:
-                    sse_conn.close()
-                    continue
-
-                messages_url = ep_val if ep_val.startswith("http") else base + ep_val
-
-                def _post(payload, timeout=10):
-                    return requests.post(messages_url, json=payload, headers=self._http_headers(), timeout=timeout)
-
-                def _wait(rid, timeout=20):
-                    deadline = _t.time() + timeout
-                    while _t.time() < deadline:
-                        try:
-                            msg = response_q.get(timeout=0.3)
-                            if isinstance(msg, dict) and msg.get("id") == rid:
-                                return msg
-                            response_q.put(msg)
-                        except _q.Empty:
-                            pass
-                    return None
-
-                _post({"jsonrpc": "2.0", "id": 1, "method": "initialize",
-                       "params": {"protocolVersion": "2024-11-05", "capabilities": {},
-                                  "clientInfo": {"name": "amira", "version": "1.0"}}})
-                _wait(1, timeout=6)
-                _post({"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}})
-                _post({"jsonrpc": "2.0", "id": 2, "method": "tools/call",
-                       "params": {"name": tool_name, "arguments": arguments}})
-                data = _wait(2, timeout=25)
-                sse_conn.close()
-
-                if data:
-                    if "result" in data:
-                        return json.dumps(data["result"])
-                    elif "error" in data:
-                        return json.dumps({"error": data["error"].get("message", "Unknown error")})
-                return json.dumps({"error": "SSE tool call timeout"})
-
-            except Exception as e:
-                logger.error(f"MCP {self.name}: SSE tool call failed: {e}")
-
-        return json.dumps({"error": "SSE tool call: no working endpoint"})
+    def transport_stats(self) -> Dict[str, Any]:
+        """Latency and reconnect statistics for this server."""
+        stats = self.latency.snapshot()
+        if self._official_client:
+            stats["mode"] = "stdio-sdk"
+        elif self._transport:
+            stats["mode"] = self._transport.mode
+        if self.result_cache:
+            stats["cache"] = self.result_cache.stats()
+        return stats
 
     def disconnect(self) -> None:
         """Disconnect from MCP server."""
@@ -803,31 +611,48 @@ class MCPServer:
             if self._official_client:
                 self._official_client.disconnect()
                 self._official_client = None
-            elif self.process:
-                self.process.terminate()
-                self.process.wait(timeout=2)
-                logger.debug(f"MCP {self.name}: Process terminated")
+            elif self._transport:
+                self._transport.close()
+                logger.debug(f"MCP {self.name}: Transport closed")
         except Exception as e:
             logger.warning(f"MCP {self.name}: Disconnect error: {e}")
         finally:
+            self._transport = None
             self._connected = False
     
     def is_connected(self) -> bool:
-        """Check if server is connected."""
-        if self.transport_type == self.TRANSPORT_STDIO:
-            if self._official_client:
-                return self._connected
-            return self._connected and self.process is not None and self.process.poll() is None
+        """Check if server is connected.
+
+        HTTP transports reconnect on demand, so a dropped stream still
+        counts as connected; a dead stdio process reconnects on the next call too.
+        """
         return self._connected
 
 
 class MCPManager:
     """Manages multiple MCP server connections."""
     
+    # Upper bound on concurrent calls fanned out by call_tools_batch()
+    BATCH_MAX_WORKERS = 8
+
     def __init__(self):
         """Initialize MCP manager."""
         self.servers: Dict[str, MCPServer] = {}
         self._lock = threading.Lock()
+        # Merged tool catalog, rebuilt only when catalog_version moves
+        # (connect / disconnect / tools list_changed).
+        self._catalog: Dict[str, Dict] = {}
+        self._catalog_version = 0
+        self._catalog_built_version = -1
+        self._batch_pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def catalog_version(self) -> int:
+        """Monotonic counter bumped whenever the merged tool catalog changes."""
+        return self._catalog_version
+
+    def _invalidate_catalog(self, _server_name: str = "") -> None:
+        self._catalog_version += 1
     
     def add_server(self, name: str, transport_type: str, config: Dict[str, Any]) -> bool:
         """Add and connect to an MCP server.
@@ -845,10 +670,13 @@ class MCPManager:
                 if name in self.servers:
                     logger.warning(f"MCP: Server '{name}' already registered, reconnecting...")
                     self.servers[name].disconnect()
+                    self._invalidate_catalog()
                 
                 server = MCPServer(name, transport_type, config)
                 if server.connect():
+                    server.on_tools_changed = self._invalidate_catalog
                     self.servers[name] = server
+                    self._invalidate_catalog()
                     logger.info(f"MCP: Registered server '{name}' with {len(server.tools)} tools")
                     return True
                 else:
@@ -860,12 +688,18 @@ class MCPManager:
     
     def get_all_tools(self) -> Dict[str, Dict]:
         """Get all available tools from all servers.
+
+        The merged catalog is cached and only rebuilt after a server connects,
+        disconnects or announces a tool list change; callers get a copy.
         
         Returns:
             Dict mapping tool_name -> {server, description, inputSchema}
         """
-        all_tools = {}
+        if self._catalog_built_version == self._catalog_version:
+            return {name: dict(info) for name, info in self._catalog.items()}
         with self._lock:
+            version = self._catalog_version
+            all_tools = {}
             for server_name, server in self.servers.items():
                 if server.is_connected():
                     for tool_name, tool_info in server.tools.items():
@@ -877,7 +711,9 @@ class MCPManager:
                             "description": tool_info["description"],
                             "inputSchema": tool_info["inputSchema"]
                         }
-        return all_tools
+            self._catalog = all_tools
+            self._catalog_built_version = version
+        return {name: dict(info) for name, info in all_tools.items()}
     
     def call_tool(self, prefixed_tool_name: str, arguments: Dict, max_retries: int = 2) -> str:
         """Call a tool on an MCP server with retry logic.
@@ -915,40 +751,98 @@ class MCPManager:
                         logger.warning(f"MCP: Schema validation failed for {prefixed_tool_name}: {error_msg}")
                         return json.dumps({"error": f"Argument validation failed: {error_msg}"})
             
-            # Execute with retry logic
+            cache = server.result_cache
+            if cache and cache.is_cacheable(tool_name):
+                cached = cache.get(tool_name, arguments)
+                if cached is not None:
+                    logger.debug(f"MCP: Result cache hit for {prefixed_tool_name}")
+                    return cached
+            else:
+                cache = None
+
+            # Retry only when the request could not reach the server (connection
+            # lost, process gone). Tool errors and timeouts are returned as-is:
+            # the call may already have run, and tools are not assumed idempotent.
             start_time = time.time()
             for attempt in range(max_retries + 1):
                 try:
                     result = server.call_tool(tool_name, arguments)
-                    elapsed = time.time() - start_time
-                    
-                    # If result contains error, still return it (tool-specific error, not transport error)
-                    try:
-                        result_obj = json.loads(result)
-                        if result_obj.get("error") and attempt < max_retries:
-                            logger.debug(f"MCP: Tool returned error, retrying {attempt + 1}/{max_retries + 1}")
-                            time.sleep(0.5 * (2 ** attempt))
-                            continue
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-                    
-                    logger.debug(f"MCP: Tool call succeeded in {elapsed:.2f}s (attempt {attempt + 1})")
-                    return result
-                    
-                except Exception as e:
+                except (TransportClosed, ConnectionError) as e:
                     if attempt < max_retries:
                         delay = 0.5 * (2 ** attempt)
-                        logger.warning(f"MCP: Tool call failed, retrying in {delay}s... ({attempt + 1}/{max_retries + 1}): {e}")
+                        logger.warning(f"MCP: Connection lost, retrying in {delay}s... ({attempt + 1}/{max_retries + 1}): {e}")
                         time.sleep(delay)
-                    else:
-                        elapsed = time.time() - start_time
-                        logger.error(f"MCP: Tool call failed after {elapsed:.2f}s and {max_retries + 1} attempts: {e}")
-                        return json.dumps({"error": f"Tool call failed: {str(e)}"})
+                        continue
+                    elapsed = time.time() - start_time
+                    logger.error(f"MCP: Tool call failed after {elapsed:.2f}s and {max_retries + 1} attempts: {e}")
+                    return json.dumps({"error": f"Tool call failed: {str(e)}"})
+                except Exception as e:
+                    logger.error(f"MCP: Tool call failed: {e}")
+                    return json.dumps({"error": f"Tool call failed: {str(e)}"})
+
+                elapsed = time.time() - start_time
+                is_error = False
+                try:
+                    result_obj = json.loads(result)
+                    is_error = isinstance(result_obj, dict) and bool(
+                        result_obj.get("error") or result_obj.get("isError")
+                    )
+                except (json.JSONDecodeError, TypeError):
+                    pass
+
+                logger.debug(f"MCP: Tool call finished in {elapsed:.2f}s (attempt {attempt + 1})")
+                if cache and not is_error:
+                    cache.put(tool_name, arguments, result)
+                return result
         
         except Exception as e:
             logger.error(f"MCP: Tool routing error: {e}")
             return json.dumps({"error": str(e)})
     
+    def is_read_only(self, prefixed_tool_name: str) -> bool:
+        """Whether a tool may run ahead of its turn (cached tools or read-only names)."""
+        parts = prefixed_tool_name.split("_", 2)
+        if len(parts) != 3 or parts[0] != "mcp":
+            return False
+        server = self.servers.get(parts[1])
+        if server is not None and server.result_cache is not None:
+            return server.result_cache.is_cacheable(parts[2])
+        return MCPResultCache.looks_read_only(parts[2])
+
+    def call_tools_batch(self, calls: List[tuple], timeout: float = 60.0) -> List[str]:
+        """Run independent tool calls concurrently, across and within servers.
+
+        Args:
+            calls: List of (prefixed_tool_name, arguments) tuples
+            timeout: Overall deadline in seconds for the whole batch
+
+        Returns:
+            Results as JSON strings, in the same order as ``calls``
+        """
+        if not calls:
+            return []
+        if len(calls) == 1:
+            name, args = calls[0]
+            return [self.call_tool(name, args)]
+
+        with self._lock:
+            if self._batch_pool is None:
+                self._batch_pool = ThreadPoolExecutor(
+                    max_workers=self.BATCH_MAX_WORKERS, thread_name_prefix="mcp-batch"
+                )
+            pool = self._batch_pool
+
+        futures = [pool.submit(self.call_tool, name, args) for name, args in calls]
+        deadline = time.monotonic() + timeout
+        results = []
+        for (name, _args), fut in zip(calls, futures):
+            try:
+                results.append(fut.result(timeout=max(0.0, deadline - time.monotonic())))
+            except Exception as e:
+                logger.warning(f"MCP: Batch call {name} failed: {e}")
+                results.append(json.dumps({"error": f"Tool call failed: {e}"}))
+        return results
+
     def disconnect_all(self) -> None:
         """Disconnect all servers."""
         with self._lock:
@@ -956,6 +850,7 @@ class MCPManager:
                 logger.debug(f"MCP: Disconnecting '{server_name}'...")
                 server.disconnect()
             self.servers.clear()
+            self._invalidate_catalog()
 
     def remove_server(self, name: str) -> bool:
         """Disconnect and unregister a single server.
@@ -972,6 +867,7 @@ class MCPManager:
                 server.disconnect()
             finally:
                 self.servers.pop(name, None)
+                self._invalidate_catalog()
             return True
     
     def stats(self) -> Dict[str, Any]:
@@ -988,11 +884,13 @@ class MCPManager:
                 "servers_configured": len(self.servers),
                 "servers_connected": connected,
                 "total_tools": total_tools,
+                "catalog_version": self._catalog_version,
                 "servers": {
                     name: {
                         "connected": server.is_connected(),
                         "transport": server.transport_type,
                         "tools": len(server.tools),
+                        "latency": server.transport_stats(),
                     }
                     for name, server in self.servers.items()
                 }
@@ -1141,7 +1039,8 @@ def initialize_mcp_servers(mcp_config: Dict[str, Dict]) -> int:
                        },
                        "my-remote": {
                            "transport": "http",
-                           "url": "https://mcp.example.com"
+                           "url": "https://mcp.example.com",
+                           "cache": {"ttl": 120, "tools": ["search", "fetch"]}
                        }
                    }
     
@@ -1171,6 +1070,8 @@ def initialize_mcp_servers(mcp_config: Dict[str, Dict]) -> int:
             else:
                 logger.error(f"MCP: Unknown transport '{transport}' for server '{server_name}'")
                 continue
+            if server_config.get("cache"):
+                config["cache"] = server_config["cache"]
             
             if manager.add_server(server_name, transport, config):
                 connected += 1
@@ -0,0 +1,650 @@
+"""Persistent JSON-RPC transports for MCP servers.
+
+Every transport keeps one long-lived session per server:
+
+- Streamable HTTP (MCP 2025-03-26): pooled ``requests.Session`` + ``Mcp-Session-Id``
+- HTTP+SSE (MCP 2024-11-05): one GET event stream, POSTs to the messages endpoint
+- stdio (built-in fallback): one subprocess with a single stdout reader
+
+Responses are routed to the waiting caller by JSON-RPC id, so several requests
+can be in flight on the same server. A broken session is re-opened
+transparently on the next request and per-server latency stats are kept.
+"""
+
+import itertools
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CLIENT_INFO = {"name": "amira", "version": "1.0"}
+
+
+class TransportError(Exception):
+    """Transport-level failure (connection lost, bad status, ...)."""
+
+
+class TransportClosed(TransportError):
+    """The underlying session is gone; the transport must be re-opened."""
+
+
+class TransportTimeout(TransportError):
+    """No response arrived for a request within its timeout."""
+
+
+class TransportStats:
+    """Rolling latency / error counters for one MCP server."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.in_flight = 0
+        self.last_error = ""
+
+    def begin(self) -> float:
+        with self._lock:
+            self.in_flight += 1
+        return time.monotonic()
+
+    def end(self, started: float, ok: bool, error: str = "") -> None:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.calls += 1
+            self._latencies.append(elapsed_ms)
+            if not ok:
+                self.errors += 1
+                self.last_error = error[:200]
+
+    def record_reconnect(self) -> None:
+        with self._lock:
+            self.reconnects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._latencies)
+            calls, errors = self.calls, self.errors
+            snap = {
+                "calls": calls,
+                "errors": errors,
+                "reconnects": self.reconnects,
+                "in_flight": self.in_flight,
+                "last_error": self.last_error,
+            }
+
+        def _pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1)
+
+        snap.update({
+            "avg_ms": round(sum(samples) / len(samples), 1) if samples else 0.0,
+            "p50_ms": _pct(0.50),
+            "p95_ms": _pct(0.95),
+            "max_ms": round(samples[-1], 1) if samples else 0.0,
+        })
+        return snap
+
+
+class _PendingRequests:
+    """Maps in-flight JSON-RPC ids to the callers waiting for them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Dict[Any, "queue.Queue"] = {}
+
+    def register(self, req_id: Any) -> "queue.Queue":
+        slot: queue.Queue = queue.Queue(maxsize=1)
+        with self._lock:
+            self._waiters[req_id] = slot
+        return slot
+
+    def discard(self, req_id: Any) -> None:
+        with self._lock:
+            self._waiters.pop(req_id, None)
+
+    def resolve(self, message: Dict) -> bool:
+        """Deliver a response to its waiter. Returns False for unknown ids."""
+        with self._lock:
+            slot = self._waiters.pop(message.get("id"), None)
+        if slot is None:
+            return False
+        slot.put(message)
+        return True
+
+    def fail_all(self, exc: Exception) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, {}
+        for slot in waiters.values():
+            slot.put(exc)
+
+    @staticmethod
+    def wait(slot: "queue.Queue", timeout: float) -> Dict:
+        try:
+            item = slot.get(timeout=timeout)
+        except queue.Empty:
+            raise TransportTimeout(f"no response within {timeout:.0f}s")
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+class MCPTransport:
+    """Base class: id allocation, reconnect-on-failure and latency accounting.
+
+    Subclasses implement ``_open()``, ``_send(message, timeout)``,
+    ``_notify(message)``, ``_close()`` and ``is_alive()``.
+    """
+
+    mode = ""
+    protocol_version = "2024-11-05"
+
+    def __init__(self, name: str, stats: Optional[TransportStats] = None):
+        self.name = name
+        self.stats = stats or TransportStats()
+        self._ids = itertools.count(1)
+        self._open_lock = threading.Lock()
+        self._closed = False
+        # Called with server-initiated notifications (e.g. tools/list_changed)
+        self.on_notification: Optional[Callable[[Dict], None]] = None
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    def open(self) -> None:
+        """Open the session and run the MCP initialize handshake."""
+        with self._open_lock:
+            self._closed = False
+            self._open()
+            self._handshake()
+
+    def request(self, method: str, params: Optional[Dict] = None, timeout: float = 30.0) -> Dict:
+        """Send a JSON-RPC request and return the raw response message.
+
+        A closed session is re-opened once before giving up.
+        """
+        started = self.stats.begin()
+        try:
+            try:
+                response = self._request_once(method, params, timeout)
+            except TransportClosed as e:
+                if self._closed:
+                    raise
+                logger.info(f"MCP {self.name}: session lost ({e}), reconnecting")
+                self._reopen()
+                response = self._request_once(method, params, timeout)
+        except Exception as e:
+            self.stats.end(started, ok=False, error=str(e))
+            raise
+        self.stats.end(started, ok="error" not in response,
+                       error=str((response.get("error") or {}).get("message", "")))
+        return response
+
+    def notify(self, method: str, params: Optional[Dict] = None) -> None:
+        """Send a fire-and-forget JSON-RPC notification."""
+        try:
+            self._notify({"jsonrpc": "2.0", "method": method, "params": params or {}})
+        except Exception as e:
+            logger.debug(f"MCP {self.name}: notification {method} failed: {e}")
+
+    def close(self) -> None:
+        self._closed = True
+        try:
+            self._close()
+        except Exception as e:
+            logger.debug(f"MCP {self.name}: close error: {e}")
+
+    def is_alive(self) -> bool:
+        raise NotImplementedError
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _request_once(self, method: str, params: Optional[Dict], timeout: float) -> Dict:
+        message = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or {}}
+        return self._send(message, timeout)
+
+    def _handshake(self) -> None:
+        init = self._request_once("initialize", {
+            "protocolVersion": self.protocol_version,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO,
+        }, timeout=10.0)
+        if "error" in init:
+            raise TransportError(f"initialize failed: {init['error']}")
+        self.notify("notifications/initialized")
+
+    def _reopen(self) -> None:
+        with self._open_lock:
+            if self.is_alive():
+                return  # another caller already reconnected
+            try:
+                self._close()
+            except Exception:
+                pass
+            self.stats.record_reconnect()
+            self._open()
+            self._handshake()
+
+    def _dispatch_incoming(self, message: Dict, pending: _PendingRequests) -> None:
+        """Route one message read from the server."""
+        if "method" not in message:
+            if not pending.resolve(message):
+                logger.debug(f"MCP {self.name}: response for unknown id {message.get('id')!r}")
+            return
+        if "id" in message:
+            # Server → client request; only ping is expected from tool servers
+            reply: Dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"]}
+            if message["method"] == "ping":
+                reply["result"] = {}
+            else:
+                reply["error"] = {"code": -32601, "message": "Method not found"}
+            try:
+                self._notify(reply)
+            except Exception:
+                pass
+            return
+        if self.on_notification:
+            try:
+                self.on_notification(message)
+            except Exception as e:
+                logger.debug(f"MCP {self.name}: notification handler error: {e}")
+
+    def _send(self, message: Dict, timeout: float) -> Dict:
+        raise NotImplementedError
+
+    def _notify(self, message: Dict) -> None:
+        raise NotImplementedError
+
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+def _new_http_session(pool_size: int = 8) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _iter_sse_events(lines):
+    """Yield ``(event_name, data)`` tuples from an iterable of SSE lines."""
+    event, data = "", []
+    for raw in lines:
+        line = (raw or "").rstrip("\r")
+        if not line:
+            if data:
+                yield event or "message", "\n".join(data)
+            event, data = "", []
+            continue
+        if line.startswith(":"):
+            continue
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+    if data:
+        yield event or "message", "\n".join(data)
+
+
+class StreamableHTTPTransport(MCPTransport):
+    """Streamable HTTP transport over a pooled, keep-alive ``requests.Session``."""
+
+    mode = "streamable"
+    protocol_version = "2025-03-26"
+
+    def __init__(self, name: str, url: str, headers_factory: Callable[[], Dict],
+                 stats: Optional[TransportStats] = None):
+        super().__init__(name, stats)
+        self.url = url.rstrip("/")
+        self._headers_factory = headers_factory
+        self._http = _new_http_session()
+        self.session_id = ""
+        self._expired = False
+
+    def _headers(self) -> Dict:
+        hdrs = dict(self._headers_factory())
+        if self.session_id:
+            hdrs["Mcp-Session-Id"] = self.session_id
+        return hdrs
+
+    def _open(self) -> None:
+        self.session_id = ""
+        if self._http is None:
+            self._http = _new_http_session()
+
+    def _handshake(self) -> None:
+        message = {"jsonrpc": "2.0", "id": next(self._ids), "method": "initialize", "params": {
+            "protocolVersion": self.protocol_version,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO,
+        }}
+        resp = self._post(message, timeout=8)
+        if resp.status_code != 200:
+            raise TransportError(f"initialize → HTTP {resp.status_code}")
+        try:
+            init = self._read_response(resp, message["id"])
+        except (TransportError, ValueError):
+            init = {}  # body-less or non-JSON 200: keep the lenient behaviour
+        if isinstance(init, dict) and "error" in init:
+            # e.g. a server that only speaks HTTP+SSE: let _connect_http fall back
+            err = init["error"]
+            raise TransportError(f"initialize failed: {err.get('message', err) if isinstance(err, dict) else err}")
+        self.session_id = resp.headers.get("Mcp-Session-Id", "")
+        self._expired = False
+        logger.info(f"MCP {self.name}: Streamable init → HTTP 200, session={self.session_id!r}")
+        self.notify("notifications/initialized")
+
+    def _post(self, message: Dict, timeout: float) -> requests.Response:
+        if self._http is None:
+            raise TransportClosed("transport closed")
+        try:
+            return self._http.post(self.url, json=message, headers=self._headers(), timeout=timeout)
+        except requests.ConnectionError as e:
+            raise TransportClosed(str(e))
+        except requests.Timeout:
+            raise TransportTimeout(f"no response within {timeout:.0f}s")
+
+    def _send(self, message: Dict, timeout: float) -> Dict:
+        resp = self._post(message, timeout)
+        if resp.status_code == 404 and self.session_id:
+            # Server dropped our session (restart / expiry) → re-initialize
+            self.session_id = ""
+            self._expired = True
+            raise TransportClosed("session expired (HTTP 404)")
+        if resp.status_code != 200:
+            raise TransportError(f"HTTP {resp.status_code}")
+        return self._read_response(resp, message["id"])
+
+    @staticmethod
+    def _read_response(resp: requests.Response, message_id: Any) -> Dict:
+        if "text/event-stream" in resp.headers.get("Content-Type", ""):
+            for _event, data in _iter_sse_events(resp.text.splitlines()):
+                try:
+                    msg = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(msg, dict) and msg.get("id") == message_id:
+                    return msg
+            raise TransportError("no matching response in event stream")
+        return resp.json()
+
+    def _notify(self, message: Dict) -> None:
+        self._post(message, timeout=5)
+
+    def _close(self) -> None:
+        if self._http is not None:
+            if self.session_id:
+                try:
+                    self._http.delete(self.url, headers=self._headers(), timeout=3)
+                except Exception:
+                    pass
+            self._http.close()
+            self._http = None
+
+    def is_alive(self) -> bool:
+        return self._http is not None and not self._closed and not self._expired
+
+
+class SSETransport(MCPTransport):
+    """HTTP+SSE transport: one long-lived event stream read by a single thread."""
+
+    mode = "sse"
+
+    def __init__(self, name: str, url: str, headers_factory: Callable[[], Dict],
+                 stats: Optional[TransportStats] = None):
+        super().__init__(name, stats)
+        self.url = url.rstrip("/")
+        self._headers_factory = headers_factory
+        self._http: Optional[requests.Session] = None
+        self._stream: Optional[requests.Response] = None
+        self._reader: Optional[threading.Thread] = None
+        self._pending = _PendingRequests()
+        self.messages_url = ""
+        self.sse_url = ""
+
+    def _candidate_urls(self):
+        parsed = urlparse(self.url)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+        if self.sse_url:
+            yield self.sse_url  # last known-good endpoint first
+        for candidate in (self.url, self.url + "/sse", base + "/sse"):
+            if candidate != self.sse_url:
+                yield candidate
+
+    def _open(self) -> None:
+        self._http = _new_http_session()
+        self._pending = _PendingRequests()
+        parsed = urlparse(self.url)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+
+        for sse_path in self._candidate_urls():
+            try:
+                hdrs = {**self._headers_factory(), "Accept": "text/event-stream"}
+                stream = self._http.get(sse_path, headers=hdrs, timeout=(10, None), stream=True)
+                if "text/event-stream" not in stream.headers.get("Content-Type", ""):
+                    stream.close()
+                    continue
+
+                endpoint_q: queue.Queue = queue.Queue(maxsize=1)
+                reader = threading.Thread(
+                    target=self._read_stream, args=(stream, endpoint_q, self._pending),
+                    name=f"mcp-sse-{self.name}", daemon=True,
+                )
+                reader.start()
+                try:
+                    endpoint_val = endpoint_q.get(timeout=8)
+                except queue.Empty:
+                    stream.close()
+                    continue
+
+                if endpoint_val.startswith("http"):
+                    self.messages_url = endpoint_val
+                elif endpoint_val.startswith("/"):
+                    self.messages_url = base + endpoint_val
+                else:
+                    stream.close()
+                    continue
+
+                self._stream, self._reader, self.sse_url = stream, reader, sse_path
+                logger.info(f"MCP {self.name}: SSE transport, messages endpoint: {self.messages_url}")
+                return
+            except requests.RequestException as e:
+                logger.debug(f"MCP {self.name}: SSE attempt {sse_path} failed: {e}")
+
+        raise TransportClosed("no working SSE endpoint")
+
+    def _read_stream(self, stream, endpoint_q: "queue.Queue", pending: _PendingRequests) -> None:
+        endpoint_found = False
+        try:
+            for event, data in _iter_sse_events(stream.iter_lines(decode_unicode=True)):
+                if not data or data == "[DONE]":
+                    continue
+                if not endpoint_found and (event == "endpoint" or not data.startswith("{")):
+                    endpoint_q.put(data)
+                    endpoint_found = True
+                    continue
+                try:
+                    msg = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(msg, dict):
+                    self._dispatch_incoming(msg, pending)
+        except Exception as e:
+            logger.debug(f"MCP {self.name}: SSE reader stopped: {e}")
+        finally:
+            if stream is self._stream:
+                self._stream = None
+            pending.fail_all(TransportClosed("SSE stream closed"))
+
+    def _post(self, message: Dict, timeout: float = 10) -> None:
+        if self._http is None or not self.messages_url:
+            raise TransportClosed("transport closed")
+        try:
+            resp = self._http.post(self.messages_url, json=message,
+                                   headers=self._headers_factory(), timeout=timeout)
+        except requests.ConnectionError as e:
+            raise TransportClosed(str(e))
+        except requests.Timeout:
+            raise TransportTimeout(f"POST timed out after {timeout:.0f}s")
+        if resp.status_code in (404, 410):
+            raise TransportClosed(f"messages endpoint gone (HTTP {resp.status_code})")
+        if resp.status_code >= 400:
+            raise TransportError(f"HTTP {resp.status_code}")
+
+    def _send(self, message: Dict, timeout: float) -> Dict:
+        if not self.is_alive():
+            raise TransportClosed("SSE stream not connected")
+        pending = self._pending
+        slot = pending.register(message["id"])
+        try:
+            self._post(message)
+            return pending.wait(slot, timeout)
+        finally:
+            pending.discard(message["id"])
+
+    def _notify(self, message: Dict) -> None:
+        self._post(message, timeout=5)
+
+    @staticmethod
+    def _abort_stream(stream) -> None:
+        # Closing a response while the reader thread is blocked in recv() can
+        # hang, so shut the socket down first to wake the reader.
+        try:
+            conn = getattr(stream.raw, "connection", None) or getattr(stream.raw, "_connection", None)
+            sock = getattr(conn, "sock", None)
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+        except (OSError, AttributeError):
+            pass
+        threading.Thread(target=stream.close, daemon=True).start()
+
+    def _close(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            self._abort_stream(stream)
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        self._pending.fail_all(TransportClosed("transport closed"))
+
+    def is_alive(self) -> bool:
+        return (
+            self._stream is not None
+            and self._reader is not None
+            and self._reader.is_alive()
+        )
+
+
+class StdioTransport(MCPTransport):
+    """Built-in stdio transport: one subprocess, one stdout reader thread."""
+
+    mode = "stdio"
+
+    def __init__(self, name: str, spawn: Callable[[], Any], stats: Optional[TransportStats] = None):
+        super().__init__(name, stats)
+        self._spawn = spawn
+        self.process = None
+        self._write_lock = threading.Lock()
+        self._pending = _PendingRequests()
+        self._reader: Optional[threading.Thread] = None
+        self._stderr_tail: Deque[str] = deque(maxlen=50)
+
+    def _open(self) -> None:
+        self._pending = _PendingRequests()
+        self.process = self._spawn()
+        self._reader = threading.Thread(
+            target=self._read_stdout, args=(self.process, self._pending),
+            name=f"mcp-stdio-{self.name}", daemon=True,
+        )
+        self._reader.start()
+        if self.process.stderr is not None:
+            # Drain stderr continuously so a chatty server never blocks on a full pipe
+            threading.Thread(
+                target=self._read_stderr, args=(self.process,),
+                name=f"mcp-stderr-{self.name}", daemon=True,
+            ).start()
+
+    def _read_stdout(self, process, pending: _PendingRequests) -> None:
+        try:
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    logger.debug(f"MCP {self.name}: non-JSON stdout line: {line[:200]}")
+                    continue
+                if isinstance(msg, dict):
+                    self._dispatch_incoming(msg, pending)
+        except Exception as e:
+            logger.debug(f"MCP {self.name}: stdio reader stopped: {e}")
+        finally:
+            pending.fail_all(TransportClosed("process exited"))
+
+    def _write(self, message: Dict) -> None:
+        process = self.process
+        if process is None or process.poll() is not None:
+            raise TransportClosed("process not running")
+        try:
+            with self._write_lock:
+                process.stdin.write(json.dumps(message) + "\n")
+                process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise TransportClosed(str(e))
+
+    def _send(self, message: Dict, timeout: float) -> Dict:
+        pending = self._pending
+        slot = pending.register(message["id"])
+        try:
+            self._write(message)
+            return pending.wait(slot, timeout)
+        finally:
+            pending.discard(message["id"])
+
+    def _notify(self, message: Dict) -> None:
+        self._write(message)
+
+    def _read_stderr(self, process) -> None:
+        try:
+            for line in process.stderr:
+                self._stderr_tail.append(line.rstrip())
+        except Exception:
+            pass
+
+    def stderr_tail(self, limit: int = 2000) -> str:
+        """Last lines the process printed on stderr (diagnostics)."""
+        return "\n".join(self._stderr_tail)[-limit:].strip()
+
+    def _close(self) -> None:
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.terminate()
+            process.wait(timeout=2)
+        except Exception:
+            try:
+                process.kill()
+            except Exception:
+                pass
+        self._pending.fail_all(TransportClosed("transport closed"))
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
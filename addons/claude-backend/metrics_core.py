@@ -0,0 +1,211 @@
+"""Bounded, streaming metrics primitives shared by the stats endpoints.
+
+Quality analysis, the tool optimizer and the provider fallback chain used to
+keep every observation in a Python list and recompute their aggregates on
+each stats request.  The pieces here keep memory constant and make reads
+independent of how long the add-on has been running:
+
+- ``RingBuffer``      last N raw items (for "recent" views), fixed size
+- ``EWMA``            exponentially weighted moving average
+- ``QuantileSketch``  log-bucketed sketch (relative error ~1%), mergeable,
+                      bounded number of bins
+- ``StreamingStats``  count / sum / min / max / mean + EWMA + sketch in one
+
+All classes are thread-safe for concurrent observe/snapshot.
+
+    from metrics_core import StreamingStats
+    latency = StreamingStats()
+    latency.observe(0.42)
+    latency.snapshot()   # {"count", "mean", "min", "max", "ewma", "p50", "p95", "p99"}
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent items."""
+
+    def __init__(self, maxlen: int = 200):
+        self._items: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def append(self, item: Any) -> None:
+        with self._lock:
+            self._items.append(item)
+
+    def last(self, n: Optional[int] = None) -> List[Any]:
+        with self._lock:
+            items = list(self._items)
+        return items if n is None else items[-n:] if n > 0 else []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def maxlen(self) -> int:
+        return self._items.maxlen or 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self.last())
+
+
+class EWMA:
+    """Exponentially weighted moving average (first sample initializes it)."""
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with logarithmic buckets.
+
+    A value x > 0 lands in bucket ceil(log_gamma(x)) with
+    gamma = (1 + accuracy) / (1 - accuracy), so every quantile is returned
+    within ``accuracy`` relative error.  When more than ``max_bins`` buckets
+    exist the lowest ones are folded together (the low tail loses precision
+    first; p50+ stay accurate).  Values <= 0 are counted in a zero bucket.
+    """
+
+    def __init__(self, accuracy: float = 0.01, max_bins: int = 512):
+        self.accuracy = accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, x: float, n: int = 1) -> None:
+        with self._lock:
+            self.count += n
+            if x <= 0:
+                self._zero += n
+                return
+            idx = math.ceil(math.log(x) / self._log_gamma)
+            self._bins[idx] = self._bins.get(idx, 0) + n
+            if len(self._bins) > self.max_bins:
+                self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self._bins)
+        excess = len(keys) - self.max_bins
+        folded = sum(self._bins.pop(k) for k in keys[:excess + 1])
+        target = keys[excess]
+        self._bins[target] = self._bins.get(target, 0) + folded
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add *other*'s observations (sketches must share the same accuracy)."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        with other._lock:
+            bins = dict(other._bins)
+            zero, count = other._zero, other.count
+        with self._lock:
+            for k, c in bins.items():
+                self._bins[k] = self._bins.get(k, 0) + c
+            self._zero += zero
+            self.count += count
+            while len(self._bins) > self.max_bins:
+                self._collapse()
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        qs = list(qs)
+        with self._lock:
+            if not self.count:
+                return [None for _ in qs]
+            items = sorted(self._bins.items())
+            zero, count = self._zero, self.count
+        out: List[Optional[float]] = []
+        for q in qs:
+            rank = q * (count - 1)
+            if rank < zero:
+                out.append(0.0)
+                continue
+            seen = zero
+            value = None
+            for k, c in items:
+                seen += c
+                if seen > rank:
+                    # Bucket midpoint: within `accuracy` of any value in (gamma^(k-1), gamma^k]
+                    value = 2 * self._gamma ** k / (1 + self._gamma)
+                    break
+            if value is None and items:
+                value = 2 * self._gamma ** items[-1][0] / (1 + self._gamma)
+            out.append(value)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def __len__(self) -> int:
+        return len(self._bins)
+
+
+class StreamingStats:
+    """Constant-memory summary of a stream of numbers."""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, alpha: float = 0.1, accuracy: float = 0.01):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.ewma = EWMA(alpha)
+        self.sketch = QuantileSketch(accuracy)
+
+    def observe(self, x: float) -> None:
+        x = float(x)
+        with self._lock:
+            self.count += 1
+            self.sum += x
+            self.min = x if self.min is None else min(self.min, x)
+            self.max = x if self.max is None else max(self.max, x)
+            self.ewma.update(x)
+        self.sketch.add(x)
+
+    def merge(self, other: "StreamingStats") -> None:
+        with other._lock:
+            count, total, lo, hi = other.count, other.sum, other.min, other.max
+        if not count:
+            return
+        with self._lock:
+            self.count += count
+            self.sum += total
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def snapshot(self, digits: int = 3) -> Dict[str, Any]:
+        with self._lock:
+            count, total, lo, hi, ewma = self.count, self.sum, self.min, self.max, self.ewma.value
+        if not count:
+            return {"count": 0}
+        p50, p95, p99 = self.sketch.quantiles(self.QUANTILES)
+
+        def r(v):
+            # Sketch values are bucket midpoints: clamp to the observed range
+            return round(min(max(v, lo), hi), digits) if v is not None else None
+
+        return {"count": count, "mean": r(total / count), "min": r(lo), "max": r(hi),
+                "ewma": r(ewma), "p50": r(p50), "p95": r(p95), "p99": r(p99)}
@@ -0,0 +1,359 @@
+"""Prometheus / OpenMetrics exporter for the add-on's hot paths.
+
+Served at ``/metrics``.  Instrumented code updates in-process counters,
+gauges and fixed-bucket histograms (one dict lookup, a bisect and a lock per
+observation, so it stays on in production).  Values that other modules
+already track (cache hit ratios, queue depths) are read at scrape time by
+collectors, which never initialize a subsystem that is not running yet.
+
+    from metrics_exporter import TOOL_SECONDS
+    with TOOL_SECONDS.time(tool="get_entities"):
+        ...
+
+The output is OpenMetrics text when the scraper asks for it (Prometheus
+does) and the classic Prometheus text format otherwise.  Label sets per
+metric are capped at MAX_SERIES; extra ones are folded into ``_other``.
+
+Disable with ``ENABLE_METRICS=false``.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+ENABLED = os.getenv("ENABLE_METRICS", "True").lower() not in ("false", "0", "no")
+MAX_SERIES = 500
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0)
+
+_OTHER = "_other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        if key not in self._series and len(self._series) >= MAX_SERIES:
+            return tuple(_OTHER for _ in self.labelnames)
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter; exposed as ``<name>_total``."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not ENABLED or amount < 0:
+            return
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return [f"{self.name}_total{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (set directly or by collectors)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram (cumulative buckets, sum and count on export)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not ENABLED:
+            return
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (+Inf last), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][idx] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels: Any):
+        """Observe the wall time of the ``with`` block (also when it raises)."""
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - t0, **labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+        return lines
+
+
+class Registry:
+    """Ordered set of metrics plus scrape-time collectors."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, doc: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, doc, labelnames))
+
+    def gauge(self, name: str, doc: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, doc, labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, doc, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], None]) -> Callable[[], None]:
+        """Register *fn* to refresh gauges right before each scrape (decorator)."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self, openmetrics: bool = True) -> str:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                pass  # a broken collector must not break the scrape
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            family = m.name if openmetrics or m.kind != "counter" else f"{m.name}_total"
+            lines.append(f"# HELP {family} {_escape(m.doc)}")
+            lines.append(f"# TYPE {family} {m.kind}")
+            lines.extend(m.samples(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PROVIDER_TTFT_SECONDS = REGISTRY.histogram(
+    "amira_provider_ttft_seconds", "Time from provider request to first content event.",
+    ("provider", "model"))
+PROVIDER_STREAM_SECONDS = REGISTRY.histogram(
+    "amira_provider_stream_seconds", "Total duration of a completed provider stream.",
+    ("provider", "model"))
+PROVIDER_ERRORS = REGISTRY.counter(
+    "amira_provider_errors", "Provider streams that raised or emitted an error event.",
+    ("provider", "model"))
+TOOL_SECONDS = REGISTRY.histogram(
+    "amira_tool_seconds", "Tool execution latency.", ("tool",), FAST_BUCKETS)
+HA_REQUEST_SECONDS = REGISTRY.histogram(
+    "amira_ha_request_seconds", "Home Assistant REST / WebSocket call latency.",
+    ("transport", "resource"), FAST_BUCKETS)
+TOKENS = REGISTRY.counter(
+    "amira_tokens", "Tokens reported by providers.", ("provider", "model", "kind"))
+COST = REGISTRY.counter(
+    "amira_cost", "Estimated cost of provider calls.", ("provider", "model", "currency"))
+ACTIVE_STREAMS = REGISTRY.gauge(
+    "amira_active_streams", "Chat streams currently being served.")
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "amira_cache_hit_ratio", "Hit ratio since start per cache (absent until the first lookup).",
+    ("cache",))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "amira_queue_depth", "Work waiting or in flight per queue.", ("queue",))
+
+
+def timed_stream(provider: str, model: str, events):
+    """Re-yield a provider event stream, observing TTFT, total time and errors.
+
+    Streams closed early by the consumer (e.g. the losing side of a hedged
+    request) are not counted.
+    """
+    if not ENABLED:
+        yield from events
+        return
+    import tracing
+    t0 = time.monotonic()
+    first = False
+    try:
+        for event in events:
+            if isinstance(event, dict):
+                kind = event.get("type")
+                if not first and kind not in tracing._NON_CONTENT_EVENTS:
+                    first = True
+                    PROVIDER_TTFT_SECONDS.observe(time.monotonic() - t0, provider=provider, model=model)
+                elif kind == "error":
+                    PROVIDER_ERRORS.inc(provider=provider, model=model)
+            yield event
+    except GeneratorExit:
+        raise
+    except Exception:
+        PROVIDER_ERRORS.inc(provider=provider, model=model)
+        raise
+    PROVIDER_STREAM_SECONDS.observe(time.monotonic() - t0, provider=provider, model=model)
+
+
+def record_usage(usage: Dict[str, Any]) -> None:
+    """Count tokens and cost of one enriched usage dict (see usage_tracker.record)."""
+    if not ENABLED:
+        return
+    provider = usage.get("provider") or "unknown"
+    model = usage.get("model") or "unknown"
+    for kind in ("input", "output", "cache_read", "cache_write"):
+        n = usage.get(f"{kind}_tokens") or 0
+        if n:
+            TOKENS.inc(n, provider=provider, model=model, kind=kind)
+    cost = usage.get("cost") or 0
+    if cost:
+        COST.inc(cost, provider=provider, model=model, currency=usage.get("currency") or "USD")
+
+
+@contextmanager
+def track_active_stream():
+    ACTIVE_STREAMS.inc()
+    try:
+        yield
+    finally:
+        ACTIVE_STREAMS.dec()
+
+
+def _loaded(module: str, attr: str) -> Optional[Any]:
+    """Module-level singleton *attr* of *module* if both already exist (no imports)."""
+    mod = sys.modules.get(module)
+    return getattr(mod, attr, None) if mod is not None else None
+
+
+@REGISTRY.collector
+def _collect_caches() -> None:
+    ratios = {}
+    response_cache = _loaded("semantic_cache", "_response_cache")
+    if response_cache is not None:
+        ratios["response"] = response_cache.stats().get("hit_rate")
+    engine = _loaded("services.command_engine", "_engine")
+    if engine is not None:
+        ratios["fast_path"] = engine.stats().get("hit_rate")
+    manager = _loaded("mcp", "_mcp_manager")
+    for server in list(getattr(manager, "servers", {}).values()):
+        cache = getattr(server, "result_cache", None)
+        if cache is not None:
+            st = cache.stats()
+            if st["hits"] + st["misses"]:
+                ratios[f"mcp:{server.name}"] = st["hit_rate"]
+    for name, ratio in ratios.items():
+        if ratio is not None:
+            CACHE_HIT_RATIO.set(ratio, cache=name)
+
+
+@REGISTRY.collector
+def _collect_queues() -> None:
+    runtime = _loaded("async_runtime", "_runtime")
+    if runtime is not None:
+        st = runtime.stats()
+        QUEUE_DEPTH.set(st.get("inflight") or 0, queue="async_inflight")
+        QUEUE_DEPTH.set(st.get("loop_tasks") or 0, queue="async_loop_tasks")
+    hub = _loaded("services.state_stream_service", "_hub")
+    if hub is not None:
+        QUEUE_DEPTH.set(hub.stream_clients, queue="state_stream_clients")
+    tracker = _loaded("usage_tracker", "_tracker")
+    if tracker is not None:
+        QUEUE_DEPTH.set(len(tracker._pending), queue="usage_journal_pending")
+
+
+def render(openmetrics: bool = True) -> str:
+    return REGISTRY.render(openmetrics)
@@ -31,6 +31,8 @@ from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from pricing import model_id_candidates, normalize_model_id
+
 logger = logging.getLogger(__name__)
 
 
@@ -417,11 +419,11 @@ _PROVIDER_MODELS: Dict[str, List[str]] = {
 # ---------------------------------------------------------------------------
 
 def _build_alias_index(entries: List[ModelCatalogEntry]) -> Dict[str, Tuple[str, str]]:
-    """Map lowercase alias → (provider, model_id)."""
+    """Map normalized alias (see pricing.normalize_model_id) → (provider, model_id)."""
     idx: Dict[str, Tuple[str, str]] = {}
     for e in entries:
         for a in e.aliases:
-            idx[a.lower()] = (e.provider, e.id)
+            idx[normalize_model_id(a)] = (e.provider, e.id)
     return idx
 
 
@@ -561,23 +563,32 @@ class ModelCatalog:
     # -- queries --
 
     def get_entry(self, provider: str, model_id: str) -> Optional[ModelCatalogEntry]:
-        """Look up a model by provider + id (exact or alias)."""
+        """Look up a model by provider + id (exact, gateway-stripped id, or alias)."""
         key = f"{provider}/{model_id}"
         with self._lock:
             entry = self._entries.get(key)
             if entry:
                 return entry
-            # Try alias
-            alias_hit = self._alias_index.get(model_id.lower())
-            if alias_hit:
-                return self._entries.get(f"{alias_hit[0]}/{alias_hit[1]}")
+            # Same identity rules as pricing: "groq/llama-3.3-70b-versatile",
+            # "claude-opus-4.6" and "opus-4.6" all name a known entry.
+            for cand in model_id_candidates(model_id, normalize=False)[1:]:
+                entry = self._entries.get(f"{provider}/{cand}")
+                if entry:
+                    return entry
+            for cand in model_id_candidates(model_id):
+                alias_hit = self._alias_index.get(cand)
+                if alias_hit:
+                    return self._entries.get(f"{alias_hit[0]}/{alias_hit[1]}")
         return None
 
     def resolve_alias(self, raw: str) -> Optional[Tuple[str, str]]:
         """Resolve a model alias to (provider, model_id), or None."""
         with self._lock:
-            hit = self._alias_index.get(raw.lower().strip())
-            return hit
+            for cand in model_id_candidates(raw):
+                hit = self._alias_index.get(cand)
+                if hit:
+                    return hit
+        return None
 
     def get_all(self, provider: Optional[str] = None, *, 
                 include_deprecated: bool = False) -> List[ModelCatalogEntry]:
@@ -12,6 +12,7 @@ Integrates with:
 - agent_config.AgentManager: for building the candidate chain
 - model_catalog.ModelCatalog: for capability checks and context window info
 - fallback.ProviderHealth: for health tracking (reuses existing module)
+- model_router.ModelRouter: per-intent reordering from live telemetry (opt-in)
 
 Usage:
     from model_fallback import run_with_model_fallback
@@ -34,6 +35,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, TypeVar
 
+import model_router
+
 logger = logging.getLogger(__name__)
 
 
@@ -331,6 +334,18 @@ def resolve_candidates(
     return candidates
 
 
+def _routed_candidates(provider: str, model: str, agent_id: Optional[str],
+                       fallbacks_override: Optional[List[str]],
+                       intent: Optional[str]) -> List[ModelCandidate]:
+    """resolve_candidates() reordered by the model router (no-op when routing is off)."""
+    candidates = resolve_candidates(provider, model, agent_id, fallbacks_override)
+    router = model_router.get_router()
+    if not candidates or not router.enabled:
+        return candidates
+    ordered = router.route(intent, [(c.provider, c.model) for c in candidates])
+    return [ModelCandidate(p, m) for p, m in ordered]
+
+
 # ---------------------------------------------------------------------------
 # Core: run_with_model_fallback
 # ---------------------------------------------------------------------------
@@ -343,6 +358,7 @@ def run_with_model_fallback(
     fallbacks_override: Optional[List[str]] = None,
     on_error: Optional[Callable[[Dict[str, Any]], None]] = None,
     on_fallback: Optional[Callable[[str, str, str, str], None]] = None,
+    intent: Optional[str] = None,
 ) -> FallbackResult:
     """Execute `run(provider, model)` with automatic model fallback.
 
@@ -354,11 +370,12 @@ def run_with_model_fallback(
         fallbacks_override: Explicit fallback list (overrides agent/defaults)
         on_error: Callback({provider, model, error, attempt, total})
         on_fallback: Callback(from_provider, from_model, to_provider, to_model)
+        intent: Optional intent name, used by the model router to order candidates
 
     Returns:
         FallbackResult with .result, .provider, .model, .success, .attempts
     """
-    candidates = resolve_candidates(provider, model, agent_id, fallbacks_override)
+    candidates = _routed_candidates(provider, model, agent_id, fallbacks_override, intent)
 
     if not candidates:
         return FallbackResult(
@@ -430,6 +447,8 @@ def run_with_model_fallback(
         except Exception as err:
             elapsed_ms = (time.time() - t0) * 1000
             reason = classify_error(err)
+            if reason != FailoverReason.CONTEXT_OVERFLOW:
+                model_router.get_router().record_failure(candidate.provider, candidate.model)
 
             attempts.append(FallbackAttempt(
                 provider=candidate.provider,
@@ -543,14 +562,17 @@ def run_with_model_fallback_streaming(
     fallbacks_override: Optional[List[str]] = None,
     on_error: Optional[Callable[[Dict[str, Any]], None]] = None,
     on_fallback: Optional[Callable[[str, str, str, str], None]] = None,
+    intent: Optional[str] = None,
 ) -> FallbackResult:
     """Same as run_with_model_fallback but for streaming generators.
 
     The `run` callable should return a generator. We consume the first
     chunk to verify connectivity, then return the generator as the result.
     If the first chunk fails, we fallback to the next candidate.
+    The returned stream feeds the model router's telemetry (TTFT, tokens/sec,
+    cost) as it is consumed.
     """
-    candidates = resolve_candidates(provider, model, agent_id, fallbacks_override)
+    candidates = _routed_candidates(provider, model, agent_id, fallbacks_override, intent)
 
     if not candidates:
         return FallbackResult(error=Exception("No model candidates configured"))
@@ -573,6 +595,7 @@ def run_with_model_fallback_streaming(
                 continue
 
         t0 = time.time()
+        started = time.monotonic()
         try:
             gen = run(candidate.provider, candidate.model)
             # Probe stream startup:
@@ -620,7 +643,10 @@ def run_with_model_fallback_streaming(
             ))
 
             return FallbackResult(
-                result=_chain_gen(startup_buffer, gen),
+                result=model_router.get_router().observe(
+                    candidate.provider, candidate.model,
+                    _chain_gen(startup_buffer, gen), started=started,
+                ),
                 provider=candidate.provider,
                 model=candidate.model,
                 success=True,
@@ -645,6 +671,8 @@ def run_with_model_fallback_streaming(
         except Exception as err:
             elapsed_ms = (time.time() - t0) * 1000
             reason = classify_error(err)
+            if reason != FailoverReason.CONTEXT_OVERFLOW:
+                model_router.get_router().record_failure(candidate.provider, candidate.model)
 
             attempts.append(FallbackAttempt(
                 provider=candidate.provider, model=candidate.model,
@@ -699,4 +727,5 @@ def get_fallback_stats() -> Dict[str, Any]:
     return {
         "cooldowns": get_cooldown_status(),
         "probe_interval_sec": _PROBE_INTERVAL_SEC,
+        "routing_enabled": model_router.get_router().enabled,
     }
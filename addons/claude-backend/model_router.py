@@ -0,0 +1,406 @@
+"""Model Router — latency- and cost-aware candidate ordering from live telemetry.
+
+model_fallback.resolve_candidates builds the candidate chain from static
+config (primary → agent fallbacks → global defaults). When routing is
+enabled, the router reorders that chain per intent using what it has
+observed for each (provider, model):
+
+- TTFT (time to first token), tokens/sec, error rate and cost per
+  successful turn, as exponentially weighted moving averages
+- a per-intent objective: ``quality`` (keep configured order), ``latency``,
+  ``cost`` or ``fast_cheap`` (both, normalised)
+- a latency SLO (TTFT) and a per-turn budget: candidates that break them,
+  or fail too often, are moved behind the compliant ones (never dropped,
+  so fallback still works)
+
+Candidates without enough samples rank after measured ones, in configured
+order, so routing only changes anything once there is evidence (``cost``
+can use the price table right away). Every decision is
+kept (last 50) and can be inspected via ``/api/routing``; ``explain()``
+dry-runs the policy for an intent.
+
+Policy file: ``/config/amira/routing_config.json``::
+
+    {
+      "enabled": true,
+      "latency_slo_ms": 4000,
+      "max_cost_per_turn": 0.02,
+      "intents": {
+        "chat": {"objective": "fast_cheap", "candidates": ["groq/llama-3.1-8b-instant"]},
+        "create_html_dashboard": {"objective": "quality", "latency_slo_ms": 20000}
+      }
+    }
+
+Per-intent ``candidates`` are appended to the pool (when their provider has
+an API key), which is how simple turns can reach a fast cheap model that is
+not otherwise in the fallback chain.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROUTING_CONFIG_PATH = "/config/amira/routing_config.json"
+
+DEFAULT_POLICY: Dict[str, Any] = {
+    "enabled": False,
+    "latency_slo_ms": 4000,
+    "max_cost_per_turn": None,
+    "max_error_rate": 0.5,
+    "min_samples": 5,
+    "intents": {
+        # Conversational turns: no tools, short answers → fastest cheap model
+        "chat": {"objective": "fast_cheap"},
+    },
+}
+
+OBJECTIVES = ("quality", "latency", "cost", "fast_cheap")
+
+_ALPHA = 0.2          # EWMA weight for latency / throughput / cost
+_ERROR_ALPHA = 0.1    # EWMA weight for the error rate
+_MAX_DECISIONS = 50
+
+Candidate = Tuple[str, str]  # (provider, model)
+
+
+@dataclass
+class ModelTelemetry:
+    """Rolling performance of one (provider, model)."""
+    provider: str
+    model: str
+    samples: int = 0
+    successes: int = 0
+    failures: int = 0
+    ttft_ms: Optional[float] = None
+    tokens_per_sec: Optional[float] = None
+    cost_per_turn: Optional[float] = None
+    error_rate: float = 0.0
+    last_seen: float = 0.0
+
+    @staticmethod
+    def _ewma(old: Optional[float], new: float, alpha: float = _ALPHA) -> float:
+        return new if old is None else old + alpha * (new - old)
+
+    def record_success(self, ttft_ms: Optional[float], tokens_per_sec: Optional[float],
+                       cost: Optional[float]) -> None:
+        self.samples += 1
+        self.successes += 1
+        self.last_seen = time.time()
+        self.error_rate = self._ewma(self.error_rate, 0.0, _ERROR_ALPHA)
+        if ttft_ms is not None:
+            self.ttft_ms = self._ewma(self.ttft_ms, ttft_ms)
+        if tokens_per_sec:
+            self.tokens_per_sec = self._ewma(self.tokens_per_sec, tokens_per_sec)
+        if cost is not None:
+            self.cost_per_turn = self._ewma(self.cost_per_turn, cost)
+
+    def record_failure(self) -> None:
+        self.samples += 1
+        self.failures += 1
+        self.last_seen = time.time()
+        self.error_rate = self._ewma(self.error_rate, 1.0, _ERROR_ALPHA)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "samples": self.samples,
+            "successes": self.successes,
+            "failures": self.failures,
+            "ttft_ms": round(self.ttft_ms, 1) if self.ttft_ms is not None else None,
+            "tokens_per_sec": round(self.tokens_per_sec, 1) if self.tokens_per_sec is not None else None,
+            "cost_per_turn": round(self.cost_per_turn, 6) if self.cost_per_turn is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "last_seen": self.last_seen,
+        }
+
+
+def _static_cost(provider: str, model: str) -> Optional[float]:
+    """Price-table estimate (USD) of a typical turn, used before telemetry exists."""
+    try:
+        import pricing
+        return pricing.calculate_cost(model, provider, 3000, 300)
+    except Exception:
+        return None
+
+
+def _provider_configured(provider: str) -> bool:
+    try:
+        from providers.manager import _PROVIDER_KEY_ENV
+    except Exception:
+        return True
+    env_var = _PROVIDER_KEY_ENV.get(provider)
+    return bool(env_var and os.getenv(env_var, "")) if env_var else True
+
+
+class ModelRouter:
+    """Telemetry store + routing policy."""
+
+    def __init__(self, config_path: str = ROUTING_CONFIG_PATH):
+        self.config_path = config_path
+        self._lock = threading.Lock()
+        self._telemetry: Dict[Candidate, ModelTelemetry] = {}
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=_MAX_DECISIONS)
+        self._policy_cache: Tuple[float, Dict[str, Any]] = (-1.0, DEFAULT_POLICY)
+
+    # -- policy --
+
+    def policy(self) -> Dict[str, Any]:
+        """Routing policy: defaults overlaid with routing_config.json (reloaded on change)."""
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = 0.0
+        cached_mtime, cached = self._policy_cache
+        if mtime == cached_mtime:
+            return cached
+        policy = json.loads(json.dumps(DEFAULT_POLICY))
+        if mtime:
+            try:
+                with open(self.config_path, "r", encoding="utf-8") as f:
+                    data = json.load(f) or {}
+                for key in ("enabled", "latency_slo_ms", "max_cost_per_turn", "max_error_rate", "min_samples"):
+                    if key in data:
+                        policy[key] = data[key]
+                if isinstance(data.get("intents"), dict):
+                    policy["intents"].update(data["intents"])
+            except Exception as e:
+                logger.warning(f"ModelRouter: could not load {self.config_path}: {e}")
+        self._policy_cache = (mtime, policy)
+        return policy
+
+    def _intent_policy(self, intent: Optional[str]) -> Dict[str, Any]:
+        policy = self.policy()
+        rule = dict(policy["intents"].get(intent or "", {}) or {})
+        objective = rule.get("objective", "quality")
+        return {
+            "objective": objective if objective in OBJECTIVES else "quality",
+            "latency_slo_ms": rule.get("latency_slo_ms", policy["latency_slo_ms"]),
+            "max_cost_per_turn": rule.get("max_cost_per_turn", policy["max_cost_per_turn"]),
+            "max_error_rate": rule.get("max_error_rate", policy["max_error_rate"]),
+            "min_samples": int(rule.get("min_samples", policy["min_samples"]) or 0),
+            "candidates": [c for c in rule.get("candidates", []) if isinstance(c, str) and "/" in c],
+        }
+
+    @property
+    def enabled(self) -> bool:
+        env = os.getenv("MODEL_ROUTING", "")
+        if env:
+            return env.lower() in ("true", "1", "yes")
+        return bool(self.policy().get("enabled"))
+
+    # -- telemetry --
+
+    def _get(self, provider: str, model: str) -> ModelTelemetry:
+        key = (provider, model)
+        tel = self._telemetry.get(key)
+        if tel is None:
+            tel = self._telemetry[key] = ModelTelemetry(provider, model)
+        return tel
+
+    def record_success(self, provider: str, model: str, ttft_ms: Optional[float] = None,
+                       tokens_per_sec: Optional[float] = None, cost: Optional[float] = None) -> None:
+        with self._lock:
+            self._get(provider, model).record_success(ttft_ms, tokens_per_sec, cost)
+
+    def record_failure(self, provider: str, model: str) -> None:
+        with self._lock:
+            self._get(provider, model).record_failure()
+
+    def observe(self, provider: str, model: str, events: Iterator[Any],
+                started: Optional[float] = None) -> Iterator[Any]:
+        """Re-yield a provider event stream, recording its TTFT, throughput and cost."""
+        t0 = started if started is not None else time.monotonic()
+        first_at: Optional[float] = None
+        usage: Optional[Dict[str, Any]] = None
+        outcome = None
+        try:
+            for event in events:
+                if isinstance(event, dict):
+                    etype = event.get("type")
+                    if first_at is None and etype in ("content", "text", "delta", "tool_call"):
+                        first_at = time.monotonic()
+                    if event.get("usage"):
+                        usage = event["usage"]
+                    if etype == "done":
+                        outcome = "ok"
+                    elif etype == "error" and outcome is None:
+                        outcome = "error"
+                yield event
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            if outcome == "ok":
+                end = time.monotonic()
+                ttft_ms = (first_at - t0) * 1000 if first_at is not None else None
+                tps = cost = None
+                if usage:
+                    try:
+                        import pricing
+                        norm = pricing.normalize_usage(usage)
+                        out_tokens = norm.get("output_tokens", 0)
+                        if first_at is not None and out_tokens and end > first_at:
+                            tps = out_tokens / (end - first_at)
+                        cost = pricing.calculate_cost(
+                            model, provider, norm.get("input_tokens", 0), out_tokens,
+                            cache_read_tokens=norm.get("cache_read_tokens", 0),
+                            cache_write_tokens=norm.get("cache_write_tokens", 0),
+                        )
+                    except Exception:
+                        pass
+                self.record_success(provider, model, ttft_ms, tps, cost)
+            elif outcome == "error":
+                self.record_failure(provider, model)
+            # Abandoned streams (client went away) are not evidence either way
+
+    # -- routing --
+
+    def _evaluate(self, candidates: List[Candidate], rule: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        with self._lock:
+            snapshot = {c: self._telemetry.get(c) for c in candidates}
+        for pos, (provider, model) in enumerate(candidates):
+            tel = snapshot.get((provider, model))
+            known = tel is not None and tel.successes >= rule["min_samples"]
+            cost = tel.cost_per_turn if known and tel.cost_per_turn is not None else _static_cost(provider, model)
+            row = {
+                "provider": provider, "model": model, "position": pos,
+                "samples": tel.samples if tel else 0,
+                "ttft_ms": round(tel.ttft_ms, 1) if known and tel.ttft_ms is not None else None,
+                "tokens_per_sec": round(tel.tokens_per_sec, 1) if known and tel.tokens_per_sec else None,
+                "error_rate": round(tel.error_rate, 3) if tel else None,
+                "cost_per_turn": round(cost, 6) if cost is not None else None,
+                "violations": [],
+            }
+            if tel is not None and tel.samples >= rule["min_samples"] and tel.error_rate > rule["max_error_rate"]:
+                row["violations"].append("error_rate")
+            if row["ttft_ms"] is not None and rule["latency_slo_ms"] and row["ttft_ms"] > rule["latency_slo_ms"]:
+                row["violations"].append("latency_slo")
+            if cost is not None and rule["max_cost_per_turn"] is not None and cost > rule["max_cost_per_turn"]:
+                row["violations"].append("budget")
+            row["known"] = known
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _sort_key(objective: str, rows: List[Dict[str, Any]]):
+        ttfts = [r["ttft_ms"] for r in rows if r["ttft_ms"] is not None]
+        costs = [r["cost_per_turn"] for r in rows if r["cost_per_turn"] is not None]
+        max_ttft = max(ttfts) if ttfts else 1.0
+        max_cost = max(costs) if costs else 1.0
+
+        def key(row):
+            ttft = row["ttft_ms"] / max_ttft if row["ttft_ms"] is not None and max_ttft else None
+            cost = row["cost_per_turn"] / max_cost if row["cost_per_turn"] is not None and max_cost else None
+            if objective == "latency":
+                score = ttft
+            elif objective == "cost":
+                score = cost
+            elif ttft is not None and cost is not None:
+                score = 0.5 * ttft + 0.5 * cost
+            else:
+                score = None
+            # Unscored candidates go after scored ones, in configured order
+            return (score is None, score if score is not None else 0.0, row["position"])
+        return key
+
+    def _rank(self, intent: Optional[str], candidates: List[Candidate]):
+        rule = self._intent_policy(intent)
+        pool = list(dict.fromkeys(candidates))
+        for raw in rule["candidates"]:
+            provider, model = raw.split("/", 1)
+            if (provider, model) not in pool and _provider_configured(provider):
+                pool.append((provider, model))
+        rows = self._evaluate(pool, rule)
+        compliant = [r for r in rows if not r["violations"]]
+        if rule["objective"] != "quality":
+            compliant.sort(key=self._sort_key(rule["objective"], compliant))
+        return rule, compliant + [r for r in rows if r["violations"]]
+
+    def route(self, intent: Optional[str], candidates: List[Candidate]) -> List[Candidate]:
+        """Return *candidates* reordered for *intent* (unchanged when routing is off)."""
+        if not candidates or not self.enabled:
+            return list(candidates)
+        rule, ordered = self._rank(intent, candidates)
+        result = [(r["provider"], r["model"]) for r in ordered]
+        decision = {
+            "timestamp": time.time(),
+            "intent": intent or "",
+            "objective": rule["objective"],
+            "latency_slo_ms": rule["latency_slo_ms"],
+            "max_cost_per_turn": rule["max_cost_per_turn"],
+            "configured": [f"{p}/{m}" for p, m in candidates],
+            "chosen": f"{result[0][0]}/{result[0][1]}",
+            "candidates": ordered,
+        }
+        with self._lock:
+            self._decisions.append(decision)
+        if result[0] != tuple(candidates[0]):
+            logger.info(
+                f"ModelRouter: intent '{intent}' ({rule['objective']}) → {decision['chosen']} "
+                f"instead of {candidates[0][0]}/{candidates[0][1]}"
+            )
+        return result
+
+    def order_providers(self, providers: List[str]) -> List[str]:
+        """Provider-level fallback ordering: demote providers failing too often."""
+        if not providers or not self.enabled:
+            return list(providers)
+        policy = self.policy()
+        with self._lock:
+            rates: Dict[str, List[ModelTelemetry]] = {}
+            for (prov, _), tel in self._telemetry.items():
+                rates.setdefault(prov, []).append(tel)
+
+        def unhealthy(prov: str) -> bool:
+            tels = [t for t in rates.get(prov, []) if t.samples >= policy["min_samples"]]
+            return bool(tels) and min(t.error_rate for t in tels) > policy["max_error_rate"]
+
+        return [p for p in providers if not unhealthy(p)] + [p for p in providers if unhealthy(p)]
+
+    def explain(self, intent: Optional[str], candidates: List[Candidate]) -> Dict[str, Any]:
+        """Dry-run the policy for *intent* without recording a decision."""
+        rule, ordered = self._rank(intent, candidates)
+        return {
+            "enabled": self.enabled,
+            "intent": intent or "",
+            "rule": rule,
+            "order": [f"{r['provider']}/{r['model']}" for r in ordered],
+            "candidates": ordered,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            telemetry = [t.to_dict() for t in self._telemetry.values()]
+            decisions = list(self._decisions)
+        telemetry.sort(key=lambda t: (t["provider"], t["model"]))
+        return {
+            "enabled": self.enabled,
+            "policy": self.policy(),
+            "telemetry": telemetry,
+            "recent_decisions": list(reversed(decisions)),
+        }
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Get or create the global model router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
@@ -10,7 +10,7 @@ Cache reads are typically 90% cheaper, cache writes 25% more expensive.
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 # ---------------------------------------------------------------------------
 # Prices per 1M tokens (USD)
@@ -274,30 +274,141 @@ def normalize_usage(raw: Dict[str, Any]) -> Dict[str, Any]:
 # Cost breakdown (inspired by OpenClaw CostBreakdown)
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# Model identity index — one resolver for cost calculation and the catalog
+# ---------------------------------------------------------------------------
+
+def normalize_model_id(model: str) -> str:
+    """Canonical form used for matching: lowercase, trimmed, "." → "-"."""
+    return (model or "").strip().lower().replace(".", "-")
+
+
+def model_id_candidates(model: str, normalize: bool = True) -> List[str]:
+    """Normalized id followed by its gateway-stripped forms.
+
+    "openrouter/anthropic/claude-opus-4.6" →
+    ["openrouter/anthropic/claude-opus-4-6", "anthropic/claude-opus-4-6", "claude-opus-4-6"]
+    With normalize=False only the prefixes are stripped (ids keep their case).
+    """
+    norm = normalize_model_id(model) if normalize else (model or "").strip()
+    out = [norm] if norm else []
+    while "/" in norm:
+        norm = norm.split("/", 1)[1]
+        if norm:
+            out.append(norm)
+    return out
+
+
+class ModelIndex:
+    """Precompiled model → pricing resolver.
+
+    Built once from MODEL_PRICING and the catalog aliases:
+    - exact lookup on normalized ids (and gateway-stripped forms),
+    - alias → canonical id,
+    - prefix trie for the "longest known key contained in the name" fallback,
+      which used to be a linear scan over every pricing key,
+    - memoized results (the set of model names seen at runtime is small).
+    """
+
+    _MEMO_MAX = 4096
+
+    def __init__(self, table: Dict[str, Dict[str, float]], aliases: Optional[Dict[str, str]] = None):
+        self._keys: Dict[str, str] = {}          # normalized → original pricing key
+        self._trie: Dict[str, Any] = {}
+        for key in table:
+            norm = normalize_model_id(key)
+            self._keys.setdefault(norm, key)
+            node = self._trie
+            for ch in norm:
+                node = node.setdefault(ch, {})
+            node.setdefault("", key)             # "" marks the end of a key
+        self._aliases: Dict[str, str] = {}
+        for alias, target in (aliases or {}).items():
+            hit = self._keys.get(normalize_model_id(target))
+            if hit:
+                self._aliases[normalize_model_id(alias)] = hit
+        self._table = table
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def resolve(self, model: str) -> Optional[str]:
+        """Return the MODEL_PRICING key that prices *model*, or None."""
+        if not model:
+            return None
+        try:
+            return self._memo[model]
+        except KeyError:
+            pass
+        key = self._resolve(model)
+        if len(self._memo) >= self._MEMO_MAX:
+            self._memo.clear()
+        self._memo[model] = key
+        return key
+
+    def _resolve(self, model: str) -> Optional[str]:
+        candidates = model_id_candidates(model)
+        for c in candidates:
+            hit = self._keys.get(c) or self._aliases.get(c)
+            if hit:
+                return hit
+        # Fuzzy: the LONGEST pricing key that occurs in the bare name
+        return self._longest_contained(candidates[-1]) if candidates else None
+
+    def _longest_contained(self, name: str) -> Optional[str]:
+        best, best_len = None, 0
+        for start in range(len(name)):
+            if len(name) - start <= best_len:
+                break
+            node = self._trie
+            for i in range(start, len(name)):
+                node = node.get(name[i])
+                if node is None:
+                    break
+                if "" in node and i - start + 1 > best_len and self._at_boundary(name, i + 1):
+                    best, best_len = node[""], i - start + 1
+        return best
+
+    @staticmethod
+    def _at_boundary(name: str, end: int) -> bool:
+        # A key ending in a version number must not match the first digits of
+        # a longer one: "gpt-4-1" is not inside "gpt-4-1106-preview".
+        return end == len(name) or not (name[end].isdigit() and name[end - 1].isdigit())
+
+    def pricing(self, model: str) -> Optional[Dict[str, float]]:
+        key = self.resolve(model)
+        return self._table[key] if key else None
+
+
+_model_index: Optional[ModelIndex] = None
+
+
+def _catalog_aliases() -> Dict[str, str]:
+    try:
+        from model_catalog import _STATIC_CATALOG
+    except Exception:
+        return {}
+    return {a: e.id for e in _STATIC_CATALOG for a in e.aliases}
+
+
+def get_model_index() -> ModelIndex:
+    """Shared index (built on first use from MODEL_PRICING + catalog aliases)."""
+    global _model_index
+    if _model_index is None:
+        _model_index = ModelIndex(MODEL_PRICING, _catalog_aliases())
+    return _model_index
+
+
 def _lookup_pricing(model: str) -> Optional[Dict[str, float]]:
-    """Exact match first, then prefix/substring fallback."""
-    if not model:
-        return None
-    # Exact match
-    p = MODEL_PRICING.get(model)
-    if p:
-        return p
-    # Strip provider prefix (e.g. "groq/llama-3.3-70b-versatile" → "llama-3.3-70b-versatile")
-    bare = model.split("/", 1)[-1] if "/" in model else model
-    if bare != model:
-        p = MODEL_PRICING.get(bare)
-        if p:
-            return p
-    # Fuzzy: find the LONGEST pricing key that matches (prefix or substring)
-    model_lower = bare.lower()
-    best_key = None
-    best_len = 0
-    for key, val in MODEL_PRICING.items():
-        kl = key.lower()
-        if (model_lower.startswith(kl) or kl in model_lower) and len(kl) > best_len:
-            best_key = key
-            best_len = len(kl)
-    return MODEL_PRICING[best_key] if best_key else None
+    """Exact match (also gateway-stripped and via catalog alias), then longest contained key."""
+    return get_model_index().pricing(model)
+
+
+def model_price(model: str, provider: str = "") -> Optional[Dict[str, float]]:
+    """Per-1M-token input/output price shown in catalog listings (same rules as cost calculation)."""
+    provider = (provider or "").strip().lower()
+    if provider.endswith("_web") or provider in FREE_PROVIDERS:
+        return {"input": 0.0, "output": 0.0}
+    p = _lookup_pricing(model)
+    return {"input": p["input"], "output": p["output"]} if p else None
 
 
 def calculate_cost_breakdown(
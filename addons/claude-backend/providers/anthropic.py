@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional, Generator
 
 from .enhanced import EnhancedProvider
 from .error_handler import ErrorTranslator
+from .hedging import on_cancel
 from .rate_limiter import get_rate_limit_coordinator
 
 logger = logging.getLogger(__name__)
@@ -287,6 +288,7 @@ class AnthropicProvider(EnhancedProvider):
             kwargs["tools"] = anthropic_tools
 
         with client.messages.stream(**kwargs) as stream:
+            on_cancel(getattr(stream, "response", None))
             text_chunks: List[str] = []
             for text in stream.text_stream:
                 if text:
@@ -18,6 +18,7 @@ from typing import Any, Dict, Optional, Generator, List
 import httpx
 
 from .base import BaseProvider
+from .hedging import on_cancel
 from prompt_caching import get_cache_manager
 from mcp_auth import get_mcp_auth_manager
 
@@ -495,6 +496,7 @@ class EnhancedProvider(BaseProvider):
         # pool/write standard
         _timeout = httpx.Timeout(connect=10.0, read=120.0, write=10.0, pool=5.0)
         with httpx.stream("POST", url, headers=headers, json=body, timeout=_timeout) as response:
+            on_cancel(response)
             if response.status_code != 200:
                 error_text = response.read().decode("utf-8", errors="ignore")
                 raise RuntimeError(f"HTTP {response.status_code}: {error_text[:400]}")
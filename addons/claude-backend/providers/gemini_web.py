@@ -21,13 +21,15 @@ import logging
 import os
 import random
 import re
-import threading
 import time
 import uuid
 from typing import Any, Dict, Generator, List, Optional, Tuple
 
+from async_runtime import get_runtime
+
 from .enhanced import EnhancedProvider
 from .rate_limiter import get_rate_limit_coordinator
+from .web_warmup import get_web_session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,9 @@ _GEMINI_GENERATE = (
     f"{_GEMINI_BASE}/_/BardChatUi/data/assistant.lamda.BardFrontendService/StreamGenerate"
 )
 _TOKEN_FILE   = "/data/session_gemini_web.json"
+# Background refresh cadence (providers/web_warmup.py); must stay below the
+# 1h SNlM0e age at which the chat path would refresh inline.
+WARMUP_INTERVAL = 2700
 
 _HEADERS = {
     "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
@@ -77,6 +82,7 @@ _HEADERS = {
 _stored_session: Optional[Dict[str, Any]] = None
 _sdk_client: Optional[Any] = None
 _sdk_client_fingerprint: str = ""
+_sdk_client_lock: Optional[asyncio.Lock] = None  # created on the shared loop
 
 # Model headers aligned with the reverse-engineered Gemini web flow used by
 # HanaokaYuzu/Gemini-API (legacy name gemini-3.0-pro maps to gemini-3.1-pro).
@@ -180,31 +186,12 @@ async def _close_sdk_client() -> None:
 
 
 def _run_async(coro):
-    """Run async coroutine from sync code."""
-    try:
-        asyncio.get_running_loop()
-        _has_loop = True
-    except RuntimeError:
-        _has_loop = False
-
-    if not _has_loop:
-        return asyncio.run(coro)
-
-    # Running loop in this thread: execute coroutine in a worker thread.
-    _box: Dict[str, Any] = {}
-
-    def _runner():
-        try:
-            _box["result"] = asyncio.run(coro)
-        except Exception as e:
-            _box["error"] = e
+    """Run async coroutine from sync code on the shared async runtime loop.
 
-    t = threading.Thread(target=_runner, daemon=True)
-    t.start()
-    t.join()
-    if "error" in _box:
-        raise _box["error"]
-    return _box.get("result")
+    The SDK client is bound to the loop it was initialised on, so every call
+    must go through the same loop for the client to be reused.
+    """
+    return get_runtime().run(coro, name="gemini_web")
 
 
 def _fetch_page_tokens(psid: str, psidts: str) -> Tuple[str, str]:
@@ -250,24 +237,44 @@ def _fetch_page_tokens(psid: str, psidts: str) -> Tuple[str, str]:
     return snlm0e, bl
 
 
+def _refresh_page_tokens(s: Dict[str, Any]) -> None:
+    """Fetch fresh SNlM0e/BL into session *s* and persist it."""
+    global _stored_session
+    snlm0e, bl = _fetch_page_tokens(s["psid"], s["psidts"])
+    s["snlm0e"] = snlm0e
+    s["bl"] = bl
+    s["snlm0e_fetched_at"] = int(time.time())
+    _stored_session = s
+    _save_session(s)
+
+
 def _ensure_snlm0e(s: Dict[str, Any]) -> str:
     """Return SNlM0e from session, refreshing if older than 1 hour."""
-    global _stored_session
     age = int(time.time()) - s.get("snlm0e_fetched_at", 0)
     if age > 3600:
         try:
-            snlm0e, bl = _fetch_page_tokens(s["psid"], s["psidts"])
-            s["snlm0e"] = snlm0e
-            s["bl"] = bl
-            s["snlm0e_fetched_at"] = int(time.time())
-            _stored_session = s
-            _save_session(s)
+            _refresh_page_tokens(s)
             logger.debug("GeminiWeb: SNlM0e refreshed")
         except Exception as e:
             logger.warning(f"GeminiWeb: could not refresh SNlM0e: {e}")
     return s.get("snlm0e", "")
 
 
+def warm_up() -> bool:
+    """Refresh page tokens and pre-initialise the SDK client (web_warmup hook).
+
+    Returns False when no session is stored; raises if the cookies are rejected.
+    """
+    s = _stored_session
+    if not s or not s.get("psid") or not s.get("psidts"):
+        return False
+    if HTTPX_AVAILABLE:
+        _refresh_page_tokens(s)
+    if GEMINI_WEBAPI_AVAILABLE:
+        _run_async(_get_sdk_client(s))
+    return True
+
+
 # ---------------------------------------------------------------------------
 # Public auth helpers
 # ---------------------------------------------------------------------------
@@ -295,6 +302,7 @@ def store_session(psid: str, psidts: str) -> Dict[str, Any]:
     _save_session(data)
     if GEMINI_WEBAPI_AVAILABLE:
         _run_async(_close_sdk_client())
+    get_web_session_pool().notify_session_changed("gemini_web")
     logger.info("GeminiWeb: session stored successfully")
     return data
 
@@ -304,7 +312,11 @@ def get_session_status() -> Dict[str, Any]:
     if not s:
         return {"configured": False}
     age_days = (int(time.time()) - s.get("stored_at", 0)) // 86400
-    return {"configured": True, "age_days": age_days}
+    return {
+        "configured": True,
+        "age_days": age_days,
+        "warmup": get_web_session_pool().status("gemini_web"),
+    }
 
 
 def clear_session() -> None:
@@ -317,49 +329,73 @@ def clear_session() -> None:
             os.remove(_TOKEN_FILE)
     except Exception:
         pass
+    get_web_session_pool().notify_session_changed("gemini_web")
 
 
 # ---------------------------------------------------------------------------
 # Core request / response
 # ---------------------------------------------------------------------------
 
-async def _send_message_sdk_async(s: Dict[str, Any], prompt: str, model: str = "") -> str:
-    """Primary path via gemini_webapi SDK (HanaokaYuzu/Gemini-API)."""
+async def _get_sdk_client(s: Dict[str, Any]) -> Any:
+    """Return the cached SDK client for session *s*, creating it on first use.
+
+    Runs on the shared web provider loop, so the initialised client (and its
+    auto_refresh task) survives between requests.
+    """
+    global _sdk_client, _sdk_client_fingerprint, _sdk_client_lock
     if not GEMINI_WEBAPI_AVAILABLE or GeminiClient is None:
         raise RuntimeError("gemini_webapi SDK not installed")
+    if _sdk_client_lock is None:
+        _sdk_client_lock = asyncio.Lock()
+    fingerprint = _session_fingerprint(s["psid"], s["psidts"])
+    async with _sdk_client_lock:
+        if _sdk_client is not None and _sdk_client_fingerprint == fingerprint:
+            return _sdk_client
+        await _close_sdk_client()
+        psid = s["psid"]
+        psidts = s["psidts"]
+        _ctor_errors: List[str] = []
+        _client = None
+        # Try multiple constructor styles for compatibility across gemini_webapi versions.
+        # Official docs use positional args first: GeminiClient(Secure_1PSID, Secure_1PSIDTS, ...).
+        _ctor_variants = [
+            {"args": (psid, psidts), "kwargs": {"proxy": None}},
+            {"args": (), "kwargs": {"Secure_1PSID": psid, "Secure_1PSIDTS": psidts, "proxy": None}},
+            {"args": (), "kwargs": {"cookies": {"__Secure-1PSID": psid, "__Secure-1PSIDTS": psidts}}},
+            {"args": (), "kwargs": {"psid": psid, "psidts": psidts}},
+            {"args": (), "kwargs": {"secure_1psid": psid, "secure_1psidts": psidts}},
+        ]
+        for _variant in _ctor_variants:
+            try:
+                _client = GeminiClient(*_variant["args"], **_variant["kwargs"])
+                break
+            except Exception as _ce:
+                _ctor_errors.append(f"{type(_ce).__name__}: {_ce}")
+        if _client is None:
+            raise RuntimeError(
+                "Gemini SDK client init failed (cookie ctor variants exhausted): "
+                + " | ".join(_ctor_errors[:3])
+            )
 
-    psid = s["psid"]
-    psidts = s["psidts"]
-    _ctor_errors: List[str] = []
-    _client = None
-    # Try multiple constructor styles for compatibility across gemini_webapi versions.
-    # Official docs use positional args first: GeminiClient(Secure_1PSID, Secure_1PSIDTS, ...).
-    _ctor_variants = [
-        {"args": (psid, psidts), "kwargs": {"proxy": None}},
-        {"args": (), "kwargs": {"Secure_1PSID": psid, "Secure_1PSIDTS": psidts, "proxy": None}},
-        {"args": (), "kwargs": {"cookies": {"__Secure-1PSID": psid, "__Secure-1PSIDTS": psidts}}},
-        {"args": (), "kwargs": {"psid": psid, "psidts": psidts}},
-        {"args": (), "kwargs": {"secure_1psid": psid, "secure_1psidts": psidts}},
-    ]
-    for _variant in _ctor_variants:
-        try:
-            _client = GeminiClient(*_variant["args"], **_variant["kwargs"])
-            break
-        except Exception as _ce:
-            _ctor_errors.append(f"{type(_ce).__name__}: {_ce}")
-    if _client is None:
-        raise RuntimeError(
-            "Gemini SDK client init failed (cookie ctor variants exhausted): "
-            + " | ".join(_ctor_errors[:3])
+        _base_timeout = _get_base_timeout()
+        await _client.init(
+            timeout=float(max(45, _base_timeout * 2)),
+            auto_close=False,
+            auto_refresh=True,
         )
+        _sdk_client = _client
+        _sdk_client_fingerprint = fingerprint
+        logger.debug("GeminiWeb: SDK client initialised")
+        return _client
+
+
+async def _send_message_sdk_async(s: Dict[str, Any], prompt: str, model: str = "") -> str:
+    """Primary path via gemini_webapi SDK (HanaokaYuzu/Gemini-API)."""
+    if not GEMINI_WEBAPI_AVAILABLE or GeminiClient is None:
+        raise RuntimeError("gemini_webapi SDK not installed")
 
+    _client = await _get_sdk_client(s)
     _base_timeout = _get_base_timeout()
-    await _client.init(
-        timeout=float(max(45, _base_timeout * 2)),
-        auto_close=True,
-        close_delay=120.0,
-        auto_refresh=True,
-    )
 
     model_name = (model or "").strip() or "gemini-3.0-flash"
     # Keep compatibility with our internal alias used in UI.
@@ -427,18 +463,14 @@ async def _send_message_sdk_async(s: Dict[str, Any], prompt: str, model: str = "
             return text.strip()
         raise RuntimeError("Gemini SDK returned empty response")
     except asyncio.TimeoutError as _te:
+        await _close_sdk_client()
         raise RuntimeError(
             f"Gemini SDK timeout after {_sdk_deadline:.0f}s (model={model_name})"
         ) from _te
-    finally:
-        try:
-            close_fn = getattr(_client, "close", None)
-            if callable(close_fn):
-                maybe_await = close_fn()
-                if asyncio.iscoroutine(maybe_await):
-                    await maybe_await
-        except Exception:
-            pass
+    except Exception:
+        # Drop the cached client so the next request re-initialises it.
+        await _close_sdk_client()
+        raise
 
 
 def _send_message_sdk(s: Dict[str, Any], prompt: str, model: str = "") -> str:
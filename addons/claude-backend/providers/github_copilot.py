@@ -20,6 +20,7 @@ from typing import Any, Dict, List, Optional, Generator
 
 from .enhanced import EnhancedProvider
 from .error_handler import ErrorTranslator
+from .hedging import on_cancel
 from .rate_limiter import get_rate_limit_coordinator
 from model_catalog import get_catalog
 
@@ -506,6 +507,7 @@ class GitHubCopilotProvider(EnhancedProvider):
         with httpx.stream(
             "POST", _COPILOT_CHAT_URL, headers=headers, json=body, timeout=_timeout
         ) as response:
+            on_cancel(response)
             if response.status_code == 401:
                 raise RuntimeError(
                     _t(
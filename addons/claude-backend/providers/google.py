@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional, Generator
 
 from .enhanced import EnhancedProvider
 from .error_handler import ErrorTranslator
+from .hedging import on_cancel
 from .rate_limiter import get_rate_limit_coordinator
 
 logger = logging.getLogger(__name__)
@@ -197,6 +198,7 @@ class GoogleProvider(EnhancedProvider):
             pool=10.0,
         )
         with httpx.stream("POST", url, json=body, timeout=_timeout) as response:
+            on_cancel(response)
             if response.status_code != 200:
                 error_text = response.read().decode("utf-8", errors="ignore")
                 # Quota esaurita = errore permanente, non ha senso ritentare
@@ -13,6 +13,7 @@ from typing import Any, Dict, Generator, List, Optional
 
 from .enhanced import EnhancedProvider
 from .rate_limiter import get_rate_limit_coordinator
+from .web_warmup import get_web_session_pool
 try:
     from .grok_web_advanced import (
         init_handshake as _adv_init_handshake,
@@ -46,6 +47,9 @@ _CHAT_URL = f"{_BASE_URL}/rest/app-chat/conversations/new"
 _CONV_LIST_URL = f"{_BASE_URL}/rest/app-chat/conversations"
 _RATE_LIMITS_URL = f"{_BASE_URL}/rest/rate-limits"
 _TOKEN_FILE = "/data/session_grok_web.json"
+_CHAT_TIMEOUT = (
+    httpx.Timeout(connect=15.0, read=40.0, write=30.0, pool=20.0) if HTTPX_AVAILABLE else None
+)
 
 _HEADERS = {
     "Accept": "*/*",
@@ -70,6 +74,12 @@ _discovery_cache: Dict[str, Any] = {"models": [], "ts": 0.0}
 _DISCOVERY_TTL_SECONDS = 3600
 _warned_missing_advanced = False
 
+# Background re-warm cadence (providers/web_warmup.py) and max age of a cached
+# anti-bot handshake; the handshake costs ~5 round trips to grok.com.
+WARMUP_INTERVAL = 900
+_HANDSHAKE_TTL_SECONDS = 1200
+_handshake_cache: Dict[str, Any] = {"key": "", "state": None, "ts": 0.0}
+
 # Candidate models for session-scoped discovery via /rest/rate-limits.
 # Keep web aliases first because they are what users pick in the UI.
 _DISCOVERY_CANDIDATES: List[str] = [
@@ -206,6 +216,75 @@ def _auth_headers(sso_token: str, cf_clearance: str = "", cf_cookies: str = "")
 _stored_session = _load_session()
 
 
+def _session_key(s: Dict[str, Any]) -> str:
+    """Fingerprint of the session cookies (pool / handshake cache key)."""
+    return "|".join(
+        (s.get(k) or "")[-16:] for k in ("sso_token", "cf_clearance", "cf_cookies")
+    )
+
+
+def _get_handshake(s: Dict[str, Any], build: bool = True) -> Any:
+    """Return a cached advanced handshake for session *s*, building it if needed."""
+    if not (ADVANCED_AVAILABLE and _adv_init_handshake and _adv_build_conversation_headers):
+        return None
+    key = _session_key(s)
+    cached = _handshake_cache
+    if (
+        cached["state"] is not None
+        and cached["key"] == key
+        and time.time() - cached["ts"] < _HANDSHAKE_TTL_SECONDS
+    ):
+        return cached["state"]
+    if not build:
+        return None
+    cookie_header = _cookie_header(
+        s["sso_token"],
+        s.get("cf_clearance", ""),
+        s.get("cf_cookies", ""),
+    )
+    for _imp in ("chrome136", "firefox133"):
+        state = _adv_init_handshake(cookie_header, impersonate=_imp)
+        if state:
+            logger.info("GrokWeb: advanced handshake initialized via %s", _imp)
+            _handshake_cache.update(key=key, state=state, ts=time.time())
+            return state
+    return None
+
+
+def _drop_handshake() -> None:
+    _handshake_cache.update(key="", state=None, ts=0.0)
+
+
+def _pooled_client(s: Dict[str, Any], headers: Dict[str, str], timeout: Any):
+    """Borrow the long-lived grok.com httpx client for session *s*."""
+    return get_web_session_pool().client(
+        "grok_web",
+        _session_key(s),
+        lambda: httpx.Client(headers=headers, timeout=timeout, follow_redirects=True),
+    )
+
+
+def warm_up() -> bool:
+    """Pre-build the anti-bot handshake and pooled client (web_warmup hook).
+
+    Returns False when no session is stored; raises if the session is rejected.
+    """
+    s = _stored_session
+    if not s or not s.get("sso_token") or not HTTPX_AVAILABLE:
+        return False
+    _drop_handshake()
+    try:
+        _get_handshake(s)
+    except Exception as e:
+        logger.debug(f"GrokWeb: warm-up handshake failed: {e}")
+    headers = _auth_headers(s["sso_token"], s.get("cf_clearance", ""), s.get("cf_cookies", ""))
+    with _pooled_client(s, headers, _CHAT_TIMEOUT) as client:
+        r = client.post(_RATE_LIMITS_URL, json={"requestKind": "DEFAULT", "modelName": "grok-3"})
+    if r.status_code == 401:
+        raise RuntimeError("Grok Web session rejected (HTTP 401) — reconnect with fresh cookies.")
+    return True
+
+
 def store_session(sso_token: str, cf_clearance: str = "", cf_cookies: str = "") -> Dict[str, Any]:
     """Validate and persist Grok Web session token."""
     global _stored_session, _warned_missing_advanced
@@ -316,6 +395,8 @@ def store_session(sso_token: str, cf_clearance: str = "", cf_cookies: str = "")
     }
     _stored_session = data
     _save_session(data)
+    _drop_handshake()
+    get_web_session_pool().notify_session_changed("grok_web")
     try:
         discover_available_models(force=True)
     except Exception:
@@ -337,6 +418,7 @@ def get_session_status() -> Dict[str, Any]:
         "has_cf_cookies": bool(s.get("cf_cookies")),
         "advanced_ready": bool(ADVANCED_AVAILABLE),
         "missing_deps": dedup_missing,
+        "warmup": get_web_session_pool().status("grok_web"),
     }
 
 
@@ -344,11 +426,13 @@ def clear_session() -> None:
     global _stored_session, _discovery_cache
     _stored_session = None
     _discovery_cache = {"models": [], "ts": 0.0}
+    _drop_handshake()
     try:
         if os.path.exists(_TOKEN_FILE):
             os.remove(_TOKEN_FILE)
     except Exception:
         pass
+    get_web_session_pool().notify_session_changed("grok_web")
 
 
 def _build_probe_payload(user_text: str, model: str) -> Dict[str, Any]:
@@ -904,21 +988,12 @@ class GrokWebProvider(EnhancedProvider):
         chosen_model = ""
         last_http_status = 0
         last_http_body = ""
-        _timeout = httpx.Timeout(connect=15.0, read=40.0, write=30.0, pool=20.0)
         impersonate_targets = _IMPERSONATE_TARGETS
-        cookie_header_for_adv = _cookie_header(
-            s["sso_token"],
-            s.get("cf_clearance", ""),
-            s.get("cf_cookies", ""),
-        )
         adv_state = None
         if ADVANCED_AVAILABLE and _adv_init_handshake and _adv_build_conversation_headers:
+            # Normally pre-built by the background warm-up; built inline on a cold start.
             try:
-                for _imp in ("chrome136", "firefox133"):
-                    adv_state = _adv_init_handshake(cookie_header_for_adv, impersonate=_imp)
-                    if adv_state:
-                        logger.info("GrokWeb: advanced handshake initialized via %s", _imp)
-                        break
+                adv_state = _get_handshake(s)
                 if not adv_state:
                     logger.warning("GrokWeb: advanced handshake unavailable for current session, using fallback flow")
             except Exception as _adv_e:
@@ -930,7 +1005,7 @@ class GrokWebProvider(EnhancedProvider):
                 ", ".join(missing or ["curl_cffi", "beautifulsoup4", "coincurve"]),
             )
         try:
-            with httpx.Client(headers=headers, timeout=_timeout, follow_redirects=True) as client:
+            with _pooled_client(s, headers, _CHAT_TIMEOUT) as client:
                 for model in model_candidates:
                     payload = self._build_payload(user_text, model)
                     logger.info("GrokWeb: trying model candidate '%s'", model)
@@ -976,7 +1051,11 @@ class GrokWebProvider(EnhancedProvider):
                                                 yield {"type": "text", "text": delta, "content": delta}
                                             last_text = full_msg
                                 break
+                            if last_http_status in (401, 403):
+                                # Stale anti-bot state: rebuild on the next request / warm-up.
+                                _drop_handshake()
                         except Exception as _adv_req_err:
+                            _drop_handshake()
                             logger.debug(f"GrokWeb: advanced request failed: {_adv_req_err}")
 
                     used_cffi = False
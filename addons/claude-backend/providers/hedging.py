@@ -0,0 +1,412 @@
+"""Hedged (race-mode) provider requests.
+
+A slow-but-alive primary provider used to delay the first token by however
+long it took to answer (plus retry backoff) before the fallback chain was
+even considered. With hedging enabled, the primary gets a deadline derived
+from its own time-to-first-token (TTFT) history; if no content has arrived
+by then, the next provider of the fallback chain is started in parallel.
+The first stream to produce content wins and the other one is cancelled.
+
+Opt-in: ``PROVIDER_HEDGING=true`` or ``"hedging": true`` (or an object with
+``enabled`` / ``min_delay`` / ``max_delay`` / ``default_delay`` seconds) in
+``fallback_config.json``.
+
+- TTFT histograms: fixed log-spaced buckets per provider; counts are halved
+  when they grow large so the p95 tracks recent behaviour.
+- Deadline: primary's p95 TTFT clamped to [min_delay, max_delay];
+  ``default_delay`` until enough samples exist.
+- Cancellation: each stream is pumped by its own thread. Providers register
+  their streaming HTTP response with ``on_cancel()``; cancelling a loser
+  shuts that connection down, so a pump blocked waiting for its next event
+  returns at once instead of holding its thread until the read timeout.
+  Without a registered response the pump stops at its next event.
+"""
+
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the TTFT histogram buckets; the last one is open.
+TTFT_BUCKETS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0, 32.0, 48.0, 64.0)
+MIN_SAMPLES = 10
+DECAY_AT = 500
+
+DEFAULT_CONFIG = {"enabled": False, "min_delay": 1.0, "max_delay": 15.0, "default_delay": 4.0}
+
+# Event types that do not count as "first token" (same set tracing uses).
+_NON_CONTENT = frozenset({"status", "error", "done", "fallback_notice", "usage"})
+
+_END = object()
+
+_pump_local = threading.local()
+
+
+def on_cancel(response: Any) -> Any:
+    """Let the hedged race abort *response* if this stream loses.
+
+    Providers call this right after opening a streaming HTTP response (an
+    ``httpx.Response``). Outside a hedge pump thread it does nothing.
+    Returns *response*.
+    """
+    scope = getattr(_pump_local, "scope", None)
+    if scope is not None and response is not None:
+        scope.add(response)
+    return response
+
+
+def _abort(response: Any) -> None:
+    """Close *response*, shutting its socket down first so a blocked read returns."""
+    if getattr(response, "is_closed", False):
+        return
+    try:
+        network = response.extensions.get("network_stream")
+        sock = network.get_extra_info("socket") if network is not None else None
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+    except Exception:
+        pass
+    try:
+        response.close()
+    except Exception:
+        pass
+
+
+class _CancelScope:
+    """Responses opened by one pump thread; aborted together on cancel."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses: List[Any] = []
+        self._state = "open"  # open | cancelled | finished
+
+    def add(self, response: Any) -> None:
+        with self._lock:
+            if self._state == "open":
+                self._responses.append(response)
+                return
+            late = self._state == "cancelled"
+        if late:
+            _abort(response)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._state != "open":
+                return
+            self._state = "cancelled"
+            responses, self._responses = self._responses, []
+        for response in responses:
+            _abort(response)
+
+    def finish(self) -> None:
+        with self._lock:
+            if self._state == "open":
+                self._state = "finished"
+            self._responses = []
+
+
+class TTFTHistogram:
+    """Bucketed time-to-first-token histogram for one provider."""
+
+    def __init__(self):
+        self.counts = [0] * (len(TTFT_BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        idx = len(TTFT_BUCKETS)
+        for i, bound in enumerate(TTFT_BUCKETS):
+            if seconds <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.total += 1
+        self.sum += seconds
+        if self.total >= DECAY_AT:
+            self.counts = [c // 2 for c in self.counts]
+            self.sum *= sum(self.counts) / self.total
+            self.total = sum(self.counts)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None without data)."""
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return TTFT_BUCKETS[i] if i < len(TTFT_BUCKETS) else TTFT_BUCKETS[-1] * 2
+        return TTFT_BUCKETS[-1] * 2
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{b:g}" for b in TTFT_BUCKETS] + ["inf"]
+        return {
+            "samples": self.total,
+            "avg_s": round(self.sum / self.total, 3) if self.total else None,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "buckets": {k: c for k, c in zip(labels, self.counts) if c},
+        }
+
+
+class HedgeController:
+    """TTFT histograms, deadlines and hedge statistics (shared by both managers)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ttft: Dict[str, TTFTHistogram] = {}
+        self.stats = {
+            "hedged_requests": 0,     # requests that ran in race mode
+            "hedges_started": 0,      # backup launched because the primary missed its deadline
+            "failovers": 0,           # backup launched because the primary failed first
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "all_failed": 0,
+            "cancelled_streams": 0,   # loser streams closed early
+            "wasted_events": 0,       # events the loser produced before cancellation
+        }
+
+    # --- configuration ---
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        cfg = dict(DEFAULT_CONFIG)
+        try:
+            from .manager import _load_fallback_config
+            raw = _load_fallback_config().get("hedging")
+        except Exception:
+            raw = None
+        if isinstance(raw, bool):
+            cfg["enabled"] = raw
+        elif isinstance(raw, dict):
+            for key, default in DEFAULT_CONFIG.items():
+                if key in raw:
+                    try:
+                        cfg[key] = bool(raw[key]) if key == "enabled" else float(raw[key])
+                    except (TypeError, ValueError):
+                        cfg[key] = default
+        env = os.getenv("PROVIDER_HEDGING", "")
+        if env:
+            cfg["enabled"] = env.lower() in ("true", "1", "yes")
+        return cfg
+
+    # --- TTFT ---
+
+    def record_ttft(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            self._ttft.setdefault(provider, TTFTHistogram()).observe(seconds)
+
+    def deadline(self, provider: str, cfg: Optional[Dict[str, Any]] = None) -> float:
+        cfg = cfg or self.config()
+        with self._lock:
+            hist = self._ttft.get(provider)
+            p95 = hist.quantile(0.95) if hist and hist.total >= MIN_SAMPLES else None
+        if p95 is None:
+            return cfg["default_delay"]
+        return max(cfg["min_delay"], min(cfg["max_delay"], p95))
+
+    # --- stats ---
+
+    def _bump(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def dashboard(self) -> Dict[str, Any]:
+        cfg = self.config()
+        with self._lock:
+            stats = dict(self.stats)
+            ttft = {p: h.to_dict() for p, h in self._ttft.items()}
+        launched = stats["hedges_started"] + stats["failovers"]
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / launched, 3) if launched else None
+        return {
+            "config": cfg,
+            "stats": stats,
+            "deadlines_s": {p: self.deadline(p, cfg) for p in ttft},
+            "ttft": ttft,
+        }
+
+    # --- racing ---
+
+    def race(
+        self,
+        open_stream: Callable[[str], Iterator[Dict[str, Any]]],
+        providers: List[str],
+        on_failure: Callable[[str, str], None],
+    ) -> "HedgedStream":
+        return HedgedStream(self, open_stream, providers, on_failure)
+
+
+class HedgedStream:
+    """Race *providers* (primary first, then one backup) and yield the winner's events.
+
+    ``winner`` is set once a stream produced content; ``provider`` is the
+    provider the yielded events belong to (the winner, or the last one to
+    fail). Earlier failures are reported through ``on_failure(provider,
+    message)`` from the consumer thread; the last one is yielded as an error
+    event, so callers handle it like a plain provider error.
+    """
+
+    def __init__(self, controller: HedgeController,
+                 open_stream: Callable[[str], Iterator[Dict[str, Any]]],
+                 providers: List[str], on_failure: Callable[[str, str], None]):
+        self.controller = controller
+        self.open_stream = open_stream
+        self.providers = providers
+        self.on_failure = on_failure
+        self.winner: Optional[str] = None
+        self.provider: str = providers[0]
+        self.attempted: List[str] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel: Dict[str, threading.Event] = {}
+        self._scopes: Dict[str, _CancelScope] = {}
+        self._started_at: Dict[str, float] = {}
+        self._events_seen: Dict[str, int] = {}
+
+    def _launch(self, provider: str) -> None:
+        cancel = threading.Event()
+        self._cancel[provider] = cancel
+        self._scopes[provider] = _CancelScope()
+        self._started_at[provider] = time.monotonic()
+        self._events_seen[provider] = 0
+        self.attempted.append(provider)
+        trace, parent = tracing.current(), tracing.current_span()
+        threading.Thread(
+            target=self._pump, args=(provider, cancel, trace, parent),
+            name=f"hedge-{provider}", daemon=True,
+        ).start()
+
+    def _pump(self, provider: str, cancel: threading.Event, trace, parent) -> None:
+        tracing.bind_worker(trace, parent)
+        _pump_local.scope = scope = self._scopes[provider]
+        stream = None
+        try:
+            stream = self.open_stream(provider)
+            for event in stream:
+                if cancel.is_set():
+                    break
+                self._queue.put((provider, event))
+        except Exception as e:
+            if not cancel.is_set():
+                self._queue.put((provider, {"type": "error", "message": str(e)}))
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+            scope.finish()
+            _pump_local.scope = None
+            tracing.bind(None)
+            self._queue.put((provider, _END))
+
+    def _stop(self, provider: str) -> None:
+        self._cancel[provider].set()
+        self._scopes[provider].cancel()
+
+    def _cancel_others(self, keep: str) -> None:
+        for provider, cancel in self._cancel.items():
+            if provider != keep and not cancel.is_set():
+                self._stop(provider)
+                self.controller._bump("cancelled_streams")
+
+    def __iter__(self) -> Generator[Dict[str, Any], None, None]:
+        ctl = self.controller
+        primary = self.providers[0]
+        backups = list(self.providers[1:])
+        deadline_s = ctl.deadline(primary)
+        ctl._bump("hedged_requests")
+        self._launch(primary)
+        hedge_at = time.monotonic() + deadline_s
+        buffered: Dict[str, List[Dict[str, Any]]] = {primary: []}
+        live = {primary}
+        try:
+            while True:
+                timeout = None
+                if self.winner is None and backups:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                try:
+                    provider, event = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._start_backup(backups, buffered, live, "deadline")
+                    continue
+
+                if self.winner is not None:
+                    if provider != self.winner:
+                        if event is not _END:
+                            ctl._bump("wasted_events")
+                        continue
+                    if event is _END:
+                        return
+                    yield event
+                    continue
+
+                if provider not in live:
+                    continue  # late events from a stream that already failed
+                etype = event.get("type") if isinstance(event, dict) else None
+                if event is _END or etype in ("error", "done"):
+                    # Failed (or finished empty) before producing content
+                    message = "stream ended without content" if event is _END else (
+                        str(event.get("message") or "") or "empty response")
+                    live.discard(provider)
+                    self._stop(provider)
+                    if live or backups:
+                        self.on_failure(provider, message)
+                        if not live:
+                            self._start_backup(backups, buffered, live, "failure")
+                        continue
+                    self.provider = provider
+                    ctl._bump("all_failed")
+                    yield event if etype == "error" else {"type": "error", "message": message}
+                    return
+                self._events_seen[provider] += 1
+                if etype in _NON_CONTENT:
+                    buffered[provider].append(event)
+                    continue
+
+                # First content: this provider wins, the others are cancelled
+                self.winner = self.provider = provider
+                ttft = time.monotonic() - self._started_at[provider]
+                ctl.record_ttft(provider, ttft)
+                if provider == primary:
+                    ctl._bump("primary_wins")
+                else:
+                    ctl._bump("hedge_wins")
+                    logger.info(f"Hedging: {provider} answered first (ttft {ttft:.2f}s), cancelling {primary}")
+                for other in live:
+                    if other != provider:
+                        ctl._bump("wasted_events", self._events_seen.get(other, 0))
+                self._cancel_others(provider)
+                yield from buffered.pop(provider, [])
+                yield event
+        finally:
+            for provider in self._cancel:
+                self._stop(provider)
+
+    def _start_backup(self, backups: List[str], buffered: Dict[str, list], live: set, reason: str) -> None:
+        backup = backups.pop(0)
+        logger.info(f"Hedging: starting {backup} alongside {self.providers[0]} ({reason})")
+        self.controller._bump("hedges_started" if reason == "deadline" else "failovers")
+        buffered[backup] = []
+        live.add(backup)
+        self._launch(backup)
+
+
+_controller: Optional[HedgeController] = None
+_controller_lock = threading.Lock()
+
+
+def get_hedge_controller() -> HedgeController:
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = HedgeController()
+    return _controller
@@ -6,6 +6,7 @@ This manager handles:
 - Error handling and retry logic
 - Provider statistics and monitoring
 - Rate-aware provider selection (v3.17.12+)
+- Optional hedged requests (see providers/hedging.py)
 """
 
 import os
@@ -15,6 +16,11 @@ from typing import Any, Dict, Generator, List, Optional, Tuple
 
 from .error_handler import ErrorTranslator
 from .ollama import resolve_ollama_base_url
+from .hedging import get_hedge_controller
+from .web_warmup import get_web_session_pool
+
+import metrics_exporter
+import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +85,7 @@ def _build_fallback_chain(primary: str) -> List[str]:
     The primary provider is excluded from the chain.
     Respects FALLBACK_ENABLED env var and fallback_config.json enabled flag.
     Respects custom priority order from /config/amira/fallback_config.json.
+    With model routing enabled, providers with a high live error rate move last.
     """
     # Load custom config
     fb_config = _load_fallback_config()
@@ -104,6 +111,13 @@ def _build_fallback_chain(primary: str) -> List[str]:
         env_var = _PROVIDER_KEY_ENV.get(prov, "")
         if env_var and os.getenv(env_var, ""):
             chain.append(prov)
+
+    # Adaptive routing (opt-in): demote providers that keep failing
+    try:
+        import model_router
+        chain = model_router.get_router().order_providers(chain)
+    except ImportError:
+        pass
     return chain
 
 
@@ -222,7 +236,9 @@ class ProviderManager:
                     "success_rate": float,
                     "failure_priority": int
                 }
-            }
+            },
+            "hedging": {"config": {...}, "stats": {...}, "deadlines_s": {...}, "ttft": {...}},
+            "web_warmup": {"enabled": bool, "running": bool, "providers": {...}}
         }
         """
         enhanced = self._get_enhanced_manager()
@@ -233,6 +249,8 @@ class ProviderManager:
             return {
                 "timestamp": time.time(),
                 "providers": self.provider_stats,
+                "hedging": get_hedge_controller().dashboard(),
+                "web_warmup": get_web_session_pool().readiness(),
                 "note": "Legacy stats - use enhanced manager for detailed dashboard"
             }
 
@@ -264,17 +282,41 @@ class ProviderManager:
         last_exception = None
         last_event = None
 
-        for prov in providers_to_try:
+        hedger = get_hedge_controller()
+        hedging = hedger.config()["enabled"]
+        attempted = set()
+
+        for idx, prov in enumerate(providers_to_try):
+            if prov in attempted:
+                continue  # already raced as a hedge
             try:
                 logger.info(f"ProviderManager: streaming with {prov}")
                 event_count = 0
                 content_started = False  # True after first content/text event
                 last_error_event = None
-                effective_model = model if prov == provider else (fallback_models or {}).get(prov)
+                first_token = False
+
+                def _open(p):
+                    effective_model = model if p == provider else (fallback_models or {}).get(p)
+                    return self._stream_with_provider(p, messages, intent_info, model=effective_model)
+
+                partner = providers_to_try[idx + 1] if hedging and not attempted and idx + 1 < len(providers_to_try) else None
+                attempted.add(prov)
+                if partner:
+                    stream = hedger.race(_open, [prov, partner], on_failure=self._record_failure)
+                    attempted.add(partner)
+                else:
+                    stream = _open(prov)
+                started = time.monotonic()
 
-                for event in self._stream_with_provider(prov, messages, intent_info, model=effective_model):
+                for event in stream:
                     event_count += 1
                     last_event = event
+                    if partner:
+                        prov = stream.provider  # events belong to the race winner
+                    elif not first_token and event.get("type") not in ("status", "error", "done", "usage"):
+                        first_token = True
+                        hedger.record_ttft(prov, time.monotonic() - started)
 
                     # Track whether content has started
                     if event.get("type") in ("content", "text", "delta"):
@@ -470,8 +512,12 @@ class ProviderManager:
             {k: v for k, v in m.items() if k in _ALLOWED_MSG_KEYS}
             for m in messages
         ]
-        for event in provider_instance.stream_chat(clean_messages, intent_info=intent_info):
-            yield event
+        yield from tracing.traced_stream(
+            f"provider:{provider}",
+            metrics_exporter.timed_stream(
+                provider, model, provider_instance.stream_chat(clean_messages, intent_info=intent_info)),
+            model=model,
+        )
 
     def _record_success(self, provider: str, event_count: int):
         """Record a successful provider call."""
@@ -5,6 +5,7 @@ Improvements over base ProviderManager:
 - Tracks rate limits for each provider
 - Prioritizes non-rate-limited providers for fallback
 - Exponential backoff on provider failures
+- Optional hedged requests: a backup provider races a slow primary
 """
 
 import os
@@ -15,6 +16,12 @@ from typing import Any, Dict, Generator, List, Optional
 from .rate_limiter import get_rate_limit_coordinator, RateLimitInfo
 from .error_handler import ErrorTranslator, ErrorType
 from .ollama import resolve_ollama_base_url
+from .hedging import get_hedge_controller
+from .web_warmup import get_web_session_pool
+
+import metrics_exporter
+import tracing
+
 try:
     from core.translations import get_lang_text
 except Exception:  # pragma: no cover - safe fallback if translations are unavailable
@@ -88,8 +95,14 @@ class EnhancedProviderManager:
         last_event = None
         last_error_event = None
 
+        hedger = get_hedge_controller()
+        hedging = hedger.config()["enabled"]
+        attempted = set()
+
         _primary = providers_to_try[0] if providers_to_try else provider
-        for prov in providers_to_try:
+        for idx, prov in enumerate(providers_to_try):
+            if prov in attempted:
+                continue  # already raced as a hedge
             try:
                 logger.info(
                     f"EnhancedProviderManager: attempting {prov} "
@@ -116,14 +129,29 @@ class EnhancedProviderManager:
                 event_count = 0
                 content_started = False
                 _fallback_notice_sent = False
-                effective_model = model if prov == provider else (fallback_models or {}).get(prov)
+                first_token = False
+
+                def _open(p):
+                    effective_model = model if p == provider else (fallback_models or {}).get(p)
+                    return self._stream_with_provider(p, messages, intent_info, model=effective_model)
 
-                for event in self._stream_with_provider(
-                    prov, messages, intent_info,
-                    model=effective_model,
-                ):
+                partner = self._hedge_partner(providers_to_try, idx) if hedging and not attempted else None
+                attempted.add(prov)
+                if partner:
+                    stream = hedger.race(_open, [prov, partner], on_failure=self._record_failure)
+                    attempted.add(partner)
+                else:
+                    stream = _open(prov)
+                started = time.monotonic()
+
+                for event in stream:
                     event_count += 1
                     last_event = event
+                    if partner:
+                        prov = stream.provider  # events belong to the race winner
+                    elif not first_token and event.get("type") not in ("status", "error", "done", "usage"):
+                        first_token = True
+                        hedger.record_ttft(prov, time.monotonic() - started)
 
                     # Track content start
                     if event.get("type") in ("content", "text", "delta"):
@@ -259,6 +287,13 @@ class EnhancedProviderManager:
                 ),
             }
 
+    def _hedge_partner(self, providers: List[str], idx: int) -> Optional[str]:
+        """First provider after *idx* that is not rate limited (hedge candidate)."""
+        for prov in providers[idx + 1:]:
+            if self.coordinator.get_limiter(prov).can_request()[0]:
+                return prov
+        return None
+
     def _order_providers_by_availability(self, providers: List[str]) -> List[str]:
         """Order providers by rate limit availability and failure history.
         
@@ -425,8 +460,12 @@ class EnhancedProviderManager:
         # --- stream & record rate-limit events ---
         limiter = self.coordinator.get_limiter(provider)
         limiter.record_request()
-        for event in provider_instance.stream_chat(clean_messages, intent_info=intent_info):
-            yield event
+        yield from tracing.traced_stream(
+            f"provider:{provider}",
+            metrics_exporter.timed_stream(
+                provider, model, provider_instance.stream_chat(clean_messages, intent_info=intent_info)),
+            model=model,
+        )
 
     def _record_success(self, provider: str, event_count: int):
         """Record successful request."""
@@ -499,4 +538,6 @@ class EnhancedProviderManager:
                 "failure_priority": self._get_failure_priority(provider),
             }
 
+        dashboard["hedging"] = get_hedge_controller().dashboard()
+        dashboard["web_warmup"] = get_web_session_pool().readiness()
         return dashboard
@@ -12,19 +12,29 @@ Supports:
 Providers without a public models endpoint (GitHub Models, OpenAI Codex,
 Claude Web, ChatGPT Web) are skipped silently; their static lists remain in use.
 
+Providers are fetched concurrently under an overall deadline; each result is
+merged into the on-disk cache (and handed to ``on_update``) as soon as it
+arrives, so a hanging endpoint never holds up the others.  Responses carrying
+an ETag / Last-Modified are revalidated with If-None-Match / If-Modified-Since
+on the next refresh; a 304 reuses the previous body.
+
 Usage:
     from providers.model_fetcher import refresh_all_providers, load_cache
-    results = refresh_all_providers(provider_keys, extra_config)
-    # results["updated"] -> {provider: [model_id, ...]}
+    results = refresh_all_providers(provider_keys, extra_config, on_update=callback)
+    # results["updated"] -> {provider: [model_id, ...]}   (arrived before the deadline)
     # results["errors"]  -> {provider: "error message"}
     # results["skipped"] -> [provider, ...]
+    # results["pending"] -> [provider, ...]   (still running; merged when they finish)
 """
 
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import httpx
 
@@ -34,6 +44,8 @@ from .ollama import resolve_ollama_base_url
 CACHE_FILE = "/data/amira_models_cache.json"
 SCHEMA_VERSION = 2
 TIMEOUT = 10.0
+REFRESH_DEADLINE = 20.0   # overall budget for refresh_all_providers (seconds)
+MAX_WORKERS = 8
 
 # Keywords identifying non-chat models (embeddings, TTS, image, moderation, etc.)
 _EXCLUDE = {
@@ -82,6 +94,40 @@ def _is_chat_model(model_id: str) -> bool:
     return not any(kw in m for kw in _EXCLUDE)
 
 
+# Conditional-request validators: {(url, params, credential): {"etag", "last_modified", "data"}}
+_VALIDATORS: Dict[tuple, Dict[str, Any]] = {}
+_validators_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def _get_json(url: str, headers: Optional[Dict[str, str]] = None,
+              params: Optional[Dict[str, str]] = None, timeout: float = TIMEOUT) -> Any:
+    """GET a models endpoint as JSON, revalidating with ETag / Last-Modified when possible."""
+    headers = dict(headers or {})
+    key = (url, tuple(sorted((params or {}).items())),
+           headers.get("Authorization") or headers.get("x-api-key") or "")
+    with _validators_lock:
+        prev = _VALIDATORS.get(key)
+    if prev:
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+    resp = httpx.get(url, headers=headers or None, params=params, timeout=timeout)
+    if resp.status_code == 304 and prev:
+        return prev["data"]
+    resp.raise_for_status()
+    data = resp.json()
+    etag = resp.headers.get("etag")
+    last_modified = resp.headers.get("last-modified")
+    with _validators_lock:
+        if etag or last_modified:
+            _VALIDATORS[key] = {"etag": etag, "last_modified": last_modified, "data": data}
+        else:
+            _VALIDATORS.pop(key, None)
+    return data
+
+
 def _normalize_api_key(api_key: str) -> str:
     """Normalize API key field.
 
@@ -102,9 +148,7 @@ def _fetch_openai_compat(base_url: str, api_key: str) -> List[str]:
     api_key = _normalize_api_key(api_key)
     url = base_url.rstrip("/") + "/models"
     headers = {"Authorization": f"Bearer {api_key}"}
-    resp = httpx.get(url, headers=headers, timeout=TIMEOUT)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, headers=headers)
     ids = [m.get("id", "") for m in data.get("data", []) if isinstance(m, dict)]
     return sorted(m for m in ids if m and _is_chat_model(m))
 
@@ -116,21 +160,16 @@ def _fetch_anthropic(api_key: str) -> List[str]:
         "anthropic-version": "2023-06-01",
         "content-type": "application/json",
     }
-    resp = httpx.get("https://api.anthropic.com/v1/models", headers=headers, timeout=TIMEOUT)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json("https://api.anthropic.com/v1/models", headers=headers)
     return sorted(m.get("id", "") for m in data.get("data", []) if isinstance(m, dict) and m.get("id"))
 
 
 def _fetch_google(api_key: str) -> List[str]:
     """Fetch Gemini models from Google Generative AI /v1beta/models."""
-    resp = httpx.get(
+    data = _get_json(
         "https://generativelanguage.googleapis.com/v1beta/models",
         params={"key": api_key},
-        timeout=TIMEOUT,
     )
-    resp.raise_for_status()
-    data = resp.json()
     models = []
     for m in data.get("models", []):
         name = m.get("name", "")
@@ -151,9 +190,7 @@ def _fetch_ollama(base_url: str, api_key: str = "") -> List[str]:
     key = _normalize_api_key(api_key)
     if key:
         headers["Authorization"] = f"Bearer {key}"
-    resp = httpx.get(url, headers=headers or None, timeout=5.0)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, headers=headers, timeout=5.0)
     return sorted(m.get("name", "") for m in data.get("models", []) if m.get("name"))
 
 
@@ -222,28 +259,45 @@ def fetch_provider_models(
     return None
 
 
+def _merge_into_cache(provider: str, models: List[str]) -> None:
+    """Write one provider's fresh list into the dynamic cache section."""
+    with _cache_lock:
+        bundle = load_cache_sections()
+        dynamic = dict(bundle.get("dynamic") or {})
+        dynamic[provider] = models
+        save_cache_sections(fixed=bundle.get("fixed") or {}, dynamic=dynamic)
+
+
 def refresh_all_providers(
     provider_keys: Dict[str, str],
     extra: Optional[Dict[str, str]] = None,
+    deadline: float = REFRESH_DEADLINE,
+    on_update: Optional[Callable[[str, List[str]], None]] = None,
 ) -> Dict[str, Any]:
-    """Fetch latest model lists for all configured providers.
+    """Fetch latest model lists for all configured providers, concurrently.
 
     Args:
         provider_keys: mapping of {provider_name: api_key}
         extra:         extra config values like ollama_base_url, custom_api_base
+        deadline:      seconds to wait for all providers before returning
+        on_update:     called with (provider, models) as each provider finishes,
+                       including those that finish after the deadline
 
     Returns:
         {
             "updated": {provider: [model_id, ...]},
             "errors":  {provider: "error description"},
-            "skipped": [provider, ...]
+            "skipped": [provider, ...],
+            "pending": [provider, ...]
         }
     """
     extra = extra or {}
     updated: Dict[str, List[str]] = {}
     errors: Dict[str, str] = {}
     skipped: List[str] = []
+    t0 = time.monotonic()
 
+    targets: List[str] = []
     for provider, api_key in provider_keys.items():
         if provider in _NO_ENDPOINT:
             skipped.append(provider)
@@ -251,21 +305,51 @@ def refresh_all_providers(
         if not api_key and provider not in {"ollama", "github_copilot", "grok_web"}:
             skipped.append(provider)
             continue
-
-        models = fetch_provider_models(provider, api_key, extra)
+        targets.append(provider)
+    if not targets:
+        return {"updated": updated, "errors": errors, "skipped": skipped, "pending": []}
+
+    def _fetch_and_merge(provider: str) -> Optional[List[str]]:
+        # Merged before the future completes: done() means the cache has it.
+        models = fetch_provider_models(provider, provider_keys[provider], extra)
+        if models is None:
+            return None
+        try:
+            _merge_into_cache(provider, models)
+        except Exception as e:
+            logger.warning(f"model_fetcher [{provider}]: cache write failed: {e}")
+        logger.info(f"model_fetcher [{provider}]: {len(models)} models "
+                    f"({time.monotonic() - t0:.1f}s)")
+        if on_update:
+            try:
+                on_update(provider, models)
+            except Exception as e:
+                logger.warning(f"model_fetcher [{provider}]: on_update failed: {e}")
+        return models
+
+    pool = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(targets)),
+                              thread_name_prefix="model-fetch")
+    futures = {}
+    for provider in targets:
+        futures[pool.submit(_fetch_and_merge, provider)] = provider
+    wait(futures, timeout=deadline)
+    # Stragglers keep running in the pool threads and are merged when they finish.
+    pool.shutdown(wait=False)
+
+    pending: List[str] = []
+    for future, provider in futures.items():
+        if not future.done():
+            pending.append(provider)
+            continue
+        models = future.result()
         if models is not None:
             updated[provider] = models
-            logger.info(f"model_fetcher [{provider}]: {len(models)} models")
         else:
             errors[provider] = "fetch failed or endpoint not available"
+    if pending:
+        logger.warning(f"model_fetcher: deadline {deadline:.0f}s reached, still waiting on {', '.join(pending)}")
 
-    if updated:
-        bundle = load_cache_sections()
-        dynamic = dict(bundle.get("dynamic") or {})
-        dynamic.update(updated)
-        save_cache_sections(fixed=bundle.get("fixed") or {}, dynamic=dynamic)
-
-    return {"updated": updated, "errors": errors, "skipped": skipped}
+    return {"updated": updated, "errors": errors, "skipped": skipped, "pending": pending}
 
 
 def _apply_blacklist(models: List[str]) -> List[str]:
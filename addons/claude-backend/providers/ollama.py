@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Generator
 
 from .enhanced import EnhancedProvider
 from .error_handler import ErrorTranslator
+from .hedging import on_cancel
 from .rate_limiter import get_rate_limit_coordinator
 
 logger = logging.getLogger(__name__)
@@ -312,6 +313,7 @@ class OllamaProvider(EnhancedProvider):
             headers=self._auth_headers() or None,
             timeout=_timeout,
         ) as response:
+            on_cancel(response)
             if response.status_code != 200:
                 error_text = response.read().decode("utf-8", errors="ignore")
                 raise RuntimeError(f"Ollama HTTP {response.status_code}: {error_text[:300]}")
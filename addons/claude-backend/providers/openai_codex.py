@@ -24,6 +24,7 @@ from typing import Any, Dict, List, Optional, Generator, Tuple
 
 from .enhanced import EnhancedProvider
 from .error_handler import ErrorTranslator
+from .hedging import on_cancel
 from .rate_limiter import get_rate_limit_coordinator
 
 logger = logging.getLogger(__name__)
@@ -444,6 +445,7 @@ class OpenAICodexProvider(EnhancedProvider):
         try:
             _timeout = httpx.Timeout(connect=10.0, read=120.0, write=10.0, pool=5.0)
             with httpx.stream("POST", self.api_url, headers=headers, json=body, timeout=_timeout, verify=self.verify_ssl) as response:
+                on_cancel(response)
                 if response.status_code != 200:
                     error_text = response.read().decode("utf-8", errors="ignore")
                     raise RuntimeError(f"HTTP {response.status_code}: {error_text}")
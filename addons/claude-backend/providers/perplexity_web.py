@@ -13,6 +13,7 @@ from typing import Any, Dict, Generator, List, Optional
 
 from .enhanced import EnhancedProvider
 from .rate_limiter import get_rate_limit_coordinator
+from .web_warmup import get_web_session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,8 @@ _BASE_URL = "https://www.perplexity.ai"
 _AUTH_SESSION_URL = f"{_BASE_URL}/api/auth/session"
 _SSE_ASK_URL = f"{_BASE_URL}/rest/sse/perplexity_ask"
 _TOKEN_FILE = "/data/session_perplexity_web.json"
+# Background session check cadence (providers/web_warmup.py)
+WARMUP_INTERVAL = 1200
 
 _HEADERS = {
     "Accept": "text/event-stream",
@@ -94,6 +97,38 @@ def _make_cookies(csrf_token: str, session_token: str) -> Dict[str, str]:
 _stored_session = _load_session()
 
 
+def _pooled_client(s: Dict[str, Any]):
+    """Borrow the long-lived perplexity.ai httpx client for session *s*."""
+    key = f"{s['csrf_token'][-12:]}|{s['session_token'][-12:]}"
+    cookies = _make_cookies(s["csrf_token"], s["session_token"])
+    return get_web_session_pool().client(
+        "perplexity_web",
+        key,
+        lambda: httpx.Client(headers=_HEADERS, cookies=cookies, timeout=30.0, follow_redirects=True),
+    )
+
+
+def warm_up() -> bool:
+    """Check the stored session over the pooled client (web_warmup hook).
+
+    Returns False when no session is stored; raises if the cookies are rejected.
+    """
+    s = _stored_session
+    if not s or not s.get("csrf_token") or not s.get("session_token") or not HTTPX_AVAILABLE:
+        return False
+    with _pooled_client(s) as client:
+        r = client.get(_AUTH_SESSION_URL, headers={"Accept": "application/json"}, timeout=15.0)
+    if r.status_code != 200:
+        raise RuntimeError(f"Perplexity Web auth check failed (HTTP {r.status_code}).")
+    try:
+        user = (r.json() or {}).get("user")
+    except Exception:
+        user = None
+    if not user:
+        raise RuntimeError("Perplexity Web session expired — reconnect with fresh cookies.")
+    return True
+
+
 def store_session(csrf_token: str, session_token: str) -> Dict[str, Any]:
     """Validate and persist Perplexity Web cookies."""
     global _stored_session
@@ -138,6 +173,7 @@ def store_session(csrf_token: str, session_token: str) -> Dict[str, Any]:
     }
     _stored_session = data
     _save_session(data)
+    get_web_session_pool().notify_session_changed("perplexity_web")
     logger.info("PerplexityWeb: session stored")
     return data
 
@@ -151,6 +187,7 @@ def get_session_status() -> Dict[str, Any]:
         "configured": True,
         "age_days": age_days,
         "email": s.get("email", ""),
+        "warmup": get_web_session_pool().status("perplexity_web"),
     }
 
 
@@ -162,6 +199,7 @@ def clear_session() -> None:
             os.remove(_TOKEN_FILE)
     except Exception:
         pass
+    get_web_session_pool().notify_session_changed("perplexity_web")
 
 
 class PerplexityWebProvider(EnhancedProvider):
@@ -379,7 +417,6 @@ class PerplexityWebProvider(EnhancedProvider):
             },
         }
 
-        cookies = _make_cookies(s["csrf_token"], s["session_token"])
         last_answer = ""
         _started = time.time()
         _events = 0
@@ -394,8 +431,8 @@ class PerplexityWebProvider(EnhancedProvider):
             len(user_text),
         )
         try:
-            with httpx.Client(headers=_HEADERS, cookies=cookies, timeout=_timeout, follow_redirects=True) as client:
-                with client.stream("POST", _SSE_ASK_URL, json=json_data) as resp:
+            with _pooled_client(s) as client:
+                with client.stream("POST", _SSE_ASK_URL, json=json_data, timeout=_timeout) as resp:
                     logger.info("PerplexityWeb: stream opened (http=%s)", resp.status_code)
                     if resp.status_code == 401:
                         logger.warning("PerplexityWeb: unauthorized session (401)")
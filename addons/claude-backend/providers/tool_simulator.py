@@ -24,7 +24,7 @@ from __future__ import annotations
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -197,6 +197,77 @@ def get_simulator_system_prompt(tool_schemas: Optional[List[Dict[str, Any]]] = N
 # Parser
 # ---------------------------------------------------------------------------
 
+def _parse_tool_call_block(raw: str, i: int) -> Optional[Dict[str, Any]]:
+    """Parse the JSON body of one <tool_call> block into a tool-loop call dict."""
+    raw = raw.strip()
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as _e0:
+        # Try to repair common model mistakes: trailing commas, single quotes
+        try:
+            repaired = _repair_json(raw)
+            payload = json.loads(repaired)
+        except json.JSONDecodeError as _e1:
+            payload = _parse_tool_call_relaxed(raw)
+            if payload is not None:
+                logger.info(f"ToolSimulator: relaxed parse recovered tool_call block #{i}")
+            else:
+                logger.warning(
+                    f"ToolSimulator: could not parse tool_call block #{i} "
+                    f"(orig_err={_e0}, repair_err={_e1}): {raw[:1000]}"
+                )
+                return None
+    if not isinstance(payload, dict):
+        logger.warning(f"ToolSimulator: tool_call block #{i} is not a JSON object")
+        return None
+
+    name = payload.get("name", "")
+    arguments = payload.get("arguments", {})
+
+    if not name:
+        logger.warning(f"ToolSimulator: tool_call block #{i} missing 'name' field")
+        return None
+
+    # Normalise arguments to JSON string (api.py expects string, then json.loads it)
+    if isinstance(arguments, dict):
+        arguments_str = json.dumps(arguments, ensure_ascii=False)
+    elif isinstance(arguments, str):
+        arguments_str = arguments
+    else:
+        arguments_str = json.dumps(arguments, ensure_ascii=False)
+
+    logger.info(f"ToolSimulator: found tool_call '{name}' (block #{i})")
+    return {
+        "id": f"sim_{i}",
+        "name": name,
+        "arguments": arguments_str,
+    }
+
+
+def _parse_function_calls_block(fc_text: str) -> List[Dict[str, Any]]:
+    """Parse one claude.ai-native <function_calls> block into tool-loop call dicts."""
+    calls = []
+    for j, invoke_match in enumerate(_INVOKE_RE.finditer(fc_text)):
+        inv_name = invoke_match.group(1).strip()
+        params_text = invoke_match.group(2)
+        arguments: Dict[str, Any] = {}
+        for param_match in _PARAM_RE.finditer(params_text):
+            p_name = param_match.group(1).strip()
+            p_val = param_match.group(2).strip()
+            try:
+                arguments[p_name] = json.loads(p_val)
+            except (json.JSONDecodeError, ValueError):
+                arguments[p_name] = p_val
+        if inv_name:
+            calls.append({
+                "id": f"invoke_{j}",
+                "name": inv_name,
+                "arguments": json.dumps(arguments, ensure_ascii=False),
+            })
+            logger.info(f"ToolSimulator: found <invoke> '{inv_name}' (block #{j})")
+    return calls
+
+
 def extract_tool_calls(text: str) -> List[Dict[str, Any]]:
     """Parse <tool_call> blocks from a model response.
 
@@ -207,70 +278,15 @@ def extract_tool_calls(text: str) -> List[Dict[str, Any]]:
     """
     calls = []
     for i, match in enumerate(_TOOL_CALL_RE.finditer(text)):
-        raw = match.group(1).strip()
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError as _e0:
-            # Try to repair common model mistakes: trailing commas, single quotes
-            try:
-                repaired = _repair_json(raw)
-                payload = json.loads(repaired)
-            except json.JSONDecodeError as _e1:
-                payload = _parse_tool_call_relaxed(raw)
-                if payload is not None:
-                    logger.info(f"ToolSimulator: relaxed parse recovered tool_call block #{i}")
-                else:
-                    logger.warning(
-                        f"ToolSimulator: could not parse tool_call block #{i} "
-                        f"(orig_err={_e0}, repair_err={_e1}): {raw[:1000]}"
-                    )
-                    continue
-
-        name = payload.get("name", "")
-        arguments = payload.get("arguments", {})
-
-        if not name:
-            logger.warning(f"ToolSimulator: tool_call block #{i} missing 'name' field")
-            continue
-
-        # Normalise arguments to JSON string (api.py expects string, then json.loads it)
-        if isinstance(arguments, dict):
-            arguments_str = json.dumps(arguments, ensure_ascii=False)
-        elif isinstance(arguments, str):
-            arguments_str = arguments
-        else:
-            arguments_str = json.dumps(arguments, ensure_ascii=False)
-
-        calls.append({
-            "id": f"sim_{i}",
-            "name": name,
-            "arguments": arguments_str,
-        })
-        logger.info(f"ToolSimulator: found tool_call '{name}' (block #{i})")
+        call = _parse_tool_call_block(match.group(1), i)
+        if call is not None:
+            calls.append(call)
 
     # ── Also parse claude.ai native <function_calls><invoke> format ──
     # claude.ai sometimes falls back to its own XML even when instructed to use <tool_call>.
     if not calls:
         for fc_match in _FUNCTION_CALLS_RE.finditer(text):
-            fc_text = fc_match.group(0)
-            for j, invoke_match in enumerate(_INVOKE_RE.finditer(fc_text)):
-                inv_name = invoke_match.group(1).strip()
-                params_text = invoke_match.group(2)
-                arguments: Dict[str, Any] = {}
-                for param_match in _PARAM_RE.finditer(params_text):
-                    p_name = param_match.group(1).strip()
-                    p_val = param_match.group(2).strip()
-                    try:
-                        arguments[p_name] = json.loads(p_val)
-                    except (json.JSONDecodeError, ValueError):
-                        arguments[p_name] = p_val
-                if inv_name:
-                    calls.append({
-                        "id": f"invoke_{j}",
-                        "name": inv_name,
-                        "arguments": json.dumps(arguments, ensure_ascii=False),
-                    })
-                    logger.info(f"ToolSimulator: found <invoke> '{inv_name}' (block #{j})")
+            calls.extend(_parse_function_calls_block(fc_match.group(0)))
 
     return calls
 
@@ -310,6 +326,176 @@ def clean_display_text(text: str) -> str:
     return cleaned.strip()
 
 
+# ---------------------------------------------------------------------------
+# Incremental parser — extract tool calls while the reply is still streaming
+# ---------------------------------------------------------------------------
+
+# Openers, tolerant of the markdown escaping web models apply (\<tool\_call\>)
+_STREAM_OPEN_RE = re.compile(
+    r"\\?<tool\\?_call\\?>|\\?<function\\?_calls\\?>|\[TOOL RESULT:[^\]\n]*\]",
+    re.IGNORECASE,
+)
+_STREAM_CLOSE_RE = {
+    "tool_call": re.compile(r"\\?<\\?/tool\\?_call\\?>", re.IGNORECASE),
+    "function_calls": re.compile(r"\\?<\\?/function\\?_calls\\?>", re.IGNORECASE),
+    "tool_result": re.compile(r"\[/TOOL RESULT\]", re.IGNORECASE),
+}
+_STREAM_OPEN_PREFIXES = ("<tool_call>", "<function_calls>")
+_STREAM_MAX_HOLD = 128  # longest tail held back as a possible opener
+_STREAM_CLOSE_OVERLAP = 24  # re-check this much old text for a closer split across chunks
+_MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+
+
+def _could_open(tail: str) -> bool:
+    """True if *tail* may still grow into a block opener."""
+    low = tail.lower()
+    bare = low.replace("\\", "")
+    if any(p.startswith(bare) for p in _STREAM_OPEN_PREFIXES):
+        return True
+    if "[tool result:".startswith(low):
+        return True
+    return low.startswith("[tool result:") and "]" not in low and "\n" not in low
+
+
+def _unescape_markdown(text: str) -> str:
+    return (
+        text.replace("\\<", "<")
+        .replace("\\>", ">")
+        .replace("\\_", "_")
+        .replace("\\#", "#")
+    )
+
+
+class IncrementalToolCallParser:
+    """Streaming counterpart of extract_tool_calls() + clean_display_text().
+
+    Feed text chunks as they arrive; each feed() returns the display text that
+    is safe to show (tool markup removed) and the tool calls whose blocks
+    closed in that chunk.  Only the unclosed block or a possible opener tail is
+    held back, so the accumulated reply is never re-scanned.
+
+    Differences from the batch functions: an unclosed block at finish() is
+    dropped rather than shown, and <function_calls> blocks are reported as soon
+    as they close instead of only when no <tool_call> block exists.
+
+    With *dispatchable* (a predicate over parsed calls), the parser also
+    notices when the reply starts to depend on results it does not have:
+    once a dispatchable call has closed, any further prose or a fabricated
+    [TOOL RESULT] block sets ``needs_result`` and that text is withheld.
+    Further tool calls right after the first one keep being collected.
+    """
+
+    def __init__(self, dispatchable: Optional[Callable[[Dict[str, Any]], bool]] = None) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.needs_result = False
+        self._dispatchable = dispatchable
+        self._dispatched = False
+        self._pending = ""
+        self._block: Optional[str] = None
+        self._block_escaped = False
+        self._scan_from = 0
+        self._tool_blocks = 0
+        self._ws = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Consume a chunk; return (display_text, newly_completed_calls)."""
+        if not chunk:
+            return "", []
+        self._pending += chunk
+        shown: List[str] = []
+        new_calls: List[Dict[str, Any]] = []
+        while True:
+            if self._block is None:
+                m = _STREAM_OPEN_RE.search(self._pending)
+                if m:
+                    self._show(shown, self._pending[:m.start()])
+                    tag = m.group(0)
+                    low = tag.lower()
+                    self._block = (
+                        "tool_result" if low.startswith("[")
+                        else "function_calls" if "function" in low
+                        else "tool_call"
+                    )
+                    if self._block == "tool_result" and self._dispatched:
+                        self.needs_result = True
+                    self._block_escaped = "\\" in tag
+                    self._pending = self._pending[m.end():]
+                    self._scan_from = 0
+                    continue
+                hold = self._hold_index(self._pending)
+                self._show(shown, self._pending[:hold])
+                self._pending = self._pending[hold:]
+                break
+            m = _STREAM_CLOSE_RE[self._block].search(self._pending, self._scan_from)
+            if not m:
+                self._scan_from = max(self._scan_from, len(self._pending) - _STREAM_CLOSE_OVERLAP)
+                break
+            closed = self._close_block(self._pending[:m.start()])
+            if self._dispatchable and any(self._dispatchable(c) for c in closed):
+                self._dispatched = True
+            new_calls.extend(closed)
+            self._pending = self._pending[m.end():]
+            self._block = None
+            self._scan_from = 0
+        self.calls.extend(new_calls)
+        return self._emit("".join(shown)), new_calls
+
+    def finish(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """Flush held-back text at end of stream; an unclosed block is discarded."""
+        shown: List[str] = []
+        if self._block is not None:
+            logger.debug(f"ToolSimulator: dropping unclosed <{self._block}> block at end of stream")
+        else:
+            self._show(shown, self._pending)
+        self._pending = ""
+        self._block = None
+        return self._emit("".join(shown)), []
+
+    def _show(self, shown: List[str], text: str) -> None:
+        """Queue display text, withholding prose written after a dispatchable call."""
+        if self._dispatched and text.strip():
+            self.needs_result = True
+        if not self.needs_result:
+            shown.append(text)
+
+    def _close_block(self, body: str) -> List[Dict[str, Any]]:
+        if self._block == "tool_call":
+            i = self._tool_blocks
+            self._tool_blocks += 1
+            raw = _unescape_markdown(body) if self._block_escaped else body
+            call = _parse_tool_call_block(raw, i)
+            return [call] if call is not None else []
+        if self._block == "function_calls":
+            return _parse_function_calls_block(_unescape_markdown(body) if self._block_escaped else body)
+        return []
+
+    @staticmethod
+    def _hold_index(text: str) -> int:
+        """Index where a possible (still incomplete) opener starts, else len(text)."""
+        start = max(0, len(text) - _STREAM_MAX_HOLD)
+        for i in range(start, len(text)):
+            if text[i] in "<\\[" and _could_open(text[i:]):
+                return i
+        return len(text)
+
+    def _emit(self, text: str) -> str:
+        """Apply clean_display_text()'s whitespace rules incrementally."""
+        if not text:
+            return ""
+        combined = self._ws + text
+        core = combined.rstrip()
+        tail = combined[len(core):]
+        if not self._started:
+            core = core.lstrip()
+        if not core:
+            self._ws = tail if self._started else ""
+            return ""
+        self._started = True
+        self._ws = tail
+        return _MULTI_NEWLINE_RE.sub("\n\n", core)
+
+
 # ---------------------------------------------------------------------------
 # Message normaliser — flatten tool-call history for no-native-tool providers
 # ---------------------------------------------------------------------------
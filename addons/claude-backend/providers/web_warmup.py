@@ -0,0 +1,244 @@
+"""web_warmup.py — Background warm-up and session pool for web (cookie) providers.
+
+gemini_web, grok_web and perplexity_web authenticate with browser cookies and
+must bootstrap per-session state (page tokens, anti-bot handshakes, SDK
+clients) before a chat request can go out.  Doing that on the first message
+after idle costs several seconds.  This module keeps that state warm:
+
+- one long-lived ``httpx.Client`` per provider, keyed by a session
+  fingerprint and rebuilt when the cookies change or a transport error occurs;
+- async SDKs (gemini_webapi) run on the process-wide loop from
+  ``async_runtime``, so SDK clients survive between requests instead of a
+  new loop + thread per call;
+- a background thread that calls each configured provider's ``warm_up()``
+  before its tokens go stale and records a readiness state.
+
+Provider modules expose ``warm_up() -> bool`` (False = no session stored) and
+``WARMUP_INTERVAL`` (seconds).  A failed warm-up never affects the chat path:
+the provider simply falls back to its own inline bootstrap.
+
+Set WEB_PROVIDER_WARMUP=0 to disable the background thread (the client pool
+and event loop are still used).
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from async_runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+WEB_PROVIDERS = ("gemini_web", "grok_web", "perplexity_web")
+SESSION_FILE = "/data/session_{provider}.json"
+
+TICK_SECONDS = 30
+RETRY_SECONDS = 300          # after a failed warm-up
+DEFAULT_INTERVAL = 1800
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WEB_PROVIDER_WARMUP", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _is_transport_error(exc: BaseException) -> bool:
+    return type(exc).__module__.split(".")[0] in ("httpx", "httpcore")
+
+
+class WebSessionPool:
+    """Long-lived clients, event loop and readiness tracking for web providers."""
+
+    def __init__(
+        self,
+        providers: Sequence[str] = WEB_PROVIDERS,
+        loader: Optional[Callable[[str], Any]] = None,
+        session_file: str = SESSION_FILE,
+    ):
+        self._providers = tuple(providers)
+        self._loader = loader or (lambda name: importlib.import_module(f"providers.{name}"))
+        self._session_file = session_file
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple[str, Any]] = {}
+        self._state: Dict[str, Dict[str, Any]] = {
+            p: {"state": "cold", "warmed_at": None, "duration_ms": None,
+                "last_error": None, "warmups": 0, "failures": 0, "next_at": 0.0}
+            for p in self._providers
+        }
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # HTTP clients
+    # ------------------------------------------------------------------
+
+    def get_client(self, provider: str, key: str, factory: Callable[[], Any]) -> Any:
+        """Return the provider's shared client, building it if *key* changed."""
+        stale = None
+        with self._lock:
+            entry = self._clients.get(provider)
+            if entry and entry[0] == key:
+                return entry[1]
+            client = factory()
+            if entry:
+                stale = entry[1]
+            self._clients[provider] = (key, client)
+        if stale is not None:
+            self._close(stale)
+        return client
+
+    @contextmanager
+    def client(self, provider: str, key: str, factory: Callable[[], Any]) -> Iterator[Any]:
+        """Borrow the shared client; it is NOT closed on exit.
+
+        A transport error escaping the block drops the client so the next
+        request starts with a fresh connection pool.
+        """
+        c = self.get_client(provider, key, factory)
+        try:
+            yield c
+        except Exception as e:
+            if _is_transport_error(e):
+                self.discard_client(provider, c)
+            raise
+
+    def discard_client(self, provider: str, client: Any = None) -> None:
+        with self._lock:
+            entry = self._clients.get(provider)
+            if not entry or (client is not None and entry[1] is not client):
+                return
+            del self._clients[provider]
+        self._close(entry[1])
+
+    @staticmethod
+    def _close(client: Any) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Warm-up
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background warm-up thread (idempotent)."""
+        if not warmup_enabled():
+            logger.info("WebWarmup: disabled (WEB_PROVIDER_WARMUP=0)")
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="web-provider-warmup", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def notify_session_changed(self, provider: str) -> None:
+        """Session cookies were stored or cleared: drop clients, re-warm soon."""
+        self.discard_client(provider)
+        with self._lock:
+            st = self._state.get(provider)
+            if st is not None:
+                st.update(state="cold", warmed_at=None, last_error=None, next_at=0.0)
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.time()
+            for provider in self._providers:
+                if self._stop.is_set():
+                    break
+                with self._lock:
+                    due = self._state[provider]["next_at"] <= now
+                if due:
+                    self.warm(provider)
+            self._wake.wait(TICK_SECONDS)
+            self._wake.clear()
+
+    def _has_session(self, provider: str) -> bool:
+        return os.path.exists(self._session_file.format(provider=provider))
+
+    def warm(self, provider: str) -> Dict[str, Any]:
+        """Warm *provider* now (blocking); returns its readiness entry."""
+        now = time.time()
+        if not self._has_session(provider):
+            # Do not import provider modules (and their SDKs) nobody has configured.
+            self._set(provider, state="unconfigured", next_at=now + TICK_SECONDS)
+            return self.status(provider)
+        self._set(provider, state="warming")
+        t0 = time.monotonic()
+        try:
+            module = self._loader(provider)
+            interval = float(getattr(module, "WARMUP_INTERVAL", DEFAULT_INTERVAL))
+            ok = module.warm_up()
+        except Exception as e:
+            with self._lock:
+                st = self._state[provider]
+                st.update(state="error", last_error=str(e)[:300],
+                          failures=st["failures"] + 1, next_at=time.time() + RETRY_SECONDS)
+            logger.warning(f"WebWarmup: {provider} warm-up failed: {e}")
+            return self.status(provider)
+        duration_ms = round((time.monotonic() - t0) * 1000, 1)
+        if not ok:
+            self._set(provider, state="unconfigured", next_at=time.time() + TICK_SECONDS)
+        else:
+            with self._lock:
+                st = self._state[provider]
+                st.update(state="ready", warmed_at=time.time(), duration_ms=duration_ms,
+                          last_error=None, warmups=st["warmups"] + 1,
+                          next_at=time.time() + interval)
+            logger.info(f"WebWarmup: {provider} ready ({duration_ms:.0f} ms)")
+        return self.status(provider)
+
+    def _set(self, provider: str, **fields: Any) -> None:
+        with self._lock:
+            self._state[provider].update(fields)
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+
+    def is_ready(self, provider: str) -> bool:
+        with self._lock:
+            return self._state.get(provider, {}).get("state") == "ready"
+
+    def status(self, provider: str) -> Dict[str, Any]:
+        with self._lock:
+            st = dict(self._state.get(provider) or {"state": "unknown"})
+            has_client = provider in self._clients
+        next_at = st.pop("next_at", None)
+        if st.get("state") == "ready" and next_at:
+            st["refresh_in_s"] = max(0, round(next_at - time.time()))
+        st["pooled_client"] = has_client
+        return st
+
+    def readiness(self) -> Dict[str, Any]:
+        return {
+            "enabled": warmup_enabled(),
+            "running": bool(self._thread and self._thread.is_alive()),
+            "event_loop": get_runtime().running,
+            "providers": {p: self.status(p) for p in self._providers},
+        }
+
+
+_pool: Optional[WebSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_web_session_pool() -> WebSessionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WebSessionPool()
+    return _pool
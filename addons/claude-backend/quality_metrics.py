@@ -15,6 +15,8 @@ from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 
+from metrics_core import RingBuffer, StreamingStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,9 +71,16 @@ class ResponseQualityAnalyzer:
         r"timeout|timed\s+out",
     ]
     
+    HISTORY_SIZE = 200
+
     def __init__(self):
         """Initialize analyzer."""
-        self.metrics_history: List[Dict[str, Any]] = []
+        # Last analyses only; aggregates below cover every response.
+        self.metrics_history = RingBuffer(self.HISTORY_SIZE)
+        self._scores = StreamingStats()
+        self._metric_scores: Dict[str, StreamingStats] = {}
+        self._levels: Dict[str, int] = {q.value: 0 for q in ResponseQuality}
+        self._by_provider: Dict[str, StreamingStats] = {}
     
     def _calculate_length_score(self, text: str) -> float:
         """Score based on response length.
@@ -256,6 +265,12 @@ class ResponseQualityAnalyzer:
         }
         
         self.metrics_history.append(analysis)
+        self._scores.observe(overall_score)
+        self._levels[quality_level.value] += 1
+        for m in metrics:
+            self._metric_scores.setdefault(m.name, StreamingStats()).observe(m.score)
+        if provider:
+            self._by_provider.setdefault(provider, StreamingStats()).observe(overall_score)
         
         return analysis
     
@@ -284,24 +299,23 @@ class ResponseQualityAnalyzer:
         return recommendations if recommendations else ["Response quality is good"]
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get quality metrics statistics."""
-        if not self.metrics_history:
+        """Get quality metrics statistics (streaming aggregates, constant time)."""
+        scores = self._scores.snapshot()
+        if not scores["count"]:
             return {"responses_analyzed": 0}
         
-        scores = [m["overall_score"] for m in self.metrics_history]
-        levels = [m["quality_level"] for m in self.metrics_history]
-        
         return {
-            "responses_analyzed": len(self.metrics_history),
-            "average_score": round(sum(scores) / len(scores), 3),
-            "min_score": min(scores),
-            "max_score": max(scores),
-            "quality_distribution": {
-                "excellent": levels.count("excellent"),
-                "good": levels.count("good"),
-                "fair": levels.count("fair"),
-                "poor": levels.count("poor"),
-            },
+            "responses_analyzed": scores["count"],
+            "average_score": scores["mean"],
+            "min_score": scores["min"],
+            "max_score": scores["max"],
+            "recent_score": scores["ewma"],
+            "p50_score": scores["p50"],
+            "p95_score": scores["p95"],
+            "quality_distribution": dict(self._levels),
+            "metrics": {name: st.snapshot() for name, st in self._metric_scores.items()},
+            "by_provider": {p: st.snapshot() for p, st in self._by_provider.items()},
+            "history_kept": len(self.metrics_history),
         }
 
 
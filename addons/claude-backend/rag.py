@@ -255,6 +255,8 @@ def _chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> List[st
     while start < len(text):
         end = min(start + chunk_size, len(text))
         chunks.append(text[start:end].strip())
+        if end == len(text):
+            break
         start = end - overlap
 
     return [c for c in chunks if c]
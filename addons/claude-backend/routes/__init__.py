@@ -140,6 +140,8 @@ ROUTE_REGISTRATIONS = {
         (catalog_bp, '/api/models/cache/status', 'api_models_cache_status', ['GET']),
         (catalog_bp, '/api/models/cache/clear', 'api_models_cache_clear', ['POST']),
         (catalog_bp, '/api/models/cache/refresh', 'api_models_cache_refresh', ['POST']),
+        (catalog_bp, '/api/routing', 'api_routing', ['GET']),
+        (catalog_bp, '/api/routing/explain', 'api_routing_explain', ['GET']),
     ],
     'analytics': [
         (analytics_bp, '/api/cache/semantic/stats', 'api_cache_semantic_stats', ['GET']),
@@ -184,6 +186,11 @@ ROUTE_REGISTRATIONS = {
         (system_bp, '/api/browser-errors', 'api_browser_errors_post', ['POST']),
         (system_bp, '/api/browser-errors', 'api_browser_errors_get', ['GET']),
         (system_bp, '/api/addon/restart', 'api_addon_restart', ['POST']),
+        (system_bp, '/api/debug/traces', 'api_debug_traces', ['GET']),
+        (system_bp, '/api/debug/async', 'api_debug_async', ['GET']),
+        (system_bp, '/api/debug/fast_path', 'api_debug_fast_path', ['GET']),
+        (system_bp, '/api/debug/startup', 'api_debug_startup', ['GET']),
+        (system_bp, '/metrics', 'api_metrics', ['GET']),
     ],
     'usage': [
         (usage_bp, '/api/usage_stats', 'api_usage_stats', ['GET']),
@@ -192,6 +199,8 @@ ROUTE_REGISTRATIONS = {
     ],
     'dashboard': [
         (dashboard_bp, '/dashboard_api/states', 'dashboard_api_states', ['GET']),
+        (dashboard_bp, '/dashboard_api/stream', 'dashboard_api_stream', ['GET']),
+        (dashboard_bp, '/dashboard_api/poll', 'dashboard_api_poll', ['GET']),
         (dashboard_bp, '/dashboard_api/history', 'dashboard_api_history', ['GET']),
         (dashboard_bp, '/dashboard_api/services/<domain>/<service>', 'dashboard_api_services', ['POST']),
         (dashboard_bp, '/custom_dashboards/<name>', 'custom_dashboards', ['GET']),
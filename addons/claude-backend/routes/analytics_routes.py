@@ -30,9 +30,11 @@ def api_semantic_cache_stats():
             return jsonify({"status": "error", "message": "Semantic cache not initialized"}), 503
 
         stats = cache.stats()
+        response_cache = _api.semantic_cache.get_response_cache()
         return jsonify({
             "status": "success",
             "cache_stats": stats,
+            "response_cache": response_cache.stats() if response_cache else None,
         }), 200
     except Exception as e:
         logger.error(f"Semantic cache stats error: {e}")
@@ -52,6 +54,9 @@ def api_semantic_cache_clear():
             return jsonify({"status": "error", "message": "Semantic cache not initialized"}), 503
 
         cache.clear()
+        response_cache = _api.semantic_cache.get_response_cache()
+        if response_cache:
+            response_cache.clear()
         return jsonify({
             "status": "success",
             "message": "Semantic cache cleared",
@@ -4,6 +4,8 @@ Endpoints:
 - GET /api/catalog/stats
 - GET /api/catalog/models
 - GET /api/get_models
+- GET /api/routing
+- GET /api/routing/explain
 """
 
 import logging
@@ -13,6 +15,8 @@ import re
 from copy import deepcopy
 from flask import Blueprint, request, jsonify
 
+import pricing
+
 logger = logging.getLogger(__name__)
 
 catalog_bp = Blueprint('catalog', __name__)
@@ -73,6 +77,7 @@ def api_catalog_models():
                 "max_output_tokens": e.max_output_tokens,
                 "reasoning": e.reasoning,
                 "pricing_tier": e.pricing_tier.value,
+                "price": pricing.model_price(e.id, e.provider),
                 "deprecated": e.deprecated,
             })
         return jsonify({"success": True, "models": result, "count": len(result)}), 200
@@ -300,6 +305,7 @@ def api_get_models():
                                 "ctx": entry.context_window,
                                 "out": entry.max_output_tokens,
                                 "tier": entry.pricing_tier.value,
+                                "price": pricing.model_price(mid, prov_key),
                                 "reasoning": entry.reasoning,
                             }
             except Exception as _e:
@@ -372,9 +378,9 @@ def api_models_cache_clear():
 @catalog_bp.route('/api/models/cache/refresh', methods=['POST'])
 def api_models_cache_refresh():
     """Refresh dynamic model cache now and re-apply it to runtime providers."""
-    import api as _api
+    from services.model_refresh_service import get_model_refresh_service
     try:
-        result = _api._refresh_model_cache_at_startup()
+        result = get_model_refresh_service().refresh_now()
         if not isinstance(result, dict):
             result = {"success": True}
         if result.get("success", True):
@@ -384,6 +390,7 @@ def api_models_cache_refresh():
                 "updated_count": int(result.get("updated_count", 0)),
                 "dynamic_count": int(result.get("dynamic_count", 0)),
                 "updated": result.get("updated", []),
+                "pending": result.get("pending", []),
             }), 200
         return jsonify({
             "success": False,
@@ -400,6 +407,7 @@ def api_models_cache_status():
     import api as _api
     try:
         from providers.model_fetcher import load_cache_sections
+        from services.model_refresh_service import get_model_refresh_service
 
         bundle = load_cache_sections() or {}
         fixed = bundle.get("fixed") or {}
@@ -483,7 +491,42 @@ def api_models_cache_status():
                 "models_nvidia_uncertain": len(nvidia_uncertain),
                 "models_uncertain": _count_models(uncertain),
             },
+            "refresh": get_model_refresh_service().status(),
         }), 200
     except Exception as e:
         logger.error(f"api_models_cache_status error: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@catalog_bp.route('/api/routing', methods=['GET'])
+def api_routing():
+    """Model router state: policy, per-model telemetry and recent routing decisions."""
+    import model_router
+    try:
+        return jsonify({"success": True, "routing": model_router.get_router().stats()}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@catalog_bp.route('/api/routing/explain', methods=['GET'])
+def api_routing_explain():
+    """Dry-run routing for ?intent= over the active model's fallback candidates."""
+    import api as _api
+    import model_fallback
+    import model_router
+    try:
+        intent_name = request.args.get("intent", "")
+        agent_id = None
+        if _api.AGENT_CONFIG_AVAILABLE:
+            try:
+                active = _api.agent_config.get_agent_manager().get_active_agent()
+                agent_id = active.id if active else None
+            except Exception:
+                pass
+        candidates = model_fallback.resolve_candidates(_api.AI_PROVIDER, _api.get_active_model(), agent_id)
+        explanation = model_router.get_router().explain(
+            intent_name, [(c.provider, c.model) for c in candidates]
+        )
+        return jsonify({"success": True, **explanation}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -11,11 +11,13 @@ Endpoints:
 - POST /api/conversation/process
 """
 
+import hashlib
+import io
 import json
 import logging
 import os
 from datetime import datetime
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, make_response, send_file
 
 logger = logging.getLogger(__name__)
 
@@ -90,152 +92,132 @@ def api_conversation_process():
 
 @conversation_bp.route('/api/conversations', methods=['GET'])
 def api_conversations_list():
-    """List all conversation sessions with metadata.
-    Optional query param ?source=card|bubble|chat to filter by source."""
+    """List conversation sessions with metadata, newest first.
+
+    Query params: ?source=card|bubble|chat filters by source; ?limit=N (default
+    MAX_CONVERSATIONS) and ?cursor=<next_cursor> page through the list.
+    Responses carry an ETag, so an unchanged sidebar refresh is a 304."""
     import api as _api
+    from services.conversation_index import get_conversation_index
     source_filter = request.args.get("source", "").strip().lower()
-    result = []
-    for sid, msgs in conversations.items():
-        if not msgs:
-            continue
-        # Exclude messaging sessions — they have their own dedicated UI section
-        if sid.startswith(("whatsapp_", "telegram_")):
-            continue
-        # Extract first user message as title (strip [CONTEXT: ...] blocks)
-        title = _t("New conversation", "Nuova conversazione", "Nueva conversacion", "Nouvelle conversation")
-        for msg in msgs:
-            if msg.get("role") == "user":
-                content = msg.get("content", "")
-                if isinstance(content, str):
-                    clean = _api._strip_context_blocks(content)
-                    if clean:
-                        title = clean[:50] + ("..." if len(clean) > 50 else "")
-                    break
-        # Determine source: bubble_, card_ or chat
-        source = "bubble" if sid.startswith("bubble_") else ("card" if sid.startswith("card_") else "chat")
-
-        # Extract timestamp for sorting/date grouping
-        if source in ("bubble", "card") and "_" in sid:
-            # Parse bubble session_id: bubble_<base36_timestamp>_<random>
-            try:
-                parts = sid.split("_")
-                if len(parts) >= 2:
-                    timestamp_b36 = parts[1]
-                    last_updated = int(timestamp_b36, 36)  # Decode base36 timestamp
-                else:
-                    last_updated = sid
-            except Exception:
-                last_updated = sid
-        else:
-            # For chat: ID is typically a numeric timestamp
-            try:
-                last_updated = int(sid) if sid.isdigit() else sid
-            except Exception:
-                last_updated = sid if msgs else 0
-
-        # Apply source filter if requested
-        if source_filter and source != source_filter:
-            continue
-        result.append({
-            "id": sid,
-            "title": title,
-            "message_count": len(msgs),
-            "last_updated": last_updated,
-            "source": source
-        })
-    # Sort by last_updated descending
-    result.sort(key=lambda x: (x["last_updated"] if isinstance(x["last_updated"], (int, float)) else 0), reverse=True)
-    return jsonify({"conversations": result[:_api.MAX_CONVERSATIONS]}), 200
+    cursor = request.args.get("cursor", "").strip()
+    try:
+        limit = max(1, min(500, int(request.args.get("limit") or _api.MAX_CONVERSATIONS)))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    entries, next_cursor, version = get_conversation_index().page(
+        conversations, source=source_filter, cursor=cursor, limit=limit,
+    )
+    etag = hashlib.md5(
+        f"{version}|{source_filter}|{cursor}|{limit}|{_lang()}".encode("utf-8")
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        resp = make_response("", 304)
+        resp.set_etag(etag)
+        return resp
+
+    default_title = _t("New conversation", "Nuova conversazione", "Nueva conversacion", "Nouvelle conversation")
+    result = [{
+        "id": e["id"],
+        "title": e["title"] or default_title,
+        "message_count": e["message_count"],
+        "last_updated": e["last_updated"],
+        "source": e["source"],
+    } for e in entries]
+    resp = make_response(jsonify({"conversations": result, "next_cursor": next_cursor}), 200)
+    resp.set_etag(etag)
+    return resp
 
 
 @conversation_bp.route('/api/snapshots', methods=['GET'])
 def api_snapshots_list():
     """List all file snapshots (backups) created by Amira."""
-    import api as _api
-    if not os.path.isdir(_api.SNAPSHOTS_DIR):
-        return jsonify({"snapshots": []}), 200
-
+    from services.snapshot_service import get_snapshot_store
     snapshots = []
-    for filename in os.listdir(_api.SNAPSHOTS_DIR):
-        if filename.endswith(".meta"):
-            continue
-        meta_path = os.path.join(_api.SNAPSHOTS_DIR, filename + ".meta")
-        if os.path.isfile(meta_path):
-            try:
-                with open(meta_path, "r") as f:
-                    meta = json.load(f)
-                # Parse timestamp from snapshot_id: YYYYMMDD_HHMMSS_filename
-                ts_str = meta.get("timestamp", "")
-                try:
-                    ts_dt = datetime.strptime(ts_str, "%Y%m%d_%H%M%S")
-                    formatted_date = ts_dt.strftime("%d/%m/%Y %H:%M:%S")
-                    sort_key = ts_dt.timestamp()
-                except Exception:
-                    formatted_date = ts_str
-                    sort_key = 0
-                snapshots.append({
-                    "id": meta.get("snapshot_id", filename),
-                    "original_file": meta.get("original_file", filename),
-                    "timestamp": ts_str,
-                    "formatted_date": formatted_date,
-                    "size": meta.get("size", 0),
-                    "sort_key": sort_key
-                })
-            except Exception as e:
-                logger.debug(f"Error reading snapshot meta {filename}: {e}")
-
-    # Sort by timestamp descending (newest first)
-    snapshots.sort(key=lambda x: x.get("sort_key", 0), reverse=True)
-    # Remove sort_key from output
-    for s in snapshots:
-        s.pop("sort_key", None)
-
+    for meta in reversed(get_snapshot_store().list()):  # newest first
+        ts_str = meta.get("timestamp", "")
+        try:
+            formatted_date = datetime.strptime(ts_str, "%Y%m%d_%H%M%S").strftime("%d/%m/%Y %H:%M:%S")
+        except Exception:
+            formatted_date = ts_str
+        snapshots.append({
+            "id": meta.get("snapshot_id", ""),
+            "original_file": meta.get("original_file", ""),
+            "timestamp": ts_str,
+            "formatted_date": formatted_date,
+            "size": meta.get("size", 0),
+        })
     return jsonify({"snapshots": snapshots}), 200
 
 
-@conversation_bp.route('/api/conversations/<session_id>', methods=['GET'])
-def api_conversation_get(session_id):
-    """Get a specific conversation session."""
+def _display_messages(msgs):
+    """Filter a session to user-facing messages (user/assistant with text content)."""
     import api as _api
-    if session_id in conversations:
-        # Filter to only return displayable messages (user/assistant with non-empty string content)
-        msgs = conversations.get(session_id, [])
-        display_msgs = []
-        for m in msgs:
-            role = m.get("role", "")
-            content = m.get("content", "")
-            # For multimodal messages, extract text content
-            if isinstance(content, list):
-                # Extract text from content blocks (Anthropic format: [{type:text, text:...}])
-                text_parts = []
-                for block in content:
-                    if isinstance(block, dict):
-                        if block.get("type") == "text":
-                            text_parts.append(block.get("text", ""))
-                        elif isinstance(block.get("text"), str):
-                            text_parts.append(block["text"])
-                        # Skip tool_use / tool_result blocks — not user-facing
-                content = "\n".join(text_parts) if text_parts else ""
-
-            if role in ("user", "assistant") and isinstance(content, str) and content.strip():
-                # Skip internal tool-call artifact messages
-                if role == "assistant" and _api._is_tool_call_artifact(content, m):
+    display_msgs = []
+    for m in msgs:
+        role = m.get("role", "")
+        content = m.get("content", "")
+        # For multimodal messages, extract text content
+        if isinstance(content, list):
+            # Extract text from content blocks (Anthropic format: [{type:text, text:...}])
+            text_parts = []
+            for block in content:
+                if isinstance(block, dict):
+                    if block.get("type") == "text":
+                        text_parts.append(block.get("text", ""))
+                    elif isinstance(block.get("text"), str):
+                        text_parts.append(block["text"])
+                    # Skip tool_use / tool_result blocks — not user-facing
+            content = "\n".join(text_parts) if text_parts else ""
+
+        if role in ("user", "assistant") and isinstance(content, str) and content.strip():
+            # Skip internal tool-call artifact messages
+            if role == "assistant" and _api._is_tool_call_artifact(content, m):
+                continue
+            # Strip [CONTEXT: ...] blocks from user messages for clean display
+            if role == "user":
+                content = _api._strip_context_blocks(content)
+                if not content.strip():
                     continue
-                # Strip [CONTEXT: ...] blocks from user messages for clean display
-                if role == "user":
-                    content = _api._strip_context_blocks(content)
-                    if not content.strip():
-                        continue
-                msg_data = {"role": role, "content": content}
-                # Include model/provider metadata for assistant messages
-                if role == "assistant":
-                    if m.get("model"):
-                        msg_data["model"] = m["model"]
-                    if m.get("provider"):
-                        msg_data["provider"] = m["provider"]
-                display_msgs.append(msg_data)
-        return jsonify({"session_id": session_id, "messages": display_msgs}), 200
-    return jsonify({"error": "Conversation not found"}), 404
+            msg_data = {"role": role, "content": content}
+            # Include model/provider metadata for assistant messages
+            if role == "assistant":
+                if m.get("model"):
+                    msg_data["model"] = m["model"]
+                if m.get("provider"):
+                    msg_data["provider"] = m["provider"]
+            display_msgs.append(msg_data)
+    return display_msgs
+
+
+@conversation_bp.route('/api/conversations/<session_id>', methods=['GET'])
+def api_conversation_get(session_id):
+    """Get a specific conversation session.
+
+    Without query params all displayable messages are returned.  ?limit=N
+    returns the last N; add ?before=<start> (the ``start`` of the previous
+    page) to load older ones."""
+    from services.conversation_index import get_conversation_index
+    msgs = conversations.get(session_id)
+    if msgs is None:
+        return jsonify({"error": "Conversation not found"}), 404
+    display_msgs = get_conversation_index().display_messages(session_id, msgs, _display_messages)
+    total = len(display_msgs)
+    try:
+        limit = int(request.args["limit"]) if request.args.get("limit") else None
+        before = int(request.args["before"]) if request.args.get("before") else total
+    except ValueError:
+        return jsonify({"error": "limit and before must be integers"}), 400
+    end = max(0, min(before, total))
+    start = 0 if limit is None else max(0, end - max(1, limit))
+    return jsonify({
+        "session_id": session_id,
+        "messages": display_msgs[start:end],
+        "total": total,
+        "start": start,
+        "has_more": start > 0,
+    }), 200
 
 
 @conversation_bp.route('/api/conversations/<session_id>', methods=['DELETE'])
@@ -244,7 +226,7 @@ def api_conversation_delete(session_id):
     if session_id in conversations:
         del conversations[session_id]
         import api as _api
-        _api.save_conversations()
+        _api.save_conversations(session_id)
     session_last_intent.pop(session_id, None)
     return jsonify({"status": "ok", "message": f"Session '{session_id}' cleared."}), 200
 
@@ -278,24 +260,13 @@ def api_snapshots_restore():
 
 @conversation_bp.route('/api/snapshots/<snapshot_id>', methods=['DELETE'])
 def api_delete_snapshot(snapshot_id):
-    """Delete a specific snapshot (backup file + metadata)."""
-    import api as _api
+    """Delete a specific snapshot (index entry; the blob goes once unreferenced)."""
+    from services.snapshot_service import get_snapshot_store
     try:
         if not snapshot_id or ".." in snapshot_id or "/" in snapshot_id:
             return jsonify({"error": "Invalid snapshot_id"}), 400
 
-        snap_path = os.path.join(_api.SNAPSHOTS_DIR, snapshot_id)
-        meta_path = snap_path + ".meta"
-        deleted = False
-        if os.path.isfile(snap_path):
-            os.remove(snap_path)
-            deleted = True
-        if os.path.isfile(meta_path):
-            os.remove(meta_path)
-            deleted = True
-
-        if deleted:
-            logger.info(f"Snapshot deleted: {snapshot_id}")
+        if get_snapshot_store().delete(snapshot_id):
             return jsonify({"status": "success", "message": f"Snapshot '{snapshot_id}' deleted"}), 200
         return jsonify({"error": f"Snapshot '{snapshot_id}' not found"}), 404
     except Exception as e:
@@ -306,28 +277,19 @@ def api_delete_snapshot(snapshot_id):
 @conversation_bp.route('/api/snapshots/<snapshot_id>/download', methods=['GET'])
 def api_download_snapshot(snapshot_id):
     """Download a backup snapshot file."""
-    import api as _api
+    from services.snapshot_service import get_snapshot_store
     try:
         if not snapshot_id or ".." in snapshot_id or "/" in snapshot_id:
             return jsonify({"error": "Invalid snapshot_id"}), 400
 
-        snap_path = os.path.join(_api.SNAPSHOTS_DIR, snapshot_id)
-        meta_path = snap_path + ".meta"
-
-        if not os.path.isfile(snap_path):
+        store = get_snapshot_store()
+        meta = store.get(snapshot_id)
+        data = store.read(snapshot_id) if meta else None
+        if data is None:
             return jsonify({"error": f"Snapshot '{snapshot_id}' not found"}), 404
 
-        # Read metadata to get original filename
-        original_filename = snapshot_id  # default fallback
-        timestamp = ""
-        if os.path.isfile(meta_path):
-            try:
-                with open(meta_path, "r") as f:
-                    meta = json.load(f)
-                    original_filename = meta.get("original_file", snapshot_id)
-                    timestamp = meta.get("timestamp", "")
-            except Exception:
-                pass
+        original_filename = meta.get("original_file", snapshot_id)
+        timestamp = meta.get("timestamp", "")
 
         # Generate download filename: original_name.YYYYMMDD_HHMMSS.ext
         # E.g.: automations.20260220_143022.yaml
@@ -340,7 +302,7 @@ def api_download_snapshot(snapshot_id):
 
         logger.info(f"Snapshot download: {snapshot_id} as {dl_filename}")
         return send_file(
-            snap_path,
+            io.BytesIO(data),
             as_attachment=True,
             download_name=dl_filename,
             mimetype="application/octet-stream"
@@ -2,6 +2,8 @@
 
 Endpoints:
 - GET /dashboard_api/states
+- GET /dashboard_api/stream   (SSE: snapshot + diffs for the requested entity_ids)
+- GET /dashboard_api/poll     (diff poll / long-poll fallback of /stream)
 - GET /dashboard_api/history
 - POST /dashboard_api/services/<domain>/<service>
 - GET /custom_dashboards/<name>
@@ -12,10 +14,10 @@ Endpoints:
 import logging
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import requests
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
 logger = logging.getLogger(__name__)
 
@@ -38,31 +40,108 @@ def dashboard_api_states():
         return jsonify({"error": str(e)}), 502
 
 
+_ENTITY_ID_RE = re.compile(r'^[a-z_]+\.[a-z0-9_]+$')
+_MAX_STREAM_ENTITIES = 500
+
+
+def _parse_entity_ids(raw: str):
+    """Split + validate a comma separated entity_ids query param -> (list, error)."""
+    ids = list(dict.fromkeys(e.strip() for e in (raw or "").split(",") if e.strip()))
+    if not ids:
+        return None, "entity_ids parameter required"
+    if len(ids) > _MAX_STREAM_ENTITIES:
+        return None, f"Too many entity_ids (max {_MAX_STREAM_ENTITIES})"
+    for eid in ids:
+        if not _ENTITY_ID_RE.match(eid):
+            return None, f"Invalid entity_id: {eid}"
+    return ids, None
+
+
+@dashboard_bp.route('/dashboard_api/stream')
+def dashboard_api_stream():
+    """SSE push of only the requested entities.
+
+    Sends ``event: snapshot`` once, then ``event: diff`` with the entities that
+    changed (coalesced), fed from one shared HA subscription for all clients.
+    """
+    from services.state_stream_service import MAX_STREAM_CLIENTS, get_hub, sse_stream
+    entity_ids, error = _parse_entity_ids(request.args.get('entity_ids', ''))
+    if error:
+        return jsonify({"error": error}), 400
+    if get_hub().stream_clients >= MAX_STREAM_CLIENTS:
+        # Streams hold a worker thread each; send extra clients to /poll
+        return jsonify({"error": "stream capacity reached", "fallback": "poll"}), 503, {"Retry-After": "30"}
+    return Response(
+        stream_with_context(sse_stream(entity_ids)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@dashboard_bp.route('/dashboard_api/poll')
+def dashboard_api_poll():
+    """Poll variant of /dashboard_api/stream, served from the shared hub cache.
+
+    ``since=0`` (default) returns a snapshot; otherwise only the requested
+    entities changed after ``since``. By default it answers immediately (a
+    cheap filtered diff, no HA call); ``timeout`` (max 30s) turns it into a
+    long-poll. Clients pass the returned ``seq`` as the next ``since``.
+    """
+    from services.state_stream_service import get_hub
+    entity_ids, error = _parse_entity_ids(request.args.get('entity_ids', ''))
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        since = max(0, int(request.args.get('since', 0)))
+        timeout = min(max(float(request.args.get('timeout', 0)), 0), 30)
+    except ValueError:
+        return jsonify({"error": "since/timeout must be numbers"}), 400
+
+    hub = get_hub()
+    hub.lease(entity_ids)
+    if since == 0 or since > hub.seq:
+        # First call, or the hub restarted since the client's cursor: full snapshot
+        seq, states = hub.changes_since(entity_ids, 0)
+        return jsonify({"seq": seq, "full": True, "states": states}), 200
+    if timeout > 0:
+        seq, states = hub.wait_changes(entity_ids, since, timeout)
+    else:
+        seq, states = hub.changes_since(entity_ids, since)
+    return jsonify({"seq": seq, "full": False, "states": states}), 200
+
+
 @dashboard_bp.route('/dashboard_api/history')
 def dashboard_api_history():
-    """Proxy GET /api/history/period using server-side SUPERVISOR_TOKEN."""
-    import api
+    """History for dashboard charts, in HA's ``minimal_response`` shape.
+
+    Served from the bucketed history cache (only the missing ranges hit HA,
+    all requested entities in one call) and downsampled to ``points`` per
+    entity (default 1000) so week-long charts stay light.
+    """
+    from services.history_service import get_history_service, format_ts
     try:
         entity_ids = request.args.get('entity_ids', '')
         hours = min(int(request.args.get('hours', 24)), 168)
+        points = max(2, min(int(request.args.get('points', 1000)), 5000))
 
         if not entity_ids:
             return jsonify({"error": "entity_ids parameter required"}), 400
 
-        for eid in entity_ids.split(','):
-            if not re.match(r'^[a-z_]+\.[a-z0-9_]+$', eid.strip()):
+        ids = [eid.strip() for eid in entity_ids.split(',') if eid.strip()]
+        for eid in ids:
+            if not _ENTITY_ID_RE.match(eid):
                 return jsonify({"error": f"Invalid entity_id: {eid}"}), 400
 
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=hours)
-
-        url = (f"{api.HA_URL}/api/history/period/{start_time.isoformat()}Z"
-               f"?filter_entity_id={entity_ids}"
-               f"&end_time={end_time.isoformat()}Z"
-               f"&minimal_response&no_attributes")
+        end_ts = datetime.now().timestamp()
+        series = get_history_service().get(ids, end_ts - hours * 3600, end_ts, max_points=points)
 
-        resp = requests.get(url, headers=api.get_ha_headers(), timeout=30)
-        return resp.json(), resp.status_code, {"Content-Type": "application/json"}
+        result = []
+        for eid in ids:
+            entries = [{"state": state, "last_changed": format_ts(ts)} for ts, state in series.get(eid, [])]
+            if entries:
+                entries[0]["entity_id"] = eid
+                result.append(entries)
+        return jsonify(result)
     except Exception as e:
         logger.error(f"Dashboard API proxy /history error: {e}")
         return jsonify({"error": str(e)}), 502
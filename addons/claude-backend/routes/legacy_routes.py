@@ -99,6 +99,7 @@ def clear_conversation():
     import api
     sid = (request.get_json() or {}).get("session_id", "default")
     api.conversations.pop(sid, None)
+    api._touch_conversation_index(sid)
     api.session_active_skill.pop(sid, None)
     return jsonify({"status": "cleared"}), 200
 
@@ -306,12 +306,15 @@ def api_fallback_config_get():
                 "model": provider_models.get(prov, ""),
             })
 
+    from providers.hedging import get_hedge_controller
+
     return jsonify({
         "success": True,
         "enabled": enabled,
         "providers": providers,
         "priority": priority,
         "provider_models": provider_models,
+        "hedging": get_hedge_controller().config(),
     })
 
 
@@ -355,6 +358,17 @@ def api_fallback_config_post():
         "provider_models": clean_provider_models,
     }
 
+    # Hedging settings: take the posted value, else keep what is on disk
+    hedging = data.get("hedging")
+    if hedging is None:
+        try:
+            with open(_FALLBACK_CONFIG_FILE, "r", encoding="utf-8") as f:
+                hedging = (json.load(f) or {}).get("hedging")
+        except (OSError, ValueError):
+            hedging = None
+    if isinstance(hedging, (bool, dict)):
+        config_data["hedging"] = hedging
+
     try:
         os.makedirs(os.path.dirname(_FALLBACK_CONFIG_FILE), exist_ok=True)
         with open(_FALLBACK_CONFIG_FILE, "w", encoding="utf-8") as f:
@@ -425,6 +439,7 @@ def api_settings_get():
                 {"key": "enable_chat_bubble", "type": "toggle"},
                 {"key": "enable_amira_card_button", "type": "toggle"},
                 {"key": "enable_amira_automation_button", "type": "toggle"},
+                {"key": "enable_fast_path", "type": "toggle"},
             ],
         },
         {
@@ -551,6 +566,7 @@ def api_uninstall_cleanup():
 
     try:
         api.conversations.clear()
+        api._touch_conversation_index()
         api.abort_streams.clear()
         api.read_only_sessions.clear()
         api.session_last_intent.clear()
@@ -6,13 +6,18 @@ Endpoints:
 - POST /api/browser-errors
 - GET /api/browser-errors
 - POST /api/addon/restart
+- GET /api/debug/traces
+- GET /api/debug/async
+- GET /api/debug/fast_path
+- GET /api/debug/startup
+- GET /metrics
 """
 
 import json
 import logging
 import requests
 from datetime import datetime
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 
 logger = logging.getLogger(__name__)
 
@@ -158,3 +163,58 @@ def api_addon_restart():
     except Exception as e:
         logger.error(f"Addon restart failed: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@system_bp.route('/api/debug/traces', methods=['GET'])
+def api_debug_traces():
+    """Recent chat request traces with per-stage latency aggregates.
+
+    Query params: ``limit`` (default 20) and ``format=folded`` for a
+    folded-stack text export (flamegraph.pl / speedscope).
+    """
+    import tracing
+    if request.args.get("format") == "folded":
+        return Response(tracing.folded_stacks(), mimetype="text/plain")
+    try:
+        limit = max(0, min(int(request.args.get("limit", 20)), tracing.MAX_TRACES))
+    except ValueError:
+        limit = 20
+    return jsonify({
+        "enabled": tracing.ENABLED,
+        "aggregates": tracing.aggregates(),
+        "traces": tracing.recent_traces(limit),
+    }), 200
+
+
+@system_bp.route('/api/debug/async', methods=['GET'])
+def api_debug_async():
+    """Shared async runtime: loop state, in-flight work and per-task metrics."""
+    from async_runtime import get_runtime
+    return jsonify(get_runtime().stats()), 200
+
+
+@system_bp.route('/api/debug/fast_path', methods=['GET'])
+def api_debug_fast_path():
+    """Local command engine: hit rate, fallbacks by reason and accuracy."""
+    import api
+    from services.command_engine import get_command_engine
+    return jsonify({"enabled": api.ENABLE_FAST_PATH, **get_command_engine().stats()}), 200
+
+
+@system_bp.route('/api/debug/startup', methods=['GET'])
+def api_debug_startup():
+    """Startup report: time to ready, per-stage timings, background stages and on-demand imports."""
+    from lazy_import import startup_timer
+    return jsonify(startup_timer.report()), 200
+
+
+@system_bp.route('/metrics', methods=['GET'])
+def api_metrics():
+    """Prometheus scrape endpoint (OpenMetrics when the Accept header asks for it)."""
+    import metrics_exporter
+    if not metrics_exporter.ENABLED:
+        return jsonify({"error": "Metrics disabled (ENABLE_METRICS=false)"}), 404
+    openmetrics = "application/openmetrics-text" in request.headers.get("Accept", "")
+    content_type = (metrics_exporter.OPENMETRICS_CONTENT_TYPE if openmetrics
+                    else metrics_exporter.PROMETHEUS_CONTENT_TYPE)
+    return Response(metrics_exporter.render(openmetrics), content_type=content_type)
@@ -14,7 +14,9 @@ import re
 import requests
 from flask import Blueprint, Response, jsonify
 
-import chat_ui
+from lazy_import import LazyModule
+
+chat_ui = LazyModule("chat_ui")
 
 logger = logging.getLogger(__name__)
 
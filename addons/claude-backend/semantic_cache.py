@@ -2,61 +2,60 @@
 
 Inspired by nanobot: Minimal semantic cache that stores and retrieves based on meaning,
 not just exact hash matching. Uses simple embeddings and similarity scoring.
+
+``ResponseCache`` sits in front of the provider call in the chat pipeline and
+serves repeated read-only questions, revalidated against live entity states.
 """
 
 import json
 import logging
 import hashlib
-from typing import Dict, List, Optional, Tuple, Any
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import math
 
 logger = logging.getLogger(__name__)
 
+_TOKEN_RE = re.compile(r"\w+")
+
 
 class SimpleEmbedding:
     """Simple token-based embedding for semantic similarity."""
     
     @staticmethod
-    def get_embedding(text: str) -> List[float]:
-        """Get simple embedding based on token frequency (TF-IDF style).
+    def get_embedding(text: str) -> Dict[str, float]:
+        """Get a sparse bag-of-words embedding (token -> normalized frequency).
         
-        Uses minimal approach: token frequency scaled by inverse document frequency.
+        Tokens keep their identity, so the cosine of two embeddings measures
+        vocabulary overlap rather than just the shape of the frequency curve.
         """
         if not text:
-            return []
+            return {}
         
-        # Simple tokenization
-        tokens = text.lower().split()
-        token_freq = {}
+        tokens = _TOKEN_RE.findall(text.lower())
+        token_freq: Dict[str, float] = {}
         for token in tokens:
             token_freq[token] = token_freq.get(token, 0) + 1
         
-        # Convert to sorted vector for reproducibility
-        sorted_tokens = sorted(token_freq.items(), key=lambda x: x[1], reverse=True)[:100]
-        
-        # Create simple embedding: [frequency, token_hash] pairs
-        embedding = []
-        for token, freq in sorted_tokens:
-            # Normalize frequency
-            norm_freq = freq / max(len(tokens), 1)
-            embedding.append(norm_freq)
-        
-        # Pad to fixed size
-        while len(embedding) < 100:
-            embedding.append(0.0)
-        
-        return embedding[:100]
+        total = max(len(tokens), 1)
+        return {token: freq / total for token, freq in token_freq.items()}
     
     @staticmethod
-    def cosine_similarity(embed1: List[float], embed2: List[float]) -> float:
+    def cosine_similarity(embed1: Dict[str, float], embed2: Dict[str, float]) -> float:
         """Calculate cosine similarity between embeddings."""
         if not embed1 or not embed2:
             return 0.0
         
-        dot_product = sum(a * b for a, b in zip(embed1, embed2))
-        magnitude1 = math.sqrt(sum(a * a for a in embed1))
-        magnitude2 = math.sqrt(sum(b * b for b in embed2))
+        if len(embed1) > len(embed2):
+            embed1, embed2 = embed2, embed1
+        dot_product = sum(v * embed2.get(k, 0.0) for k, v in embed1.items())
+        magnitude1 = math.sqrt(sum(a * a for a in embed1.values()))
+        magnitude2 = math.sqrt(sum(b * b for b in embed2.values()))
         
         if magnitude1 == 0 or magnitude2 == 0:
             return 0.0
@@ -205,18 +204,229 @@ class SemanticCache:
         }
 
 
+def normalize_query(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+# Words that never change what a chat question asks for; everything else
+# (entities, rooms, states, negations) must match for a similarity hit.
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "which", "what", "whats", "s", "do", "does", "my", "me",
+    "please", "tell", "show", "of", "in", "il", "lo", "la", "i", "gli", "le", "l", "un", "una", "e",
+    "sono", "quale", "quali", "che", "cosa", "mi", "dimmi", "mostra", "di", "del", "della", "dei",
+    "delle", "per", "favore", "el", "los", "las", "es", "son", "que", "cual", "cuales", "de", "por",
+    "les", "est", "sont", "quel", "quels", "quelle", "quelles", "du", "des",
+})
+
+
+def _content_tokens(norm: str) -> frozenset:
+    return frozenset(t for t in norm.split() if t not in _FILLER_WORDS)
+
+
+_NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+
+def rerender_numbers(answer: str, old: Dict[str, str], new: Dict[str, str]) -> Optional[str]:
+    """Patch the numbers of changed states into a cached *answer*.
+
+    Only possible when every changed state is numeric (old and new) and its
+    old value appears exactly once in the text (also with a decimal comma),
+    and no other dependency shares that value.  Returns None otherwise.
+    """
+    changed = {eid: v for eid, v in old.items() if new.get(eid) != v}
+    unchanged = {v for eid, v in old.items() if eid not in changed}
+    if len({old[e] for e in changed}) != len(changed):
+        return None
+    for eid, old_v in changed.items():
+        new_v = new.get(eid)
+        if new_v is None or not _NUMBER_RE.match(old_v or "") or not _NUMBER_RE.match(new_v):
+            return None
+        if old_v in unchanged:
+            return None
+        variants = [(old_v, new_v)]
+        if "." in old_v:
+            variants.append((old_v.replace(".", ","), new_v.replace(".", ",")))
+        hits = [
+            (m, repl)
+            for old_text, repl in variants
+            for m in re.finditer(r"(?<![\d.,])" + re.escape(old_text) + r"(?![\d]|[.,]\d)", answer)
+        ]
+        if len(hits) != 1:
+            return None
+        m, repl = hits[0]
+        answer = answer[:m.start()] + repl + answer[m.end():]
+    return answer
+
+
+class ResponseCache:
+    """Whole-answer cache for read-only chat turns.
+
+    Entries are scoped (intent, language, agent, page context, previous turn)
+    and keyed by the normalized question; a lookup tries the exact key first,
+    then the most similar question in the same scope that asks about exactly
+    the same words once filler is ignored.  Each entry records the states of the
+    entities its tool results mentioned: on a hit those are re-read, and a
+    changed state either patches the numbers in the answer (see
+    ``rerender_numbers``) or drops the entry.
+    """
+
+    def __init__(self, max_entries: int = 100, similarity_threshold: float = 0.85,
+                 ttl_minutes: int = 30, max_dependencies: int = 300):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_minutes * 60
+        self.max_dependencies = max_dependencies
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._stats = {
+            "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "rerendered": 0,
+            "stale": 0, "misses": 0, "stores": 0,
+            "saved_input_tokens": 0, "saved_output_tokens": 0, "saved_cost": 0.0,
+        }
+
+    def _find(self, norm: str, scope: str) -> Tuple[Optional[Tuple[str, str]], float]:
+        key = (scope, norm)
+        if key in self._entries:
+            return key, 1.0
+        query_emb = SimpleEmbedding.get_embedding(norm)
+        tokens = _content_tokens(norm)
+        best, best_sim = None, 0.0
+        for k, entry in self._entries.items():
+            # "kitchen" vs "bedroom" or "enabled" vs "disabled" share most of
+            # the vocabulary; only rephrasings of the same question qualify.
+            if k[0] != scope or entry["tokens"] != tokens:
+                continue
+            sim = SimpleEmbedding.cosine_similarity(query_emb, entry["embedding"])
+            if sim > best_sim:
+                best, best_sim = k, sim
+        if best is not None and best_sim >= self.similarity_threshold:
+            return best, best_sim
+        return None, 0.0
+
+    def lookup(self, query: str, scope: str,
+               current_states: Callable[[Iterable[str]], Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """Cached answer for *query*, revalidated against live states, or None.
+
+        ``current_states(entity_ids)`` returns ``{entity_id: state}`` for the
+        ids that still exist.
+        """
+        norm = normalize_query(query)
+        with self._lock:
+            self._stats["lookups"] += 1
+            key, similarity = self._find(norm, scope)
+            entry = self._entries.get(key) if key else None
+            if entry is not None and time.time() - entry["created"] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+        try:
+            current = current_states(list(entry["deps"]))
+        except Exception as e:
+            logger.warning(f"Response cache: state check failed: {e}")
+            current = None
+        rerendered = False
+        with self._lock:
+            if not current:
+                self._stats["misses"] += 1
+                return None
+            answer = entry["answer"]
+            if current != entry["deps"]:
+                answer = rerender_numbers(answer, entry["deps"], current) if set(current) == set(entry["deps"]) else None
+                if answer is None:
+                    self._entries.pop(key, None)
+                    self._stats["stale"] += 1
+                    self._stats["misses"] += 1
+                    logger.debug(f"Response cache: stale entry dropped ({norm[:50]})")
+                    return None
+                entry["answer"], entry["deps"] = answer, current
+                rerendered = True
+                self._stats["rerendered"] += 1
+            self._entries.move_to_end(key)
+            entry["hits"] += 1
+            self._stats["exact_hits" if similarity >= 1.0 else "semantic_hits"] += 1
+            usage = entry["usage"]
+            self._stats["saved_input_tokens"] += usage.get("input_tokens", 0)
+            self._stats["saved_output_tokens"] += usage.get("output_tokens", 0)
+            self._stats["saved_cost"] += usage.get("cost", 0.0)
+        logger.info(f"Response cache HIT ({similarity:.0%}{', re-rendered' if rerendered else ''}): {norm[:50]}")
+        return {"answer": answer, "similarity": round(similarity, 3), "rerendered": rerendered,
+                "query": entry["query"]}
+
+    def store(self, query: str, scope: str, answer: str, deps: Dict[str, str],
+              usage: Optional[Dict[str, Any]] = None) -> bool:
+        """Cache *answer*; *deps* maps the entity ids it depends on to their states."""
+        if not answer or not deps or len(deps) > self.max_dependencies:
+            return False
+        norm = normalize_query(query)
+        usage = usage or {}
+        with self._lock:
+            self._entries[(scope, norm)] = {
+                "query": query,
+                "answer": answer,
+                "deps": dict(deps),
+                "usage": {
+                    "input_tokens": int(usage.get("input_tokens") or 0),
+                    "output_tokens": int(usage.get("output_tokens") or 0),
+                    "cost": float(usage.get("cost") or 0.0),
+                },
+                "embedding": SimpleEmbedding.get_embedding(norm),
+                "tokens": _content_tokens(norm),
+                "created": time.time(),
+                "hits": 0,
+            }
+            self._entries.move_to_end((scope, norm))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["stores"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            entries = len(self._entries)
+        hits = s["exact_hits"] + s["semantic_hits"]
+        return {
+            **s,
+            "saved_cost": round(s["saved_cost"], 6),
+            "hits": hits,
+            "hit_rate": round(hits / s["lookups"], 3) if s["lookups"] else None,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
 # Global semantic cache instance
 _semantic_cache: Optional[SemanticCache] = None
+_response_cache: Optional[ResponseCache] = None
 
 
 def initialize_semantic_cache(max_entries: int = 100, threshold: float = 0.85) -> SemanticCache:
-    """Initialize global semantic cache."""
-    global _semantic_cache
+    """Initialize global semantic cache (and the chat response cache)."""
+    global _semantic_cache, _response_cache
     _semantic_cache = SemanticCache(max_entries, threshold)
+    _response_cache = ResponseCache(max_entries, threshold)
     logger.info(f"Semantic cache initialized (max: {max_entries}, threshold: {threshold:.0%})")
     return _semantic_cache
 
 
 def get_semantic_cache() -> Optional[SemanticCache]:
-    """Get global semantic cache instance."""
+    """Get global semantic cache instance (initialized with defaults on first use)."""
+    if _semantic_cache is None:
+        initialize_semantic_cache()
     return _semantic_cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get global chat response cache instance (initialized with defaults on first use)."""
+    if _response_cache is None:
+        initialize_semantic_cache()
+    return _response_cache
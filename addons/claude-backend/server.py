@@ -20,6 +20,8 @@ import signal
 import sys
 import traceback
 
+from lazy_import import module_available, startup_timer
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
@@ -29,20 +31,13 @@ logger = logging.getLogger("server")
 
 # ── Optional-package audit (runs before heavy imports) ────────────────────────
 def _check_optional_packages() -> dict[str, bool]:
-    """Quick import-check for every optional dependency."""
+    """Availability check for every optional dependency (find_spec, nothing is imported)."""
     pkgs = [
         "anthropic", "openai", "google.genai", "httpx",
         "mcp", "telegram", "twilio", "discord",
         "PyPDF2", "docx",
     ]
-    status: dict[str, bool] = {}
-    for name in pkgs:
-        try:
-            __import__(name)
-            status[name] = True
-        except ImportError:
-            status[name] = False
-    return status
+    return {name: module_available(name) for name in pkgs}
 
 
 def _log_package_status(status: dict[str, bool]) -> None:
@@ -104,12 +99,14 @@ def main() -> None:
     logger.info(f"Platform: {platform.machine()} | Python {platform.python_version()} | PID {os.getpid()}")
 
     # Audit optional packages first
-    pkg_status = _check_optional_packages()
+    with startup_timer.stage("package audit"):
+        pkg_status = _check_optional_packages()
     _log_package_status(pkg_status)
 
-    # Try loading the main application
+    # Try loading the main application (core only: optional subsystems are lazy)
     try:
-        import api  # noqa: E402  — heavy import, may fail on ARM
+        with startup_timer.stage("import api"):
+            import api  # noqa: E402  — may fail on ARM
     except Exception as exc:
         logger.critical(f"FATAL: Failed to import api module: {exc}")
         logger.critical(traceback.format_exc())
@@ -144,7 +141,8 @@ def main() -> None:
             api.logger.warning(fix_msgs.get(api.LANGUAGE, fix_msgs["en"]))
 
     # Register floating chat bubble (if enabled)
-    api.setup_chat_bubble()
+    with startup_timer.stage("chat bubble"):
+        api.setup_chat_bubble()
 
     # Cleanup bubble resources on graceful shutdown (SIGTERM sent by HA on stop/delete)
     def _sigterm_handler(signum, frame):
@@ -159,13 +157,27 @@ def main() -> None:
     signal.signal(signal.SIGTERM, _sigterm_handler)
 
     # Start Telegram / WhatsApp / Discord bots if configured
-    api.start_messaging_bots()
+    with startup_timer.stage("messaging bots"):
+        api.start_messaging_bots()
 
     # Initialize MCP servers if configured
-    api.initialize_mcp()
+    with startup_timer.stage("mcp"):
+        api.initialize_mcp()
+
+    # Keep web (cookie) provider sessions warm so chats never wait on bootstrap
+    try:
+        from providers.web_warmup import get_web_session_pool
+        get_web_session_pool().start()
+    except Exception as e:
+        api.logger.warning(f"Web provider warm-up not started: {e}")
+
+    # Model discovery and warm-up imports continue after the port is bound
+    api.start_background_startup()
 
     from waitress import serve
 
+    startup_timer.mark_ready()
+    api.logger.info(f"Startup: {startup_timer.summary()}")
     api.logger.info(f"Starting production server on 0.0.0.0:{api.API_PORT}")
     serve(api.app, host="0.0.0.0", port=api.API_PORT, threads=6)
 
@@ -0,0 +1,525 @@
+"""Command engine: answer simple device commands without calling the LLM.
+
+Turns such as "turn off the kitchen light" or "what's the temperature in the
+bedroom" normally cost two provider rounds (tool call + final answer).  The
+engine handles them locally, in the user's language, and returns ``None`` for
+everything else so the normal LLM pipeline takes over.
+
+- Parsing: per-language verb patterns (it/en/es/fr) recognise on/off,
+  open/close and temperature/humidity/state questions about ONE target.
+  Anything with numbers, conjunctions, conditions or "all ..." is left to
+  the LLM.
+- Resolution: the target words are matched against friendly names, object
+  ids and effective area names of the entities in the latest states
+  snapshot.  Every target word must be covered and the best candidate must
+  beat the runner-up; ties and partial matches fall back.  A target made
+  only of device nouns ("the light", "door") or naming several devices
+  ("lights", "luci") never picks a single entity.
+- Execution: write actions go through the ``call_service`` tool (same
+  validation, metrics and tracing as an LLM tool call); questions read the
+  live state of the resolved entity.  Doors, gates, garage doors and windows
+  are never moved from here: those turns go to the LLM.
+- Metrics: attempts, hits per action, fallbacks per reason and errors give
+  the hit rate.  Accuracy comes from the user's next turn: a correction
+  ("no", "wrong", "sbagliato", ...) right after a hit counts against it.
+"""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL_SECONDS = 60
+FOLLOWUP_SECONDS = 120
+MAX_MESSAGE_CHARS = 80
+MIN_PRECISION = 0.5
+
+WRITE_ACTIONS = ("on", "off", "open", "close")
+
+_SERVICES = {"on": "turn_on", "off": "turn_off", "open": "open_cover", "close": "close_cover"}
+
+# Covers guarding an opening: answering "is it open?" is fine, moving them
+# without the LLM (and its confirmation rules) is not.
+SECURITY_COVER_CLASSES = frozenset({"door", "garage", "gate", "window"})
+SECURITY_COVER_WORDS = frozenset({
+    "porta", "porte", "portone", "door", "doors", "puerta", "puertas", "portes", "cancello", "cancelli",
+    "gate", "gates", "portail", "garage", "garages", "basculante",
+})
+
+_ACTION_DOMAINS = {
+    "on": ("light", "switch", "fan", "input_boolean"),
+    "off": ("light", "switch", "fan", "input_boolean"),
+    "open": ("cover",),
+    "close": ("cover",),
+    "state": ("light", "switch", "fan", "input_boolean", "cover", "lock", "binary_sensor"),
+}
+
+# (language, action, pattern) — matched against the normalised message
+# (lowercase, no accents, punctuation -> spaces).  Group "t" is the target.
+_STATE_IT = r"(?:accesa|acceso|accese|accesi|spenta|spento|spente|spenti|aperta|aperto|chiusa|chiuso)"
+_STATE_ES = r"(?:encendida|encendido|apagada|apagado|abierta|abierto|cerrada|cerrado)"
+_STATE_FR = r"(?:allumee?|eteinte?|ouverte?|fermee?)"
+_PATTERNS: List[Tuple[str, str, "re.Pattern"]] = [
+    (lang, action, re.compile(rf"^{rx}$"))
+    for lang, action, rx in (
+        ("it", "on", r"(?:accendi|accendere|attiva) (?P<t>.+)"),
+        ("it", "off", r"(?:spegni|spegnere|disattiva) (?P<t>.+)"),
+        ("it", "open", r"(?:apri|alza) (?P<t>.+)"),
+        ("it", "close", r"(?:chiudi|abbassa) (?P<t>.+)"),
+        ("it", "temperature", r"(?:quanti gradi (?:ci sono|fa)|(?:qual e|quale e|dimmi) la temperatura"
+                              r"|che temperatura (?:c e|fa)|temperatura)(?: (?P<t>.+))?"),
+        ("it", "humidity", r"(?:(?:qual e|quale e|dimmi) l umidita|che umidita (?:c e|fa)|umidita)(?: (?P<t>.+))?"),
+        ("it", "state", rf"(?:e|sono) {_STATE_IT} (?P<t>.+)"),
+        ("it", "state", rf"(?P<t>.+) (?:e|sono) {_STATE_IT}"),
+        ("it", "state", r"(?:(?:qual e|com e) )?(?:lo )?stato (?:di|del|della|dello|dei|delle) (?P<t>.+)"),
+        ("en", "on", r"(?:turn|switch|power) on (?P<t>.+)"),
+        ("en", "on", r"(?:turn|switch|power) (?P<t>.+) on"),
+        ("en", "off", r"(?:turn|switch|power) off (?P<t>.+)"),
+        ("en", "off", r"(?:turn|switch|power) (?P<t>.+) off"),
+        ("en", "open", r"(?:open|raise) (?P<t>.+)"),
+        ("en", "close", r"(?:close|lower) (?P<t>.+)"),
+        ("en", "temperature", r"(?:(?:what s|whats|what is) the temperature|how (?:hot|warm|cold) is it"
+                              r"|temperature)(?: (?P<t>.+))?"),
+        ("en", "humidity", r"(?:(?:what s|whats|what is) the humidity|how humid is it|humidity)(?: (?P<t>.+))?"),
+        ("en", "state", r"(?:is|are) (?P<t>.+) (?:on|off|open|closed)"),
+        ("en", "state", r"(?:what s|whats|what is) the (?:state|status) of (?P<t>.+)"),
+        ("es", "on", r"(?:enciende|encender|prende|activa) (?P<t>.+)"),
+        ("es", "off", r"(?:apaga|apagar|desactiva) (?P<t>.+)"),
+        ("es", "open", r"(?:abre|sube) (?P<t>.+)"),
+        ("es", "close", r"(?:cierra|baja) (?P<t>.+)"),
+        ("es", "temperature", r"(?:cual es la temperatura|que temperatura (?:hace|hay)|temperatura)(?: (?P<t>.+))?"),
+        ("es", "humidity", r"(?:cual es la humedad|que humedad hay|humedad)(?: (?P<t>.+))?"),
+        ("es", "state", rf"(?:esta|estan) {_STATE_ES} (?P<t>.+)"),
+        ("es", "state", rf"(?P<t>.+) (?:esta|estan) {_STATE_ES}"),
+        ("fr", "on", r"(?:allume|allumer|active) (?P<t>.+)"),
+        ("fr", "off", r"(?:eteins|eteindre|desactive) (?P<t>.+)"),
+        ("fr", "open", r"(?:ouvre|ouvrir|monte) (?P<t>.+)"),
+        ("fr", "close", r"(?:ferme|fermer|baisse) (?P<t>.+)"),
+        ("fr", "temperature", r"(?:quelle est la temperature|quelle temperature fait il|temperature)(?: (?P<t>.+))?"),
+        ("fr", "humidity", r"(?:quelle est l humidite|humidite)(?: (?P<t>.+))?"),
+        ("fr", "state", rf"(?:est ce que )?(?P<t>.+) (?:est|sont) {_STATE_FR}"),
+    )
+]
+
+_POLITE_PREFIX_RE = re.compile(
+    r"^(?:(?:hey|ehi|ok|per favore|please|por favor|s il te plait|s il vous plait)\s+)*"
+    r"(?:(?:puoi|potresti|can you|could you|would you|puedes|podrias|peux tu|pourrais tu)\s+)?"
+)
+_POLITE_SUFFIX_RE = re.compile(
+    r"\s+(?:per favore|please|por favor|s il te plait|s il vous plait|grazie|thanks|gracias|merci)$"
+)
+
+STOPWORDS = frozenset({
+    # it
+    "il", "lo", "la", "i", "gli", "le", "l", "un", "una", "di", "del", "della", "dello", "dei",
+    "delle", "in", "nel", "nella", "nello", "nei", "nelle", "a", "al", "alla", "sul", "sulla",
+    "mio", "mia", "ora", "adesso", "subito", "c", "e", "fa",
+    # en
+    "the", "an", "of", "on", "at", "my", "now", "it", "is", "inside", "outside",
+    # es
+    "el", "los", "las", "de", "en", "mi", "ahora", "hay", "hace",
+    # fr
+    "les", "du", "des", "dans", "au", "aux", "mon", "ma", "maintenant",
+})
+
+# Words that make a turn too complex for the fast path (conditions, several
+# targets, scheduling, "all ...", configuration objects).
+REJECT_WORDS = frozenset({
+    "e", "and", "y", "et", "o", "or", "ou", "se", "if", "si", "quando", "when", "cuando", "quand",
+    "poi", "then", "luego", "puis", "tutte", "tutti", "tutto", "all", "every", "todas", "todos",
+    "toutes", "tous", "ogni", "cada", "chaque", "dopo", "after", "despues", "apres", "tra", "fra",
+    "minuti", "minutes", "minutos", "ore", "hours", "horas", "heures", "automazione", "automation",
+    "automatizacion", "dashboard", "card", "script", "scena", "scene", "escena", "non",
+    "not", "no", "ne", "pas", "tranne", "except", "excepto", "sauf",
+})
+
+DOMAIN_WORDS = {
+    "light": ("luce", "luci", "lampada", "lampade", "lampadario", "light", "lights", "lamp",
+              "lamps", "luz", "luces", "lampara", "lumiere", "lumieres", "lampe"),
+    "switch": ("presa", "prese", "interruttore", "switch", "plug", "socket", "enchufe", "prise"),
+    "fan": ("ventilatore", "fan", "ventilador", "ventilateur"),
+    "cover": ("tapparella", "tapparelle", "serranda", "serrande", "tenda", "tende", "persiana",
+              "persiane", "blind", "blinds", "shutter", "shutters", "cover", "curtain", "curtains",
+              "cortina", "cortinas", "volet", "volets", "store", "rideau", "rideaux", "porta", "porte",
+              "portone", "door", "doors", "puerta", "puertas", "portes", "cancello", "cancelli", "gate",
+              "gates", "portail", "garage", "garages", "basculante"),
+    "lock": ("serratura", "lock", "cerradura", "serrure"),
+}
+_DOMAIN_OF_WORD = {w: d for d, words in DOMAIN_WORDS.items() for w in words}
+
+# Device nouns that name several devices: "spegni le luci" means all of them.
+PLURAL_DEVICE_WORDS = frozenset({
+    "luci", "lampade", "lights", "lamps", "luces", "lumieres", "prese", "interruttori", "switches",
+    "plugs", "sockets", "enchufes", "prises", "ventilatori", "fans", "ventiladores", "ventilateurs",
+    "tapparelle", "serrande", "tende", "persiane", "blinds", "shutters", "curtains", "cortinas",
+    "volets", "rideaux", "porte", "doors", "puertas", "portes", "cancelli", "gates", "garages",
+})
+
+_KIND_WORDS = {
+    "temperature": frozenset({"temperatura", "temperature", "temp", "termometro", "thermometer", "thermometre"}),
+    "humidity": frozenset({"umidita", "humidity", "humedad", "humidite", "igrometro", "hygrometer"}),
+}
+
+_CORRECTION_RE = re.compile(
+    r"^(?:no|non|nope|sbagliato|errato|wrong|not that|incorrect|mal|equivocado|incorrecto|"
+    r"pas ca|faux|ho detto|i said|he dicho|j ai dit)\b"
+)
+
+REPLIES = {
+    "it": {"on": "✅ Ho acceso {name}.", "off": "✅ Ho spento {name}.",
+           "open": "✅ Ho aperto {name}.", "close": "✅ Ho chiuso {name}.", "value": "{name}: {value}"},
+    "en": {"on": "✅ Turned on {name}.", "off": "✅ Turned off {name}.",
+           "open": "✅ Opened {name}.", "close": "✅ Closed {name}.", "value": "{name}: {value}"},
+    "es": {"on": "✅ He encendido {name}.", "off": "✅ He apagado {name}.",
+           "open": "✅ He abierto {name}.", "close": "✅ He cerrado {name}.", "value": "{name}: {value}"},
+    "fr": {"on": "✅ J'ai allumé {name}.", "off": "✅ J'ai éteint {name}.",
+           "open": "✅ J'ai ouvert {name}.", "close": "✅ J'ai fermé {name}.", "value": "{name} : {value}"},
+}
+
+STATE_WORDS = {
+    "it": {"on": "acceso", "off": "spento", "open": "aperto", "closed": "chiuso", "opening": "in apertura",
+           "closing": "in chiusura", "locked": "bloccato", "unlocked": "sbloccato",
+           "unavailable": "non disponibile", "unknown": "sconosciuto"},
+    "en": {"on": "on", "off": "off", "open": "open", "closed": "closed", "opening": "opening",
+           "closing": "closing", "locked": "locked", "unlocked": "unlocked",
+           "unavailable": "unavailable", "unknown": "unknown"},
+    "es": {"on": "encendido", "off": "apagado", "open": "abierto", "closed": "cerrado", "opening": "abriéndose",
+           "closing": "cerrándose", "locked": "bloqueado", "unlocked": "desbloqueado",
+           "unavailable": "no disponible", "unknown": "desconocido"},
+    "fr": {"on": "allumé", "off": "éteint", "open": "ouvert", "closed": "fermé", "opening": "en ouverture",
+           "closing": "en fermeture", "locked": "verrouillé", "unlocked": "déverrouillé",
+           "unavailable": "indisponible", "unknown": "inconnu"},
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents, turn punctuation into single spaces."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def _stem(word: str) -> str:
+    # "luce"/"luci", "light"/"lights", "camera"/"camere" share a stem
+    return word[:-1] if len(word) > 4 else word
+
+
+def _words_match(a: str, b: str) -> bool:
+    return a == b or (len(a) >= 4 and len(b) >= 4 and _stem(a) == _stem(b))
+
+
+def parse(text: str) -> Optional[Dict[str, Any]]:
+    """``{"lang", "action", "target": [words]}`` for a simple command, else None."""
+    if not text or len(text) > MAX_MESSAGE_CHARS or "\n" in text.strip():
+        return None
+    norm = _POLITE_SUFFIX_RE.sub("", _POLITE_PREFIX_RE.sub("", normalize(text)))
+    for lang, action, rx in _PATTERNS:
+        m = rx.match(norm)
+        if not m:
+            continue
+        words = (m.group("t") or "").split()
+        if any(w in REJECT_WORDS or any(c.isdigit() for c in w) for w in words):
+            return None
+        return {"lang": lang, "action": action, "target": [w for w in words if w not in STOPWORDS]}
+    return None
+
+
+class _Entry:
+    __slots__ = ("entity_id", "domain", "name", "name_words", "area_words", "device_class")
+
+    def __init__(self, state: Dict[str, Any], area: str):
+        attrs = state.get("attributes") or {}
+        self.entity_id = state["entity_id"]
+        self.domain, obj = self.entity_id.split(".", 1)
+        self.name = attrs.get("friendly_name") or obj.replace("_", " ")
+        self.name_words = frozenset(normalize(self.name).split()) or frozenset(obj.split("_"))
+        self.area_words = frozenset(normalize(area).split()) - STOPWORDS
+        self.device_class = attrs.get("device_class") or ""
+
+    def is_security_cover(self) -> bool:
+        if self.domain != "cover":
+            return False
+        if self.device_class:
+            return self.device_class in SECURITY_COVER_CLASSES
+        return bool(self.name_words & SECURITY_COVER_WORDS)
+
+
+class CommandEngine:
+    """Local parser/resolver/executor for single-target device turns.
+
+    Args:
+        states: returns the latest full ``/api/states`` list (cheap; cached
+            snapshot).
+        areas: returns ``{entity_id: area name}``.
+        call_service: ``call_service(domain, service, data)``; a dict with an
+            ``"error"`` key means failure.
+        get_state: live state dict for one entity (None if unknown).
+    """
+
+    def __init__(self, states: Callable[[], List[Dict[str, Any]]],
+                 areas: Callable[[], Dict[str, str]],
+                 call_service: Callable[[str, str, Dict[str, Any]], Any],
+                 get_state: Callable[[str], Optional[Dict[str, Any]]]):
+        self._states = states
+        self._areas = areas
+        self._call_service = call_service
+        self._get_state = get_state
+        self._lock = threading.Lock()
+        self._catalog: List[_Entry] = []
+        self._catalog_key: Any = None
+        self._catalog_at = 0.0
+        self._pending: Dict[str, Tuple[float, str]] = {}
+        self._stats = {"attempts": 0, "hits": 0, "errors": 0, "confirmed": 0, "corrected": 0, "total_ms": 0.0}
+        self._hits_by_action: Dict[str, int] = defaultdict(int)
+        self._fallbacks: Dict[str, int] = defaultdict(int)
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def _entries(self) -> List[_Entry]:
+        states = self._states() or []
+        with self._lock:
+            if self._catalog_key == id(states) and time.time() - self._catalog_at < CATALOG_TTL_SECONDS:
+                return self._catalog
+        try:
+            areas = self._areas() or {}
+        except Exception as e:
+            logger.debug(f"Command engine: area names unavailable: {e}")
+            areas = {}
+        catalog = [
+            _Entry(s, areas.get(s["entity_id"], ""))
+            for s in states
+            if isinstance(s, dict) and "." in (s.get("entity_id") or "")
+        ]
+        with self._lock:
+            self._catalog, self._catalog_key, self._catalog_at = catalog, id(states), time.time()
+        return catalog
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def target_reject_reason(cmd: Dict[str, Any]) -> Optional[str]:
+        """Why *cmd*'s target cannot name one entity, or None if it might."""
+        target = cmd["target"]
+        if any(w in PLURAL_DEVICE_WORDS for w in target):
+            return "plural_target"
+        kind_words = _KIND_WORDS.get(cmd["action"], frozenset())
+        if not any(w not in _DOMAIN_OF_WORD and w not in kind_words for w in target):
+            return "generic_target"
+        return None
+
+    def resolve(self, cmd: Dict[str, Any]) -> Optional[Tuple[_Entry, float]]:
+        """Best entity for *cmd* as ``(entry, precision)``, or None when unsure.
+
+        Precision is the share of an entity's distinctive name words (device
+        nouns and the asked quantity excluded) matched by the target.
+        """
+        action, target = cmd["action"], cmd["target"]
+        if not target or self.target_reject_reason(cmd):
+            return None
+        kind_words = _KIND_WORDS.get(action, frozenset())
+        if kind_words:
+            domains: Tuple[str, ...] = ("sensor", "climate") if action == "temperature" else ("sensor", "humidifier")
+        else:
+            domains = _ACTION_DOMAINS[action]
+        scored = []
+        for e in self._entries():
+            if e.domain not in domains:
+                continue
+            if e.domain == "sensor" and kind_words and e.device_class != action:
+                continue
+            if action in WRITE_ACTIONS and e.is_security_cover():
+                continue
+            words = e.name_words | e.area_words
+            # Device nouns ("luce" for a light) and the asked quantity say
+            # nothing about which entity is meant.
+            distinctive = {n for n in e.name_words if n not in _DOMAIN_OF_WORD and n not in kind_words}
+            matched_name = set()
+            covered = True
+            for w in target:
+                if w in _DOMAIN_OF_WORD or w in kind_words:
+                    if _DOMAIN_OF_WORD.get(w, e.domain) != e.domain:
+                        covered = False
+                        break
+                    continue
+                hit = [n for n in words if _words_match(w, n)]
+                if not hit:
+                    covered = False
+                    break
+                matched_name.update(n for n in hit if n in distinctive)
+            if not covered:
+                continue
+            # A generic name ("Tapparella") is identified by its area alone.
+            precision = len(matched_name) / len(distinctive) if distinctive else 1.0
+            scored.append((precision, e))
+        if not scored:
+            return None
+        scored.sort(key=lambda x: -x[0])
+        best, entry = scored[0]
+        if best < MIN_PRECISION or (len(scored) > 1 and scored[1][0] >= best):
+            return None
+        return entry, round(best, 3)
+
+    # ------------------------------------------------------------------
+    # Handling
+    # ------------------------------------------------------------------
+
+    def _fallback(self, reason: str) -> None:
+        with self._lock:
+            self._fallbacks[reason] += 1
+
+    def handle(self, text: str, session_id: str = "", read_only: bool = False) -> Optional[Dict[str, Any]]:
+        """Execute or answer *text* locally; None means "use the LLM"."""
+        t0 = time.monotonic()
+        with self._lock:
+            self._stats["attempts"] += 1
+        cmd = parse(text)
+        if cmd is None:
+            self._fallback("no_pattern")
+            return None
+        action = cmd["action"]
+        if read_only and action in WRITE_ACTIONS:
+            self._fallback("read_only")
+            return None
+        reason = self.target_reject_reason(cmd)
+        if reason:
+            self._fallback(reason)
+            return None
+        try:
+            match = self.resolve(cmd)
+        except Exception as e:
+            logger.warning(f"Command engine: resolution failed: {e}")
+            self._fallback("error")
+            return None
+        if match is None:
+            self._fallback("unresolved")
+            return None
+        entry, confidence = match
+        lang = cmd["lang"]
+        try:
+            if action in WRITE_ACTIONS:
+                result = self._call_service(entry.domain, _SERVICES[action], {"entity_id": entry.entity_id})
+                if isinstance(result, dict) and result.get("error"):
+                    raise RuntimeError(result["error"])
+                reply = REPLIES[lang][action].format(name=entry.name)
+            else:
+                state = self._get_state(entry.entity_id)
+                if not isinstance(state, dict) or "state" not in state:
+                    raise RuntimeError(f"no state for {entry.entity_id}")
+                reply = REPLIES[lang]["value"].format(name=entry.name, value=_format_value(state, action, lang))
+        except Exception as e:
+            logger.warning(f"Command engine: {action} {entry.entity_id} failed: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            self._fallback("error")
+            return None
+        ms = (time.monotonic() - t0) * 1000
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["total_ms"] += ms
+            self._hits_by_action[action] += 1
+            if session_id:
+                self._pending[session_id] = (time.time(), entry.entity_id)
+        logger.info(f"Command engine: {action} {entry.entity_id} (confidence {confidence}, {ms:.0f} ms)")
+        return {"reply": reply, "action": action, "entity_id": entry.entity_id,
+                "language": lang, "confidence": confidence, "ms": round(ms, 1)}
+
+    def observe_followup(self, session_id: str, text: str) -> None:
+        """Score the previous fast-path hit of *session_id* using the user's next turn."""
+        with self._lock:
+            pending = self._pending.pop(session_id, None)
+            if pending is None or time.time() - pending[0] > FOLLOWUP_SECONDS:
+                return
+            key = "corrected" if _CORRECTION_RE.match(normalize(text)) else "confirmed"
+            self._stats[key] += 1
+        if key == "corrected":
+            logger.info(f"Command engine: hit on {pending[1]} corrected by the user")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            judged = s["confirmed"] + s["corrected"]
+            return {
+                "attempts": s["attempts"],
+                "hits": s["hits"],
+                "hit_rate": round(s["hits"] / s["attempts"], 3) if s["attempts"] else None,
+                "hits_by_action": dict(self._hits_by_action),
+                "fallbacks": dict(self._fallbacks),
+                "errors": s["errors"],
+                "confirmed": s["confirmed"],
+                "corrected": s["corrected"],
+                "accuracy": round(s["confirmed"] / judged, 3) if judged else None,
+                "avg_ms": round(s["total_ms"] / s["hits"], 1) if s["hits"] else None,
+                "catalog_entities": len(self._catalog),
+            }
+
+
+def _format_value(state: Dict[str, Any], action: str, lang: str) -> str:
+    attrs = state.get("attributes") or {}
+    value = state.get("state")
+    if action == "temperature" and state.get("entity_id", "").startswith("climate."):
+        value = attrs.get("current_temperature", value)
+        unit = attrs.get("temperature_unit") or "°"
+    elif action == "humidity" and state.get("entity_id", "").startswith("humidifier."):
+        value = attrs.get("current_humidity", value)
+        unit = "%"
+    else:
+        unit = attrs.get("unit_of_measurement") or ""
+    words = STATE_WORDS[lang]
+    if isinstance(value, str) and value in words:
+        return words[value]
+    return f"{value} {unit}".strip() if unit and unit != "°" else f"{value}{unit}"
+
+
+# ---------------------------------------------------------------------------
+# Home Assistant wiring
+# ---------------------------------------------------------------------------
+
+def _ha_states() -> List[Dict[str, Any]]:
+    from services.registry_service import get_registry_graph
+    states = get_registry_graph().states()
+    if not states:
+        import api
+        states = api.get_all_states()  # also feeds the registry graph snapshot
+    return states
+
+
+def _ha_areas() -> Dict[str, str]:
+    from services.registry_service import get_registry_graph
+    return get_registry_graph().entity_area_names()
+
+
+def _ha_call_service(domain: str, service: str, data: Dict[str, Any]) -> Any:
+    import json
+    import tools
+    result = json.loads(tools.execute_tool("call_service", {"domain": domain, "service": service, "data": data}))
+    if result.get("status") != "success":
+        return {"error": result.get("error") or result.get("result") or "service call failed"}
+    return result.get("result")
+
+
+def _ha_get_state(entity_id: str) -> Optional[Dict[str, Any]]:
+    import api
+    result = api.call_ha_api("GET", f"states/{entity_id}")
+    return result if isinstance(result, dict) and not result.get("error") else None
+
+
+_engine: Optional[CommandEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_command_engine() -> CommandEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = CommandEngine(_ha_states, _ha_areas, _ha_call_service, _ha_get_state)
+    return _engine
@@ -0,0 +1,239 @@
+"""Conversation index: sidebar metadata for ``/api/conversations``.
+
+The sidebar only needs title, source, timestamp and message count per
+session, but deriving them means stripping ``[CONTEXT: ...]`` blocks from the
+first user message and decoding the base36 id.  This index keeps those fields
+per session.  ``save_conversations(session_id)`` calls ``touch()`` after
+every turn, so listings read the index directly; a full reconcile against the
+in-memory ``conversations`` dict (``sync()``) runs only on the first listing
+and after ``invalidate()`` (bulk changes, reloads).  Both compare each session
+by a cheap signature (the list object itself + its length):
+
+- unchanged sessions cost one dict lookup per listing;
+- appended messages are scanned incrementally (only until a title is found);
+- a replaced list (trim, reload) is re-derived from scratch.
+
+The sorted order is rebuilt only when something changed, and ``version``
+increases on every change so routes can serve ETags.  Display-ready message
+lists for ``/api/conversations/<id>`` are cached under the same signature.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_PREFIXES = ("whatsapp_", "telegram_")
+TITLE_MAX_CHARS = 50
+
+
+def session_source(sid: str) -> str:
+    if sid.startswith("bubble_"):
+        return "bubble"
+    if sid.startswith("card_"):
+        return "card"
+    return "chat"
+
+
+def session_timestamp(sid: str) -> Any:
+    """Timestamp encoded in the session id (ms), or the id itself if none."""
+    if session_source(sid) in ("bubble", "card"):
+        # bubble_<base36_timestamp>_<random>
+        try:
+            return int(sid.split("_")[1], 36)
+        except (IndexError, ValueError):
+            return sid
+    return int(sid) if sid.isdigit() else sid
+
+
+def _sort_key(entry: Dict[str, Any]) -> Tuple[float, str]:
+    ts = entry["last_updated"]
+    return (ts if isinstance(ts, (int, float)) else 0, entry["id"])
+
+
+class ConversationIndex:
+    """Incrementally maintained metadata for conversation sessions."""
+
+    def __init__(self, strip_fn: Optional[Callable[[str], str]] = None):
+        self._strip = strip_fn or (lambda s: s)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._sigs: Dict[str, Tuple[List[Dict], int]] = {}
+        self._scanned: Dict[str, int] = {}
+        self._display: Dict[str, Tuple[Tuple[Any, ...], List[Dict[str, Any]]]] = {}
+        self._order: List[Dict[str, Any]] = []
+        self._dirty = True
+        self._source: Optional[Dict[str, List[Dict]]] = None  # dict last synced against
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _title_from(self, msgs: List[Dict], start: int) -> Optional[str]:
+        for msg in msgs[start:]:
+            if isinstance(msg, dict) and msg.get("role") == "user":
+                content = msg.get("content", "")
+                if isinstance(content, str):
+                    clean = self._strip(content)
+                    if clean:
+                        return clean[:TITLE_MAX_CHARS] + ("..." if len(clean) > TITLE_MAX_CHARS else "")
+                    # The first user message decides the title, even when empty
+                    return ""
+        return None
+
+    def _observe(self, sid: str, msgs: List[Dict]) -> bool:
+        """Bring one session up to date; returns True if its entry changed."""
+        # Holding the list (not its id) means a recycled id can never match.
+        old_sig = self._sigs.get(sid)
+        if old_sig is not None and old_sig[0] is msgs and old_sig[1] == len(msgs):
+            return False
+        entry = self._entries.get(sid)
+        if entry is None or old_sig is None or old_sig[0] is not msgs or len(msgs) < old_sig[1]:
+            entry = {
+                "id": sid,
+                "title": None,
+                "source": session_source(sid),
+                "last_updated": session_timestamp(sid),
+                "updated_at": time.time(),
+            }
+            self._entries[sid] = entry
+            self._scanned[sid] = 0
+        if entry["title"] is None:
+            entry["title"] = self._title_from(msgs, self._scanned.get(sid, 0))
+            self._scanned[sid] = len(msgs)
+        entry["message_count"] = len(msgs)
+        if old_sig is not None:
+            entry["updated_at"] = time.time()
+        self._sigs[sid] = (msgs, len(msgs))
+        return True
+
+    def _forget(self, sid: str) -> None:
+        for d in (self._entries, self._sigs, self._scanned, self._display):
+            d.pop(sid, None)
+
+    def touch(self, sid: str, msgs: Optional[List[Dict]]) -> None:
+        """Record that *sid* changed (messages appended, replaced or removed)."""
+        with self._lock:
+            if not msgs or sid.startswith(EXCLUDED_PREFIXES):
+                changed = sid in self._entries
+                self._forget(sid)
+            else:
+                changed = self._observe(sid, msgs)
+            if changed:
+                self._dirty = True
+                self.version += 1
+
+    def invalidate(self) -> None:
+        """Force a full reconcile on the next listing (bulk or untracked changes)."""
+        with self._lock:
+            self._source = None
+
+    def sync(self, conversations: Dict[str, List[Dict]]) -> int:
+        """Reconcile with *conversations*; returns the current version."""
+        with self._lock:
+            self._source = conversations
+            changed = False
+            for sid, msgs in list(conversations.items()):
+                if not msgs or sid.startswith(EXCLUDED_PREFIXES):
+                    if sid in self._entries:
+                        self._forget(sid)
+                        changed = True
+                    continue
+                changed = self._observe(sid, msgs) or changed
+            for sid in [s for s in self._entries if s not in conversations]:
+                self._forget(sid)
+                changed = True
+            if changed:
+                self._dirty = True
+                self.version += 1
+            self._sort()
+            return self.version
+
+    def _sort(self) -> None:
+        if self._dirty:
+            self._order = sorted(self._entries.values(), key=_sort_key, reverse=True)
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def page(
+        self,
+        conversations: Dict[str, List[Dict]],
+        source: str = "",
+        cursor: str = "",
+        limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Return ``(entries, next_cursor, version)``, newest first.
+
+        *cursor* is the ``next_cursor`` of the previous page: entries are
+        returned strictly after it in sort order, so concurrent inserts at the
+        top do not shift later pages.
+        """
+        if self._source is not conversations:
+            self.sync(conversations)
+        after = _parse_cursor(cursor)
+        out: List[Dict[str, Any]] = []
+        next_cursor = None
+        with self._lock:
+            self._sort()
+            version = self.version
+            for entry in self._order:
+                if source and entry["source"] != source:
+                    continue
+                if after is not None and _sort_key(entry) >= after:
+                    continue
+                if len(out) >= limit:
+                    last = out[-1]
+                    next_cursor = f"{_sort_key(last)[0]}:{last['id']}"
+                    break
+                out.append(dict(entry))
+        return out, next_cursor, version
+
+    def display_messages(
+        self,
+        sid: str,
+        msgs: List[Dict],
+        build: Callable[[List[Dict]], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Display-ready messages for *sid*, rebuilt only when the session changed."""
+        # The last message's content is part of the key: the stream path may
+        # replace it in place (e.g. collapsing raw dashboard HTML).
+        last = msgs[-1] if msgs and isinstance(msgs[-1], dict) else {}
+        sig = (msgs, len(msgs), last.get("content"))
+        with self._lock:
+            cached = self._display.get(sid)
+            if cached and cached[0][0] is msgs and cached[0][1] == sig[1] and cached[0][2] is sig[2]:
+                return cached[1]
+        display = build(msgs)
+        with self._lock:
+            self._display[sid] = (sig, display)
+        return display
+
+
+def _parse_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+    if not cursor or ":" not in cursor:
+        return None
+    ts, _, sid = cursor.partition(":")
+    try:
+        return (float(ts), sid)
+    except ValueError:
+        return None
+
+
+_index: Optional[ConversationIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_conversation_index() -> ConversationIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                import api
+                _index = ConversationIndex(api._strip_context_blocks)
+    return _index
@@ -0,0 +1,283 @@
+"""Entity validator: check entity ids mentioned in AI replies against HA.
+
+Backs ``api._validate_entity_ids_in_response`` (final replies) and can
+annotate unknown ids inline while a reply streams.
+
+- Matcher: the entity-id regex and the service-verb set are built once at
+  import, not per reply.
+- Live id set: ``EntityIdIndex`` keeps a frozenset of known entity ids plus
+  friendly names.  Every ``api.get_all_states()`` call feeds it, the state
+  stream hub reports created/removed entities, and a stale index refreshes in
+  a background thread — validation itself never waits on Home Assistant.
+  Until the first load completes, ids are treated as valid.
+- Suggestions: a character-trigram index over object ids (built lazily, on
+  the first lookup after the id set changes) ranks likely corrections for
+  hallucinated ids, e.g. ``sensor.epcube_pvpower`` -> ``sensor.ep_cube_pv_power``.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 300
+
+HA_DOMAINS = (
+    "sensor", "binary_sensor", "light", "switch", "climate", "cover",
+    "fan", "media_player", "automation", "script", "scene", "group",
+    "person", "input_boolean", "input_number", "input_text", "input_select",
+    "input_datetime", "button", "number", "select", "text", "lock",
+    "alarm_control_panel", "camera", "vacuum", "water_heater", "humidifier",
+    "weather", "device_tracker", "timer", "counter", "update", "siren",
+    "remote",
+    # NOTE: notify, tts, persistent_notification are SERVICES, not entities
+)
+
+# HA service verbs — patterns like switch.turn_off are service calls, not entity IDs
+SERVICE_VERBS = frozenset({
+    "turn_on", "turn_off", "toggle", "reload", "trigger", "press",
+    "open_cover", "close_cover", "stop_cover", "lock", "unlock",
+    "set_temperature", "set_humidity", "set_hvac_mode", "set_fan_mode",
+    "set_value", "set_speed", "set_datetime", "set_position",
+    "set_tilt_position", "set_preset_mode", "set_swing_mode",
+    "select_option", "select_first", "select_last", "select_next",
+    "select_previous", "increment", "decrement",
+    "play_media", "media_play", "media_pause", "media_stop",
+    "media_next_track", "media_previous_track",
+    "volume_up", "volume_down", "volume_mute", "volume_set",
+    "start", "stop", "pause", "resume", "open", "close",
+    "enable", "disable", "activate", "deactivate",
+    "send_message", "notify", "install", "skip",
+})
+
+# Generic examples the model uses in explanations
+EXAMPLE_ENTITIES = frozenset({
+    "light.living_room", "switch.living_room", "sensor.temperature",
+    "binary_sensor.motion", "light.soggiorno", "light.camera",
+    "light.xxx", "switch.xxx", "sensor.xxx", "scene.movie_night",
+})
+
+# Helper IDs are often discussed in prose before creation (or mapped fallbacks).
+HELPER_DOMAINS = frozenset({
+    "input_boolean", "input_number", "input_select",
+    "input_text", "input_datetime", "counter",
+})
+
+ENTITY_RE = re.compile(
+    r"\b(" + "|".join(re.escape(d) for d in HA_DOMAINS) + r")\.[a-z0-9][a-z0-9_]*\b"
+)
+# Trailing characters that might still be the start of an entity id
+_PARTIAL_TAIL_RE = re.compile(r"[a-z0-9_.]+$")
+
+
+def find_entity_ids(text: str) -> Set[str]:
+    """Entity ids mentioned in *text*, excluding ``domain.service`` verbs."""
+    found = set()
+    for m in ENTITY_RE.finditer(text or ""):
+        candidate = m.group(0)
+        if candidate.split(".", 1)[1] not in SERVICE_VERBS:
+            found.add(candidate)
+    return found
+
+
+def _trigrams(s: str) -> Set[str]:
+    s = f"  {s.replace('_', '')} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class EntityIdIndex:
+    """Live set of known entity ids with a trigram index for suggestions.
+
+    Args:
+        fetch_states: returns HA ``/api/states`` (list of state dicts); only
+            called from the background refresh thread.
+    """
+
+    def __init__(self, fetch_states: Callable[[], List[Dict[str, Any]]],
+                 refresh_seconds: float = REFRESH_SECONDS):
+        self._fetch = fetch_states
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._ids: frozenset = frozenset()
+        self._names: Dict[str, str] = {}
+        self._grams: Optional[Tuple[Dict[str, List[str]], Dict[str, int]]] = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def update_from_states(self, states: Iterable[Dict[str, Any]]) -> None:
+        """Replace the id set from a full ``/api/states`` result."""
+        names = {}
+        for s in states or ():
+            eid = s.get("entity_id") if isinstance(s, dict) else None
+            if eid:
+                names[eid] = (s.get("attributes") or {}).get("friendly_name") or ""
+        ids = frozenset(names)
+        with self._lock:
+            self._names = names
+            self._loaded_at = time.time()
+            if ids != self._ids:
+                self._ids = ids
+                self._grams = None
+                self.version += 1
+
+    def observe(self, entity_id: str, exists: bool) -> None:
+        """An entity was created (``exists``) or removed between full refreshes."""
+        with self._lock:
+            if not self._loaded_at or (entity_id in self._ids) == exists:
+                return
+            self._ids = self._ids | {entity_id} if exists else self._ids - {entity_id}
+            if not exists:
+                self._names.pop(entity_id, None)
+            self._grams = None
+            self.version += 1
+
+    def refresh(self) -> bool:
+        try:
+            states = self._fetch()
+        except Exception as e:
+            logger.warning(f"Entity index refresh failed: {e}")
+            return False
+        if not isinstance(states, list) or not states:
+            return False
+        self.update_from_states(states)
+        return True
+
+    def ensure_fresh(self) -> None:
+        """Start a background refresh if the index is stale; never blocks."""
+        with self._lock:
+            if self._refreshing or time.time() - self._loaded_at < self._refresh_seconds:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="entity-index-refresh", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded_at > 0
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._ids
+
+    def unknown(self, entity_ids: Iterable[str]) -> Set[str]:
+        """Ids not present in HA (empty while the index is not loaded yet)."""
+        if not self.ready:
+            return set()
+        ids = self._ids
+        return {e for e in entity_ids if e not in ids}
+
+    def friendly_name(self, entity_id: str) -> str:
+        return self._names.get(entity_id, "")
+
+    def _gram_index(self) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+        """``(trigram -> ids, id -> trigram count)``, rebuilt after id-set changes."""
+        with self._lock:
+            if self._grams is None:
+                grams: Dict[str, List[str]] = defaultdict(list)
+                sizes: Dict[str, int] = {}
+                for eid in self._ids:
+                    tg = _trigrams(eid.split(".", 1)[1])
+                    sizes[eid] = len(tg)
+                    for g in tg:
+                        grams[g].append(eid)
+                self._grams = (dict(grams), sizes)
+            return self._grams
+
+    def suggest(self, entity_id: str, limit: int = 3, min_score: float = 0.45) -> List[Tuple[str, float]]:
+        """Likely intended ids for *entity_id*, best first, as ``(id, score)``."""
+        if "." not in entity_id:
+            return []
+        domain, obj = entity_id.split(".", 1)
+        query = _trigrams(obj)
+        hits: Dict[str, int] = defaultdict(int)
+        grams, sizes = self._gram_index()
+        for g in query:
+            for eid in grams.get(g, ()):
+                hits[eid] += 1
+        scored = []
+        for eid, shared in hits.items():
+            # Dice coefficient over trigrams, with a bonus for the same domain
+            score = 2.0 * shared / (len(query) + sizes[eid])
+            if eid.split(".", 1)[0] == domain:
+                score += 0.1
+            if score >= min_score:
+                scored.append((eid, round(min(score, 1.0), 3)))
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entities": len(self._ids),
+            "loaded_age_s": round(time.time() - self._loaded_at, 1) if self._loaded_at else None,
+            "version": self.version,
+        }
+
+
+def annotate_stream(chunks: Iterable[str], index: "EntityIdIndex",
+                    mark: Callable[[str], str] = lambda eid: f"{eid} ⚠️") -> Iterator[str]:
+    """Re-yield streamed text with unknown entity ids passed through *mark*.
+
+    A trailing fragment that could still grow into an entity id is held back
+    until the next chunk (or the end of the stream) completes it.
+    """
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        tail = _PARTIAL_TAIL_RE.search(buf)
+        cut = tail.start() if tail else len(buf)
+        if cut:
+            yield _annotate(buf[:cut], index, mark)
+            buf = buf[cut:]
+    if buf:
+        yield _annotate(buf, index, mark)
+
+
+def _annotate(text: str, index: "EntityIdIndex", mark: Callable[[str], str]) -> str:
+    if not index.ready:
+        return text
+
+    def _sub(m):
+        eid = m.group(0)
+        if eid.split(".", 1)[1] in SERVICE_VERBS or eid in EXAMPLE_ENTITIES or eid in index:
+            return eid
+        return mark(eid)
+
+    return ENTITY_RE.sub(_sub, text)
+
+
+def _ha_fetch_states() -> List[Dict[str, Any]]:
+    import api
+    result = api.call_ha_api("GET", "states")
+    return result if isinstance(result, list) else []
+
+
+_index: Optional[EntityIdIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_entity_index() -> EntityIdIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = EntityIdIndex(_ha_fetch_states)
+    return _index
@@ -0,0 +1,340 @@
+"""History service: cached, downsampled entity history.
+
+Backs the ``get_history`` tool and the ``/dashboard_api/history`` proxy.
+
+- Cache: per entity, history is kept in fixed time buckets (1h). A bucket is
+  cached once it is complete, so repeated chart renders / tool calls only
+  fetch the ranges that are missing (typically just the current hour).
+- Batching: entities that miss the same ranges are fetched together with one
+  ``history/period`` call (``filter_entity_id=a,b,c``).
+- Downsampling: numeric series use LTTB (Largest-Triangle-Three-Buckets),
+  which keeps peaks and dips; gaps such as "unavailable" split a numeric
+  series into runs that are downsampled separately; non-numeric series keep
+  state transitions.
+
+Each cached bucket also stores the state in effect at its start, so a range
+can be assembled from cached buckets alone even when nothing changed in it.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600
+SETTLE_SECONDS = 120          # a bucket must have ended this long ago to be cached
+RETENTION_SECONDS = 8 * 86400
+MAX_CACHED_ENTITIES = 256
+
+# (epoch seconds, state string)
+Point = Tuple[float, Any]
+
+
+def parse_ts(value: str) -> float:
+    """Parse an HA ISO timestamp into epoch seconds."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def format_ts(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def _as_float(state: Any) -> Optional[float]:
+    try:
+        value = float(state)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+# ---------------------------------------------------------------------------
+# Downsampling
+# ---------------------------------------------------------------------------
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[Tuple[float, float]]:
+    """Largest-Triangle-Three-Buckets downsampling to *threshold* points.
+
+    Points are ``(x, y, ...)`` tuples; extra fields are carried through.
+    """
+    n = len(points)
+    if threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:max(threshold, 0)]
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (the third triangle vertex)
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_len = max(avg_end - avg_start, 1)
+        avg_x = sum(p[0] for p in points[avg_start:avg_end]) / avg_len
+        avg_y = sum(p[1] for p in points[avg_start:avg_end]) / avg_len
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = points[a][0], points[a][1]
+        best_area, best = -1.0, range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (points[j][1] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best = area, j
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def _thin(points: List[Point], max_points: int) -> List[Point]:
+    """Evenly pick *max_points* of *points* (first and last always kept)."""
+    if len(points) <= max_points:
+        return points
+    step = (len(points) - 1) / (max_points - 1)
+    return [points[round(i * step)] for i in range(max_points)]
+
+
+def downsample(series: List[Point], max_points: Optional[int]) -> List[Point]:
+    """Reduce *series* to at most *max_points*, preserving its shape."""
+    if not max_points or len(series) <= max_points:
+        return series
+    numeric = [(ts, _as_float(state), i) for i, (ts, state) in enumerate(series)]
+    if all(v is not None for _, v, _ in numeric):
+        return [series[p[2]] for p in lttb(numeric, max_points)]
+    # Non-numeric (on/off, modes...): keep transitions, then thin evenly
+    transitions = [series[0]] + [p for prev, p in zip(series, series[1:]) if p[1] != prev[1]]
+    if all(v is None for _, v, _ in numeric):
+        return _thin(transitions, max_points)
+    # Numeric with gaps ("unavailable", "unknown"): keep the start of every gap
+    # and split the remaining budget over the numeric runs, LTTB on each.
+    gaps: List[int] = []
+    runs: List[List[Tuple[float, float, int]]] = []
+    for ts, value, i in numeric:
+        if value is None:
+            if i == 0 or series[i - 1][1] != series[i][1]:
+                gaps.append(i)
+        elif i == 0 or numeric[i - 1][1] is None:
+            runs.append([(ts, value, i)])
+        else:
+            runs[-1].append((ts, value, i))
+    budget = max_points - len(gaps)
+    if budget < len(runs):
+        return _thin(transitions, max_points)
+    total = sum(len(run) for run in runs)
+    keep = set(gaps)
+    for run in runs:
+        keep.update(p[2] for p in lttb(run, max(1, budget * len(run) // total)))
+    return _thin([series[i] for i in sorted(keep)], max_points)
+
+
+def summarize(series: List[Point]) -> Dict[str, Any]:
+    """min/max/mean/last over a numeric series (time-weighted mean)."""
+    values = [(ts, _as_float(s)) for ts, s in series]
+    values = [(ts, v) for ts, v in values if v is not None]
+    if not values:
+        return {}
+    weighted, span = 0.0, 0.0
+    for (ts, v), (next_ts, _) in zip(values, values[1:]):
+        weighted += v * (next_ts - ts)
+        span += next_ts - ts
+    mean = weighted / span if span > 0 else sum(v for _, v in values) / len(values)
+    nums = [v for _, v in values]
+    return {"min": min(nums), "max": max(nums), "mean": round(mean, 3), "last": nums[-1]}
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class _Bucket:
+    __slots__ = ("initial", "points")
+
+    def __init__(self, initial: Any = None, points: Optional[List[Point]] = None):
+        self.initial = initial
+        self.points = points or []
+
+
+class HistoryService:
+    """Bucketed per-entity history cache in front of HA ``history/period``.
+
+    Args:
+        fetch: ``fetch(entity_ids, start_ts, end_ts) -> {entity_id: [(ts, state), ...]}``.
+            The first point of each list is the state in effect at ``start_ts``.
+        clock: injectable time source (tests).
+    """
+
+    def __init__(self, fetch: Callable[[List[str], float, float], Dict[str, List[Point]]],
+                 clock: Callable[[], float] = time.time):
+        self._fetch = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Dict[int, _Bucket]]" = OrderedDict()
+        self._stats = {"requests": 0, "bucket_hits": 0, "bucket_misses": 0, "upstream_calls": 0}
+
+    @staticmethod
+    def _bucket_of(ts: float) -> int:
+        return int(ts // BUCKET_SECONDS)
+
+    def _missing_ranges(self, entity_id: str, first: int, last: int, now: float) -> List[Tuple[int, int]]:
+        """Contiguous runs [b0, b1] of buckets not in cache (incomplete buckets always miss)."""
+        cached = self._cache.get(entity_id, {})
+        settled = self._bucket_of(now - SETTLE_SECONDS) - 1
+        runs: List[Tuple[int, int]] = []
+        for b in range(first, last + 1):
+            if b in cached and b <= settled:
+                self._stats["bucket_hits"] += 1
+                continue
+            self._stats["bucket_misses"] += 1
+            if runs and runs[-1][1] == b - 1:
+                runs[-1] = (runs[-1][0], b)
+            else:
+                runs.append((b, b))
+        return runs
+
+    def _store(self, entity_id: str, b0: int, b1: int, points: List[Point],
+               now: float, transient: Dict[str, Dict[int, _Bucket]]) -> None:
+        """Split a fetched run into buckets; cache the settled ones."""
+        settled = self._bucket_of(now - SETTLE_SECONDS) - 1
+        start_ts = b0 * BUCKET_SECONDS
+        current, idx = None, 0
+        if points and points[0][0] <= start_ts:
+            # HA's first entry is the state in effect at the range start (it may
+            # also be a change exactly at the boundary, so it stays a point too)
+            current = points[0][1]
+        with self._lock:
+            entity_cache = self._cache.setdefault(entity_id, {})
+            self._cache.move_to_end(entity_id)
+            for b in range(b0, b1 + 1):
+                bucket_end = (b + 1) * BUCKET_SECONDS
+                bucket = _Bucket(initial=current)
+                while idx < len(points) and points[idx][0] < bucket_end:
+                    bucket.points.append(points[idx])
+                    current = points[idx][1]
+                    idx += 1
+                if b <= settled:
+                    entity_cache[b] = bucket
+                else:
+                    transient.setdefault(entity_id, {})[b] = bucket
+            while len(self._cache) > MAX_CACHED_ENTITIES:
+                self._cache.popitem(last=False)
+
+    def _prune(self, now: float) -> None:
+        oldest = self._bucket_of(now - RETENTION_SECONDS)
+        for buckets in self._cache.values():
+            for b in [b for b in buckets if b < oldest]:
+                del buckets[b]
+
+    def get(self, entity_ids: List[str], start_ts: float, end_ts: float,
+            max_points: Optional[int] = None) -> Dict[str, List[Point]]:
+        """History for *entity_ids* over [start_ts, end_ts), optionally downsampled."""
+        now = self._clock()
+        end_ts = min(end_ts, now)
+        first, last = self._bucket_of(start_ts), self._bucket_of(end_ts)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._prune(now)
+            missing = {eid: tuple(self._missing_ranges(eid, first, last, now)) for eid in entity_ids}
+
+        # One upstream call per distinct missing range, shared by all entities needing it
+        by_range: Dict[Tuple[int, int], List[str]] = {}
+        for eid, runs in missing.items():
+            for run in runs:
+                by_range.setdefault(run, []).append(eid)
+        transient: Dict[str, Dict[int, _Bucket]] = {}
+        for (b0, b1), eids in by_range.items():
+            range_start = b0 * BUCKET_SECONDS
+            range_end = min((b1 + 1) * BUCKET_SECONDS, now)
+            self._stats["upstream_calls"] += 1
+            fetched = self._fetch(eids, range_start, range_end)
+            for eid in eids:
+                self._store(eid, b0, b1, fetched.get(eid, []), now, transient)
+
+        result: Dict[str, List[Point]] = {}
+        with self._lock:
+            for eid in entity_ids:
+                buckets = {**self._cache.get(eid, {}), **transient.get(eid, {})}
+                result[eid] = self._assemble(buckets, first, last, start_ts, end_ts)
+        return {eid: downsample(series, max_points) for eid, series in result.items()}
+
+    @staticmethod
+    def _assemble(buckets: Dict[int, _Bucket], first: int, last: int,
+                  start_ts: float, end_ts: float) -> List[Point]:
+        series: List[Point] = []
+        head = buckets.get(first)
+        initial = head.initial if head else None
+        if head:
+            for ts, state in head.points:
+                if ts <= start_ts:
+                    initial = state
+        if initial is not None:
+            series.append((start_ts, initial))
+        for b in range(first, last + 1):
+            bucket = buckets.get(b)
+            if bucket is None:
+                continue
+            for ts, state in bucket.points:
+                # Skip repeats: range-start entries re-state the current value
+                if start_ts < ts < end_ts and (not series or series[-1][1] != state):
+                    series.append((ts, state))
+        return series
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "cached_entities": len(self._cache),
+                    "cached_buckets": sum(len(b) for b in self._cache.values())}
+
+
+# ---------------------------------------------------------------------------
+# Home Assistant wiring
+# ---------------------------------------------------------------------------
+
+def _ha_fetch(entity_ids: List[str], start_ts: float, end_ts: float) -> Dict[str, List[Point]]:
+    import api
+    start = datetime.fromtimestamp(start_ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    end = datetime.fromtimestamp(end_ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    endpoint = (f"history/period/{start}Z?filter_entity_id={','.join(entity_ids)}"
+                f"&end_time={end}Z&minimal_response&no_attributes")
+    result = api.call_ha_api("GET", endpoint)
+    if not isinstance(result, list):
+        raise RuntimeError(f"history/period failed: {result}")
+    out: Dict[str, List[Point]] = {}
+    for entries in result:
+        if not isinstance(entries, list) or not entries:
+            continue
+        eid = entries[0].get("entity_id")
+        if not eid:
+            continue
+        points = []
+        for e in entries:
+            try:
+                ts = parse_ts(e.get("last_changed") or e.get("last_updated"))
+            except (TypeError, ValueError, AttributeError):
+                continue
+            points.append((max(ts, start_ts), e.get("state")))
+        out[eid] = points
+    return out
+
+
+_service: Optional[HistoryService] = None
+_service_lock = threading.Lock()
+
+
+def get_history_service() -> HistoryService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = HistoryService(_ha_fetch)
+    return _service
@@ -0,0 +1,115 @@
+"""Model refresh service: periodic background refresh of provider model lists.
+
+The first refresh runs right after startup (see api.start_background_startup);
+later ones repeat every MODEL_REFRESH_INTERVAL_HOURS (default 12) with ±10%
+jitter so restarts of many add-ons do not hit provider APIs in lockstep.
+The actual fetch + merge is the ``refresh`` callable (api's
+``_refresh_model_cache_at_startup``); until it reports back, callers keep
+using the cached lists.  Set MODEL_REFRESH_INTERVAL_HOURS=0 to refresh only
+once at startup.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_HOURS = 12.0
+JITTER = 0.1
+
+
+def _interval_from_env() -> float:
+    try:
+        return max(0.0, float(os.getenv("MODEL_REFRESH_INTERVAL_HOURS", DEFAULT_INTERVAL_HOURS))) * 3600
+    except ValueError:
+        return DEFAULT_INTERVAL_HOURS * 3600
+
+
+class ModelRefreshService:
+    """Runs ``refresh()`` now and then periodically, recording the outcome."""
+
+    def __init__(self, refresh: Callable[[], Dict[str, Any]], interval: Optional[float] = None,
+                 jitter: float = JITTER):
+        self._refresh = refresh
+        self._interval = _interval_from_env() if interval is None else interval
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._running = threading.Lock()   # one refresh at a time
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._state: Dict[str, Any] = {"runs": 0, "failures": 0, "last_run_at": None,
+                                       "last_duration_s": None, "last_result": None, "next_at": None}
+
+    def next_delay(self) -> float:
+        return self._interval * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def refresh_now(self) -> Dict[str, Any]:
+        """Refresh synchronously; a refresh already in progress is not started twice."""
+        if not self._running.acquire(blocking=False):
+            return {"success": False, "error": "refresh already running"}
+        t0 = time.monotonic()
+        try:
+            result = self._refresh()
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        finally:
+            self._running.release()
+        if not isinstance(result, dict):
+            result = {"success": True}
+        with self._lock:
+            self._state["runs"] += 1
+            if not result.get("success", True):
+                self._state["failures"] += 1
+            self._state.update(last_run_at=time.time(), last_duration_s=round(time.monotonic() - t0, 2),
+                               last_result={k: v for k, v in result.items() if k != "updated"})
+        return result
+
+    def start(self, delay: float = 0.0) -> None:
+        """Refresh in the background after *delay* seconds, then periodically (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(delay,), name="model-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, delay: float) -> None:
+        while True:
+            with self._lock:
+                self._state["next_at"] = time.time() + delay
+            if self._stop.wait(delay):
+                return
+            self.refresh_now()
+            if self._interval <= 0:
+                return
+            delay = self.next_delay()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            st = dict(self._state)
+        next_at = st.pop("next_at", None)
+        st["interval_hours"] = round(self._interval / 3600, 2)
+        st["next_in_s"] = max(0, round(next_at - time.time())) if next_at else None
+        st["running"] = self._running.locked()
+        return st
+
+
+_service: Optional[ModelRefreshService] = None
+_service_lock = threading.Lock()
+
+
+def get_model_refresh_service() -> ModelRefreshService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                import api
+                _service = ModelRefreshService(api._refresh_model_cache_at_startup)
+    return _service
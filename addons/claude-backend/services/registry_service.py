@@ -0,0 +1,373 @@
+"""Registry service: cached Home Assistant registry graph with secondary indexes.
+
+Backs ``get_integration_entities``, ``get_devices``, ``get_areas``,
+``manage_areas`` and the registry/device_class sections of
+``intent.build_smart_context``.
+
+- Registries: entity, device and area registries plus config entries are
+  each fetched once over the WebSocket API and cached.
+- Freshness: a background WebSocket listener subscribes to
+  ``entity_registry_updated`` / ``device_registry_updated`` /
+  ``area_registry_updated`` and marks the matching registry stale; it is
+  reloaded on the next lookup.  Config entries are refreshed together with
+  the entity registry (new integrations always add entities).  Without the
+  listener (connect failure), every registry expires after ``TTL_SECONDS``.
+  Local writes (``manage_areas``, ``manage_entity``) invalidate explicitly.
+- Indexes: entities by domain, platform, config entry, device and
+  *effective* area (the entity's own area, else its device's area — the
+  same rule as HA's ``area_entities()``), rebuilt once per reload.
+- States: ``api.get_all_states()`` hands every fresh snapshot to
+  ``observe_states``; the state map and the ``device_class`` index are built
+  lazily from the latest snapshot.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TTL_SECONDS = 600              # fallback expiry when no event listener is connected
+RECONNECT_MAX_DELAY = 60.0
+
+ENTITY, DEVICE, AREA, CONFIG_ENTRY = "entity", "device", "area", "config_entry"
+
+_COMMANDS = {
+    ENTITY: "config/entity_registry/list",
+    DEVICE: "config/device_registry/list",
+    AREA: "config/area_registry/list",
+    CONFIG_ENTRY: "config_entries/get_entries",
+}
+_EVENTS = {
+    "entity_registry_updated": (ENTITY, CONFIG_ENTRY),
+    "device_registry_updated": (DEVICE,),
+    "area_registry_updated": (AREA,),
+}
+
+
+class RegistryGraph:
+    """Entity/device/area/config-entry registries with O(result) lookups.
+
+    Args:
+        fetch: ``fetch(ws_command) -> list`` returning a registry list
+            (raises or returns a non-list on failure).
+        connect: optional; returns a websocket-like object (recv/close, recv
+            raising on timeout) already subscribed to the registry events.
+    """
+
+    def __init__(self, fetch: Callable[[str], Any], connect: Optional[Callable[[], Any]] = None,
+                 ttl: float = TTL_SECONDS):
+        self._fetch = fetch
+        self._connect = connect
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        self._data: Dict[str, List[Dict[str, Any]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._stale: Set[str] = set()
+        self._idx: Optional[Dict[str, Any]] = None
+        self._states: List[Dict[str, Any]] = []
+        self._state_idx: Optional[Dict[str, Any]] = None
+        self._listener: Optional[threading.Thread] = None
+        self._listening = False
+        self._stats = {"loads": 0, "events": 0, "load_errors": 0}
+
+    # ------------------------------------------------------------------
+    # Loading / invalidation
+    # ------------------------------------------------------------------
+
+    def _expired(self, kind: str) -> bool:
+        if kind in self._stale or kind not in self._data:
+            return True
+        return not self._listening and time.time() - self._loaded_at.get(kind, 0) > self._ttl
+
+    def _get(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_listener()
+            if not self._expired(kind):
+                return self._data[kind]
+            try:
+                result = self._fetch(_COMMANDS[kind])
+            except Exception as e:
+                result = None
+                logger.warning(f"Registry: loading {kind} registry failed: {e}")
+            if isinstance(result, list):
+                self._data[kind] = result
+                self._loaded_at[kind] = time.time()
+                self._stale.discard(kind)
+                self._idx = None
+                self._stats["loads"] += 1
+                logger.debug(f"Registry: loaded {len(result)} {kind} entries")
+            else:
+                self._stats["load_errors"] += 1
+            # On failure keep serving the previous copy (if any)
+            return self._data.get(kind, [])
+
+    def invalidate(self, *kinds: str) -> None:
+        """Mark registries stale (all of them when called without arguments)."""
+        with self._lock:
+            self._stale.update(kinds or _COMMANDS.keys())
+
+    def observe_states(self, states: List[Dict[str, Any]]) -> None:
+        """Record the latest full ``/api/states`` snapshot."""
+        with self._lock:
+            self._states = states
+            self._state_idx = None
+
+    # ------------------------------------------------------------------
+    # Indexes
+    # ------------------------------------------------------------------
+
+    def _indexes(self) -> Dict[str, Any]:
+        entities = self._get(ENTITY)
+        devices = self._get(DEVICE)
+        areas = self._get(AREA)
+        entries = self._get(CONFIG_ENTRY)
+        with self._lock:
+            if self._idx is not None:
+                return self._idx
+            device_by_id = {d.get("id"): d for d in devices if d.get("id")}
+            idx: Dict[str, Any] = {
+                "entity": {},
+                "device": device_by_id,
+                "area": {a.get("area_id"): a for a in areas if a.get("area_id")},
+                "config_entry": {e.get("entry_id"): e for e in entries if e.get("entry_id")},
+                "by_domain": defaultdict(list),
+                "by_platform": defaultdict(list),
+                "by_config_entry": defaultdict(list),
+                "by_device": defaultdict(list),
+                "by_area": defaultdict(list),
+            }
+            for r in entities:
+                eid = r.get("entity_id")
+                if not eid:
+                    continue
+                idx["entity"][eid] = r
+                idx["by_domain"][eid.split(".", 1)[0]].append(eid)
+                if r.get("platform"):
+                    idx["by_platform"][r["platform"]].append(eid)
+                if r.get("config_entry_id"):
+                    idx["by_config_entry"][r["config_entry_id"]].append(eid)
+                if r.get("device_id"):
+                    idx["by_device"][r["device_id"]].append(eid)
+                area = r.get("area_id") or (device_by_id.get(r.get("device_id")) or {}).get("area_id")
+                if area:
+                    idx["by_area"][area].append(eid)
+            self._idx = idx
+            return idx
+
+    def _states_index(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._state_idx is None:
+                by_id: Dict[str, Dict[str, Any]] = {}
+                by_dc: Dict[str, List[str]] = defaultdict(list)
+                for s in self._states:
+                    eid = s.get("entity_id")
+                    if not eid:
+                        continue
+                    by_id[eid] = s
+                    dc = (s.get("attributes") or {}).get("device_class")
+                    if dc:
+                        by_dc[dc].append(eid)
+                self._state_idx = {"by_id": by_id, "by_device_class": by_dc}
+            return self._state_idx
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def entities(self) -> Dict[str, Dict[str, Any]]:
+        """entity_id -> entity registry entry."""
+        return self._indexes()["entity"]
+
+    def devices(self) -> List[Dict[str, Any]]:
+        return self._get(DEVICE)
+
+    def areas(self) -> List[Dict[str, Any]]:
+        return self._get(AREA)
+
+    def config_entries(self) -> List[Dict[str, Any]]:
+        return self._get(CONFIG_ENTRY)
+
+    def entity_ids_by_domain(self, domain: str) -> List[str]:
+        return list(self._indexes()["by_domain"].get(domain, ()))
+
+    def entity_ids_by_area(self, area_id: str) -> List[str]:
+        return list(self._indexes()["by_area"].get(area_id, ()))
+
+    def entity_ids_by_device(self, device_id: str) -> List[str]:
+        return list(self._indexes()["by_device"].get(device_id, ()))
+
+    def entity_ids_by_config_entry(self, entry_id: str) -> List[str]:
+        return list(self._indexes()["by_config_entry"].get(entry_id, ()))
+
+    def entity_ids_by_platform(self, platform: str) -> List[str]:
+        return list(self._indexes()["by_platform"].get(platform, ()))
+
+    def integration_entities(self, keywords: Iterable[str]) -> List[Dict[str, Any]]:
+        """Registry entries whose platform, or config entry domain/title, contains a keyword.
+
+        Only the (few hundred) platform names and config entries are scanned,
+        never the full entity list.
+        """
+        idx = self._indexes()
+        keywords = [k.lower() for k in keywords if k]
+        eids: Dict[str, None] = {}
+        for platform, ids in idx["by_platform"].items():
+            p = platform.lower()
+            if any(k in p for k in keywords):
+                eids.update(dict.fromkeys(ids))
+        for entry_id, entry in idx["config_entry"].items():
+            domain = (entry.get("domain") or "").lower()
+            title = (entry.get("title") or "").lower()
+            if any(k in domain or k in title for k in keywords):
+                eids.update(dict.fromkeys(idx["by_config_entry"].get(entry_id, ())))
+        return [idx["entity"][e] for e in eids]
+
+    def area_summary(self) -> List[Dict[str, Any]]:
+        """``[{id, name, entities}]`` — the shape of HA's ``areas()`` template."""
+        idx = self._indexes()
+        return [
+            {"id": area_id, "name": a.get("name", ""), "entities": list(idx["by_area"].get(area_id, ()))}
+            for area_id, a in idx["area"].items()
+        ]
+
+    def entity_area_names(self) -> Dict[str, str]:
+        """entity_id -> name of its effective area."""
+        idx = self._indexes()
+        out: Dict[str, str] = {}
+        for area_id, ids in idx["by_area"].items():
+            name = (idx["area"].get(area_id) or {}).get("name", "")
+            if name:
+                out.update(dict.fromkeys(ids, name))
+        return out
+
+    def states(self) -> List[Dict[str, Any]]:
+        """The latest full states snapshot (empty until one was observed)."""
+        return self._states
+
+    def state(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        return self._states_index()["by_id"].get(entity_id)
+
+    def states_by_device_class(self, device_classes: Iterable[str]) -> List[Dict[str, Any]]:
+        """States (from the latest snapshot) whose ``device_class`` is in *device_classes*."""
+        idx = self._states_index()
+        out = []
+        for dc in device_classes:
+            out.extend(idx["by_id"][eid] for eid in idx["by_device_class"].get(dc, ()))
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                "listening": self._listening,
+                "registries": {
+                    kind: {"count": len(self._data.get(kind, [])),
+                           "age_s": round(now - self._loaded_at[kind]) if kind in self._loaded_at else None,
+                           "stale": kind in self._stale}
+                    for kind in _COMMANDS
+                },
+                "states": len(self._states),
+                **self._stats,
+            }
+
+    # ------------------------------------------------------------------
+    # Event listener
+    # ------------------------------------------------------------------
+
+    def _ensure_listener(self) -> None:
+        if self._connect is None or (self._listener and self._listener.is_alive()):
+            return
+        self._listener = threading.Thread(target=self._listen, name="registry-events", daemon=True)
+        self._listener.start()
+
+    def handle_event(self, raw: str) -> None:
+        try:
+            msg = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if msg.get("type") != "event":
+            return
+        kinds = _EVENTS.get((msg.get("event") or {}).get("event_type"))
+        if kinds:
+            self._stats["events"] += 1
+            self.invalidate(*kinds)
+
+    def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            ws = None
+            try:
+                ws = self._connect()
+                # Anything missed while disconnected is unknown: reload everything
+                self.invalidate()
+                self._listening = True
+                delay = 1.0
+                logger.info("Registry: listening for registry update events")
+                while True:
+                    try:
+                        raw = ws.recv()
+                    except Exception as e:
+                        if "timed out" in str(e).lower() or type(e).__name__ == "WebSocketTimeoutException":
+                            continue
+                        raise
+                    self.handle_event(raw)
+            except Exception as e:
+                logger.debug(f"Registry: event listener disconnected: {e}")
+            finally:
+                self._listening = False
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+
+# ---------------------------------------------------------------------------
+# Home Assistant wiring
+# ---------------------------------------------------------------------------
+
+def _ha_fetch(command: str) -> Any:
+    import api
+    result = api.call_ha_websocket(command)
+    if isinstance(result, dict) and result.get("success") is not False:
+        return result.get("result")
+    return None
+
+
+def _ha_connect():
+    import api
+    import websocket as ws_lib
+    ws_url = api.HA_URL.replace("http://", "ws://").replace("https://", "wss://") + "/websocket"
+    ws = ws_lib.create_connection(ws_url, timeout=15)
+    try:
+        json.loads(ws.recv())  # auth_required
+        ws.send(json.dumps({"type": "auth", "access_token": api.get_ha_token()}))
+        auth = json.loads(ws.recv())
+        if auth.get("type") != "auth_ok":
+            raise RuntimeError(f"WS auth failed: {auth.get('type')}")
+        for i, event_type in enumerate(_EVENTS, start=1):
+            ws.send(json.dumps({"id": i, "type": "subscribe_events", "event_type": event_type}))
+        ws.settimeout(30.0)
+        return ws
+    except Exception:
+        ws.close()
+        raise
+
+
+_graph: Optional[RegistryGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_registry_graph() -> RegistryGraph:
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = RegistryGraph(_ha_fetch, _ha_connect)
+    return _graph
@@ -26,6 +26,7 @@ SETTINGS_DEFAULTS = {
     "enable_chat_bubble": True,
     "enable_amira_card_button": True,
     "enable_amira_automation_button": True,
+    "enable_fast_path": True,
     "enable_mcp": False,
     "fallback_enabled": False,
     "anthropic_extended_thinking": False,
@@ -65,6 +66,7 @@ _SETTINGS_GLOBAL_MAP = {
     "enable_chat_bubble": "ENABLE_CHAT_BUBBLE",
     "enable_amira_card_button": "ENABLE_AMIRA_CARD_BUTTON",
     "enable_amira_automation_button": "ENABLE_AMIRA_AUTOMATION_BUTTON",
+    "enable_fast_path": "ENABLE_FAST_PATH",
     "enable_mcp": "ENABLE_MCP",
     "fallback_enabled": "FALLBACK_ENABLED",
     "anthropic_extended_thinking": "ANTHROPIC_EXTENDED_THINKING",
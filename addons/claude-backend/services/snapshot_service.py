@@ -0,0 +1,301 @@
+"""Snapshot service: content-addressed backups of config files before writes.
+
+Layout under ``SNAPSHOTS_DIR``:
+
+    index.json                      snapshot metadata + per-file retention lists
+    blobs/<aa>/<sha256>.gz          gzip-compressed file contents, one per hash
+
+- Dedup: identical contents are stored once, however many snapshots (or
+  files) reference them.  Snapshotting a file whose content equals its latest
+  snapshot returns that snapshot instead of creating a new one.
+- Index: ``list``/``get``/``restore`` and per-file retention read the in-memory
+  index; the snapshot directory is never rescanned.  Blobs are deleted when
+  the last snapshot referencing them is pruned.
+- Migration: snapshots in the legacy flat layout (``<id>`` + ``<id>.meta``)
+  are imported into the index once, the first time the store is opened.
+
+Snapshot ids keep the legacy ``YYYYMMDD_HHMMSS_<safe_name>`` format.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+BLOBS_DIR = "blobs"
+INDEX_VERSION = 1
+
+
+def _safe_name(name: str) -> str:
+    return name.replace("/", "__").replace("\\", "__")
+
+
+class SnapshotStore:
+    """Content-addressed snapshot store with a JSON index."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_mtime = 0.0
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX_FILE)
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the index, reloading only if the file changed on disk."""
+        path = self._index_path
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = 0.0
+        if self._index is not None and mtime == self._index_mtime:
+            return self._index
+        index: Dict[str, Any] = {"version": INDEX_VERSION, "snapshots": {}, "files": {}}
+        if mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f) or {}
+                index["snapshots"] = data.get("snapshots") or {}
+                index["files"] = data.get("files") or {}
+            except Exception as e:
+                logger.warning(f"Snapshot index unreadable, rebuilding from legacy files: {e}")
+        self._index, self._index_mtime = index, mtime
+        self._migrate_legacy()
+        return index
+
+    def _save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self._index_path)
+        self._index_mtime = os.path.getmtime(self._index_path)
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, BLOBS_DIR, digest[:2], digest + ".gz")
+
+    def _put_blob(self, data: bytes) -> Dict[str, Any]:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6, mtime=0))
+            os.replace(tmp, path)
+        return {"blob": digest, "stored_size": os.path.getsize(path)}
+
+    def _drop_blob_if_unused(self, digest: str) -> None:
+        if any(m.get("blob") == digest for m in self._index["snapshots"].values()):
+            return
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def create(
+        self,
+        original_file: str,
+        data: bytes,
+        max_per_file: int,
+        kind: str = "file",
+        extra: Optional[Dict[str, Any]] = None,
+        safe_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Store *data* as a new snapshot of *original_file*; returns its metadata."""
+        with self._lock:
+            index = self._load()
+            history: List[str] = index["files"].setdefault(original_file, [])
+            digest = hashlib.sha256(data).hexdigest()
+            if history:
+                latest = index["snapshots"].get(history[-1])
+                if latest and latest.get("blob") == digest:
+                    logger.debug(f"Snapshot unchanged, reusing {latest['snapshot_id']}")
+                    return dict(latest, deduplicated=True)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            snapshot_id = f"{timestamp}_{safe_name or _safe_name(original_file)}"
+            meta: Dict[str, Any] = {
+                "snapshot_id": snapshot_id,
+                "original_file": original_file,
+                "timestamp": timestamp,
+                "created_at": time.time(),
+                "kind": kind,
+                "size": len(data),
+                **self._put_blob(data),
+                **(extra or {}),
+            }
+            old = index["snapshots"].get(snapshot_id)
+            if snapshot_id in history:
+                history.remove(snapshot_id)  # same second: the newer content wins
+            history.append(snapshot_id)
+            index["snapshots"][snapshot_id] = meta
+            if old and old.get("blob") != digest:
+                self._drop_blob_if_unused(old["blob"])
+            self._prune(original_file, max(1, int(max_per_file)))
+            self._save()
+        logger.info(f"Snapshot created: {snapshot_id}")
+        return dict(meta)
+
+    def create_from_file(self, original_file: str, src_path: str, max_per_file: int) -> Dict[str, Any]:
+        with open(src_path, "rb") as f:
+            data = f.read()
+        return self.create(original_file, data, max_per_file)
+
+    def _prune(self, original_file: str, keep: int) -> None:
+        history = self._index["files"].get(original_file) or []
+        while len(history) > keep:
+            oldest = history.pop(0)
+            meta = self._index["snapshots"].pop(oldest, None)
+            if meta:
+                self._drop_blob_if_unused(meta.get("blob", ""))
+            logger.debug(f"Snapshot auto-deleted (per-file limit): {oldest}")
+
+    def get(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self._load()["snapshots"].get(snapshot_id)
+            return dict(meta) if meta else None
+
+    def read(self, snapshot_id: str) -> Optional[bytes]:
+        """Return the snapshot contents, or None if unknown / blob missing."""
+        meta = self.get(snapshot_id)
+        if not meta:
+            return None
+        try:
+            with open(self._blob_path(meta["blob"]), "rb") as f:
+                return gzip.decompress(f.read())
+        except (OSError, KeyError) as e:
+            logger.warning(f"Snapshot blob missing for {snapshot_id}: {e}")
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All snapshots, oldest first."""
+        with self._lock:
+            snaps = [dict(m) for m in self._load()["snapshots"].values()]
+        snaps.sort(key=lambda m: (m.get("created_at", 0), m.get("snapshot_id", "")))
+        return snaps
+
+    def delete(self, snapshot_id: str) -> bool:
+        with self._lock:
+            index = self._load()
+            meta = index["snapshots"].pop(snapshot_id, None)
+            if not meta:
+                return False
+            history = index["files"].get(meta.get("original_file", ""))
+            if history and snapshot_id in history:
+                history.remove(snapshot_id)
+                if not history:
+                    index["files"].pop(meta.get("original_file", ""), None)
+            self._drop_blob_if_unused(meta.get("blob", ""))
+            self._save()
+        logger.info(f"Snapshot deleted: {snapshot_id}")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snaps = list(self._load()["snapshots"].values())
+        blobs = {m.get("blob"): m.get("stored_size", 0) for m in snaps}
+        return {
+            "snapshots": len(snaps),
+            "files": len({m.get("original_file") for m in snaps}),
+            "blobs": len(blobs),
+            "logical_bytes": sum(m.get("size", 0) for m in snaps),
+            "stored_bytes": sum(blobs.values()),
+        }
+
+    # ------------------------------------------------------------------
+    # Legacy layout
+    # ------------------------------------------------------------------
+
+    def _migrate_legacy(self) -> None:
+        """Import ``<id>`` + ``<id>.meta`` files from the old flat layout."""
+        if not os.path.isdir(self.root):
+            return
+        reserved = {INDEX_FILE, INDEX_FILE + ".tmp", BLOBS_DIR}
+        legacy = sorted(
+            f for f in os.listdir(self.root)
+            if f not in reserved and not f.endswith(".meta")
+            and os.path.isfile(os.path.join(self.root, f))
+        )
+        if not legacy:
+            return
+        index = self._index
+        for snapshot_id in legacy:
+            path = os.path.join(self.root, snapshot_id)
+            meta: Dict[str, Any] = {}
+            try:
+                with open(path + ".meta", "r", encoding="utf-8") as f:
+                    meta = json.load(f) or {}
+            except Exception:
+                pass
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            original = meta.get("original_file") or snapshot_id.split("_", 2)[-1].replace("__", "/")
+            timestamp = meta.get("timestamp") or "_".join(snapshot_id.split("_", 2)[:2])
+            try:
+                created_at = datetime.strptime(timestamp, "%Y%m%d_%H%M%S").timestamp()
+            except ValueError:
+                created_at = os.path.getmtime(path)
+            meta.update(
+                snapshot_id=snapshot_id,
+                original_file=original,
+                timestamp=timestamp,
+                created_at=created_at,
+                kind=meta.get("kind") or "file",
+                size=len(data),
+                **self._put_blob(data),
+            )
+            index["snapshots"][snapshot_id] = meta
+            history = index["files"].setdefault(original, [])
+            if snapshot_id not in history:
+                history.append(snapshot_id)
+        for history in index["files"].values():
+            history.sort(key=lambda sid: index["snapshots"].get(sid, {}).get("created_at", 0))
+        # Persist the index before removing the legacy copies
+        self._save()
+        for snapshot_id in legacy:
+            for p in (snapshot_id, snapshot_id + ".meta"):
+                try:
+                    os.remove(os.path.join(self.root, p))
+                except OSError:
+                    pass
+        logger.info(f"Snapshot store: migrated {len(legacy)} legacy snapshot(s) into {self.root}")
+
+
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                import api
+                _store = SnapshotStore(api.SNAPSHOTS_DIR)
+    return _store
@@ -0,0 +1,382 @@
+"""State stream service: filtered, coalesced entity state push for HTML dashboards.
+
+One upstream Home Assistant WebSocket subscription (``state_changed``) is
+shared by every open dashboard. Each client only receives the entities it
+declares (its ``ENTITIES`` list): an initial snapshot, then diffs.
+
+Change tracking is sequence based: every accepted state change bumps a global
+``seq`` and is stored as ``{entity_id: (seq, state)}``. A client remembers the
+last seq it saw and asks for "my entities changed since N", which serves both
+the SSE stream and the long-poll endpoint with the same code path and makes
+bursts naturally coalesce into one diff.
+
+Only entities somebody is watching are cached. Watched ids that HA does not
+know are remembered for ``MISSING_TTL_SECONDS`` so polls don't fetch them
+again; a creation event still delivers them at once. The upstream connection is
+opened on the first subscriber and closed after ``IDLE_SECONDS`` without any.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COALESCE_SECONDS = 0.5      # batch bursts of changes into one diff
+KEEPALIVE_SECONDS = 15.0    # SSE comment ping interval
+LEASE_SECONDS = 90.0        # long-poll clients keep interest alive this long
+IDLE_SECONDS = 60.0         # close upstream after this long with no interest
+RECONNECT_MAX_DELAY = 30.0
+BULK_SNAPSHOT_THRESHOLD = 15  # above this many missing ids, fetch /api/states once
+MISSING_TTL_SECONDS = 60.0  # ids HA does not know are not fetched again for this long
+# Each SSE client pins a waitress worker thread (6 in total), so only a few
+# may stream; the rest use the non-blocking /dashboard_api/poll diff endpoint.
+MAX_STREAM_CLIENTS = int(os.getenv("DASHBOARD_STREAM_MAX_CLIENTS", "2"))
+
+# Attributes the dashboards don't render but HA sends on every change
+_DROP_ATTRIBUTES = frozenset({"entity_picture_local", "supported_features", "context"})
+
+
+def compact_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the fields dashboards use, in HA's /api/states shape."""
+    attrs = state.get("attributes") or {}
+    return {
+        "entity_id": state.get("entity_id"),
+        "state": state.get("state"),
+        "attributes": {k: v for k, v in attrs.items() if k not in _DROP_ATTRIBUTES},
+        "last_changed": state.get("last_changed"),
+        "last_updated": state.get("last_updated"),
+    }
+
+
+class StateHub:
+    """Shared upstream subscription + per-entity versioned state cache.
+
+    Args:
+        connect: returns an authenticated websocket-like object (send/recv/close,
+            recv raising on timeout) already subscribed to ``state_changed``.
+        fetch_states: ``fetch_states(entity_ids) -> list[state dict]`` used for
+            snapshots of entities not yet cached.
+    """
+
+    def __init__(self, connect: Callable[[], Any],
+                 fetch_states: Callable[[List[str]], List[Dict[str, Any]]]):
+        self._connect = connect
+        self._fetch_states = fetch_states
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._states: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._missing: Dict[str, float] = {}  # entity_id -> monotonic expiry
+        self._refs: Dict[str, int] = {}
+        self._leases: Dict[str, float] = {}
+        self._idle_since: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ws = None
+        self._stop = threading.Event()
+        self._stats = {"upstream_connects": 0, "events": 0, "accepted": 0,
+                       "snapshots_fetched": 0, "clients": 0}
+
+    # ---- interest management ----
+
+    def _interested(self, entity_id: str) -> bool:
+        return entity_id in self._refs or entity_id in self._leases
+
+    def _ensure_cached(self, entity_ids: Iterable[str]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            missing = [e for e in entity_ids if e not in self._states and self._missing.get(e, 0.0) <= now]
+        if not missing:
+            return
+        try:
+            fetched = self._fetch_states(missing)
+            self._stats["snapshots_fetched"] += 1
+        except Exception as e:
+            logger.warning(f"State stream: snapshot fetch failed: {e}")
+            return
+        with self._cond:
+            found = set()
+            for state in fetched:
+                eid = state.get("entity_id") if isinstance(state, dict) else None
+                if not eid:
+                    continue
+                found.add(eid)
+                if eid not in self._states and self._interested(eid):
+                    self._seq += 1
+                    self._states[eid] = (self._seq, compact_state(state))
+            expiry = time.monotonic() + MISSING_TTL_SECONDS
+            for eid in missing:
+                if eid not in found and self._interested(eid):
+                    self._missing[eid] = expiry
+            self._cond.notify_all()
+
+    def _start_upstream(self) -> None:
+        # Caller holds self._cond; _run clears self._thread under the same lock
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="state-stream-hub", daemon=True)
+        self._thread.start()
+
+    def acquire(self, entity_ids: List[str]) -> None:
+        """Register a streaming client's interest (ref-counted)."""
+        with self._cond:
+            for eid in entity_ids:
+                self._refs[eid] = self._refs.get(eid, 0) + 1
+            self._stats["clients"] += 1
+            self._idle_since = None
+            self._start_upstream()
+        self._ensure_cached(entity_ids)
+
+    def release(self, entity_ids: List[str]) -> None:
+        with self._cond:
+            for eid in entity_ids:
+                n = self._refs.get(eid, 0) - 1
+                if n > 0:
+                    self._refs[eid] = n
+                else:
+                    self._refs.pop(eid, None)
+            self._stats["clients"] = max(0, self._stats["clients"] - 1)
+
+    def lease(self, entity_ids: List[str]) -> None:
+        """Keep interest alive for a long-poll client until LEASE_SECONDS pass."""
+        expiry = time.monotonic() + LEASE_SECONDS
+        with self._cond:
+            for eid in entity_ids:
+                self._leases[eid] = expiry
+            self._idle_since = None
+            self._start_upstream()
+        self._ensure_cached(entity_ids)
+
+    # ---- reads ----
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    @property
+    def stream_clients(self) -> int:
+        return self._stats["clients"]
+
+    def changes_since(self, entity_ids: Iterable[str], since: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return ``(current_seq, [state...])`` for *entity_ids* changed after *since*."""
+        with self._cond:
+            out = []
+            for eid in entity_ids:
+                entry = self._states.get(eid)
+                if entry is not None and entry[0] > since:
+                    out.append(entry[1])
+            return self._seq, out
+
+    def wait_changes(self, entity_ids: List[str], since: int,
+                     timeout: float) -> Tuple[int, List[Dict[str, Any]]]:
+        """Block until one of *entity_ids* changes after *since* (or timeout).
+
+        After the first change is seen, waits COALESCE_SECONDS more so a burst
+        (e.g. a scene switching ten lights) is delivered as one diff.
+        """
+        wanted = set(entity_ids)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if any(self._states.get(e, (0,))[0] > since for e in wanted):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._seq, []
+                self._cond.wait(min(remaining, 1.0))
+        time.sleep(COALESCE_SECONDS)
+        return self.changes_since(entity_ids, since)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "seq": self._seq,
+                "cached_entities": len(self._states),
+                "missing_entities": len(self._missing),
+                "watched_entities": len(set(self._refs) | set(self._leases)),
+                "upstream_connected": self._ws is not None,
+            }
+
+    # ---- upstream ----
+
+    def _housekeeping(self) -> bool:
+        """Expire leases and drop unwatched cache entries; False when idle long enough."""
+        now = time.monotonic()
+        with self._cond:
+            for eid in [e for e, exp in self._leases.items() if exp < now]:
+                del self._leases[eid]
+            for eid in [e for e in self._states if not self._interested(e)]:
+                del self._states[eid]
+            for eid in [e for e, exp in self._missing.items() if exp < now or not self._interested(e)]:
+                del self._missing[eid]
+            if self._refs or self._leases:
+                self._idle_since = None
+                return True
+            if self._idle_since is None:
+                self._idle_since = now
+            return now - self._idle_since < IDLE_SECONDS
+
+    def _handle_message(self, raw: str) -> None:
+        try:
+            msg = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if msg.get("type") != "event":
+            return
+        data = (msg.get("event") or {}).get("data") or {}
+        eid = data.get("entity_id")
+        self._stats["events"] += 1
+        if eid and (data.get("old_state") is None) != (data.get("new_state") is None):
+            # Entity created or removed: keep the shared entity-id index current
+            from services.entity_validator import get_entity_index
+            get_entity_index().observe(eid, data.get("new_state") is not None)
+        if not eid or not self._interested(eid):
+            return
+        new_state = data.get("new_state")
+        with self._cond:
+            self._seq += 1
+            self._missing.pop(eid, None)
+            if new_state:
+                self._states[eid] = (self._seq, compact_state(new_state))
+            else:
+                # Entity removed: report it once with state None
+                self._states[eid] = (self._seq, {"entity_id": eid, "state": None, "attributes": {}})
+            self._stats["accepted"] += 1
+            self._cond.notify_all()
+
+    def _resync(self) -> None:
+        """After (re)connecting, refresh every watched entity: changes may have been missed."""
+        with self._cond:
+            watched = list(set(self._refs) | set(self._leases))
+            for eid in watched:
+                self._states.pop(eid, None)
+                self._missing.pop(eid, None)
+        self._ensure_cached(watched)
+
+    def _run(self) -> None:
+        while True:
+            self._serve_upstream()
+            with self._cond:
+                # Interest may have arrived while we were shutting down
+                if (self._refs or self._leases) and not self._stop.is_set():
+                    continue
+                self._states.clear()
+                self._missing.clear()
+                self._thread = None
+                self._cond.notify_all()
+            logger.info("State stream: upstream subscription closed")
+            return
+
+    def _serve_upstream(self) -> None:
+        """Keep one subscription open (with reconnects) until idle or shut down."""
+        delay = 1.0
+        last_housekeeping = time.monotonic()
+        while not self._stop.is_set() and self._housekeeping():
+            try:
+                self._ws = self._connect()
+                self._stats["upstream_connects"] += 1
+                delay = 1.0
+                logger.info("State stream: upstream state_changed subscription open")
+                self._resync()
+                while not self._stop.is_set():
+                    try:
+                        raw = self._ws.recv()
+                    except Exception as e:
+                        if type(e).__name__ not in ("WebSocketTimeoutException", "timeout", "TimeoutError"):
+                            raise
+                        raw = None
+                    if raw:
+                        self._handle_message(raw)
+                    if time.monotonic() - last_housekeeping > 5.0:
+                        last_housekeeping = time.monotonic()
+                        if not self._housekeeping():
+                            return
+            except Exception as e:
+                logger.warning(f"State stream: upstream error: {e} (retry in {delay:.0f}s)")
+                self._stop.wait(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            finally:
+                self._close_ws()
+
+    def _close_ws(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._close_ws()
+
+
+# ---------------------------------------------------------------------------
+# Home Assistant wiring
+# ---------------------------------------------------------------------------
+
+def _ha_connect():
+    import api
+    import websocket as ws_lib
+    ws_url = api.HA_URL.replace("http://", "ws://").replace("https://", "wss://") + "/websocket"
+    ws = ws_lib.create_connection(ws_url, timeout=15)
+    try:
+        json.loads(ws.recv())  # auth_required
+        ws.send(json.dumps({"type": "auth", "access_token": api.get_ha_token()}))
+        auth = json.loads(ws.recv())
+        if auth.get("type") != "auth_ok":
+            raise RuntimeError(f"WS auth failed: {auth.get('type')}")
+        ws.send(json.dumps({"id": 1, "type": "subscribe_events", "event_type": "state_changed"}))
+        ws.settimeout(1.0)
+        return ws
+    except Exception:
+        ws.close()
+        raise
+
+
+def _ha_fetch_states(entity_ids: List[str]) -> List[Dict[str, Any]]:
+    import api
+    if len(entity_ids) > BULK_SNAPSHOT_THRESHOLD:
+        wanted = set(entity_ids)
+        return [s for s in api.get_all_states() if s.get("entity_id") in wanted]
+    out = []
+    for eid in entity_ids:
+        result = api.call_ha_api("GET", f"states/{eid}")
+        if isinstance(result, dict) and result.get("entity_id"):
+            out.append(result)
+    return out
+
+
+_hub: Optional[StateHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> StateHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = StateHub(_ha_connect, _ha_fetch_states)
+    return _hub
+
+
+def sse_stream(entity_ids: List[str], hub: Optional[StateHub] = None):
+    """Generator of SSE frames: one ``snapshot`` then ``diff`` events + keepalives."""
+    hub = hub or get_hub()
+    hub.acquire(entity_ids)
+    try:
+        seq, states = hub.changes_since(entity_ids, 0)
+        yield f"event: snapshot\ndata: {json.dumps({'seq': seq, 'states': states})}\n\n"
+        while True:
+            new_seq, changed = hub.wait_changes(entity_ids, seq, KEEPALIVE_SECONDS)
+            if changed:
+                seq = new_seq
+                yield f"event: diff\ndata: {json.dumps({'seq': seq, 'states': changed})}\n\n"
+            else:
+                yield ": ping\n\n"
+    finally:
+        hub.release(entity_ids)
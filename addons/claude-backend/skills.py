@@ -6,6 +6,14 @@ and a body with LLM instructions.
 
 When the user prefixes a message with /skill-name, the skill body is
 injected into the system prompt before the message is processed.
+
+Installed skills are kept in an in-memory catalog (``SkillCatalog``): each
+SKILL.md is parsed once, its prompt injection text and token estimate are
+rendered up front, and the skills directory is re-checked at most every
+SCAN_INTERVAL seconds by comparing file mtimes/sizes.  Follow-up turns of a
+session with an active skill therefore do no file I/O.  The store index is
+cached for 5 minutes and then revalidated with If-None-Match /
+If-Modified-Since.
 """
 
 from __future__ import annotations
@@ -16,7 +24,8 @@ import re
 import shutil
 import threading
 import time
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +38,12 @@ _RESERVED_NAMES = {"help", "clear", "reset", "debug", "new", "abort"}
 _MAX_BODY_CHARS = 60000
 
 # Store cache: avoid hammering GitHub on every panel open
-_store_cache: dict = {"ts": 0.0, "data": None}
+_store_cache: dict = {"ts": 0.0, "data": None, "etag": None, "last_modified": None}
 _store_lock = threading.Lock()
 _STORE_TTL = 300  # 5 minutes
 
+SCAN_INTERVAL = 2.0  # seconds between mtime checks of SKILLS_DIR
+
 
 # ---------------------------------------------------------------------------
 # Parsing
@@ -59,49 +70,135 @@ def _parse_skill_md(path: str) -> dict:
     return {"meta": meta, "body": body}
 
 
+def _render_injection(name: str, body: str) -> str:
+    return f"SKILL INSTRUCTIONS ({name}):\n{body}"
+
+
+# ---------------------------------------------------------------------------
+# Catalog of installed skills
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _CatalogEntry:
+    """One parsed skill plus what the chat pipeline needs from it."""
+    stamp: tuple            # (mtime_ns, size) of SKILL.md when parsed
+    meta: dict
+    body: str
+    summary: dict           # list_skills() item
+    injection: str          # "SKILL INSTRUCTIONS (name):\n<body>" ('' for an empty body)
+    tokens: int
+
+
+class SkillCatalog:
+    """Parsed SKILL.md files, refreshed from disk only when their mtime/size change."""
+
+    def __init__(self, skills_dir: Optional[str] = None, scan_interval: float = SCAN_INTERVAL):
+        self._dir = skills_dir
+        self.scan_interval = scan_interval
+        self._entries: Dict[str, _CatalogEntry] = {}
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"scans": 0, "parses": 0, "errors": 0}
+
+    @property
+    def skills_dir(self) -> str:
+        return self._dir or SKILLS_DIR
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Force a rescan on the next access; *name* is also re-parsed (after install/delete)."""
+        with self._lock:
+            self._scanned_at = 0.0
+            if name is not None:
+                self._entries.pop(name, None)
+
+    def _load(self, name: str, path: str, stamp: tuple) -> Optional[_CatalogEntry]:
+        try:
+            parsed = _parse_skill_md(path)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Skills: could not read {path}: {e}")
+            return None
+        self._stats["parses"] += 1
+        meta = parsed["meta"] if isinstance(parsed["meta"], dict) else {}
+        meta.setdefault("name", name)
+        body = parsed["body"]
+        injection = _render_injection(name, body.strip()) if body.strip() else ""
+        summary = {
+            "name": name,
+            "version": meta.get("version", ""),
+            "description": meta.get("description", {}),
+            "author": meta.get("author", ""),
+            "tags": meta.get("tags", []),
+            "min_version": meta.get("min_version", ""),
+            "installed": True,
+        }
+        return _CatalogEntry(stamp, meta, body, summary, injection,
+                             len(injection) // 4)  # ~4 chars per token
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._scanned_at and now - self._scanned_at < self.scan_interval:
+                return
+            self._scanned_at = now
+            self._stats["scans"] += 1
+            root = self.skills_dir
+            try:
+                names = sorted(os.listdir(root)) if os.path.isdir(root) else []
+            except OSError as e:
+                logger.warning(f"Skills: could not list {root}: {e}")
+                names = []
+            entries: Dict[str, _CatalogEntry] = {}
+            for name in names:
+                path = os.path.join(root, name, "SKILL.md")
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size)
+                entry = self._entries.get(name)
+                if entry is None or entry.stamp != stamp:
+                    entry = self._load(name, path, stamp)
+                if entry is not None:
+                    entries[name] = entry
+            self._entries = entries
+
+    def get(self, name: str) -> Optional[_CatalogEntry]:
+        self._refresh()
+        return self._entries.get(name)
+
+    def list(self) -> list[dict]:
+        self._refresh()
+        return [dict(e.summary) for _, e in sorted(self._entries.items())]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "skills": len(self._entries),
+                    "tokens": {n: e.tokens for n, e in self._entries.items()}}
+
+
+_catalog = SkillCatalog()
+
+
+def get_catalog() -> SkillCatalog:
+    return _catalog
+
+
 # ---------------------------------------------------------------------------
 # List / get installed skills
 # ---------------------------------------------------------------------------
 
 def list_skills() -> list[dict]:
     """Return metadata for all installed skills (no body)."""
-    skills = []
-    if not os.path.isdir(SKILLS_DIR):
-        return skills
-    for name in sorted(os.listdir(SKILLS_DIR)):
-        skill_path = os.path.join(SKILLS_DIR, name, "SKILL.md")
-        if not os.path.isfile(skill_path):
-            continue
-        try:
-            parsed = _parse_skill_md(skill_path)
-            meta = parsed["meta"]
-            meta.setdefault("name", name)
-            skills.append({
-                "name": name,
-                "version": meta.get("version", ""),
-                "description": meta.get("description", {}),
-                "author": meta.get("author", ""),
-                "tags": meta.get("tags", []),
-                "min_version": meta.get("min_version", ""),
-                "installed": True,
-            })
-        except Exception as e:
-            logger.warning(f"Skills: could not read {skill_path}: {e}")
-    return skills
+    return _catalog.list()
 
 
 def get_skill(name: str) -> Optional[dict]:
     """Return full skill data (meta + body) or None if not found."""
-    skill_path = os.path.join(SKILLS_DIR, name, "SKILL.md")
-    if not os.path.isfile(skill_path):
-        return None
-    try:
-        parsed = _parse_skill_md(skill_path)
-        parsed["meta"].setdefault("name", name)
-        return parsed
-    except Exception as e:
-        logger.warning(f"Skills: could not read {skill_path}: {e}")
+    entry = _catalog.get(name)
+    if entry is None:
         return None
+    return {"meta": dict(entry.meta), "body": entry.body}
 
 
 # ---------------------------------------------------------------------------
@@ -132,6 +229,7 @@ def install_skill(name: str, skill_md_content: str) -> dict:
     try:
         with open(skill_path, "w", encoding="utf-8") as f:
             f.write(skill_md_content)
+        _catalog.invalidate(name)
         logger.info(f"Skills: installed '{name}'")
         return {"success": True, "name": name}
     except Exception as e:
@@ -145,6 +243,7 @@ def delete_skill(name: str) -> bool:
         return False
     try:
         shutil.rmtree(skill_dir)
+        _catalog.invalidate(name)
         logger.info(f"Skills: deleted '{name}'")
         return True
     except Exception as e:
@@ -158,36 +257,68 @@ def delete_skill(name: str) -> bool:
 
 def _http_get(url: str, timeout: int = 10) -> bytes:
     """Fetch URL content. Uses requests if available, falls back to urllib."""
+    return _http_get_conditional(url, timeout=timeout)[1]
+
+
+def _http_get_conditional(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                          timeout: int = 10) -> tuple[int, bytes, dict]:
+    """GET *url* with optional validators. Returns (status, body, headers); 304 has an empty body."""
     headers = {"User-Agent": "Amira-HA-Addon/1.0"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
     try:
         import requests as _req
         resp = _req.get(url, headers=headers, timeout=timeout)
+        if resp.status_code == 304:
+            return 304, b"", dict(resp.headers)
         resp.raise_for_status()
-        return resp.content
+        return resp.status_code, resp.content, dict(resp.headers)
     except ImportError:
+        import urllib.error
         import urllib.request
         req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            return r.read()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as r:
+                return r.status, r.read(), dict(r.headers)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, b"", dict(e.headers)
+            raise
 
 
 def fetch_store_index(installed_names: Optional[set] = None) -> list[dict]:
-    """Fetch skills index from GitHub (cached 5 min). Raises on failure."""
+    """Fetch skills index from GitHub (cached 5 min, then revalidated with ETag).
+
+    A stale copy is served if revalidation fails; raises only when there is
+    nothing cached yet.
+    """
     with _store_lock:
         now = time.time()
-        if _store_cache["data"] is not None and (now - _store_cache["ts"]) < _STORE_TTL:
-            skills = _store_cache["data"]
-        else:
-            import json
-            data = json.loads(_http_get(SKILLS_INDEX_URL).decode())
-            skills = data.get("skills", [])
-            _store_cache["ts"] = now
-            _store_cache["data"] = skills
+        if _store_cache["data"] is None or (now - _store_cache["ts"]) >= _STORE_TTL:
+            cached = _store_cache["data"] is not None
+            try:
+                status, body, headers = _http_get_conditional(
+                    SKILLS_INDEX_URL,
+                    _store_cache["etag"] if cached else None,
+                    _store_cache["last_modified"] if cached else None)
+                if status != 304:
+                    import json
+                    _store_cache["data"] = json.loads(body.decode()).get("skills", [])
+                    _store_cache["etag"] = headers.get("ETag") or headers.get("etag")
+                    _store_cache["last_modified"] = headers.get("Last-Modified") or headers.get("last-modified")
+                _store_cache["ts"] = now
+            except Exception as e:
+                if not cached:
+                    raise
+                logger.warning(f"Skills: store index refresh failed, serving cached copy: {e}")
+                _store_cache["ts"] = now
+        skills = _store_cache["data"]
 
     if installed_names is not None:
-        for s in skills:
-            s["installed"] = s.get("name", "") in installed_names
-    return skills
+        return [{**s, "installed": s.get("name", "") in installed_names} for s in skills]
+    return [dict(s) for s in skills]
 
 
 def fetch_skill_md(raw_url: str) -> str:
@@ -214,11 +345,8 @@ def parse_skill_command(message: str) -> tuple[Optional[str], str]:
 
 def inject_skill_into_prompt(skill_name: str, base_prompt: str) -> Optional[str]:
     """Return enriched system prompt with skill instructions prepended, or None if skill not found."""
-    skill = get_skill(skill_name)
-    if skill is None:
-        return None
-    body = skill["body"].strip()
-    if not body:
+    entry = _catalog.get(skill_name)
+    if entry is None or not entry.injection:
         return None
     separator = "\n\n---\n\n"
-    return f"SKILL INSTRUCTIONS ({skill_name}):\n{body}{separator}{base_prompt}" if base_prompt else f"SKILL INSTRUCTIONS ({skill_name}):\n{body}"
+    return f"{entry.injection}{separator}{base_prompt}" if base_prompt else entry.injection
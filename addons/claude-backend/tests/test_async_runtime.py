@@ -0,0 +1,75 @@
+"""Tests for async_runtime.py (shared event loop for sync-to-async bridges)"""
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_runtime import AsyncRuntime
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    def setUp(self):
+        self.rt = AsyncRuntime(name="test-runtime")
+
+    def tearDown(self):
+        self.rt.stop()
+
+    def test_run_uses_one_loop_and_counts_calls(self):
+        async def loop_id():
+            await asyncio.sleep(0)
+            return id(asyncio.get_running_loop())
+
+        first = self.rt.run(loop_id(), name="probe")
+        self.assertEqual(self.rt.run(loop_id(), name="probe"), first)
+        with self.assertRaises(ValueError):
+            async def boom():
+                raise ValueError("x")
+            self.rt.run(boom(), name="boom")
+        stats = self.rt.stats()
+        self.assertTrue(stats["running"])
+        self.assertEqual(stats["tasks"]["probe"]["calls"], 2)
+        self.assertEqual(stats["tasks"]["boom"]["errors"], 1)
+
+    def test_timeout_cancels_the_coroutine(self):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.rt.run(slow(), timeout=0.05, name="slow")
+        self.assertTrue(cancelled.wait(1))
+        self.assertEqual(self.rt.stats()["tasks"]["slow"]["timeouts"], 1)
+
+    def test_submitted_coroutines_run_concurrently(self):
+        async def nap():
+            await asyncio.sleep(0.2)
+            return 1
+
+        t0 = time.monotonic()
+        futures = [self.rt.submit(nap(), name="nap") for _ in range(5)]
+        self.assertEqual(sum(f.result(2) for f in futures), 5)
+        self.assertLess(time.monotonic() - t0, 0.6)
+
+    def test_run_from_loop_thread_is_rejected(self):
+        async def nested():
+            inner = asyncio.sleep(0)
+            try:
+                self.rt.run(inner)
+            except RuntimeError:
+                return "rejected"
+
+        self.assertEqual(self.rt.run(nested()), "rejected")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for the benchmark fakes and harness (benchmarks/)"""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import websocket
+
+from benchmarks.fake_ha import FakeHomeAssistant, make_home
+from benchmarks.fake_llm import FakeLLM, Rule
+from benchmarks.harness import compare, time_it
+
+
+class TestFakeHomeAssistant(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ha = FakeHomeAssistant(entities=300).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ha.stop()
+
+    def test_home_is_deterministic_and_sized(self):
+        a, b = make_home(1000, seed=1), make_home(1000, seed=1)
+        self.assertEqual(len(a["states"]), 1000)
+        self.assertEqual([s["entity_id"] for s in a["states"]], [s["entity_id"] for s in b["states"]])
+        self.assertEqual(len(a["entity_registry"]), 1000)
+
+    def test_rest_states_and_history(self):
+        states = httpx.get(f"{self.ha.url}/api/states").json()
+        self.assertEqual(len(states), 300)
+        one = httpx.get(f"{self.ha.url}/api/states/light.kitchen").json()
+        self.assertEqual(one["attributes"]["friendly_name"], "Kitchen Light")
+        hist = httpx.get(f"{self.ha.url}/api/history/period/2025-01-01T00:00:00Z",
+                         params={"filter_entity_id": "sensor.bedroom_temperature,light.kitchen"}).json()
+        self.assertEqual([h[0]["entity_id"] for h in hist], ["sensor.bedroom_temperature", "light.kitchen"])
+        self.assertEqual(httpx.get(f"{self.ha.url}/api/states/light.nope").status_code, 404)
+
+    def test_websocket_auth_registry_and_statistics(self):
+        ws = websocket.create_connection(self.ha.url.replace("http", "ws") + "/websocket", timeout=5)
+        try:
+            self.assertEqual(json.loads(ws.recv())["type"], "auth_required")
+            ws.send(json.dumps({"type": "auth", "access_token": "x"}))
+            self.assertEqual(json.loads(ws.recv())["type"], "auth_ok")
+            ws.send(json.dumps({"id": 1, "type": "config/area_registry/list"}))
+            areas = json.loads(ws.recv())
+            self.assertTrue(areas["success"] and any(a["area_id"] == "kitchen" for a in areas["result"]))
+            ws.send(json.dumps({"id": 2, "type": "recorder/statistics_during_period",
+                                "statistic_ids": ["sensor.bedroom_temperature"], "period": "hour"}))
+            stats = json.loads(ws.recv())["result"]["sensor.bedroom_temperature"]
+            self.assertGreaterEqual(len(stats), 23)
+        finally:
+            ws.close()
+        self.assertEqual(self.ha.requests["ws:config/area_registry/list"], 1)
+
+
+class TestFakeLLM(unittest.TestCase):
+    def test_tool_round_then_reply(self):
+        llm = FakeLLM([Rule("lights", "Two lights are on.", "get_entities", {"domain": "light"})]).start()
+        try:
+            tools = [{"type": "function", "function": {"name": "get_entities", "parameters": {}}}]
+            msgs = [{"role": "user", "content": "which lights are on?"}]
+
+            def stream(messages):
+                with httpx.stream("POST", f"{llm.base_url}/chat/completions",
+                                  json={"model": "m", "messages": messages, "tools": tools, "stream": True}) as r:
+                    return [json.loads(line[5:]) for line in r.iter_lines()
+                            if line.startswith("data:") and "[DONE]" not in line]
+
+            first = stream(msgs)
+            call = first[0]["choices"][0]["delta"]["tool_calls"][0]["function"]
+            self.assertEqual((call["name"], json.loads(call["arguments"])), ("get_entities", {"domain": "light"}))
+            second = stream(msgs + [{"role": "tool", "tool_call_id": "x", "content": "[]"}])
+            text = "".join(c["choices"][0]["delta"].get("content", "") for c in second if c["choices"])
+            self.assertEqual(text, "Two lights are on.")
+            self.assertIn("usage", second[-1])
+            self.assertEqual([c["after_tool"] for c in llm.calls], [False, True])
+        finally:
+            llm.stop()
+
+
+class TestHarness(unittest.TestCase):
+    def test_time_it_and_compare(self):
+        timing = time_it(lambda: sum(range(1000)), repeat=5)
+        self.assertEqual(timing["runs"], 5)
+        self.assertLessEqual(timing["min_ms"], timing["p50_ms"])
+        base = {"results": {"500": {"micro": {"a": {"p50_ms": 10.0}, "b": {"p50_ms": 10.0}}}}}
+        cur = {"results": {"500": {"micro": {"a": {"p50_ms": 10.5}, "b": {"p50_ms": 13.0}}}}}
+        lines, regressions = compare(base, cur, threshold=10)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("500/micro/b", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for services/command_engine.py (LLM-bypass fast path)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.command_engine import CommandEngine, parse
+
+STATES = [
+    {"entity_id": "light.cucina", "state": "off", "attributes": {"friendly_name": "Luce Cucina"}},
+    {"entity_id": "light.cucina_led", "state": "on", "attributes": {"friendly_name": "Cucina LED"}},
+    {"entity_id": "light.soggiorno", "state": "on", "attributes": {"friendly_name": "Soggiorno"}},
+    {"entity_id": "switch.cucina_presa", "state": "on", "attributes": {"friendly_name": "Presa Cucina"}},
+    {"entity_id": "cover.bagno", "state": "closed", "attributes": {"friendly_name": "Tapparella"}},
+    {"entity_id": "cover.garage", "state": "closed", "attributes": {"friendly_name": "Garage Door"}},
+    {"entity_id": "cover.box", "state": "closed", "attributes": {"friendly_name": "Box", "device_class": "garage"}},
+    {"entity_id": "cover.ingresso", "state": "closed", "attributes": {"friendly_name": "Cancello Ingresso"}},
+    {"entity_id": "sensor.camera_temp", "state": "21.5",
+     "attributes": {"friendly_name": "Camera Temperatura", "device_class": "temperature", "unit_of_measurement": "°C"}},
+    {"entity_id": "sensor.camera_hum", "state": "48",
+     "attributes": {"friendly_name": "Camera Umidità", "device_class": "humidity", "unit_of_measurement": "%"}},
+    {"entity_id": "climate.camera", "state": "heat",
+     "attributes": {"friendly_name": "Termostato Camera", "current_temperature": 20}},
+]
+AREAS = {"cover.bagno": "Bagno", "sensor.camera_temp": "Camera da letto", "climate.camera": "Camera da letto"}
+
+
+class TestCommandEngine(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        by_id = {s["entity_id"]: s for s in STATES}
+        self.engine = CommandEngine(
+            states=lambda: STATES,
+            areas=lambda: AREAS,
+            call_service=lambda d, s, data: self.calls.append((d, s, data["entity_id"])) or [],
+            get_state=by_id.get,
+        )
+
+    def test_parse_rejects_complex_turns(self):
+        self.assertEqual(parse("Turn off the kitchen light, please")["target"], ["kitchen", "light"])
+        self.assertEqual(parse("spegni la luce della cucina")["action"], "off")
+        for text in ("spegni la luce della cucina e del bagno",
+                     "accendi la luce al 50%",
+                     "spegni tutte le luci",
+                     "crea un'automazione che accende la luce",
+                     "turn on the light when I get home"):
+            self.assertIsNone(parse(text), text)
+
+    def test_executes_best_unique_match(self):
+        hit = self.engine.handle("Spegni la luce della cucina", session_id="s1")
+        self.assertEqual(self.calls, [("light", "turn_off", "light.cucina")])
+        self.assertEqual(hit["reply"], "✅ Ho spento Luce Cucina.")
+        hit = self.engine.handle("ouvre le volet de la salle de bain")
+        self.assertIsNone(hit)  # "salle"/"bain" not covered by "Bagno"
+        hit = self.engine.handle("apri la tapparella del bagno")
+        self.assertEqual(self.calls[-1], ("cover", "open_cover", "cover.bagno"))
+        self.assertEqual(hit["language"], "it")
+
+    def test_questions_answer_from_live_state_and_read_only(self):
+        hit = self.engine.handle("what's the temperature in the camera?", read_only=True)
+        self.assertEqual(hit["entity_id"], "sensor.camera_temp")
+        self.assertEqual(hit["reply"], "Camera Temperatura: 21.5 °C")
+        self.assertIsNone(self.engine.handle("turn on the soggiorno", read_only=True))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.engine.handle("la luce cucina e accesa?")["reply"], "Luce Cucina: spento")
+
+    def test_generic_and_plural_targets_fall_back(self):
+        for text in ("turn off the lights", "spegni la luce", "accendi luci", "open the door", "apri garage"):
+            self.assertIsNone(self.engine.handle(text), text)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.engine.stats()["fallbacks"], {"plural_target": 2, "generic_target": 3})
+
+    def test_doors_and_gates_are_never_moved(self):
+        for text in ("apri il box", "chiudi il cancello dell'ingresso", "open ingresso"):
+            self.assertIsNone(self.engine.handle(text), text)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.engine.handle("il box e aperto?")["reply"], "Box: chiuso")
+
+    def test_ambiguous_targets_fall_back_and_stats(self):
+        self.assertIsNone(self.engine.handle("accendi cucina"))  # two lights named "cucina"
+        self.assertIsNone(self.engine.handle("tell me a joke"))
+        self.engine.handle("turn on the soggiorno light", session_id="s")
+        self.engine.observe_followup("s", "no, the other one")
+        self.engine.handle("turn off soggiorno", session_id="s")
+        self.engine.observe_followup("s", "thanks")
+        stats = self.engine.stats()
+        self.assertEqual((stats["attempts"], stats["hits"]), (4, 2))
+        self.assertEqual(stats["fallbacks"], {"unresolved": 1, "no_pattern": 1})
+        self.assertEqual((stats["corrected"], stats["accuracy"]), (1, 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
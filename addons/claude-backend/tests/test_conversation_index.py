@@ -0,0 +1,111 @@
+"""Tests for services/conversation_index.py (sidebar metadata index)"""
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.conversation_index import ConversationIndex
+
+
+def _strip(text):
+    return re.sub(r"\[CONTEXT:.*?\]", "", text, flags=re.S).strip()
+
+
+class TestConversationIndex(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def strip(text):
+            self.calls += 1
+            return _strip(text)
+
+        self.index = ConversationIndex(strip)
+        self.convs = {
+            "1700000000000": [{"role": "user", "content": "[CONTEXT: x] turn on the lights"}],
+            "bubble_" + self._b36(1700000005000) + "_ab": [{"role": "user", "content": "hi"}],
+            "card_" + self._b36(1700000009000) + "_cd": [{"role": "assistant", "content": "hello"}],
+            "telegram_42": [{"role": "user", "content": "ignored"}],
+        }
+
+    @staticmethod
+    def _b36(n):
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        out = ""
+        while n:
+            n, r = divmod(n, 36)
+            out = digits[r] + out
+        return out
+
+    def test_listing_metadata_and_order(self):
+        entries, cursor, _ = self.index.page(self.convs)
+        self.assertIsNone(cursor)
+        self.assertEqual([e["source"] for e in entries], ["card", "bubble", "chat"])
+        chat = entries[-1]
+        self.assertEqual(chat["title"], "turn on the lights")
+        self.assertEqual(chat["last_updated"], 1700000000000)
+        self.assertIsNone(entries[0]["title"])  # no user message yet
+        only_chat, _, _ = self.index.page(self.convs, source="chat")
+        self.assertEqual([e["id"] for e in only_chat], ["1700000000000"])
+
+    def test_unchanged_sessions_are_not_rederived(self):
+        _, _, v1 = self.index.page(self.convs)
+        calls = self.calls
+        _, _, v2 = self.index.page(self.convs)
+        self.assertEqual((v1, self.calls), (v2, calls))
+        # Appending to a titled session bumps the version without re-stripping
+        self.convs["1700000000000"].append({"role": "assistant", "content": "done"})
+        self.index.touch("1700000000000", self.convs["1700000000000"])
+        entries, _, v3 = self.index.page(self.convs, source="chat")
+        self.assertGreater(v3, v2)
+        self.assertEqual(self.calls, calls)
+        self.assertEqual(entries[0]["message_count"], 2)
+        # A session that gains its first user message picks up a title
+        card_sid = next(s for s in self.convs if s.startswith("card_"))
+        self.convs[card_sid].append({"role": "user", "content": "x" * 60})
+        self.index.touch(card_sid, self.convs[card_sid])
+        entries, _, _ = self.index.page(self.convs, source="card")
+        self.assertEqual(entries[0]["title"], "x" * 50 + "...")
+        del self.convs[card_sid]
+        self.index.touch(card_sid, None)
+        entries, _, _ = self.index.page(self.convs)
+        self.assertEqual(len(entries), 2)
+
+    def test_listings_use_touch_and_resync_only_after_invalidate(self):
+        self.index.page(self.convs)
+        syncs = []
+        original = self.index.sync
+        self.index.sync = lambda convs: syncs.append(1) or original(convs)
+        self.convs["1800000000000"] = [{"role": "user", "content": "new session"}]
+        self.index.touch("1800000000000", self.convs["1800000000000"])
+        entries, _, _ = self.index.page(self.convs)
+        self.assertEqual((entries[0]["title"], syncs), ("new session", []))
+        self.convs.pop("1800000000000")  # untracked bulk change
+        self.index.invalidate()
+        entries, _, _ = self.index.page(self.convs)
+        self.assertEqual((len(entries), syncs), (3, [1]))
+
+    def test_cursor_pagination(self):
+        for i in range(7):
+            self.convs[str(1600000000000 + i)] = [{"role": "user", "content": f"q{i}"}]
+        seen, cursor = [], ""
+        while True:
+            entries, cursor, _ = self.index.page(self.convs, cursor=cursor, limit=4)
+            seen.extend(e["id"] for e in entries)
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_display_cache_follows_in_place_edits(self):
+        msgs = [{"role": "assistant", "content": "<html>" * 200}]
+        build = lambda m: [dict(x) for x in m]
+        first = self.index.display_messages("s", msgs, build)
+        self.assertIs(self.index.display_messages("s", msgs, build), first)
+        msgs[-1]["content"] = "Dashboard saved"
+        self.assertEqual(self.index.display_messages("s", msgs, build)[0]["content"], "Dashboard saved")
+
+
+if __name__ == "__main__":
+    unittest.main()
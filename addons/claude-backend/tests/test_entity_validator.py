@@ -0,0 +1,59 @@
+"""Tests for services/entity_validator.py (entity-id index + suggestions)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.entity_validator import EntityIdIndex, annotate_stream, find_entity_ids
+
+STATES = [
+    {"entity_id": "sensor.ep_cube_pv_power", "attributes": {"friendly_name": "EP Cube PV Power"}},
+    {"entity_id": "sensor.ep_cube_battery_soc", "attributes": {"friendly_name": "EP Cube SOC"}},
+    {"entity_id": "light.kitchen_ceiling", "attributes": {}},
+    {"entity_id": "switch.garden_pump", "attributes": {}},
+]
+
+
+class TestEntityValidator(unittest.TestCase):
+    def setUp(self):
+        self.fetches = 0
+
+        def fetch():
+            self.fetches += 1
+            return STATES
+
+        self.index = EntityIdIndex(fetch)
+
+    def test_find_entity_ids_skips_service_verbs(self):
+        text = "Call light.turn_on on light.kitchen_ceiling and check sensor.ep_cube_pv_power."
+        self.assertEqual(find_entity_ids(text), {"light.kitchen_ceiling", "sensor.ep_cube_pv_power"})
+
+    def test_unknown_ids_and_live_updates(self):
+        ids = {"light.kitchen_ceiling", "light.kitchen_spot"}
+        self.assertEqual(self.index.unknown(ids), set())  # not loaded yet: assume valid
+        self.index.update_from_states(STATES)
+        self.assertEqual(self.index.unknown(ids), {"light.kitchen_spot"})
+        self.index.observe("light.kitchen_spot", True)
+        self.assertEqual(self.index.unknown(ids), set())
+        self.index.observe("light.kitchen_spot", False)
+        self.assertIn("light.kitchen_spot", self.index.unknown(ids))
+        self.assertEqual(self.fetches, 0)
+
+    def test_suggestions_rank_the_intended_entity_first(self):
+        self.index.update_from_states(STATES)
+        best = self.index.suggest("sensor.epcube_pvpower")
+        self.assertEqual(best[0][0], "sensor.ep_cube_pv_power")
+        self.assertEqual(self.index.suggest("switch.zzzz"), [])
+
+    def test_annotate_stream_holds_back_partial_ids(self):
+        self.index.update_from_states(STATES)
+        chunks = ["Turn on light.kit", "chen_ceiling and switch.garden", "_pumpp now"]
+        out = list(annotate_stream(chunks, self.index, mark=lambda e: f"[{e}?]"))
+        self.assertEqual("".join(out),
+                         "Turn on light.kitchen_ceiling and [switch.garden_pumpp?] now")
+        self.assertFalse(any("light.kit" in c and "ceiling" not in c for c in out))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests for providers/hedging.py (race-mode provider requests)"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.hedging import HedgeController, TTFTHistogram, on_cancel
+
+
+class _Controller(HedgeController):
+    @staticmethod
+    def config():
+        return {"enabled": True, "min_delay": 0.01, "max_delay": 1.0, "default_delay": 0.05}
+
+
+def _stream(delay, text, closed, fail=False):
+    try:
+        yield {"type": "status", "message": "connecting"}
+        time.sleep(delay)
+        if fail:
+            yield {"type": "error", "message": "boom"}
+            return
+        yield {"type": "content", "text": text}
+        yield {"type": "done"}
+    finally:
+        closed.set()
+
+
+class _BlockingResponse:
+    """Stands in for an httpx response whose read blocks until it is closed."""
+
+    extensions: dict = {}
+
+    def __init__(self):
+        self.is_closed = False
+        self.closed = threading.Event()
+
+    def close(self):
+        self.is_closed = True
+        self.closed.set()
+
+    def iter_lines(self):
+        self.closed.wait(30)
+        raise OSError("connection closed")
+        yield
+
+
+class TestHedgedStream(unittest.TestCase):
+    def setUp(self):
+        self.ctl = _Controller()
+        self.closed = {"slow": threading.Event(), "fast": threading.Event()}
+        self.failures = []
+
+    def _race(self, specs):
+        def open_stream(p):
+            delay, fail = specs[p]
+            return _stream(delay, p, self.closed[p], fail)
+        stream = self.ctl.race(open_stream, list(specs), lambda p, m: self.failures.append((p, m)))
+        return stream, list(stream)
+
+    def test_backup_wins_and_slow_primary_is_cancelled(self):
+        stream, events = self._race({"slow": (0.5, False), "fast": (0.0, False)})
+        self.assertEqual(stream.winner, "fast")
+        self.assertEqual([e["type"] for e in events], ["status", "content", "done"])
+        self.assertEqual(events[1]["text"], "fast")
+        self.assertTrue(self.closed["slow"].wait(2))
+        stats = self.ctl.dashboard()["stats"]
+        self.assertEqual((stats["hedges_started"], stats["hedge_wins"]), (1, 1))
+
+    def test_fast_primary_never_starts_backup(self):
+        stream, events = self._race({"fast": (0.0, False), "slow": (0.0, False)})
+        self.assertEqual(stream.winner, "fast")
+        self.assertEqual(stream.attempted, ["fast"])
+        self.assertEqual(self.ctl.dashboard()["stats"]["primary_wins"], 1)
+
+    def test_primary_error_fails_over_immediately(self):
+        stream, events = self._race({"slow": (0.0, True), "fast": (0.0, False)})
+        self.assertEqual(stream.winner, "fast")
+        self.assertEqual(self.failures, [("slow", "boom")])
+        self.assertEqual(self.ctl.dashboard()["stats"]["failovers"], 1)
+
+    def test_all_failed_yields_last_error(self):
+        stream, events = self._race({"slow": (0.0, True), "fast": (0.0, True)})
+        self.assertIsNone(stream.winner)
+        self.assertEqual(events[-1], {"type": "error", "message": "boom"})
+        self.assertEqual(len(self.failures), 1)  # the last failure is left to the caller
+
+    def test_loser_that_never_yields_is_aborted(self):
+        response = _BlockingResponse()
+        pump_done = threading.Event()
+
+        def hung():
+            try:
+                for line in on_cancel(response).iter_lines():
+                    yield {"type": "content", "text": line}
+            finally:
+                pump_done.set()
+
+        def open_stream(p):
+            return hung() if p == "hung" else _stream(0.0, p, self.closed["fast"])
+
+        started = time.monotonic()
+        stream = self.ctl.race(open_stream, ["hung", "fast"], lambda p, m: self.failures.append((p, m)))
+        events = list(stream)
+        self.assertEqual(stream.winner, "fast")
+        self.assertEqual(events[1]["text"], "fast")
+        self.assertTrue(response.closed.wait(2))
+        self.assertTrue(pump_done.wait(2))
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(self.failures, [])
+
+    def test_histogram_deadline(self):
+        hist = TTFTHistogram()
+        for _ in range(95):
+            hist.observe(0.4)
+        for _ in range(5):
+            hist.observe(7.0)
+        self.assertEqual(hist.quantile(0.5), 0.5)
+        self.assertEqual(hist.quantile(0.95), 0.5)
+        self.assertEqual(hist.quantile(0.99), 8.0)
+        for _ in range(20):
+            self.ctl.record_ttft("p", 30.0)
+        self.assertEqual(self.ctl.deadline("p"), 1.0)  # clamped to max_delay
+
+
+if __name__ == "__main__":
+    unittest.main()
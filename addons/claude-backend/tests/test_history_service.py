@@ -0,0 +1,96 @@
+"""Tests for services/history_service.py (bucketed history cache + downsampling)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.history_service import BUCKET_SECONDS, HistoryService, downsample, lttb
+
+HOUR = BUCKET_SECONDS
+
+
+class _FakeHA:
+    """Each entity changes every 10 minutes; value = minutes since epoch 0."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, entity_ids, start_ts, end_ts):
+        self.calls.append((tuple(entity_ids), start_ts, end_ts))
+        out = {}
+        for eid in entity_ids:
+            initial = (start_ts // 600) * 600
+            points = [(start_ts, str(initial / 60))]
+            ts = initial + 600
+            while ts < end_ts:
+                points.append((ts, str(ts / 60)))
+                ts += 600
+            out[eid] = points
+        return out
+
+
+class TestHistoryService(unittest.TestCase):
+    def setUp(self):
+        self.now = 100 * HOUR + 1800
+        self.ha = _FakeHA()
+        self.svc = HistoryService(self.ha, clock=lambda: self.now)
+
+    def test_second_call_only_fetches_recent_buckets(self):
+        first = self.svc.get(["sensor.a"], self.now - 24 * HOUR, self.now)
+        self.assertEqual(len(self.ha.calls), 1)
+        self.ha.calls.clear()
+        second = self.svc.get(["sensor.a"], self.now - 24 * HOUR, self.now)
+        self.assertEqual(first, second)
+        # Only the current (unsettled) hour is fetched again
+        self.assertEqual(len(self.ha.calls), 1)
+        self.assertGreaterEqual(self.ha.calls[0][1], self.now - 2 * HOUR)
+
+    def test_entities_missing_same_range_share_one_call(self):
+        self.svc.get(["sensor.a", "sensor.b", "sensor.c"], self.now - 6 * HOUR, self.now)
+        self.assertEqual(len(self.ha.calls), 1)
+        self.assertEqual(self.ha.calls[0][0], ("sensor.a", "sensor.b", "sensor.c"))
+
+    def test_range_without_changes_uses_cached_initial_state(self):
+        self.svc.get(["sensor.a"], self.now - 6 * HOUR, self.now)
+        # A 5-minute window inside a cached bucket with no change in it
+        start = self.now - 5 * HOUR + 60
+        series = self.svc.get(["sensor.a"], start, start + 300)["sensor.a"]
+        self.assertEqual(len(series), 1)
+        self.assertEqual(series[0][0], start)
+        self.assertEqual(float(series[0][1]), (start // 600) * 10)
+
+    def test_downsample_keeps_spike_and_transitions(self):
+        series = [(float(i), "1.0") for i in range(1000)]
+        series[537] = (537.0, "99.0")
+        reduced = downsample(series, 50)
+        self.assertEqual(len(reduced), 50)
+        self.assertIn((537.0, "99.0"), reduced)
+        self.assertEqual(reduced[0], series[0])
+        self.assertEqual(reduced[-1], series[-1])
+
+        onoff = [(float(i), "on" if (i // 100) % 2 else "off") for i in range(1000)]
+        kept = downsample(onoff, 50)
+        self.assertEqual([s for _, s in kept], ["off", "on"] * 5)
+
+        self.assertEqual(lttb([(0, 0), (1, 1)], 10), [(0, 0), (1, 1)])
+
+    def test_downsample_numeric_series_with_gaps_keeps_lttb(self):
+        series = [(float(i), "1.0") for i in range(1000)]
+        series[137] = (137.0, "99.0")
+        series[812] = (812.0, "-40.0")
+        for i in range(400, 420):
+            series[i] = (float(i), "unavailable")
+        series[700] = (700.0, "unknown")
+        reduced = downsample(series, 50)
+        self.assertLessEqual(len(reduced), 50)
+        self.assertGreater(len(reduced), 40)
+        for point in [(137.0, "99.0"), (812.0, "-40.0"), (400.0, "unavailable"), (700.0, "unknown")]:
+            self.assertIn(point, reduced)
+        self.assertEqual([p for p in reduced if p[1] == "unavailable"], [(400.0, "unavailable")])
+        self.assertEqual(reduced[0], series[0])
+        self.assertEqual(reduced[-1], series[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Tests for core/keyword_matcher.py (single-pass keyword families)"""
+import json
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.keyword_matcher import KeywordMatcher, all_lang_keywords
+
+_KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keywords.json")
+
+
+def _naive(families, whole_word, text):
+    """Reference: the any(k in msg ...) scans the matcher replaces."""
+    found = set()
+    for family, keywords in families.items():
+        for kw in keywords:
+            if len(kw) <= whole_word.get(family, 0):
+                hit = re.search(rf"(?<![a-z0-9_]){re.escape(kw)}(?![a-z0-9_])", text)
+            else:
+                hit = kw in text
+            if hit:
+                found.add(family)
+                break
+    return found
+
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(_KEYWORDS_FILE, encoding="utf-8") as f:
+            keywords = json.load(f)["keywords"]
+        cls.families = {key: sorted(all_lang_keywords(keywords, key))
+                        for key in ("modify", "delete", "dashboard", "chat", "statistics_manage")}
+        cls.families["html"] = ["html", "vue", "javascript", "js", "react", "custom css"]
+        cls.families["overlap"] = ["modifica", "modifica automazione", "automazione"]
+        cls.whole_word = {"chat": 3, "html": 3}
+        cls.matcher = KeywordMatcher(cls.families, whole_word_max_len=cls.whole_word)
+        cls.vocab = sorted({kw for kws in cls.families.values() for kw in kws}) + [
+            "luce", "cucina", "sensore", "jsx", "okay", "hiya", "_ok", "the", "x"]
+
+    def test_overlapping_and_prefix_keywords(self):
+        self.assertEqual(self.matcher.matches("modifica automazione"),
+                         _naive(self.families, self.whole_word, "modifica automazione"))
+        self.assertIn("overlap", self.matcher.matches("la mia automazione"))
+
+    def test_whole_word_short_keywords(self):
+        self.assertIn("html", self.matcher.matches("a js card"))
+        self.assertNotIn("html", self.matcher.matches("a jsx card"))
+        self.assertIn("html", self.matcher.matches("jsx and javascript"))
+
+    def test_matches_naive_scan_on_random_messages(self):
+        rng = random.Random(1234)
+        for _ in range(2000):
+            words = [rng.choice(self.vocab) for _ in range(rng.randint(1, 12))]
+            sep = rng.choice([" ", "", "_", ", "])
+            text = sep.join(words)
+            self.assertEqual(self.matcher.matches(text), _naive(self.families, self.whole_word, text), text)
+
+    def test_long_message_matches_naive_scan(self):
+        """A ~2 KB message gives the same families as the per-keyword loops."""
+        rng = random.Random(7)
+        text = " ".join(rng.choice(self.vocab) for _ in range(400))
+        self.assertEqual(self.matcher.matches(text), _naive(self.families, self.whole_word, text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Tests for lazy_import.py (lazy module proxies + startup timing)"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lazy_import import LazyModule, StartupTimer, module_available
+
+
+class TestLazyImport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "lazy_probe_mod.py"), "w") as f:
+            f.write("LOADED = True\nVALUE = 1\n")
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop("lazy_probe_mod", None)
+        self.tmp.cleanup()
+
+    def test_module_available_does_not_import(self):
+        self.assertTrue(module_available("lazy_probe_mod"))
+        self.assertNotIn("lazy_probe_mod", sys.modules)
+        self.assertFalse(module_available("no_such_module_xyz"))
+        self.assertFalse(module_available("no_such_package_xyz.sub"))
+
+    def test_import_deferred_until_attribute_access(self):
+        mod = LazyModule("lazy_probe_mod")
+        self.assertFalse(mod.lazy_loaded)
+        self.assertNotIn("lazy_probe_mod", sys.modules)
+        self.assertTrue(mod.LOADED)
+        self.assertTrue(mod.lazy_loaded)
+        self.assertIs(sys.modules["lazy_probe_mod"].VALUE, mod.VALUE)
+
+    def test_setattr_reaches_real_module(self):
+        mod = LazyModule("lazy_probe_mod")
+        mod.VALUE = 42
+        self.assertEqual(sys.modules["lazy_probe_mod"].VALUE, 42)
+        with self.assertRaises(AttributeError):
+            mod.MISSING
+
+    def test_timer_report(self):
+        timer = StartupTimer()
+        with timer.stage("core"):
+            pass
+        with self.assertRaises(ValueError):
+            with timer.stage("refresh", background=True):
+                raise ValueError
+        timer.record("import x", 0.002, kind="on_demand")
+        timer.mark_ready()
+        report = timer.report()
+        self.assertIsNotNone(report["ready_s"])
+        self.assertEqual([s["kind"] for s in report["stages"]], ["startup", "background", "on_demand"])
+        self.assertEqual(report["stages"][1]["error"], "ValueError")
+        self.assertIn("core", timer.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for mcp.py (result cache, catalog versioning, batch calls and retries)"""
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import MCPManager, MCPResultCache, MCPServer
+from mcp_transport import TransportClosed
+
+
+def _server(name, handler, tools=("search", "create_issue"), cache=None):
+    server = MCPServer(name, MCPServer.TRANSPORT_STDIO, {"cache": cache} if cache else {})
+    server.tools = {t: {"description": t, "inputSchema": {}} for t in tools}
+    server._connected = True
+    server.call_tool = handler
+    return server
+
+
+class TestMCPResultCache(unittest.TestCase):
+    def test_read_only_heuristic_and_explicit_list(self):
+        cache = MCPResultCache()
+        self.assertTrue(cache.is_cacheable("search"))
+        self.assertTrue(cache.is_cacheable("issues_list"))
+        self.assertFalse(cache.is_cacheable("create_issue"))
+        self.assertTrue(MCPResultCache(tools=["create_issue"]).is_cacheable("create_issue"))
+        self.assertIsNone(MCPResultCache.from_config({"enabled": False}))
+
+    def test_ttl_lru_and_argument_order(self):
+        cache = MCPResultCache(ttl=60, max_entries=2)
+        cache.put("search", {"q": "a", "n": 1}, "A")
+        self.assertEqual(cache.get("search", {"n": 1, "q": "a"}), "A")
+        cache.put("search", {"q": "b"}, "B")
+        cache.put("search", {"q": "c"}, "C")
+        self.assertIsNone(cache.get("search", {"q": "a", "n": 1}))  # least recently used, evicted
+        self.assertEqual(cache.get("search", {"q": "b"}), "B")
+        expired = MCPResultCache(ttl=0)
+        expired.put("search", {}, "X")
+        self.assertIsNone(expired.get("search", {}))
+        self.assertEqual(cache.stats()["hits"], 2)
+
+
+class TestMCPManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = MCPManager()
+
+    def test_catalog_rebuilt_only_on_version_change_and_copied(self):
+        self.manager.servers["gh"] = _server("gh", lambda *_: "{}")
+        self.manager._invalidate_catalog()
+        version = self.manager.catalog_version
+        tools = self.manager.get_all_tools()
+        self.assertEqual(sorted(tools), ["mcp_gh_create_issue", "mcp_gh_search"])
+        tools.pop("mcp_gh_search")
+        tools["mcp_gh_create_issue"]["description"] = "changed"
+        again = self.manager.get_all_tools()
+        self.assertEqual(again["mcp_gh_create_issue"]["description"], "create_issue")
+        self.assertEqual(self.manager.catalog_version, version)
+        self.manager.remove_server("gh")
+        self.assertGreater(self.manager.catalog_version, version)
+        self.assertEqual(self.manager.get_all_tools(), {})
+
+    def test_call_tools_batch_runs_concurrently_in_order(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def handler(tool, args):
+            barrier.wait()  # only passes if all three calls are in flight together
+            return json.dumps({"tool": tool, "q": args["q"]})
+
+        self.manager.servers["gh"] = _server("gh", handler)
+        results = self.manager.call_tools_batch([("mcp_gh_search", {"q": i}) for i in range(3)])
+        self.assertEqual([json.loads(r)["q"] for r in results], [0, 1, 2])
+
+    def test_cached_result_skips_server(self):
+        calls = []
+        self.manager.servers["gh"] = _server(
+            "gh", lambda tool, args: calls.append(tool) or '{"ok": true}', cache={"ttl": 60})
+        for _ in range(3):
+            self.assertEqual(self.manager.call_tool("mcp_gh_search", {"q": "x"}), '{"ok": true}')
+        self.assertEqual(calls, ["search"])
+
+    def test_only_connection_errors_are_retried(self):
+        attempts = []
+
+        def tool_error(tool, args):
+            attempts.append(tool)
+            return json.dumps({"isError": True, "content": [{"type": "text", "text": "boom"}]})
+
+        self.manager.servers["gh"] = _server("gh", tool_error)
+        result = json.loads(self.manager.call_tool("mcp_gh_create_issue", {}))
+        self.assertTrue(result["isError"])
+        self.assertEqual(attempts, ["create_issue"])
+
+        def flaky(tool, args):
+            attempts.append(tool)
+            if len(attempts) < 3:
+                raise TransportClosed("process exited")
+            return '{"ok": true}'
+
+        attempts.clear()
+        self.manager.servers["gh"] = _server("gh", flaky)
+        with mock.patch.object(time, "sleep"):
+            self.assertEqual(self.manager.call_tool("mcp_gh_create_issue", {}), '{"ok": true}')
+        self.assertEqual(len(attempts), 3)
+
+    def test_is_read_only(self):
+        self.manager.servers["gh"] = _server("gh", lambda *_: "{}")
+        self.assertTrue(self.manager.is_read_only("mcp_gh_search"))
+        self.assertFalse(self.manager.is_read_only("mcp_gh_create_issue"))
+        self.manager.servers["gh"] = _server("gh", lambda *_: "{}", cache={"tools": ["create_issue"]})
+        self.assertFalse(self.manager.is_read_only("mcp_gh_search"))
+        self.assertTrue(self.manager.is_read_only("mcp_gh_create_issue"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Tests for mcp_transport.py (built-in stdio transport against a fake server)."""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_FAKE_SERVER = r'''
+import json, sys, threading, time
+lock = threading.Lock()
+
+def out(msg):
+    with lock:
+        sys.stdout.write(json.dumps(msg) + "\n")
+        sys.stdout.flush()
+
+def handle(msg):
+    method = msg.get("method")
+    if method == "initialize":
+        out({"jsonrpc": "2.0", "id": msg["id"], "result": {"protocolVersion": "2024-11-05"}})
+    elif method == "tools/list":
+        out({"jsonrpc": "2.0", "id": msg["id"], "result": {"tools": [{"name": "echo", "description": "Echo"}]}})
+    elif method == "tools/call":
+        args = msg["params"]["arguments"]
+        time.sleep(args.get("delay", 0))
+        out({"jsonrpc": "2.0", "id": msg["id"], "result": {"echo": args}})
+
+for line in sys.stdin:
+    msg = json.loads(line)
+    if "id" in msg:
+        threading.Thread(target=handle, args=(msg,)).start()
+'''
+
+
+class TestStdioTransport(unittest.TestCase):
+
+    def setUp(self):
+        import subprocess
+        from mcp_transport import StdioTransport
+        fd, self.script = tempfile.mkstemp(suffix=".py")
+        with os.fdopen(fd, "w") as f:
+            f.write(_FAKE_SERVER)
+
+        def spawn():
+            return subprocess.Popen(
+                [sys.executable, self.script],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, bufsize=1,
+            )
+
+        self.transport = StdioTransport("fake", spawn)
+        self.transport.open()
+
+    def tearDown(self):
+        self.transport.close()
+        os.unlink(self.script)
+
+    def test_tools_list(self):
+        resp = self.transport.request("tools/list", timeout=5)
+        self.assertEqual(resp["result"]["tools"][0]["name"], "echo")
+
+    def test_concurrent_requests_routed_by_id(self):
+        def call(i):
+            return self.transport.request("tools/call", {"name": "echo", "arguments": {"i": i, "delay": 0.3}}, timeout=5)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(call, range(4)))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual([r["result"]["echo"]["i"] for r in results], [0, 1, 2, 3])
+        # In flight together, not serialised (4 x 0.3s)
+        self.assertLess(elapsed, 1.0)
+
+    def test_reconnects_after_process_exit(self):
+        self.transport.process.kill()
+        self.transport.process.wait()
+        resp = self.transport.request("tools/call", {"name": "echo", "arguments": {"x": 1}}, timeout=5)
+        self.assertEqual(resp["result"]["echo"], {"x": 1})
+        stats = self.transport.stats.snapshot()
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertEqual(stats["errors"], 0)
+
+
+
+class _FakeResponse:
+    def __init__(self, body, headers=None):
+        self.status_code = 200
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _FakeHTTP:
+    def __init__(self, init_body, headers=None):
+        self.init_body, self.headers, self.methods = init_body, headers, []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.methods.append(json["method"])
+        if json["method"] == "initialize":
+            return _FakeResponse(dict(self.init_body, id=json["id"]), self.headers)
+        return _FakeResponse({})
+
+    def delete(self, url, headers=None, timeout=None):
+        self.methods.append("DELETE")
+
+    def close(self):
+        pass
+
+
+class TestStreamableHTTPTransport(unittest.TestCase):
+
+    def _transport(self, http):
+        from mcp_transport import StreamableHTTPTransport
+        transport = StreamableHTTPTransport("fake", "http://mcp.local/mcp", dict)
+        transport._http = http
+        return transport
+
+    def test_initialize_error_fails_the_handshake(self):
+        from mcp_transport import TransportError
+        http = _FakeHTTP({"jsonrpc": "2.0", "error": {"code": -32600, "message": "use the SSE endpoint"}})
+        with self.assertRaisesRegex(TransportError, "use the SSE endpoint"):
+            self._transport(http).open()
+        self.assertEqual(http.methods, ["initialize"])
+
+    def test_initialize_result_opens_session(self):
+        http = _FakeHTTP({"jsonrpc": "2.0", "result": {"protocolVersion": "2025-03-26"}}, {"Mcp-Session-Id": "abc"})
+        transport = self._transport(http)
+        transport.open()
+        self.assertEqual(transport.session_id, "abc")
+        self.assertEqual(http.methods, ["initialize", "notifications/initialized"])
+        transport.close()
+        self.assertEqual(http.methods[-1], "DELETE")
+
+
+if __name__ == "__main__":
+    unittest.main()
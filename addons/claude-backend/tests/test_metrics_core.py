@@ -0,0 +1,66 @@
+"""Tests for metrics_core.py and the stats that use it"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics_core import QuantileSketch, RingBuffer, StreamingStats
+from quality_metrics import ResponseQualityAnalyzer
+from tool_optimizer import ToolCall, ToolExecutionOptimizer
+
+
+class TestMetricsCore(unittest.TestCase):
+    def test_sketch_quantiles_within_relative_error(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+        sketch = QuantileSketch(accuracy=0.01)
+        for v in values:
+            sketch.add(v)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q) / exact, 1.0, delta=0.02)
+        self.assertLessEqual(len(sketch), 512)
+
+    def test_merge_equals_single_stream(self):
+        a, b, both = StreamingStats(), StreamingStats(), StreamingStats()
+        for i in range(1, 501):
+            (a if i % 2 else b).observe(i / 10)
+            both.observe(i / 10)
+        a.merge(b)
+        sa, sb = a.snapshot(), both.snapshot()
+        for key in ("count", "mean", "min", "max", "p50", "p95", "p99"):
+            self.assertEqual(sa[key], sb[key], key)
+        self.assertEqual(StreamingStats().snapshot(), {"count": 0})
+
+    def test_ring_buffer_is_bounded(self):
+        ring = RingBuffer(3)
+        for i in range(10):
+            ring.append(i)
+        self.assertEqual((len(ring), ring.last(), ring.last(2)), (3, [7, 8, 9], [8, 9]))
+
+    def test_quality_and_optimizer_stats_stay_bounded(self):
+        analyzer = ResponseQualityAnalyzer()
+        for i in range(ResponseQualityAnalyzer.HISTORY_SIZE + 50):
+            analyzer.analyze("Step 1: do this.\n\n- also that\n\nIn summary, done." * (i % 3 + 1),
+                             provider="openai")
+        stats = analyzer.get_stats()
+        self.assertEqual(stats["responses_analyzed"], 250)
+        self.assertEqual(stats["history_kept"], 200)
+        self.assertEqual(sum(stats["quality_distribution"].values()), 250)
+        self.assertEqual(stats["by_provider"]["openai"]["count"], 250)
+
+        opt = ToolExecutionOptimizer()
+        calls = [ToolCall("get_state", {"entity_id": f"light.{i % 300}"}) for i in range(600)]
+        opt.execute_batch_parallel(calls, lambda c: "ok")
+        st = opt.stats()
+        self.assertEqual((st["total_executions"], st["cached"]), (600, 0))
+        self.assertEqual(st["result_cache_entries"], ToolExecutionOptimizer.RESULT_CACHE_SIZE)
+        self.assertEqual(st["by_tool"]["get_state"]["count"], 600)
+        self.assertEqual(len(opt.execution_log), ToolExecutionOptimizer.LOG_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for metrics_exporter.py (OpenMetrics rendering and hot-path helpers)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics_exporter
+from metrics_exporter import Registry
+
+
+class TestMetricsExporter(unittest.TestCase):
+    def test_openmetrics_histogram_and_counter(self):
+        reg = Registry()
+        h = reg.histogram("t_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+        c = reg.counter("t_calls", 'Calls "quoted".', ("tool",))
+        for v in (0.05, 0.5, 3.0):
+            h.observe(v, tool="get_state")
+        c.inc(2, tool='a"b')
+        text = reg.render()
+        self.assertIn('t_seconds_bucket{tool="get_state",le="0.1"} 1', text)
+        self.assertIn('t_seconds_bucket{tool="get_state",le="1"} 2', text)
+        self.assertIn('t_seconds_bucket{tool="get_state",le="+Inf"} 3', text)
+        self.assertIn('t_seconds_count{tool="get_state"} 3', text)
+        self.assertIn('t_seconds_sum{tool="get_state"} 3.55', text)
+        self.assertIn("# TYPE t_calls counter", text)
+        self.assertIn('t_calls_total{tool="a\\"b"} 2', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+        plain = reg.render(openmetrics=False)
+        self.assertIn("# TYPE t_calls_total counter", plain)
+        self.assertNotIn("# EOF", plain)
+
+    def test_series_are_capped(self):
+        reg = Registry()
+        c = reg.counter("capped", "Capped.", ("key",))
+        for i in range(metrics_exporter.MAX_SERIES + 10):
+            c.inc(key=str(i))
+        self.assertEqual(len(c._series), metrics_exporter.MAX_SERIES + 1)
+        self.assertEqual(c.value(key="_other"), 10)
+
+    def test_timed_stream_records_ttft_and_errors(self):
+        before = metrics_exporter.PROVIDER_STREAM_SECONDS.count(provider="p-test", model="m")
+        events = [{"type": "status"}, {"type": "content", "content": "hi"}, {"type": "done"}]
+        self.assertEqual(list(metrics_exporter.timed_stream("p-test", "m", iter(events))), events)
+        self.assertEqual(metrics_exporter.PROVIDER_TTFT_SECONDS.count(provider="p-test", model="m"), 1)
+        self.assertEqual(metrics_exporter.PROVIDER_STREAM_SECONDS.count(provider="p-test", model="m"), before + 1)
+
+        def boom():
+            yield {"type": "status"}
+            raise RuntimeError("down")
+
+        with self.assertRaises(RuntimeError):
+            list(metrics_exporter.timed_stream("p-test", "m", boom()))
+        self.assertEqual(metrics_exporter.PROVIDER_ERRORS.value(provider="p-test", model="m"), 1)
+
+        # Abandoned (hedge loser) streams are not counted
+        stream = metrics_exporter.timed_stream("p-test", "m", iter(events))
+        next(stream)
+        stream.close()
+        self.assertEqual(metrics_exporter.PROVIDER_STREAM_SECONDS.count(provider="p-test", model="m"), before + 1)
+
+    def test_usage_and_active_streams(self):
+        metrics_exporter.record_usage({"provider": "openai", "model": "gpt-t", "input_tokens": 100,
+                                       "output_tokens": 20, "cost": 0.5, "currency": "EUR"})
+        self.assertEqual(metrics_exporter.TOKENS.value(provider="openai", model="gpt-t", kind="input"), 100)
+        self.assertEqual(metrics_exporter.COST.value(provider="openai", model="gpt-t", currency="EUR"), 0.5)
+        with metrics_exporter.track_active_stream():
+            self.assertEqual(metrics_exporter.ACTIVE_STREAMS.value(), 1)
+        self.assertEqual(metrics_exporter.ACTIVE_STREAMS.value(), 0)
+        self.assertIn("amira_active_streams 0", metrics_exporter.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for the concurrent model list refresh (providers/model_fetcher.py + services/model_refresh_service.py)"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from providers import model_fetcher
+from services.model_refresh_service import ModelRefreshService
+
+
+class TestRefreshAllProviders(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._cache = mock.patch.object(model_fetcher, "CACHE_FILE", os.path.join(self.tmp.name, "models.json"))
+        self._cache.start()
+        model_fetcher._VALIDATORS.clear()
+
+    def tearDown(self):
+        self._cache.stop()
+        self.tmp.cleanup()
+
+    def test_concurrent_with_deadline_and_late_merge(self):
+        release = threading.Event()
+
+        def fetch(provider, api_key, extra=None):
+            if provider == "groq":
+                release.wait(5)
+                return ["llama-late"]
+            time.sleep(0.05)
+            return None if provider == "mistral" else [f"{provider}-model"]
+
+        seen = {}
+        with mock.patch.object(model_fetcher, "fetch_provider_models", side_effect=fetch):
+            t0 = time.monotonic()
+            res = model_fetcher.refresh_all_providers(
+                {"openai": "k", "anthropic": "k", "mistral": "k", "groq": "k", "github": "k", "xai": ""},
+                deadline=0.5, on_update=lambda p, m: seen.__setitem__(p, m))
+            self.assertLess(time.monotonic() - t0, 1.0)
+            self.assertEqual(sorted(res["updated"]), ["anthropic", "openai"])
+            self.assertEqual(list(res["errors"]), ["mistral"])
+            self.assertEqual(sorted(res["skipped"]), ["github", "xai"])
+            self.assertEqual(res["pending"], ["groq"])
+            release.set()
+            for _ in range(50):
+                if "groq" in seen:
+                    break
+                time.sleep(0.02)
+        self.assertEqual(seen["groq"], ["llama-late"])
+        self.assertEqual(model_fetcher.load_dynamic_cache()["groq"], ["llama-late"])
+
+    def test_reported_providers_are_already_merged(self):
+        real_merge = model_fetcher._merge_into_cache
+
+        def slow_merge(provider, models):
+            time.sleep(0.2)
+            real_merge(provider, models)
+
+        with mock.patch.object(model_fetcher, "fetch_provider_models", return_value=["m"]), \
+                mock.patch.object(model_fetcher, "_merge_into_cache", side_effect=slow_merge):
+            res = model_fetcher.refresh_all_providers({"openai": "k", "anthropic": "k"}, deadline=2)
+        self.assertEqual(sorted(res["updated"]), ["anthropic", "openai"])
+        self.assertEqual(sorted(model_fetcher.load_dynamic_cache()), ["anthropic", "openai"])
+
+    def test_conditional_request_reuses_body_on_304(self):
+        sent = []
+
+        def get(url, headers=None, params=None, timeout=None):
+            sent.append(dict(headers or {}))
+            req = httpx.Request("GET", url)
+            if (headers or {}).get("If-None-Match") == '"v1"':
+                return httpx.Response(304, request=req)
+            return httpx.Response(200, json={"data": [{"id": "gpt-x"}]}, headers={"ETag": '"v1"'}, request=req)
+
+        with mock.patch.object(model_fetcher.httpx, "get", side_effect=get):
+            self.assertEqual(model_fetcher._fetch_openai_compat("https://api.test/v1", "k"), ["gpt-x"])
+            self.assertEqual(model_fetcher._fetch_openai_compat("https://api.test/v1", "k"), ["gpt-x"])
+            model_fetcher._fetch_openai_compat("https://api.test/v1", "other-key")
+        self.assertEqual([h.get("If-None-Match") for h in sent], [None, '"v1"', None])
+
+
+class TestModelRefreshService(unittest.TestCase):
+    def test_single_flight_status_and_jitter(self):
+        gate = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            gate.wait(2)
+            return {"success": True, "updated_count": 3, "updated": ["a"]}
+
+        svc = ModelRefreshService(refresh, interval=3600, jitter=0.1)
+        t = threading.Thread(target=svc.refresh_now)
+        t.start()
+        time.sleep(0.05)
+        self.assertEqual(svc.refresh_now()["error"], "refresh already running")
+        gate.set()
+        t.join()
+        st = svc.status()
+        self.assertEqual((len(calls), st["runs"], st["failures"]), (1, 1, 0))
+        self.assertEqual(st["last_result"], {"success": True, "updated_count": 3})
+        self.assertTrue(all(3240 <= svc.next_delay() <= 3960 for _ in range(20)))
+
+
+if __name__ == "__main__":
+    unittest.main()
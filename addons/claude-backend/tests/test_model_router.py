@@ -0,0 +1,78 @@
+"""Tests for model_router.py (telemetry-driven candidate ordering)"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_router import ModelRouter
+
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "routing_config.json")
+        self._write({"enabled": True, "latency_slo_ms": 3000, "min_samples": 2,
+                     "intents": {"chat": {"objective": "fast_cheap"}}})
+        self.router = ModelRouter(config_path=self.path)
+        self.candidates = [("anthropic", "claude-opus-4-6"), ("groq", "llama-3.1-8b-instant"),
+                           ("openai", "gpt-4o")]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data):
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+    def _feed(self, provider, model, ttft_ms, cost, n=3):
+        for _ in range(n):
+            self.router.record_success(provider, model, ttft_ms=ttft_ms, tokens_per_sec=50, cost=cost)
+
+    def test_without_telemetry_order_is_unchanged(self):
+        self.assertEqual(self.router.route("chat", self.candidates), self.candidates)
+
+    def test_fast_cheap_intent_prefers_measured_fast_model(self):
+        self._feed("anthropic", "claude-opus-4-6", 2500, 0.08)
+        self._feed("groq", "llama-3.1-8b-instant", 300, 0.0002)
+        self._feed("openai", "gpt-4o", 900, 0.01)
+        self.assertEqual(self.router.route("chat", self.candidates)[0], ("groq", "llama-3.1-8b-instant"))
+        # Other intents keep the configured (quality) order
+        self.assertEqual(self.router.route("auto", self.candidates), self.candidates)
+        decision = self.router.stats()["recent_decisions"][0]
+        self.assertEqual(decision["intent"], "auto")
+
+    def test_slo_and_error_rate_demote(self):
+        self._feed("anthropic", "claude-opus-4-6", 9000, 0.08)
+        self.assertEqual(self.router.route("auto", self.candidates)[-1], ("anthropic", "claude-opus-4-6"))
+        for _ in range(20):
+            self.router.record_failure("groq", "llama-3.1-8b-instant")
+        explained = self.router.explain("auto", self.candidates)
+        self.assertEqual(explained["order"][0], "openai/gpt-4o")
+        rows = {f"{r['provider']}/{r['model']}": r for r in explained["candidates"]}
+        self.assertIn("latency_slo", rows["anthropic/claude-opus-4-6"]["violations"])
+        self.assertIn("error_rate", rows["groq/llama-3.1-8b-instant"]["violations"])
+
+    def test_observe_records_stream_telemetry(self):
+        events = [{"type": "status"}, {"type": "content", "text": "hi"},
+                  {"type": "done", "usage": {"input_tokens": 1000, "output_tokens": 100}}]
+        list(self.router.observe("openai", "gpt-4o", iter(events)))
+        tel = self.router.stats()["telemetry"][0]
+        self.assertEqual((tel["successes"], tel["failures"]), (1, 0))
+        self.assertIsNotNone(tel["ttft_ms"])
+        self.assertGreater(tel["cost_per_turn"], 0)
+        list(self.router.observe("openai", "gpt-4o", iter([{"type": "error", "message": "x"}])))
+        self.assertEqual(self.router.stats()["telemetry"][0]["failures"], 1)
+
+    def test_disabled_router_is_a_no_op(self):
+        self._write({"enabled": False})
+        os.utime(self.path, (1, 1))
+        self._feed("groq", "llama-3.1-8b-instant", 100, 0.0)
+        self.assertEqual(self.router.route("chat", list(reversed(self.candidates))),
+                         list(reversed(self.candidates)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests for pricing.py (model identity index + cost calculation)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pricing
+from pricing import ModelIndex, calculate_cost, model_id_candidates, model_price
+
+TABLE = {
+    "gpt-4": {"input": 30.0, "output": 60.0},
+    "gpt-4.1": {"input": 2.0, "output": 8.0},
+    "gpt-4o": {"input": 2.5, "output": 10.0},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.6},
+    "claude-opus-4-6": {"input": 15.0, "output": 75.0},
+    "claude-opus": {"input": 14.0, "output": 70.0},
+    "llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79},
+}
+
+
+class TestModelIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ModelIndex(TABLE, {"opus-4.6": "claude-opus-4-6"})
+
+    def test_gateway_prefixes_and_normalization(self):
+        self.assertEqual(model_id_candidates("OpenRouter/anthropic/Claude-Opus-4.6"),
+                         ["openrouter/anthropic/claude-opus-4-6", "anthropic/claude-opus-4-6", "claude-opus-4-6"])
+        self.assertEqual(self.index.resolve("openrouter/anthropic/claude-opus-4.6"), "claude-opus-4-6")
+        self.assertEqual(self.index.resolve("groq/llama-3.3-70b-versatile"), "llama-3.3-70b-versatile")
+        self.assertEqual(self.index.resolve("opus-4.6"), "claude-opus-4-6")
+
+    def test_longest_contained_key(self):
+        self.assertEqual(self.index.resolve("gpt-4o-mini-2024-07-18"), "gpt-4o-mini")
+        self.assertEqual(self.index.resolve("azure/my-gpt-4o-deploy"), "gpt-4o")
+        self.assertEqual(self.index.resolve("claude-opus-5"), "claude-opus")
+        # "gpt-4.1" normalizes to "gpt-4-1", a prefix of the version "1106".
+        self.assertEqual(self.index.resolve("gpt-4-1106-preview"), "gpt-4")
+        self.assertEqual(calculate_cost("gpt-4-1106-preview", "openai", 1_000_000, 0), 30.0)
+        self.assertIsNone(self.index.resolve("mystery-model"))
+        self.assertIsNone(self.index.resolve(""))
+
+    def test_results_are_memoized(self):
+        self.index.resolve("gpt-4o-mini-2024-07-18")
+        self.index._trie.clear()
+        self.assertEqual(self.index.resolve("gpt-4o-mini-2024-07-18"), "gpt-4o-mini")
+
+    def test_cost_and_catalog_price_agree(self):
+        for model in ("openrouter/anthropic/claude-opus-4.6", "anthropic/claude-opus-4-6", "claude-opus-4-6"):
+            self.assertEqual(calculate_cost(model, "openrouter", 1_000_000, 0), 15.0)
+            self.assertEqual(model_price(model, "openrouter"), {"input": 15.0, "output": 75.0})
+        self.assertEqual(model_price("llama-3.3-70b-versatile", "groq"), {"input": 0.0, "output": 0.0})
+        self.assertIs(pricing._lookup_pricing("gpt-5.2"), pricing.MODEL_PRICING["gpt-5.2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+"""Tests for rag.py chunking"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag import _chunk_text
+
+
+class TestChunkText(unittest.TestCase):
+    def test_multi_chunk_document_terminates_with_overlap(self):
+        text = "".join(chr(ord("a") + i % 26) for i in range(1850))
+        chunks = _chunk_text(text, chunk_size=500, overlap=100)
+        self.assertEqual([len(c) for c in chunks], [500, 500, 500, 500, 250])
+        self.assertEqual(chunks[1][:100], chunks[0][-100:])
+        self.assertTrue(text.endswith(chunks[-1]))
+
+    def test_short_and_empty(self):
+        self.assertEqual(_chunk_text("hello", chunk_size=500, overlap=100), ["hello"])
+        self.assertEqual(_chunk_text(""), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
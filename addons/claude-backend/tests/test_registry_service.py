@@ -0,0 +1,82 @@
+"""Tests for services/registry_service.py (cached HA registry graph)"""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.registry_service import RegistryGraph
+
+REGISTRIES = {
+    "config/entity_registry/list": [
+        {"entity_id": "sensor.tigo_panel_1", "platform": "tigo_energy", "config_entry_id": "e1", "device_id": "d1"},
+        {"entity_id": "sensor.ep_cube_soc", "platform": "epcube_cloud", "config_entry_id": "e2", "device_id": "d2"},
+        {"entity_id": "light.kitchen", "platform": "hue", "config_entry_id": "e3", "device_id": "d3",
+         "area_id": "kitchen"},
+        {"entity_id": "light.hall", "platform": "hue", "config_entry_id": "e3", "device_id": "d3"},
+    ],
+    "config/device_registry/list": [
+        {"id": "d1", "name": "Tigo"}, {"id": "d2", "name": "EP Cube"},
+        {"id": "d3", "name": "Hue bridge", "area_id": "hall"},
+    ],
+    "config/area_registry/list": [{"area_id": "kitchen", "name": "Kitchen"}, {"area_id": "hall", "name": "Hall"}],
+    "config_entries/get_entries": [
+        {"entry_id": "e1", "domain": "tigo_energy", "title": "Tigo Energy"},
+        {"entry_id": "e2", "domain": "epcube_cloud", "title": "EPCube"},
+        {"entry_id": "e3", "domain": "hue", "title": "Philips Hue"},
+    ],
+}
+
+
+class TestRegistryGraph(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def fetch(command):
+            self.calls.append(command)
+            return REGISTRIES[command]
+
+        self.graph = RegistryGraph(fetch)
+
+    def test_registries_load_once_and_index(self):
+        self.assertEqual(self.graph.entity_ids_by_domain("light"), ["light.kitchen", "light.hall"])
+        self.assertEqual(self.graph.entity_ids_by_platform("hue"), ["light.kitchen", "light.hall"])
+        self.assertEqual(self.graph.entity_ids_by_config_entry("e1"), ["sensor.tigo_panel_1"])
+        # Entity area wins; otherwise the device's area
+        self.assertEqual(self.graph.entity_ids_by_area("kitchen"), ["light.kitchen"])
+        self.assertEqual(self.graph.entity_ids_by_area("hall"), ["light.hall"])
+        self.graph.area_summary()
+        self.graph.devices()
+        self.assertEqual(len(self.calls), 4)
+
+    def test_integration_match_by_platform_or_entry_title(self):
+        ids = [r["entity_id"] for r in self.graph.integration_entities(["tigo"])]
+        self.assertEqual(ids, ["sensor.tigo_panel_1"])
+        ids = [r["entity_id"] for r in self.graph.integration_entities(["philips"])]
+        self.assertEqual(ids, ["light.kitchen", "light.hall"])
+
+    def test_registry_events_invalidate_only_that_registry(self):
+        self.graph.entities()
+        self.calls.clear()
+        self.graph.handle_event(json.dumps({"type": "event", "event": {"event_type": "area_registry_updated"}}))
+        self.graph.area_summary()
+        self.assertEqual(self.calls, ["config/area_registry/list"])
+        self.graph.handle_event(json.dumps({"type": "result", "success": True}))
+        self.graph.area_summary()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_device_class_index_follows_latest_states(self):
+        self.graph.observe_states([
+            {"entity_id": "sensor.ep_cube_soc", "state": "80", "attributes": {"device_class": "battery"}},
+            {"entity_id": "sensor.tigo_panel_1", "state": "120", "attributes": {"device_class": "power"}},
+        ])
+        self.assertEqual([s["entity_id"] for s in self.graph.states_by_device_class(["battery"])],
+                         ["sensor.ep_cube_soc"])
+        self.graph.observe_states([])
+        self.assertEqual(self.graph.states_by_device_class(["battery"]), [])
+        self.assertIsNone(self.graph.state("sensor.ep_cube_soc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
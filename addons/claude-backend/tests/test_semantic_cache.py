@@ -0,0 +1,67 @@
+"""Tests for semantic_cache.py (similarity + chat response cache)"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import ResponseCache, SemanticCache, rerender_numbers
+
+SCOPE = "auto|en|amira|"
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.states = {"sensor.energy_today": "12.4", "automation.night": "off", "sensor.pv": "3.1"}
+        self.cache = ResponseCache(max_entries=3, similarity_threshold=0.8)
+
+    def _current(self, ids):
+        return {e: self.states[e] for e in ids if e in self.states}
+
+    def test_similarity_uses_token_identity(self):
+        cache = SemanticCache(similarity_threshold=0.8)
+        cache.set("which automations are disabled", "A")
+        self.assertEqual(cache.get_or_similar("which automations are disabled ?")[0], "A")
+        self.assertEqual(cache.get_or_similar("turn off every light in house")[0], None)
+
+    def test_hit_requires_same_scope_and_unchanged_states(self):
+        deps = {"automation.night": "off"}
+        self.cache.store("Which automations are disabled?", SCOPE, "Night is disabled.", deps,
+                         {"input_tokens": 900, "output_tokens": 40, "cost": 0.002})
+        hit = self.cache.lookup("which automations are disabled", SCOPE, self._current)
+        self.assertEqual(hit["answer"], "Night is disabled.")
+        self.assertIsNone(self.cache.lookup("which automations are disabled", "auto|it|amira|", self._current))
+        self.states["automation.night"] = "on"
+        self.assertIsNone(self.cache.lookup("which automations are disabled", SCOPE, self._current))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["stale"], stats["entries"]), (1, 1, 0))
+        self.assertEqual((stats["saved_input_tokens"], stats["saved_cost"]), (900, 0.002))
+
+    def test_similar_hit_requires_same_content_words(self):
+        self.cache.store("Which automations are disabled?", SCOPE, "Night is disabled.", {"automation.night": "off"})
+        self.cache.store("what is the kitchen temperature", SCOPE, "21 °C", {"sensor.pv": "3.1"})
+        self.assertEqual(self.cache.lookup("which are the disabled automations", SCOPE, self._current)["answer"],
+                         "Night is disabled.")
+        self.assertEqual(self.cache.lookup("what's the kitchen temperature?", SCOPE, self._current)["answer"], "21 °C")
+        self.assertIsNone(self.cache.lookup("which automations are enabled", SCOPE, self._current))
+        self.assertIsNone(self.cache.lookup("what is the bedroom temperature", SCOPE, self._current))
+        self.assertIsNone(self.cache.lookup("which automations are not disabled", SCOPE, self._current))
+
+    def test_numbers_are_rerendered(self):
+        deps = {"sensor.energy_today": "12.4", "sensor.pv": "3.1"}
+        self.cache.store("show energy today", SCOPE, "Today: 12,4 kWh (PV now 3.1 kW).", deps)
+        self.states["sensor.energy_today"] = "13.05"
+        hit = self.cache.lookup("show energy today", SCOPE, self._current)
+        self.assertTrue(hit["rerendered"])
+        self.assertEqual(hit["answer"], "Today: 13,05 kWh (PV now 3.1 kW).")
+        self.assertEqual(self.cache.lookup("show energy today", SCOPE, self._current)["rerendered"], False)
+
+    def test_rerender_refuses_ambiguous_text(self):
+        self.assertIsNone(rerender_numbers("3.1 and 3.1", {"s.a": "3.1"}, {"s.a": "4"}))
+        self.assertIsNone(rerender_numbers("it is off", {"s.a": "off"}, {"s.a": "on"}))
+        self.assertIsNone(rerender_numbers("value 5", {"s.a": "5", "s.b": "5"}, {"s.a": "6", "s.b": "5"}))
+        self.assertEqual(rerender_numbers("at 15.5°C, not 155", {"s.a": "15.5"}, {"s.a": "16"}), "at 16°C, not 155")
+
+
+if __name__ == "__main__":
+    unittest.main()
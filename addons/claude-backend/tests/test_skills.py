@@ -0,0 +1,92 @@
+"""Tests for the skill catalog and store index cache (skills.py)"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import skills
+from skills import SkillCatalog
+
+SKILL_MD = """---
+name: energy
+version: "1.0"
+description: {en: Energy report}
+tags: [energy]
+---
+Build an energy report for the user.
+"""
+
+
+class TestSkillCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._dir = mock.patch.object(skills, "SKILLS_DIR", self.tmp)
+        self._dir.start()
+        self._cat = mock.patch.object(skills, "_catalog", SkillCatalog(scan_interval=0))
+        self._cat.start()
+
+    def tearDown(self):
+        self._cat.stop()
+        self._dir.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_parsed_once_and_injection_prerendered(self):
+        self.assertEqual(skills.install_skill("energy", SKILL_MD), {"success": True, "name": "energy"})
+        for _ in range(5):
+            prompt = skills.inject_skill_into_prompt("energy", "BASE")
+        self.assertEqual(prompt, "SKILL INSTRUCTIONS (energy):\nBuild an energy report for the user.\n\n---\n\nBASE")
+        self.assertEqual(skills.list_skills()[0]["version"], "1.0")
+        st = skills.get_catalog().stats()
+        self.assertEqual(st["parses"], 1)
+        self.assertEqual(st["tokens"]["energy"], len(skills.inject_skill_into_prompt("energy", "")) // 4)
+
+    def test_mtime_change_and_delete_are_picked_up(self):
+        skills.install_skill("energy", SKILL_MD)
+        self.assertIsNotNone(skills.get_skill("energy"))
+        path = os.path.join(self.tmp, "energy", "SKILL.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SKILL_MD.replace("Build", "Now build"))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertTrue(skills.get_skill("energy")["body"].startswith("Now build"))
+        self.assertTrue(skills.delete_skill("energy"))
+        self.assertIsNone(skills.inject_skill_into_prompt("energy", "BASE"))
+        self.assertEqual(skills.list_skills(), [])
+
+
+class TestStoreIndex(unittest.TestCase):
+    def setUp(self):
+        self._cache = mock.patch.dict(skills._store_cache, {"ts": 0.0, "data": None, "etag": None,
+                                                            "last_modified": None})
+        self._cache.start()
+
+    def tearDown(self):
+        self._cache.stop()
+
+    def test_ttl_then_etag_revalidation_and_stale_on_error(self):
+        sent = []
+
+        def get(url, etag=None, last_modified=None, timeout=10):
+            sent.append(etag)
+            if etag == '"v1"':
+                return 304, b"", {}
+            return 200, b'{"skills": [{"name": "energy"}]}', {"ETag": '"v1"'}
+
+        with mock.patch.object(skills, "_http_get_conditional", side_effect=get):
+            self.assertEqual(skills.fetch_store_index({"energy"}), [{"name": "energy", "installed": True}])
+            skills.fetch_store_index()                      # within TTL: no request
+            skills._store_cache["ts"] = 0.0
+            self.assertEqual(skills.fetch_store_index(), [{"name": "energy"}])   # 304 keeps data
+        self.assertEqual(sent, [None, '"v1"'])
+
+        skills._store_cache["ts"] = 0.0
+        with mock.patch.object(skills, "_http_get_conditional", side_effect=OSError("offline")):
+            self.assertEqual(skills.fetch_store_index(), [{"name": "energy"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
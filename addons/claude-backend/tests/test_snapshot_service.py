@@ -0,0 +1,78 @@
+"""Tests for services/snapshot_service.py (content-addressed snapshots)"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import snapshot_service
+from services.snapshot_service import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "snapshots")
+        self.store = SnapshotStore(self.root)
+        self._tick = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _create(self, name, data, keep=5):
+        # Distinct timestamps without sleeping
+        self._tick += 1
+        fake_now = mock.Mock()
+        fake_now.now.return_value.strftime.return_value = f"20260101_0000{self._tick:02d}"
+        with mock.patch.object(snapshot_service, "datetime", fake_now):
+            return self.store.create(name, data, keep)
+
+    def _blob_files(self):
+        return [f for _, _, files in os.walk(os.path.join(self.root, "blobs")) for f in files]
+
+    def test_roundtrip_and_dedup(self):
+        a = self._create("automations.yaml", b"a: 1\n" * 1000)
+        again = self._create("automations.yaml", b"a: 1\n" * 1000)
+        self.assertTrue(again["deduplicated"])
+        self.assertEqual(again["snapshot_id"], a["snapshot_id"])
+        self._create("automations.yaml", b"a: 2\n")
+        self._create("copy.yaml", b"a: 1\n" * 1000)  # same content, other file
+        self.assertEqual(len(self.store.list()), 3)
+        self.assertEqual(len(self._blob_files()), 2)
+        self.assertEqual(self.store.read(a["snapshot_id"]), b"a: 1\n" * 1000)
+        self.assertLess(a["stored_size"], a["size"])
+
+    def test_retention_prunes_oldest_and_unreferenced_blobs(self):
+        ids = [self._create("scripts.yaml", f"v{i}".encode(), keep=2)["snapshot_id"] for i in range(4)]
+        remaining = [m["snapshot_id"] for m in self.store.list()]
+        self.assertEqual(remaining, ids[-2:])
+        self.assertEqual(len(self._blob_files()), 2)
+        self.assertTrue(self.store.delete(ids[-1]))
+        self.assertIsNone(self.store.read(ids[-1]))
+        self.assertEqual(len(self._blob_files()), 1)
+
+    def test_index_is_read_by_a_fresh_store(self):
+        meta = self._create("configuration.yaml", b"homeassistant:\n")
+        fresh = SnapshotStore(self.root)
+        self.assertEqual(fresh.get(meta["snapshot_id"])["original_file"], "configuration.yaml")
+        self.assertEqual(fresh.stats()["snapshots"], 1)
+
+    def test_legacy_layout_is_migrated(self):
+        os.makedirs(self.root)
+        sid = "20250101_120000_packages__lights.yaml"
+        with open(os.path.join(self.root, sid), "wb") as f:
+            f.write(b"light: []\n")
+        with open(os.path.join(self.root, sid + ".meta"), "w") as f:
+            json.dump({"original_file": "packages/lights.yaml", "timestamp": "20250101_120000",
+                       "snapshot_id": sid}, f)
+        store = SnapshotStore(self.root)
+        self.assertEqual(store.read(sid), b"light: []\n")
+        self.assertEqual(store.get(sid)["original_file"], "packages/lights.yaml")
+        self.assertFalse(os.path.exists(os.path.join(self.root, sid)))
+
+
+if __name__ == "__main__":
+    unittest.main()
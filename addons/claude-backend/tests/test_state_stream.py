@@ -0,0 +1,114 @@
+"""Tests for services/state_stream_service.py (shared filtered state hub)"""
+import json
+import os
+import queue
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.state_stream_service as sss
+from services.state_stream_service import StateHub
+
+
+class _FakeWS:
+    def __init__(self):
+        self.inbox = queue.Queue()
+
+    def recv(self):
+        try:
+            return self.inbox.get(timeout=0.05)
+        except queue.Empty:
+            raise TimeoutError()
+
+    def close(self):
+        pass
+
+    def push(self, entity_id, state):
+        self.inbox.put(json.dumps({"type": "event", "event": {"data": {
+            "entity_id": entity_id,
+            "new_state": {"entity_id": entity_id, "state": state, "attributes": {"unit_of_measurement": "W"}},
+        }}}))
+
+
+class TestStateHub(unittest.TestCase):
+
+    def setUp(self):
+        sss.COALESCE_SECONDS = 0.05
+        self.connects = []
+        self.fetches = []
+
+        def connect():
+            ws = _FakeWS()
+            self.connects.append(ws)
+            return ws
+
+        def fetch(ids):
+            self.fetches.append(list(ids))
+            return [{"entity_id": e, "state": "0", "attributes": {}} for e in ids if "ghost" not in e]
+
+        self.hub = StateHub(connect, fetch)
+
+    def tearDown(self):
+        self.hub.shutdown()
+
+    def _wait_connected(self):
+        for _ in range(100):
+            if self.connects:
+                return self.connects[0]
+            sss.time.sleep(0.01)
+        self.fail("upstream never connected")
+
+    def test_clients_share_one_upstream_and_get_only_their_entities(self):
+        a = ["sensor.power", "light.kitchen"]
+        b = ["sensor.power"]
+        self.hub.acquire(a)
+        self.hub.acquire(b)
+        ws = self._wait_connected()
+
+        seq, snap = self.hub.changes_since(b, 0)
+        self.assertEqual([s["entity_id"] for s in snap], ["sensor.power"])
+
+        ws.push("sensor.unwatched", "5")
+        ws.push("sensor.power", "1")
+        ws.push("sensor.power", "2")
+        new_seq, diff = self.hub.wait_changes(b, seq, timeout=2)
+        self.assertEqual(len(diff), 1)
+        self.assertEqual(diff[0]["state"], "2")
+        self.assertGreater(new_seq, seq)
+        self.assertEqual(len(self.connects), 1)
+        self.assertNotIn("sensor.unwatched", [e for batch in self.fetches for e in batch])
+
+    def test_unknown_entities_are_not_refetched_until_created(self):
+        ids = ["sensor.ghost", "sensor.power"]
+        self.hub.lease(ids)
+        ws = self._wait_connected()
+        for _ in range(3):
+            self.hub.lease(ids)
+        fetched = [e for batch in self.fetches for e in batch]
+        # once on lease, once on the upstream resync, never on later leases
+        self.assertLessEqual(fetched.count("sensor.ghost"), 2)
+        self.assertEqual(self.hub.stats()["missing_entities"], 1)
+        seq, _ = self.hub.changes_since(ids, 0)
+        ws.push("sensor.ghost", "7")
+        _, diff = self.hub.wait_changes(ids, seq, timeout=2)
+        self.assertEqual([(d["entity_id"], d["state"]) for d in diff], [("sensor.ghost", "7")])
+        self.assertEqual(self.hub.stats()["missing_entities"], 0)
+
+    def test_sse_stream_snapshot_then_diff(self):
+        sss.KEEPALIVE_SECONDS = 0.2
+        gen = sss.sse_stream(["switch.pump"], hub=self.hub)
+        first = next(gen)
+        self.assertTrue(first.startswith("event: snapshot"))
+        self._wait_connected().push("switch.pump", "on")
+        frame = next(gen)
+        while frame.startswith(":"):
+            frame = next(gen)
+        self.assertTrue(frame.startswith("event: diff"))
+        self.assertIn('"on"', frame)
+        gen.close()
+        self.assertEqual(self.hub.stream_clients, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Tests for IncrementalToolCallParser in providers/tool_simulator.py"""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.tool_simulator import (
+    IncrementalToolCallParser,
+    clean_display_text,
+    extract_tool_calls,
+)
+
+_REPLY = (
+    "Sure, I will turn it on.\n\n"
+    "<tool_call>\n"
+    '{"name": "call_service", "arguments": {"domain": "light", "service": "turn_on", '
+    '"data": {"entity_id": "light.kitchen"}}}\n'
+    "</tool_call>\n\n\n"
+    "[TOOL RESULT: call_service]\n{\"status\": \"ok\"}\n[/TOOL RESULT]\n"
+    "Done — a < b is fine, [not markup] either.\n"
+    '<tool_call>{"name": "get_entity_state", "arguments": {"entity_id": "light.kitchen",},}</tool_call>'
+)
+
+
+def _run(text, size):
+    parser = IncrementalToolCallParser()
+    shown, calls = [], []
+    for i in range(0, len(text), size):
+        out, new = parser.feed(text[i:i + size])
+        shown.append(out)
+        calls.extend(new)
+    out, new = parser.finish()
+    shown.append(out)
+    calls.extend(new)
+    return "".join(shown), calls
+
+
+class TestIncrementalToolCallParser(unittest.TestCase):
+    def test_matches_batch_parser_for_any_chunking(self):
+        expected_calls = extract_tool_calls(_REPLY)
+        expected_text = clean_display_text(_REPLY)
+        self.assertEqual(len(expected_calls), 2)
+        for size in (1, 2, 3, 7, 16, 64, len(_REPLY)):
+            text, calls = _run(_REPLY, size)
+            self.assertEqual(calls, expected_calls, f"chunk size {size}")
+            self.assertEqual(text, expected_text, f"chunk size {size}")
+
+    def test_call_is_reported_when_block_closes(self):
+        parser = IncrementalToolCallParser()
+        shown, calls = parser.feed('Checking. <tool_call>{"name": "get_entities", ')
+        self.assertEqual((shown, calls), ("Checking.", []))
+        shown, calls = parser.feed('"arguments": {}}</tool_')
+        self.assertEqual(calls, [])
+        shown, calls = parser.feed("call> trailing")
+        self.assertEqual([c["name"] for c in calls], ["get_entities"])
+        self.assertEqual(shown, "  trailing")  # held separator + text after the block
+
+    def test_escaped_markdown_and_function_calls(self):
+        escaped = '\\<tool\\_call\\>{"name": "create\\_automation", "arguments": {}}\\</tool\\_call\\>'
+        _, calls = _run(escaped, 5)
+        self.assertEqual(calls[0]["name"], "create_automation")
+        native = ('<function_calls><invoke name="get_entities">'
+                  '<parameter name="domain">"light"</parameter></invoke></function_calls>')
+        text, calls = _run("Looking." + native, 4)
+        self.assertEqual(text, "Looking.")
+        self.assertEqual(calls, extract_tool_calls(native))
+
+    def test_two_calls_in_one_reply_are_both_collected_before_stopping(self):
+        reply = (
+            "Turning both on.\n"
+            '<tool_call>{"name": "call_service", "arguments": {"entity_id": "light.a"}}</tool_call>\n'
+            '<tool_call>{"name": "call_service", "arguments": {"entity_id": "light.b"}}</tool_call>\n'
+            "[TOOL RESULT: call_service]\n{\"status\": \"ok\"}\n[/TOOL RESULT]\n"
+            "Both lights are on now."
+        )
+        for size in (1, 5, 17, len(reply)):
+            parser = IncrementalToolCallParser(lambda c: c["name"] == "call_service")
+            shown, consumed = [], 0
+            for i in range(0, len(reply), size):  # what _stop_at_simulated_tool_call does
+                out, _ = parser.feed(reply[i:i + size])
+                shown.append(out)
+                consumed = i + size
+                if parser.needs_result:
+                    break
+            self.assertEqual([json.loads(c["arguments"])["entity_id"] for c in parser.calls], ["light.a", "light.b"])
+            if size < len(reply):
+                self.assertLess(consumed, len(reply))  # stopped before the fabricated result ends
+            self.assertEqual("".join(shown).strip(), "Turning both on.", f"chunk size {size}")
+
+    def test_prose_after_call_needs_result_but_non_dispatchable_does_not(self):
+        parser = IncrementalToolCallParser(lambda c: c["name"] != "create_html_dashboard")
+        parser.feed('<tool_call>{"name": "get_entities", "arguments": {}}</tool_call>\n\n')
+        self.assertFalse(parser.needs_result)
+        shown, _ = parser.feed("The kitchen light is on.")
+        self.assertTrue(parser.needs_result)
+        self.assertEqual(shown, "")
+
+        dash = IncrementalToolCallParser(lambda c: c["name"] != "create_html_dashboard")
+        dash.feed('<tool_call>{"name": "create_html_dashboard", "arguments": {}}</tool_call> Part two')
+        self.assertFalse(dash.needs_result)
+
+    def test_unclosed_block_is_not_displayed(self):
+        text, calls = _run('Hi <tool_call>{"name": "x"', 3)
+        self.assertEqual((text, calls), ("Hi", []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for tracing.py (request spans, aggregates, folded stacks)"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+
+
+def _provider_events():
+    yield {"type": "status", "message": "connecting"}
+    yield {"type": "text", "text": "hi"}
+    yield {"type": "done"}
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        tracing.clear()
+
+    def test_span_is_noop_without_trace(self):
+        self.assertIsNone(tracing.current())
+        with tracing.span("anything") as sp:
+            sp.set(x=1)
+        self.assertEqual(tracing.recent_traces(), [])
+
+    def test_nested_spans_and_ttft(self):
+        trace = tracing.start_trace("chat", session="s1")
+        with tracing.span("detect_intent"):
+            pass
+        with tracing.span("provider_round"):
+            list(tracing.traced_stream("provider:openai", _provider_events(), model="m"))
+        tracing.finish_trace(trace)
+        self.assertIsNone(tracing.current())
+
+        [data] = tracing.recent_traces()
+        paths = {s["path"] for s in data["spans"]}
+        self.assertIn("detect_intent", paths)
+        self.assertIn("provider_round;provider:openai", paths)
+        self.assertIn("provider_round;provider:openai;ttft", paths)
+        provider = next(s for s in data["spans"] if s["name"] == "provider:openai")
+        self.assertEqual(provider["meta"]["events"], 3)
+
+        aggregates = tracing.aggregates()
+        self.assertEqual(aggregates["total"]["requests"], 1)
+        self.assertEqual(aggregates["detect_intent"]["calls"], 1)
+        self.assertIn("chat;provider_round;provider:openai", tracing.folded_stacks())
+
+    def test_worker_threads_nest_under_their_parent(self):
+        trace = tracing.start_trace("chat")
+        barrier = threading.Barrier(3, timeout=5)
+
+        def worker(name, parent):
+            tracing.bind_worker(trace, parent)
+            with tracing.span(name):
+                barrier.wait()  # every thread has a span open at the same time
+                with tracing.span("http"):
+                    barrier.wait()
+            tracing.bind(None)
+
+        with tracing.span("provider_round"):
+            parent = tracing.current_span()
+            threads = [threading.Thread(target=worker, args=(n, parent)) for n in ("provider:a", "provider:b")]
+            for t in threads:
+                t.start()
+            with tracing.span("wait"):
+                barrier.wait()
+                barrier.wait()
+            for t in threads:
+                t.join()
+        tracing.finish_trace(trace)
+        [data] = tracing.recent_traces()
+        self.assertEqual(sorted(s["path"] for s in data["spans"]), [
+            "provider_round", "provider_round;provider:a", "provider_round;provider:a;http",
+            "provider_round;provider:b", "provider_round;provider:b;http", "provider_round;wait",
+        ])
+
+    def test_span_records_error(self):
+        trace = tracing.start_trace("chat")
+        with self.assertRaises(ValueError):
+            with tracing.span("tool:x"):
+                raise ValueError("boom")
+        tracing.finish_trace(trace)
+        [data] = tracing.recent_traces()
+        self.assertEqual(data["spans"][0]["meta"]["error"], "ValueError")
+
+
+if __name__ == "__main__":
+    unittest.main()
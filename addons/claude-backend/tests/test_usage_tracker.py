@@ -0,0 +1,85 @@
+"""Tests for usage_tracker.py (write-behind journal + snapshot rollups)"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from usage_tracker import UsageTracker
+
+_USAGE = {
+    "input_tokens": 100,
+    "output_tokens": 20,
+    "cost": 0.001,
+    "cost_breakdown": {"input": 0.0008, "output": 0.0002},
+    "model": "gpt-test",
+    "provider": "openai",
+}
+
+
+class TestUsageTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "usage_stats.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_record_does_not_touch_disk(self):
+        tracker = UsageTracker(self.path)
+        tracker.record(_USAGE)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        self.assertEqual(tracker.get_today()["requests"], 1)
+
+    def test_journal_replayed_on_load(self):
+        tracker = UsageTracker(self.path)
+        for _ in range(3):
+            tracker.record(_USAGE)
+        tracker.flush()
+        self.assertTrue(os.path.getsize(self.path + ".journal") > 0)
+
+        reloaded = UsageTracker(self.path)
+        summary = reloaded.get_summary(7)
+        self.assertEqual(summary["totals"]["requests"], 3)
+        self.assertEqual(summary["by_model"]["gpt-test"]["input_tokens"], 300)
+
+    def test_rollup_truncates_journal_without_double_count(self):
+        tracker = UsageTracker(self.path)
+        tracker.record(_USAGE)
+        tracker.flush()
+        tracker.flush(rollup=True)
+        self.assertEqual(os.path.getsize(self.path + ".journal"), 0)
+        tracker.record(_USAGE)
+        tracker.flush()
+
+        reloaded = UsageTracker(self.path)
+        self.assertEqual(reloaded.get_summary(1)["all_time_totals"]["requests"], 2)
+
+    def test_stale_journal_rows_are_skipped(self):
+        tracker = UsageTracker(self.path)
+        tracker.record(_USAGE)
+        tracker.flush()
+        with open(self.path + ".journal") as f:
+            journal = f.read()
+        tracker.flush(rollup=True)
+        # Simulate a crash between snapshot write and journal truncation
+        with open(self.path + ".journal", "w") as f:
+            f.write(journal)
+
+        reloaded = UsageTracker(self.path)
+        self.assertEqual(reloaded.get_today()["requests"], 1)
+
+    def test_reset(self):
+        tracker = UsageTracker(self.path)
+        tracker.record(_USAGE)
+        tracker.flush()
+        tracker.reset()
+        self.assertEqual(UsageTracker(self.path).get_today()["requests"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for providers/web_warmup.py (web provider session pool)"""
+import os
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from providers.web_warmup import WebSessionPool
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestWebSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = []
+        self.fail = False
+        self.modules = {
+            "good_web": types.SimpleNamespace(WARMUP_INTERVAL=600, warm_up=self._warm_up),
+        }
+        self.pool = WebSessionPool(
+            providers=("good_web", "other_web"),
+            loader=lambda name: self.modules[name],
+            session_file=os.path.join(self.tmp.name, "session_{provider}.json"),
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _warm_up(self):
+        self.calls.append(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("cookies rejected")
+        return True
+
+    def _store_session(self, provider):
+        open(os.path.join(self.tmp.name, f"session_{provider}.json"), "w").close()
+
+    def test_readiness_transitions(self):
+        self.assertEqual(self.pool.status("good_web")["state"], "cold")
+        self.assertEqual(self.pool.warm("good_web")["state"], "unconfigured")
+        self.assertEqual(self.calls, [])  # no session file → module never loaded
+        self._store_session("good_web")
+        st = self.pool.warm("good_web")
+        self.assertEqual(st["state"], "ready")
+        self.assertTrue(self.pool.is_ready("good_web"))
+        self.assertGreater(st["refresh_in_s"], 500)
+        self.fail = True
+        st = self.pool.warm("good_web")
+        self.assertEqual((st["state"], st["last_error"], st["failures"]), ("error", "cookies rejected", 1))
+        self.assertEqual(self.pool.readiness()["providers"]["other_web"]["state"], "cold")
+
+    def test_client_reused_until_session_changes(self):
+        made = []
+
+        def factory():
+            made.append(_Client())
+            return made[-1]
+
+        with self.pool.client("good_web", "k1", factory) as a:
+            pass
+        with self.pool.client("good_web", "k1", factory) as b:
+            pass
+        self.assertIs(a, b)
+        self.assertFalse(a.closed)
+        c = self.pool.get_client("good_web", "k2", factory)
+        self.assertIsNot(a, c)
+        self.assertTrue(a.closed)
+        self.pool.notify_session_changed("good_web")
+        self.assertTrue(c.closed)
+        self.assertEqual(len(made), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
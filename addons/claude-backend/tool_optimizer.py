@@ -9,11 +9,14 @@ Inspired by nanobot: Optimize tool execution by:
 
 import logging
 import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple, Callable
 from dataclasses import dataclass, field
 import hashlib
 import json
 
+from metrics_core import RingBuffer, StreamingStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,10 +60,16 @@ class ToolResult:
 class ToolExecutionOptimizer:
     """Optimizes and batches tool execution."""
     
+    RESULT_CACHE_SIZE = 256
+    LOG_SIZE = 500
+
     def __init__(self):
         """Initialize optimizer."""
-        self.result_cache: Dict[str, ToolResult] = {}  # call_id -> result
-        self.execution_log: List[ToolResult] = []
+        self.result_cache: "OrderedDict[str, ToolResult]" = OrderedDict()  # call_id -> result (LRU)
+        self.execution_log = RingBuffer(self.LOG_SIZE)  # recent results only
+        self._counts = {"total": 0, "successful": 0, "failed": 0, "cached": 0}
+        self._latency = StreamingStats()
+        self._by_tool: Dict[str, StreamingStats] = {}
     
     def deduplicate_calls(self, calls: List[ToolCall]) -> Tuple[List[ToolCall], Dict[str, str]]:
         """Remove duplicate calls and create mapping.
@@ -194,6 +203,7 @@ class ToolExecutionOptimizer:
             try:
                 # Check cache first
                 if call.call_id in self.result_cache:
+                    self.result_cache.move_to_end(call.call_id)
                     cached_result = self.result_cache[call.call_id]
                     cached_result.cached = True
                     results.append(cached_result)
@@ -215,6 +225,8 @@ class ToolExecutionOptimizer:
                 
                 # Cache result
                 self.result_cache[call.call_id] = result
+                if len(self.result_cache) > self.RESULT_CACHE_SIZE:
+                    self.result_cache.popitem(last=False)
                 results.append(result)
                 
                 logger.debug(f"✅ {call.tool_name} ({execution_time:.0f}ms, id: {call.call_id[:8]})")
@@ -234,8 +246,20 @@ class ToolExecutionOptimizer:
                 results.append(result)
                 logger.error(f"❌ {call.tool_name}: {str(e)[:100]} (id: {call.call_id[:8]})")
         
-        self.execution_log.extend(results)
+        for r in results:
+            self._record(r)
         return results
+
+    def _record(self, result: ToolResult) -> None:
+        """Update the streaming aggregates for one result."""
+        self.execution_log.append(result)
+        self._counts["total"] += 1
+        self._counts["successful" if result.is_success() else "failed"] += 1
+        if result.cached:
+            self._counts["cached"] += 1
+            return
+        self._latency.observe(result.execution_time_ms)
+        self._by_tool.setdefault(result.tool_name, StreamingStats()).observe(result.execution_time_ms)
     
     def optimize_and_execute(self, 
                             calls: List[ToolCall],
@@ -289,22 +313,23 @@ class ToolExecutionOptimizer:
         return final_results
     
     def stats(self) -> Dict[str, Any]:
-        """Get optimization statistics."""
-        if not self.execution_log:
+        """Get optimization statistics (streaming aggregates, constant time)."""
+        counts = dict(self._counts)
+        if not counts["total"]:
             return {"executions": 0}
         
-        success = sum(1 for r in self.execution_log if r.is_success())
-        cached = sum(1 for r in self.execution_log if r.cached)
-        total_time = sum(r.execution_time_ms for r in self.execution_log)
-        
+        latency = self._latency.snapshot(digits=1)
         return {
-            "total_executions": len(self.execution_log),
-            "successful": success,
-            "failed": len(self.execution_log) - success,
-            "cached": cached,
-            "total_execution_time_ms": total_time,
-            "avg_execution_time_ms": total_time / len(self.execution_log),
-            "cache_utilization": f"{cached / len(self.execution_log) * 100:.1f}%",
+            "total_executions": counts["total"],
+            "successful": counts["successful"],
+            "failed": counts["failed"],
+            "cached": counts["cached"],
+            "total_execution_time_ms": round(self._latency.sum, 1),
+            "avg_execution_time_ms": latency.get("mean") or 0.0,
+            "p95_execution_time_ms": latency.get("p95"),
+            "cache_utilization": f"{counts['cached'] / counts['total'] * 100:.1f}%",
+            "result_cache_entries": len(self.result_cache),
+            "by_tool": {name: st.snapshot(digits=1) for name, st in self._by_tool.items()},
         }
 
 
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 import api
+import metrics_exporter
+import tracing
 
 try:
     import mcp
@@ -62,6 +64,16 @@ def _build_dashboard_html(title: str, entities: list, theme: str,
     if lang not in ("en", "it", "es", "fr"):
         lang = "en"
 
+    # Filtered state feed (/dashboard_api/stream|poll) reached through the add-on
+    # ingress; the page falls back to /api/states polling when it's unreachable.
+    feed_base = ""
+    try:
+        ingress_url = api.get_addon_ingress_url()
+        if ingress_url:
+            feed_base = f"{ingress_url}/dashboard_api"
+    except Exception:
+        pass
+
     agent_name = getattr(api, "AGENT_NAME", "Amira") or "Amira"
     default_footer = getattr(api, "HTML_DASHBOARD_FOOTER", "") or ""
     if not footer_text:
@@ -233,6 +245,7 @@ stroke-linecap="round" transform="rotate(-90 18 18)" style="transition:stroke-da
 const{createApp,ref,reactive,onMounted,onUnmounted,nextTick}=Vue;
 const ENTITIES=__ENTITIES_JSON__;
 const SECTIONS=__SECTIONS_JSON__;
+const FEED=__FEED_JSON__;
 const PAL=['#667eea','#10b981','#f59e0b','#ef4444','#8b5cf6','#ec4899','#06b6d4','#84cc16','#f97316','#14b8a6'];
 const DICO={sensor:'S',binary_sensor:'BS',switch:'SW',light:'LT',climate:'CL',cover:'CV',fan:'FN',
 input_boolean:'IB',input_number:'IN',number:'NM',automation:'AT',script:'SC',person:'PR',weather:'WE',
@@ -290,7 +303,7 @@ function haHeaders(){const _t=_cachedToken||(typeof tok!=='undefined'?tok:'');re
 
 createApp({setup(){
 const connected=ref(false),error=ref(''),sections=ref(SECTIONS),states=reactive({});
-let ws,msgId=1,charts={},reconTimer,pollTimer;
+let ws,msgId=1,charts={},reconTimer,pollTimer,es,feedSeq=0,feedOk=!!FEED;
 
 function nm(e){return states[e]?.friendly_name||e.split('.').pop().replace(/_/g,' ')}
 function sv(e){return states[e]?.state??'...'}
@@ -324,7 +337,16 @@ function fetchStates(){
 fetch('/api/states',{headers:haHeaders()}).then(r=>{if(!r.ok)throw new Error(r.status);return r.json()}).then(applyStates)
 .catch(e=>{if(!connected.value)error.value='REST: '+e.message})}
 
-function startPolling(){if(pollTimer)return;fetchStates();pollTimer=setInterval(fetchStates,5000)}
+function feedUrl(p,q){return FEED+'/'+p+'?entity_ids='+encodeURIComponent(ENTITIES.join(','))+(q||'')}
+function onFeed(d){if(d.seq)feedSeq=d.seq;applyStates(d.states||[])}
+function pollFeed(){fetch(feedUrl('poll','&since='+feedSeq)).then(r=>{if(!r.ok)throw new Error(r.status);return r.json()})
+.then(onFeed).catch(()=>{feedOk=false;fetchStates()})}
+function startStream(){if(!FEED||typeof EventSource==='undefined')return false;
+try{es=new EventSource(feedUrl('stream'));const on=ev=>{try{onFeed(JSON.parse(ev.data))}catch(x){}};
+es.addEventListener('snapshot',on);es.addEventListener('diff',on);
+es.onerror=()=>{if(es&&es.readyState===2){es=null;startPolling(true)}};return true}catch(e){es=null;return false}}
+function startPolling(noStream){if(pollTimer||es)return;if(!noStream&&startStream())return;
+const tick=()=>feedOk?pollFeed():fetchStates();tick();pollTimer=setInterval(tick,5000)}
 
 function connect(){getTokenAsync().then(token=>{
 if(!token){error.value='';startPolling();return}
@@ -389,7 +411,7 @@ y:{grid:{color:dk?'#33415522':'#e2e8f022'},ticks:{color:dk?'#94a3b8':'#6b7280',f
 })}).catch(e=>console.warn('Trend fetch error:',e))})}
 
 onMounted(connect);
-onUnmounted(()=>{ws?.close();clearTimeout(reconTimer);clearInterval(pollTimer);Object.values(charts).forEach(c=>c.destroy())});
+onUnmounted(()=>{ws?.close();es?.close();clearTimeout(reconTimer);clearInterval(pollTimer);Object.values(charts).forEach(c=>c.destroy())});
 return{sections,connected,error,nm,sv,fv,fu,isOn,numVal,gPct,dIco,togDom,slDom,slMin,slMax,slStep,items,toggle,setVal,PAL}
 }}).mount('#app');
 })();
@@ -400,6 +422,7 @@ return{sections,connected,error,nm,sv,fv,fu,isOn,numVal,gPct,dIco,togDom,slDom,s
     html = html.replace("__TITLE__", safe_title)
     html = html.replace("__ENTITIES_JSON__", entities_json)
     html = html.replace("__SECTIONS_JSON__", sections_json)
+    html = html.replace("__FEED_JSON__", json.dumps(feed_base))
     html = html.replace("__ACCENT__", accent_color)
     html = html.replace("__ACCENT_RGB__", accent_rgb)
     html = html.replace("__THEME_CSS__", theme_css)
@@ -1798,7 +1821,8 @@ HA_TOOLS_DESCRIPTION = [
             "type": "object",
             "properties": {
                 "entity_id": {"type": "string", "description": "The entity ID to get history for."},
-                "hours": {"type": "number", "description": "Hours of history to retrieve (default 24, max 168)."}
+                "hours": {"type": "number", "description": "Hours of history to retrieve (default 24, max 168)."},
+                "points": {"type": "number", "description": "Max points returned; long series are downsampled keeping peaks/dips (default 50, max 500)."}
             },
             "required": ["entity_id"]
         }
@@ -2544,6 +2568,22 @@ def _read_only_response(tool_name: str, tool_input: dict) -> str:
     }, ensure_ascii=False, default=str)
 
 
+def _snapshot_dashboard(url_path: str, config: dict) -> str:
+    """Snapshot a Lovelace dashboard config into the snapshot store; returns its id."""
+    from services.snapshot_service import get_snapshot_store
+    url_path = url_path or "lovelace"
+    data = json.dumps({"url_path": url_path, "config": config}, ensure_ascii=False).encode("utf-8")
+    meta = get_snapshot_store().create(
+        f"lovelace:{url_path}",
+        data,
+        api.MAX_SNAPSHOTS_PER_FILE,
+        kind="lovelace_dashboard",
+        extra={"url_path": url_path},
+        safe_name="dashboard__" + url_path.replace("/", "__").replace("\\", "__"),
+    )
+    return meta["snapshot_id"]
+
+
 def _extract_entity_ids(obj, _in_service_key=False):
     """Recursively extract all entity_id references from a config dict/list.
 
@@ -2604,47 +2644,82 @@ def _extract_entity_ids(obj, _in_service_key=False):
     return ids
 
 
+def _normalize_mcp_tool_input(manager, tool_name: str, tool_input: dict) -> dict:
+    """Fix common LLM argument mistakes before dispatching an MCP tool call."""
+    # Normalise filesystem paths: strip the server root if the LLM
+    # accidentally double-prefixed it (e.g. /config/config/packages).
+    if "filesystem" in tool_name and "path" in tool_input:
+        _raw_path = tool_input["path"]
+        # Detect the filesystem root from the server config.
+        # tool_name = mcp_<server_name>_<original_tool_name>
+        # Match server by finding which server name is a prefix of the tool suffix.
+        _srv_obj = None
+        _suffix = tool_name[len("mcp_"):]
+        for _sn, _s in (manager.servers or {}).items():
+            if _suffix.startswith(_sn + "_") or _suffix == _sn:
+                _srv_obj = _s
+                break
+        if _srv_obj:
+            _srv_args = _srv_obj.config.get("args", [])
+            _fs_root = next(
+                (a for a in reversed(_srv_args)
+                 if isinstance(a, str) and a.startswith("/")),
+                None
+            )
+            if _fs_root and _fs_root != "/" and _raw_path.startswith(_fs_root + "/"):
+                _fixed = _raw_path[len(_fs_root):]
+                logger.warning(
+                    f"MCP filesystem path normalised: '{_raw_path}' → '{_fixed}' "
+                    f"(stripped root '{_fs_root}')"
+                )
+                tool_input = dict(tool_input, path=_fixed)
+            elif _fs_root and _raw_path == _fs_root:
+                logger.warning(
+                    f"MCP filesystem path normalised: '{_raw_path}' → '/' "
+                    f"(stripped root '{_fs_root}')"
+                )
+                tool_input = dict(tool_input, path="/")
+    return tool_input
+
+
+def is_mcp_read_only(tool_name: str) -> bool:
+    """True for MCP tools that can be batched ahead of their turn without side effects."""
+    return MCP_AVAILABLE and tool_name.startswith("mcp_") and mcp.get_mcp_manager().is_read_only(tool_name)
+
+
+def execute_mcp_tools_batch(calls: list) -> list:
+    """Execute independent read-only MCP tool calls concurrently.
+
+    Args:
+        calls: list of (tool_name, tool_input) tuples, all read-only ``mcp_*`` tools
+
+    Returns:
+        List of result strings in the same order as ``calls``.
+    """
+    if not MCP_AVAILABLE:
+        return [json.dumps({"error": f"MCP tool '{name}' requested but MCP module not available"})
+                for name, _ in calls]
+    manager = mcp.get_mcp_manager()
+    prepared = [(name, _normalize_mcp_tool_input(manager, name, args)) for name, args in calls]
+    logger.info(f"Executing {len(prepared)} MCP tools concurrently: {[n for n, _ in prepared]}")
+    with tracing.span("tool:mcp_batch", calls=len(prepared)):
+        return manager.call_tools_batch(prepared)
+
+
 def execute_tool(tool_name: str, tool_input: dict) -> str:
     """Execute a tool call and return the result as string."""
+    with tracing.span(f"tool:{tool_name}"), metrics_exporter.TOOL_SECONDS.time(tool=tool_name):
+        return _execute_tool(tool_name, tool_input)
+
+
+def _execute_tool(tool_name: str, tool_input: dict) -> str:
     try:
         # Handle MCP tools first
         if tool_name.startswith("mcp_"):
             if MCP_AVAILABLE:
                 logger.info(f"Executing MCP tool: {tool_name}")
                 manager = mcp.get_mcp_manager()
-                # Normalise filesystem paths: strip the server root if the LLM
-                # accidentally double-prefixed it (e.g. /config/config/packages).
-                if "filesystem" in tool_name and "path" in tool_input:
-                    _raw_path = tool_input["path"]
-                    # Detect the filesystem root from the server config.
-                    # tool_name = mcp_<server_name>_<original_tool_name>
-                    # Match server by finding which server name is a prefix of the tool suffix.
-                    _srv_obj = None
-                    _suffix = tool_name[len("mcp_"):]
-                    for _sn, _s in (manager.servers or {}).items():
-                        if _suffix.startswith(_sn + "_") or _suffix == _sn:
-                            _srv_obj = _s
-                            break
-                    if _srv_obj:
-                        _srv_args = _srv_obj.config.get("args", [])
-                        _fs_root = next(
-                            (a for a in reversed(_srv_args)
-                             if isinstance(a, str) and a.startswith("/")),
-                            None
-                        )
-                        if _fs_root and _fs_root != "/" and _raw_path.startswith(_fs_root + "/"):
-                            _fixed = _raw_path[len(_fs_root):]
-                            logger.warning(
-                                f"MCP filesystem path normalised: '{_raw_path}' → '{_fixed}' "
-                                f"(stripped root '{_fs_root}')"
-                            )
-                            tool_input = dict(tool_input, path=_fixed)
-                        elif _fs_root and _raw_path == _fs_root:
-                            logger.warning(
-                                f"MCP filesystem path normalised: '{_raw_path}' → '/' "
-                                f"(stripped root '{_fs_root}')"
-                            )
-                            tool_input = dict(tool_input, path="/")
+                tool_input = _normalize_mcp_tool_input(manager, tool_name, tool_input)
                 result = manager.call_tool(tool_name, tool_input)
                 logger.debug(f"MCP tool result ({len(result)} chars): {result[:300]}")
                 return result
@@ -3727,31 +3802,14 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
             if not keyword:
                 return json.dumps({"error": "integration keyword is required"})
 
-            # Get entity registry via WebSocket (contains platform/integration info)
-            reg_result = api.call_ha_websocket("config/entity_registry/list")
-            registry = reg_result.get("result", []) if isinstance(reg_result, dict) else []
-            if not registry:
-                return json.dumps({"error": "Could not retrieve entity registry", "detail": str(reg_result)[:200]})
-
-            # Try to also match by config_entry title (e.g. "Tigo Energy" for keyword "tigo")
-            matched_entry_ids: set = set()
-            try:
-                cfg_result = api.call_ha_websocket("config_entries/get_entries")
-                entries = cfg_result.get("result", []) if isinstance(cfg_result, dict) else []
-                for e in entries:
-                    domain = (e.get("domain") or "").lower()
-                    title = (e.get("title") or "").lower()
-                    if keyword in domain or keyword in title:
-                        matched_entry_ids.add(e.get("entry_id", ""))
-            except Exception:
-                pass  # optional, platform match is enough
+            # Cached registry graph (platform / config entry indexes)
+            from services.registry_service import get_registry_graph
+            graph = get_registry_graph()
+            if not graph.entities():
+                return json.dumps({"error": "Could not retrieve entity registry"})
 
-            # Filter entities by platform name OR config_entry_id match
-            matched_registry = [
-                r for r in registry
-                if keyword in (r.get("platform") or "").lower()
-                or (matched_entry_ids and r.get("config_entry_id") in matched_entry_ids)
-            ]
+            # Match by platform name OR config_entry domain/title (e.g. "Tigo Energy" for keyword "tigo")
+            matched_registry = graph.integration_entities([keyword])
 
             if not matched_registry:
                 return json.dumps({
@@ -3759,13 +3817,12 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                     "note": f"No entities found for integration '{keyword}'. Try search_entities for name-based search."
                 })
 
-            # Enrich with current states
-            all_states = api.get_all_states()
-            state_map = {s.get("entity_id"): s for s in all_states}
+            # Enrich with current states (each snapshot feeds graph.state())
+            api.get_all_states()
             entities = []
             for r in matched_registry:
                 eid = r.get("entity_id", "")
-                state = state_map.get(eid, {})
+                state = graph.state(eid) or {}
                 entities.append({
                     "entity_id": eid,
                     "state": state.get("state", "unavailable"),
@@ -3820,15 +3877,29 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                     "hint": "Pick one of the suggested entity_ids and call get_history again."
                 }, ensure_ascii=False, default=str)
 
-            start = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%S")
-            endpoint = f"history/period/{start}?filter_entity_id={entity_id}&significant_changes_only=1"
-            result = api.call_ha_api("GET", endpoint)
-            if isinstance(result, list) and result:
-                entries = result[0] if isinstance(result[0], list) else result
-                max_e = 20 if api.AI_PROVIDER == "github" else 50
-                summary = [{"state": e.get("state"), "last_changed": e.get("last_changed")} for e in entries[-max_e:]]
-                return json.dumps({"entity_id": entity_id, "hours": hours, "total_changes": len(entries), "history": summary}, ensure_ascii=False, default=str)
-            return json.dumps({"entity_id": entity_id, "hours": hours, "history": []}, ensure_ascii=False, default=str)
+            # Cached + downsampled: a week-long series keeps its shape in a few points
+            from services.history_service import get_history_service, downsample, summarize, format_ts
+            max_e = 20 if api.AI_PROVIDER == "github" else 50
+            try:
+                max_points = max(2, min(int(tool_input.get("points") or max_e), 500))
+            except (TypeError, ValueError):
+                max_points = max_e
+            end_ts = datetime.now().timestamp()
+            series = get_history_service().get([entity_id], end_ts - hours * 3600, end_ts)[entity_id]
+            if not series:
+                return json.dumps({"entity_id": entity_id, "hours": hours, "history": []}, ensure_ascii=False, default=str)
+            points = downsample(series, max_points)
+            payload = {
+                "entity_id": entity_id,
+                "hours": hours,
+                "total_changes": len(series),
+                "downsampled": len(points) < len(series),
+                "history": [{"state": state, "last_changed": format_ts(ts)} for ts, state in points],
+            }
+            stats = summarize(series)
+            if stats:
+                payload["summary"] = stats
+            return json.dumps(payload, ensure_ascii=False, default=str)
 
         elif tool_name == "get_scenes":
             states = api.get_all_states()
@@ -3923,16 +3994,14 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
 
         elif tool_name == "get_areas":
             try:
-                template = '[{% for area in areas() %}{"id":{{ area | tojson }}, "name":{{ area_name(area) | tojson }}, "entities":{{ area_entities(area) | list | tojson }}}{% if not loop.last %},{% endif %}{% endfor %}]'
-                url = f"{api.HA_URL}/api/template"
-                resp = requests.post(url, headers=api.get_ha_headers(), json={"template": template}, timeout=30)
-                if resp.status_code == 200:
-                    areas_data = json.loads(resp.text)
-                    if api.AI_PROVIDER == "github":
-                        for area in areas_data:
-                            area["entities"] = area["entities"][:10]
-                    return json.dumps(areas_data, ensure_ascii=False, default=str)
-                return json.dumps({"error": f"Template API error: {resp.status_code}"}, default=str)
+                from services.registry_service import get_registry_graph
+                areas_data = get_registry_graph().area_summary()
+                if not areas_data and not get_registry_graph().entities():
+                    return json.dumps({"error": "Could not retrieve area registry"}, default=str)
+                if api.AI_PROVIDER == "github":
+                    for area in areas_data:
+                        area["entities"] = area["entities"][:10]
+                return json.dumps(areas_data, ensure_ascii=False, default=str)
             except Exception as e:
                 return json.dumps({"error": f"Could not get areas: {str(e)}"}, default=str)
 
@@ -5355,9 +5424,9 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
         # ===== AREA MANAGEMENT (WebSocket) =====
         elif tool_name == "manage_areas":
             action = tool_input.get("action", "list")
+            from services.registry_service import get_registry_graph
             if action == "list":
-                result = api.call_ha_websocket("config/area_registry/list")
-                areas = result.get("result", [])
+                areas = get_registry_graph().areas()
                 summary = [{"area_id": a.get("area_id"), "name": a.get("name"), "icon": a.get("icon", "")} for a in areas]
                 return json.dumps({"areas": summary, "count": len(summary)}, ensure_ascii=False, default=str)
             elif action == "create":
@@ -5367,6 +5436,7 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                     params["icon"] = tool_input["icon"]
                 result = api.call_ha_websocket("config/area_registry/create", **params)
                 if result.get("success"):
+                    get_registry_graph().invalidate("area")
                     area = result.get("result", {})
                     return json.dumps({"status": "success", "message": f"Area '{name}' created.", "area_id": area.get("area_id")}, ensure_ascii=False, default=str)
                 error_msg = result.get("error", {}).get("message", str(result))
@@ -5380,6 +5450,7 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                     params["icon"] = tool_input["icon"]
                 result = api.call_ha_websocket("config/area_registry/update", **params)
                 if result.get("success"):
+                    get_registry_graph().invalidate("area")
                     return json.dumps({"status": "success", "message": f"Area '{area_id}' updated."}, ensure_ascii=False, default=str)
                 error_msg = result.get("error", {}).get("message", str(result))
                 return json.dumps({"error": f"Failed to update area: {error_msg}"}, default=str)
@@ -5387,6 +5458,7 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                 area_id = tool_input.get("area_id", "")
                 result = api.call_ha_websocket("config/area_registry/delete", area_id=area_id)
                 if result.get("success"):
+                    get_registry_graph().invalidate("area")
                     return json.dumps({"status": "success", "message": f"Area '{area_id}' deleted."}, ensure_ascii=False, default=str)
                 error_msg = result.get("error", {}).get("message", str(result))
                 return json.dumps({"error": f"Failed to delete area: {error_msg}"}, default=str)
@@ -5405,6 +5477,8 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                 params["icon"] = tool_input["icon"]
             result = api.call_ha_websocket("config/entity_registry/update", **params)
             if result.get("success"):
+                from services.registry_service import get_registry_graph
+                get_registry_graph().invalidate("entity")
                 entry = result.get("result", {})
                 return json.dumps({"status": "success", "message": f"Entity '{entity_id}' updated.",
                                    "name": entry.get("name"), "area_id": entry.get("area_id"),
@@ -5414,8 +5488,8 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
 
         # ===== DEVICE REGISTRY (WebSocket) =====
         elif tool_name == "get_devices":
-            result = api.call_ha_websocket("config/device_registry/list")
-            devices = result.get("result", [])
+            from services.registry_service import get_registry_graph
+            devices = get_registry_graph().devices()
             summary = []
             for d in devices[:100]:  # Limit to 100 devices
                 summary.append({
@@ -5618,23 +5692,8 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                     old_result = old_config.get("result", {})
                     old_yaml = yaml.dump({"views": old_result.get("views", [])}, default_flow_style=False, allow_unicode=True)
 
-                    # Create a restoreable snapshot (stored in SNAPSHOTS_DIR with .meta)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    safe_url = (url_path or "lovelace").replace("/", "__").replace("\\", "__")
-                    snapshot_id = f"{timestamp}_dashboard__{safe_url}"
-                    snapshot_path = os.path.join(api.SNAPSHOTS_DIR, snapshot_id)
-                    os.makedirs(api.SNAPSHOTS_DIR, exist_ok=True)
-                    with open(snapshot_path, "w", encoding="utf-8") as sf:
-                        json.dump({"url_path": url_path or "lovelace", "config": old_result}, sf, ensure_ascii=False)
-                    with open(snapshot_path + ".meta", "w", encoding="utf-8") as mf:
-                        json.dump({
-                            "snapshot_id": snapshot_id,
-                            "timestamp": timestamp,
-                            "kind": "lovelace_dashboard",
-                            "url_path": url_path or "lovelace",
-                            # Keep original_file for list_snapshots compatibility
-                            "original_file": f"lovelace:{url_path or 'lovelace'}",
-                        }, mf, ensure_ascii=False)
+                    # Create a restoreable snapshot (kind=lovelace_dashboard in the snapshot store)
+                    snapshot_id = _snapshot_dashboard(url_path, old_result)
                     logger.info(f"📊 Dashboard snapshot saved: {snapshot_id}")
             except Exception as e:
                 logger.warning(f"⚠️ Could not snapshot dashboard before update: {e}")
@@ -5828,19 +5887,11 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
 
         # ===== SNAPSHOT MANAGEMENT =====
         elif tool_name == "list_snapshots":
-            if not os.path.isdir(api.SNAPSHOTS_DIR):
-                return json.dumps({"snapshots": [], "count": 0})
-            snapshots = []
-            for f in sorted(os.listdir(api.SNAPSHOTS_DIR)):
-                if f.endswith(".meta"):
-                    continue
-                meta_path = os.path.join(api.SNAPSHOTS_DIR, f + ".meta")
-                if os.path.isfile(meta_path):
-                    with open(meta_path, "r") as mf:
-                        meta = json.load(mf)
-                    snapshots.append(meta)
-                else:
-                    snapshots.append({"snapshot_id": f, "original_file": f.split("_", 2)[-1].replace("__", "/")})
+            from services.snapshot_service import get_snapshot_store
+            snapshots = [
+                {k: v for k, v in meta.items() if k not in ("blob", "stored_size", "created_at")}
+                for meta in get_snapshot_store().list()
+            ]
             return json.dumps({"snapshots": snapshots, "count": len(snapshots)}, ensure_ascii=False, default=str)
 
         elif tool_name == "restore_snapshot":
@@ -5851,26 +5902,19 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                 return json.dumps({"error": "snapshot_id is required."}, ensure_ascii=False)
             if snapshot_id != os.path.basename(snapshot_id) or ".." in snapshot_id or "/" in snapshot_id or "\\" in snapshot_id:
                 return json.dumps({"error": "Invalid snapshot_id."}, ensure_ascii=False)
-            snapshot_path = os.path.join(api.SNAPSHOTS_DIR, snapshot_id)
-            meta_path = snapshot_path + ".meta"
-            if not os.path.isfile(snapshot_path):
+            from services.snapshot_service import get_snapshot_store
+            _snap_store = get_snapshot_store()
+            meta = _snap_store.get(snapshot_id)
+            snapshot_data = _snap_store.read(snapshot_id) if meta else None
+            if snapshot_data is None:
                 return json.dumps({"error": f"Snapshot '{snapshot_id}' not found. Use list_snapshots."})
 
-            meta = {}
-            if os.path.isfile(meta_path):
-                try:
-                    with open(meta_path, "r", encoding="utf-8") as mf:
-                        meta = json.load(mf) or {}
-                except Exception:
-                    meta = {}
-
             kind = meta.get("kind") or "file"
 
             # --- Dashboard snapshots (lovelace) ---
             if kind == "lovelace_dashboard":
                 try:
-                    with open(snapshot_path, "r", encoding="utf-8") as sf:
-                        snap = json.load(sf) or {}
+                    snap = json.loads(snapshot_data.decode("utf-8")) or {}
                 except Exception as e:
                     return json.dumps({"error": f"Invalid dashboard snapshot content: {e}"}, ensure_ascii=False)
 
@@ -5886,21 +5930,7 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
                         snap_params["url_path"] = url_path
                     current = api.call_ha_websocket("lovelace/config", **snap_params)
                     if current.get("success"):
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        safe_url = (url_path or "lovelace").replace("/", "__").replace("\\", "__")
-                        pre_snapshot_id = f"{timestamp}_dashboard__{safe_url}"
-                        pre_snapshot_path = os.path.join(api.SNAPSHOTS_DIR, pre_snapshot_id)
-                        os.makedirs(api.SNAPSHOTS_DIR, exist_ok=True)
-                        with open(pre_snapshot_path, "w", encoding="utf-8") as psf:
-                            json.dump({"url_path": url_path or "lovelace", "config": current.get("result", {})}, psf, ensure_ascii=False)
-                        with open(pre_snapshot_path + ".meta", "w", encoding="utf-8") as pmf:
-                            json.dump({
-                                "snapshot_id": pre_snapshot_id,
-                                "timestamp": timestamp,
-                                "kind": "lovelace_dashboard",
-                                "url_path": url_path or "lovelace",
-                                "original_file": f"lovelace:{url_path or 'lovelace'}",
-                            }, pmf, ensure_ascii=False)
+                        _snapshot_dashboard(url_path, current.get("result", {}))
                 except Exception:
                     pass
 
@@ -5936,10 +5966,10 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
             api.create_snapshot(original_file)
 
             # Restore file
-            import shutil
             dest = os.path.join(api.HA_CONFIG_DIR, original_file)
             os.makedirs(os.path.dirname(dest) if os.path.dirname(dest) else api.HA_CONFIG_DIR, exist_ok=True)
-            shutil.copy2(snapshot_path, dest)
+            with open(dest, "wb") as df:
+                df.write(snapshot_data)
 
             reload_result = None
             if reload_after:
@@ -6636,9 +6666,9 @@ HA_TOOLS_COMPACT = [
     },
     {
         "name": "get_history",
-        "description": "Get state history of an entity. Params: entity_id (required), hours (default 24).",
+        "description": "Get state history of an entity. Params: entity_id (required), hours (default 24), points (default 50).",
         "parameters": {"type": "object", "properties": {
-            "entity_id": {"type": "string"}, "hours": {"type": "number"}
+            "entity_id": {"type": "string"}, "hours": {"type": "number"}, "points": {"type": "number"}
         }, "required": ["entity_id"]}
     },
     {
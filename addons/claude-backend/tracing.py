@@ -0,0 +1,345 @@
+"""Lightweight request-level span tracing for the chat pipeline.
+
+A trace is started once per chat request (``stream_chat_with_ai``) and bound
+to the current thread; code anywhere below it opens spans with::
+
+    with tracing.span("build_smart_context"):
+        ...
+
+Threads running concurrently with the request (hedged provider streams) bind
+the trace with ``bind_worker(trace, parent)``: their spans nest under
+*parent* on a stack of their own, so they never reparent the request's spans.
+
+When no trace is active (tracing disabled, or code running outside a chat
+request) ``span()`` returns a shared no-op context manager, so instrumented
+hot paths pay one thread-local lookup.
+
+Finished traces are kept in a ring buffer and exposed by
+``/api/debug/traces`` with per-stage p50/p95 aggregates and a folded-stack
+("flame graph") export.
+
+Disable with ``ENABLE_TRACING=false``.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+ENABLED = os.getenv("ENABLE_TRACING", "True").lower() not in ("false", "0", "no")
+MAX_TRACES = 100
+
+_local = threading.local()
+_traces: Deque["Trace"] = deque(maxlen=MAX_TRACES)
+_traces_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+class _NoopSpan:
+    """Returned by span() when no trace is active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def set(self, **meta) -> None:
+        pass
+
+    def mark(self, name: str, **meta) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed stage inside a trace."""
+
+    __slots__ = ("trace", "name", "parent", "depth", "start", "end", "meta", "_stack")
+
+    def __init__(self, trace: "Trace", name: str, meta: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.meta = meta
+        self.parent: Optional[Span] = None
+        self.depth = 0
+        self.start = 0.0
+        self.end: Optional[float] = None
+        self._stack: Optional[List[Span]] = None
+
+    def __enter__(self) -> "Span":
+        self._stack = stack = _stack_for(self.trace)
+        self.parent = stack[-1] if stack else None
+        self.depth = self.parent.depth + 1 if self.parent is not None else 0
+        self.start = time.perf_counter()
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.meta["error"] = exc_type.__name__
+        # The stack it was pushed on, even if a generator closes it elsewhere
+        stack = self._stack if self._stack is not None else []
+        # Generators may close spans out of order: remove this one wherever it is
+        if stack and stack[-1] is self:
+            stack.pop()
+        elif self in stack:
+            stack.remove(self)
+        self.trace._add(self)
+        return False
+
+    def set(self, **meta) -> None:
+        """Attach metadata (provider, model, counts...) to the span."""
+        self.meta.update(meta)
+
+    def mark(self, name: str, **meta) -> None:
+        """Record a child stage from this span's start until now (e.g. TTFT)."""
+        child = Span(self.trace, name, meta)
+        child.parent = self
+        child.depth = self.depth + 1
+        child.start = self.start
+        child.end = time.perf_counter()
+        self.trace._add(child)
+
+    def path(self) -> str:
+        parts = []
+        node: Optional[Span] = self
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return ";".join(reversed(parts))
+
+
+class Trace:
+    """All spans recorded for one chat request."""
+
+    MAX_SPANS = 500
+
+    def __init__(self, name: str, meta: Dict[str, Any]):
+        self.id = next(_ids)
+        self.name = name
+        self.meta = meta
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self._stack: List[Span] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _add(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < self.MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "meta": self.meta,
+            "dropped_spans": self.dropped,
+            "spans": [
+                {
+                    "name": s.name,
+                    "path": s.path(),
+                    "depth": s.depth + 1,
+                    "offset_ms": round((s.start - self.start) * 1000, 2),
+                    "duration_ms": round(((s.end or s.start) - s.start) * 1000, 2),
+                    **({"meta": s.meta} if s.meta else {}),
+                }
+                for s in spans
+            ],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def start_trace(name: str, **meta) -> Optional[Trace]:
+    """Start a trace bound to the current thread (None when disabled)."""
+    if not ENABLED:
+        return None
+    trace = Trace(name, meta)
+    _local.trace = trace
+    return trace
+
+
+def finish_trace(trace: Optional[Trace]) -> None:
+    """Close a trace, unbind it from the thread and store it in the ring buffer."""
+    if trace is None:
+        return
+    if trace.end is None:
+        trace.end = time.perf_counter()
+        with _traces_lock:
+            _traces.append(trace)
+    if getattr(_local, "trace", None) is trace:
+        _local.trace = None
+
+
+def current() -> Optional[Trace]:
+    return getattr(_local, "trace", None)
+
+
+def _stack_for(trace: Trace) -> List[Span]:
+    worker = getattr(_local, "worker", None)
+    if worker is not None and worker[0] is trace:
+        return worker[1]
+    return trace._stack
+
+
+def bind(trace: Optional[Trace]) -> Optional[Trace]:
+    """Bind *trace* to the current thread (the request's own flow); returns the previous one."""
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    _local.worker = None
+    return previous
+
+
+def bind_worker(trace: Optional[Trace], parent: Optional[Span]) -> None:
+    """Bind *trace* in a thread running alongside the request; its spans nest under *parent*."""
+    bind(trace)
+    if trace is not None:
+        _local.worker = (trace, [parent] if parent is not None else [])
+
+
+def current_span() -> Optional[Span]:
+    """Innermost open span of the current thread, or None."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    stack = _stack_for(trace)
+    return stack[-1] if stack else None
+
+
+def span(name: str, **meta):
+    """Context manager timing *name* inside the active trace (no-op without one)."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NOOP
+    return Span(trace, name, meta)
+
+
+_NON_CONTENT_EVENTS = frozenset({"status", "error", "done", "fallback_notice", "usage"})
+
+
+def traced_stream(name: str, events, **meta):
+    """Re-yield a provider event stream inside a span, marking time-to-first-token."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield from events
+        return
+    with Span(trace, name, meta) as sp:
+        count = 0
+        first_token = False
+        for event in events:
+            if not first_token and isinstance(event, dict) and event.get("type") not in _NON_CONTENT_EVENTS:
+                first_token = True
+                sp.mark("ttft")
+            count += 1
+            yield event
+        sp.set(events=count)
+
+
+def annotate(**meta) -> None:
+    """Attach metadata to the active trace itself (provider, intent...)."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.meta.update(meta)
+
+
+def recent_traces(limit: int = 20) -> List[Dict[str, Any]]:
+    with _traces_lock:
+        traces = list(_traces)[-limit:] if limit > 0 else []
+    return [t.to_dict() for t in reversed(traces)]
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(p * len(sorted_values)))
+    return round(sorted_values[idx], 2)
+
+
+def aggregates() -> Dict[str, Dict[str, Any]]:
+    """Per-stage count / avg / p50 / p95 / max over the buffered traces.
+
+    Each stage's duration is summed per trace first, so a stage that runs
+    several times in one request (tool rounds, HA calls) is reported as its
+    total cost for that request.
+    """
+    with _traces_lock:
+        traces = list(_traces)
+    per_stage: Dict[str, List[float]] = {}
+    calls: Dict[str, int] = {}
+    totals: List[float] = []
+    for trace in traces:
+        totals.append(trace.duration_ms)
+        summed: Dict[str, float] = {}
+        for s in trace.spans:
+            summed[s.name] = summed.get(s.name, 0.0) + ((s.end or s.start) - s.start) * 1000
+            calls[s.name] = calls.get(s.name, 0) + 1
+        for name, ms in summed.items():
+            per_stage.setdefault(name, []).append(ms)
+    per_stage["total"] = totals
+    calls["total"] = len(totals)
+
+    result = {}
+    for name, values in per_stage.items():
+        values.sort()
+        result[name] = {
+            "requests": len(values),
+            "calls": calls.get(name, 0),
+            "avg_ms": round(sum(values) / len(values), 2) if values else 0.0,
+            "p50_ms": _percentile(values, 0.50),
+            "p95_ms": _percentile(values, 0.95),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+    return dict(sorted(result.items(), key=lambda kv: -kv[1]["p95_ms"]))
+
+
+def folded_stacks() -> str:
+    """Folded-stack export (``root;child;leaf <self-time µs>``) for flame graph tools."""
+    with _traces_lock:
+        traces = list(_traces)
+    folded: Dict[str, float] = {}
+    for trace in traces:
+        child_time: Dict[int, float] = {}
+        for s in trace.spans:
+            if s.parent is not None:
+                child_time[id(s.parent)] = child_time.get(id(s.parent), 0.0) + ((s.end or s.start) - s.start)
+        root_children = 0.0
+        for s in trace.spans:
+            dur = (s.end or s.start) - s.start
+            if s.parent is None:
+                root_children += dur
+            self_time = max(0.0, dur - child_time.get(id(s), 0.0))
+            key = f"{trace.name};{s.path()}"
+            folded[key] = folded.get(key, 0.0) + self_time
+        root_self = max(0.0, (trace.end or trace.start) - trace.start - root_children)
+        folded[trace.name] = folded.get(trace.name, 0.0) + root_self
+    return "\n".join(f"{k} {int(v * 1_000_000)}" for k, v in sorted(folded.items()) if v > 0)
+
+
+def clear() -> None:
+    with _traces_lock:
+        _traces.clear()
@@ -1,21 +1,28 @@
 """Session and daily cost/usage tracking with disk persistence.
 
 Inspired by OpenClaw's session-cost-usage.ts — tracks tokens, cost
-breakdowns, and daily aggregates.  Data is saved to /data/usage_stats.json.
+breakdowns, and daily aggregates.  Aggregates are saved to
+/data/usage_stats.json, with an append-only journal of recent requests in
+/data/usage_stats.json.journal between rollups.
 
 Thread-safe: uses a lock so the SSE stream can record usage from
-concurrent requests without races.
+concurrent requests without races.  Recording is O(1) in memory; disk
+writes happen in batches on a background thread.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
 import threading
+import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
+import metrics_exporter
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -58,18 +65,79 @@ def _add_totals(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
         dst[key] = round(dst.get(key, 0.0) + src.get(key, 0.0), 6)
 
 
+# Compact journal row: one JSON array per request, fields in this order
+_EVENT_INT_FIELDS = ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+_EVENT_COST_FIELDS = ("total_cost", "input_cost", "output_cost", "cache_read_cost", "cache_write_cost")
+
+
+def _entry_from_usage(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a single-request totals entry from the enriched usage dict."""
+    entry = _empty_totals()
+    entry["input_tokens"] = usage.get("input_tokens", 0) or 0
+    entry["output_tokens"] = usage.get("output_tokens", 0) or 0
+    entry["cache_read_tokens"] = usage.get("cache_read_tokens", 0) or 0
+    entry["cache_write_tokens"] = usage.get("cache_write_tokens", 0) or 0
+    entry["total_tokens"] = (
+        entry["input_tokens"] + entry["output_tokens"]
+        + entry["cache_read_tokens"] + entry["cache_write_tokens"]
+    )
+    entry["total_cost"] = usage.get("cost", 0.0) or 0.0
+    bd = usage.get("cost_breakdown") or {}
+    entry["input_cost"] = bd.get("input", 0.0) or 0.0
+    entry["output_cost"] = bd.get("output", 0.0) or 0.0
+    entry["cache_read_cost"] = bd.get("cache_read", 0.0) or 0.0
+    entry["cache_write_cost"] = bd.get("cache_write", 0.0) or 0.0
+    entry["requests"] = 1
+    return entry
+
+
+def _event_row(seq: int, day: str, model: str, provider: str, entry: Dict[str, Any]) -> list:
+    return [seq, day, model, provider] + [entry[k] for k in _EVENT_INT_FIELDS + _EVENT_COST_FIELDS]
+
+
+def _entry_from_row(row: list) -> Dict[str, Any]:
+    entry = _empty_totals()
+    values = row[4:]
+    for key, val in zip(_EVENT_INT_FIELDS + _EVENT_COST_FIELDS, values):
+        entry[key] = val
+    entry["total_tokens"] = sum(entry[k] for k in _EVENT_INT_FIELDS)
+    entry["requests"] = 1
+    return entry
+
+
 # ---------------------------------------------------------------------------
 # UsageTracker singleton
 # ---------------------------------------------------------------------------
 
 class UsageTracker:
-    """Accumulates usage per day, per model, per provider. Persists to disk."""
+    """Accumulates usage per day, per model, per provider. Persists to disk.
+
+    Write-behind storage: ``record()`` only updates the in-memory aggregates
+    and queues a compact event row. A background thread appends queued rows
+    to ``<path>.journal`` every ``FLUSH_INTERVAL`` seconds and periodically
+    rolls the aggregates up into the snapshot at *path*, truncating the
+    journal. On load the journal is replayed on top of the snapshot (rows are
+    sequence-numbered so a crash between rollup and truncate never
+    double-counts).
+    """
+
+    FLUSH_INTERVAL = 5.0          # seconds between journal appends
+    ROLLUP_INTERVAL = 300.0       # seconds between snapshot rewrites
+    ROLLUP_MAX_EVENTS = 500       # ...or after this many journaled events
+    RETENTION_DAYS = 400          # daily buckets older than this are dropped
 
     def __init__(self, path: str = _USAGE_FILE) -> None:
         self._path = path
+        self._journal_path = path + ".journal"
         self._lock = threading.Lock()
         # In-memory state ─ loaded from disk on first access
         self._data: Optional[Dict[str, Any]] = None
+        self._pending: List[list] = []
+        self._journaled_since_rollup = 0
+        self._last_rollup = time.monotonic()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
 
     # -- lazy load ----------------------------------------------------------
 
@@ -78,31 +146,128 @@ class UsageTracker:
             self._data = self._load()
         return self._data
 
+    @staticmethod
+    def _empty_data() -> Dict[str, Any]:
+        return {"daily": {}, "totals": _empty_totals(), "by_model": {}, "by_provider": {}, "last_seq": 0}
+
     def _load(self) -> Dict[str, Any]:
-        """Load stats from disk, returning empty structure on error."""
+        """Load snapshot + journal from disk, returning empty structure on error."""
+        data = self._empty_data()
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r") as f:
-                    data = json.load(f)
-                if isinstance(data, dict) and "daily" in data:
-                    return data
+                    loaded = json.load(f)
+                if isinstance(loaded, dict) and "daily" in loaded:
+                    data.update(loaded)
         except Exception as e:
             logger.warning("usage_tracker: could not load %s: %s", self._path, e)
-        return {"daily": {}, "totals": _empty_totals(), "by_model": {}, "by_provider": {}}
 
-    def _save(self) -> None:
-        """Persist current state to disk (called under lock)."""
-        if self._data is None:
-            return
+        replayed = 0
+        try:
+            if os.path.exists(self._journal_path):
+                last_seq = data.get("last_seq", 0)
+                with open(self._journal_path, "r") as f:
+                    for line in f:
+                        try:
+                            row = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line after a crash
+                        if not isinstance(row, list) or len(row) < 4 or row[0] <= last_seq:
+                            continue
+                        self._apply(data, row[1], row[2], row[3], _entry_from_row(row))
+                        data["last_seq"] = row[0]
+                        replayed += 1
+        except Exception as e:
+            logger.warning("usage_tracker: could not replay %s: %s", self._journal_path, e)
+        if replayed:
+            logger.info("usage_tracker: replayed %d journaled requests", replayed)
+        self._journaled_since_rollup = replayed
+        return data
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], day: str, model: str, provider: str, entry: Dict[str, Any]) -> None:
+        """Fold one request into the pre-aggregated buckets."""
+        daily = data["daily"].get(day)
+        if daily is None:
+            daily = data["daily"][day] = _empty_totals()
+        _add_totals(daily, entry)
+        _add_totals(data["totals"], entry)
+        by_model = data.setdefault("by_model", {})
+        if model not in by_model:
+            by_model[model] = _empty_totals()
+        _add_totals(by_model[model], entry)
+        by_provider = data.setdefault("by_provider", {})
+        if provider not in by_provider:
+            by_provider[provider] = _empty_totals()
+        _add_totals(by_provider[provider], entry)
+
+    # -- write-behind persistence --------------------------------------------
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="usage-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("usage_tracker: background flush failed: %s", e)
+
+    def flush(self, rollup: bool = False) -> None:
+        """Append queued events to the journal; roll up into the snapshot when due."""
+        with self._io_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if rows:
+                try:
+                    os.makedirs(os.path.dirname(self._journal_path) or ".", exist_ok=True)
+                    with open(self._journal_path, "a") as f:
+                        f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows))
+                    self._journaled_since_rollup += len(rows)
+                except Exception as e:
+                    logger.warning("usage_tracker: could not append %s: %s", self._journal_path, e)
+                    with self._lock:
+                        self._pending[:0] = rows  # retry on next flush
+                    return
+            due = (
+                self._journaled_since_rollup >= self.ROLLUP_MAX_EVENTS
+                or (self._journaled_since_rollup and time.monotonic() - self._last_rollup >= self.ROLLUP_INTERVAL)
+            )
+            if rollup or due:
+                self._rollup()
+
+    def _rollup(self) -> None:
+        """Write the aggregate snapshot and truncate the journal (io lock held)."""
+        with self._lock:
+            if self._data is None:
+                return
+            self._prune_locked()
+            payload = json.dumps(self._data, separators=(",", ":"), default=str)
         try:
             os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
             tmp = self._path + ".tmp"
             with open(tmp, "w") as f:
-                json.dump(self._data, f, indent=2, default=str)
+                f.write(payload)
             os.replace(tmp, self._path)
+            # Rows up to last_seq are now in the snapshot; anything journaled
+            # later is still queued in memory, so truncating is safe.
+            open(self._journal_path, "w").close()
+            self._journaled_since_rollup = 0
+            self._last_rollup = time.monotonic()
         except Exception as e:
             logger.warning("usage_tracker: could not save %s: %s", self._path, e)
 
+    def _prune_locked(self) -> None:
+        daily = self._data.get("daily", {})
+        if len(daily) <= self.RETENTION_DAYS:
+            return
+        for day in sorted(daily)[:-self.RETENTION_DAYS]:
+            del daily[day]
+
     # -- public API ---------------------------------------------------------
 
     def record(self, usage: Dict[str, Any]) -> None:
@@ -112,49 +277,17 @@ class UsageTracker:
             input_tokens, output_tokens, cache_read_tokens, cache_write_tokens,
             cost, cost_breakdown, currency, model, provider
         """
+        metrics_exporter.record_usage(usage)
+        entry = _entry_from_usage(usage)
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        model = usage.get("model") or "unknown"
+        provider = usage.get("provider") or "unknown"
         with self._lock:
             data = self._ensure_loaded()
-            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-            # Build entry from usage dict
-            entry = _empty_totals()
-            entry["input_tokens"] = usage.get("input_tokens", 0)
-            entry["output_tokens"] = usage.get("output_tokens", 0)
-            entry["cache_read_tokens"] = usage.get("cache_read_tokens", 0)
-            entry["cache_write_tokens"] = usage.get("cache_write_tokens", 0)
-            entry["total_tokens"] = (
-                entry["input_tokens"] + entry["output_tokens"]
-                + entry["cache_read_tokens"] + entry["cache_write_tokens"]
-            )
-            entry["total_cost"] = usage.get("cost", 0.0)
-            bd = usage.get("cost_breakdown") or {}
-            entry["input_cost"] = bd.get("input", 0.0)
-            entry["output_cost"] = bd.get("output", 0.0)
-            entry["cache_read_cost"] = bd.get("cache_read", 0.0)
-            entry["cache_write_cost"] = bd.get("cache_write", 0.0)
-            entry["requests"] = 1
-
-            # -- daily --
-            if today not in data["daily"]:
-                data["daily"][today] = _empty_totals()
-            _add_totals(data["daily"][today], entry)
-
-            # -- global totals --
-            _add_totals(data["totals"], entry)
-
-            # -- by model --
-            model = usage.get("model") or "unknown"
-            if model not in data.setdefault("by_model", {}):
-                data["by_model"][model] = _empty_totals()
-            _add_totals(data["by_model"][model], entry)
-
-            # -- by provider --
-            provider = usage.get("provider") or "unknown"
-            if provider not in data.setdefault("by_provider", {}):
-                data["by_provider"][provider] = _empty_totals()
-            _add_totals(data["by_provider"][provider], entry)
-
-            self._save()
+            self._apply(data, today, model, provider, entry)
+            data["last_seq"] = data.get("last_seq", 0) + 1
+            self._pending.append(_event_row(data["last_seq"], today, model, provider, entry))
+            self._ensure_flusher()
 
     def get_summary(self, days: int = 30) -> Dict[str, Any]:
         """Return a summary of usage for the last N days.
@@ -171,40 +304,42 @@ class UsageTracker:
         """
         with self._lock:
             data = self._ensure_loaded()
+            daily = data.get("daily", {})
+            # Filter daily entries to requested window
+            recent_dates = sorted(daily)[-days:] if days > 0 else []
+            daily_list: List[Dict[str, Any]] = [{"date": d, **daily[d]} for d in recent_dates]
+            all_time = dict(data.get("totals", _empty_totals()))
+            by_model = {k: dict(v) for k, v in data.get("by_model", {}).items()}
+            by_provider = {k: dict(v) for k, v in data.get("by_provider", {}).items()}
 
-        # Filter daily entries to requested window
-        all_dates = sorted(data.get("daily", {}).keys(), reverse=True)
-        recent_dates = all_dates[:days]
-
-        daily_list: List[Dict[str, Any]] = []
         window_totals = _empty_totals()
-        for d in sorted(recent_dates):
-            day_data = data["daily"][d]
-            daily_list.append({"date": d, **day_data})
+        for day_data in daily_list:
             _add_totals(window_totals, day_data)
 
         return {
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "days": days,
             "totals": window_totals,
-            "all_time_totals": data.get("totals", _empty_totals()),
+            "all_time_totals": all_time,
             "daily": daily_list,
-            "by_model": data.get("by_model", {}),
-            "by_provider": data.get("by_provider", {}),
+            "by_model": by_model,
+            "by_provider": by_provider,
         }
 
     def get_today(self) -> Dict[str, Any]:
         """Quick access to today's totals."""
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         with self._lock:
             data = self._ensure_loaded()
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        return data.get("daily", {}).get(today, _empty_totals())
+            return dict(data.get("daily", {}).get(today, _empty_totals()))
 
     def reset(self) -> None:
         """Clear all tracked data."""
-        with self._lock:
-            self._data = {"daily": {}, "totals": _empty_totals(), "by_model": {}, "by_provider": {}}
-            self._save()
+        with self._io_lock:
+            with self._lock:
+                self._data = self._empty_data()
+                self._pending = []
+            self._rollup()
 
 
 # ---------------------------------------------------------------------------
@@ -218,4 +353,6 @@ def get_tracker() -> UsageTracker:
     global _tracker
     if _tracker is None:
         _tracker = UsageTracker()
+        # Persist queued events on clean shutdown
+        atexit.register(_tracker.flush, True)
     return _tracker
@@ -16,7 +16,6 @@ import os
 import io
 import json
 import base64
-import asyncio
 import requests
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Tuple, Any, List
@@ -24,6 +23,8 @@ from pathlib import Path
 from enum import Enum
 import logging
 
+from async_runtime import get_runtime
+
 try:
     import edge_tts
     EDGE_TTS_AVAILABLE = True
@@ -32,6 +33,8 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+EDGE_TTS_TIMEOUT = 60  # seconds
+
 # Edge TTS voice mapping per language
 EDGE_TTS_VOICES = {
     "it": "it-IT-IsabellaNeural",
@@ -313,7 +316,6 @@ class TextToSpeech:
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.language = os.getenv("LANGUAGE", "en").lower()
-        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def _google_language_code(self) -> str:
         lang = (self.language or "en").lower()[:2]
@@ -324,18 +326,6 @@ class TextToSpeech:
             "fr": "fr-FR",
         }.get(lang, "en-US")
     
-    def _get_event_loop(self) -> asyncio.AbstractEventLoop:
-        """Get or create an event loop for async edge-tts calls."""
-        if self._loop is None or self._loop.is_closed():
-            try:
-                self._loop = asyncio.get_event_loop()
-                if self._loop.is_closed():
-                    raise RuntimeError
-            except RuntimeError:
-                self._loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(self._loop)
-        return self._loop
-    
     def speak_with_edge(self, text: str, voice: str = "") -> Tuple[bool, bytes]:
         """Generate speech using Edge TTS (free, no API key, supports Italian)."""
         if not EDGE_TTS_AVAILABLE:
@@ -363,8 +353,7 @@ class TextToSpeech:
                         audio_data += chunk["data"]
                 return audio_data
             
-            loop = self._get_event_loop()
-            audio_bytes = loop.run_until_complete(_generate())
+            audio_bytes = get_runtime().run(_generate(), timeout=EDGE_TTS_TIMEOUT, name="tts.edge")
             
             if audio_bytes:
                 logger.info(f"Edge TTS ({edge_voice}): {len(text)} chars -> {len(audio_bytes)} bytes")